@@ -1,3 +1,5 @@
+import os
+
 from langchain_core.prompts import PromptTemplate
 from langchain_core.output_parsers import StrOutputParser
 from langchain_ollama import OllamaLLM
@@ -6,7 +8,12 @@ from langchain_ollama import OllamaLLM
 local_llm = "mistral"
 
 # Initialize the OllamaLLM model with desired parameters
-llm = OllamaLLM(model=local_llm, base_url="http://127.0.0.1:11434", format="json", temperature=0)
+llm = OllamaLLM(
+    model=local_llm,
+    base_url=os.environ.get("OLLAMA_BASE_URL", "http://127.0.0.1:11434"),
+    format="json",
+    temperature=0,
+)
 
 # Define the prompt template
 template = "Question: {question}\nAnswer: Let's think step by step."
@@ -23,16 +23,10 @@ workflow.set_entry_point("node_1")
 # Compile the workflow into a runnable app
 app = workflow.compile()
 
-# Mermaid-String ausgeben
-mermaid_code = app.get_graph().draw_mermaid()
-print(mermaid_code)
+# Mermaid-Diagramm nur auf Anfrage erzeugen:
+#     python3 ../common/diagrams.py main:workflow
 
-# Optional: Mermaid-Code in Datei speichern
-with open("workflow_graph.mmd", "w") as f:
-    f.write(mermaid_code)
-
-
-
-# Ausführen
-result = app.invoke({"text": "langgraph: "})
-print(result["text"])
\ No newline at end of file
+if __name__ == "__main__":
+    # Ausführen
+    result = app.invoke({"text": "langgraph: "})
+    print(result["text"])
@@ -61,14 +61,10 @@ workflow.add_conditional_edges(
 # Compile the workflow into a runnable app
 app = workflow.compile()
 
-# Mermaid-String ausgeben
-mermaid_code = app.get_graph().draw_mermaid()
-print(mermaid_code)
+# Mermaid-Diagramm nur auf Anfrage erzeugen:
+#     python3 ../common/diagrams.py main:workflow
 
-# Optional: Mermaid-Code in Datei speichern
-with open("workflow_graph.mmd", "w") as f:
-    f.write(mermaid_code)
-
-# Start the lottery process
-for s in app.stream({"input": "", "winnings": None, "missed": None}):
-    print(s)
\ No newline at end of file
+if __name__ == "__main__":
+    # Start the lottery process
+    for s in app.stream({"input": "", "winnings": None, "missed": None}):
+        print(s)
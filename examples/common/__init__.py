@@ -0,0 +1,8 @@
+"""
+Shared helpers for the examples in this directory.
+Example scripts run from their own directory; add the examples directory to
+sys.path before importing, e.g.
+
+    sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+    from common.graph_profiler import instrument_from_env
+"""
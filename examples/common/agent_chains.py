@@ -0,0 +1,73 @@
+"""
+Per-class prompt templates and chains of the example agents.
+
+An agent class parses its template once; `prompt | llm | parser` is built
+once per class and model and shared by every instance and thread, since
+runnables are immutable:
+
+    prompt = default_chains.prompt(type(self), build_template)
+    chain = default_chains.chain(type(self), llm, build_template)
+
+A model is keyed by identity (the registry shares one client per model), and
+only the `max_chains` most recently used chains are kept, so a pool that
+keeps creating clients does not grow the cache without bound.
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Tuple
+
+from langchain_core.output_parsers import StrOutputParser
+from langchain_core.runnables import Runnable
+
+# A few agent classes times the models of their pools
+DEFAULT_MAX_CHAINS = 32
+
+class AgentChains:
+    """Parsed prompt per agent class, and its chains per model"""
+
+    def __init__(self, max_chains: int = DEFAULT_MAX_CHAINS):
+        self.max_chains = max_chains
+        self._lock = threading.Lock()
+        self._prompts: Dict[type, Any] = {}
+        # (class, id(llm)) -> (llm, chain), least recently used first
+        self._chains: "OrderedDict[Tuple[type, int], Tuple[Any, Runnable]]" = (
+            OrderedDict()
+        )
+
+    def prompt(self, owner: type, build: Callable[[], Any]) -> Any:
+        """The class's template; `build` parses it on first use"""
+        prompt = self._prompts.get(owner)
+        if prompt is None:
+            with self._lock:
+                prompt = self._prompts.get(owner)
+                if prompt is None:
+                    prompt = self._prompts[owner] = build()
+        return prompt
+
+    def chain(self, owner: type, llm: Any, build: Callable[[], Any]) -> Runnable:
+        """prompt | llm | parser for the class and model, built on first use"""
+        key = (owner, id(llm))
+        with self._lock:
+            built = self._chains.get(key)
+            if built is not None and built[0] is llm:
+                self._chains.move_to_end(key)
+                return built[1]
+        prompt = self.prompt(owner, build)
+        with self._lock:
+            built = self._chains[key] = (llm, prompt | llm | StrOutputParser())
+            self._chains.move_to_end(key)
+            while len(self._chains) > self.max_chains:
+                self._chains.popitem(last=False)
+        return built[1]
+
+    def __len__(self) -> int:
+        return len(self._chains)
+
+    def clear(self):
+        with self._lock:
+            self._prompts.clear()
+            self._chains.clear()
+
+# Shared by the example agents
+default_chains = AgentChains()
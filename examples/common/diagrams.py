@@ -0,0 +1,125 @@
+"""
+On-demand Mermaid diagrams for LangGraph workflows.
+
+Drawing a graph is kept out of the import and startup path: examples compile
+their workflow and run, and diagrams are written only by an explicit command.
+The written file ends with a structural hash of the graph (nodes, edges,
+conditional edges and their targets); when the hash still matches, the graph
+is not redrawn.
+
+Usage, from an example directory:
+    python ../common/diagrams.py graph:create_workflow        # cs pizza
+    python ../common/diagrams.py chat:create_workflow         # cs network
+    python ../common/diagrams.py main:workflow --force        # even if unchanged
+"""
+
+import argparse
+import hashlib
+import importlib
+import json
+import os
+import sys
+from importlib.metadata import PackageNotFoundError, version
+from typing import Any, Optional
+
+from langgraph.graph import StateGraph
+
+DEFAULT_OUTPUT = "workflow_graph.mmd"
+HASH_PREFIX = "%% graph-hash: "
+
+def _builder(graph: Any) -> StateGraph:
+    """The StateGraph behind a compiled app (or the graph itself)"""
+    return getattr(graph, "builder", graph)
+
+def graph_fingerprint(graph: Any) -> str:
+    """
+    Hash of everything that shows up in the drawing: node names and their
+    declared destinations, plain and waiting edges, and the targets of every
+    conditional edge. Node implementations are not part of it.
+    """
+    builder = _builder(graph)
+    structure = {
+        "nodes": {
+            name: sorted(map(str, spec.ends or ()))
+            for name, spec in builder.nodes.items()
+        },
+        "edges": sorted(builder.edges),
+        "waiting_edges": sorted(
+            (sorted(starts), end) for starts, end in builder.waiting_edges
+        ),
+        "branches": {
+            start: {
+                name: sorted((str(k), v) for k, v in (branch.ends or {}).items())
+                for name, branch in branches.items()
+            }
+            for start, branches in builder.branches.items()
+        },
+        # Output format may differ between LangGraph releases
+        "langgraph": _langgraph_version(),
+    }
+    encoded = json.dumps(structure, sort_keys=True, default=str).encode()
+    return hashlib.sha256(encoded).hexdigest()[:16]
+
+def _langgraph_version() -> Optional[str]:
+    try:
+        return version("langgraph")
+    except PackageNotFoundError:
+        return None
+
+def cached_fingerprint(path: str) -> Optional[str]:
+    """Hash recorded in an existing diagram file, if any"""
+    try:
+        with open(path) as f:
+            lines = f.read().splitlines()
+    except OSError:
+        return None
+    if lines and lines[-1].startswith(HASH_PREFIX):
+        return lines[-1][len(HASH_PREFIX):].strip()
+    return None
+
+def write_mermaid(graph: Any, path: str = DEFAULT_OUTPUT, force: bool = False) -> bool:
+    """
+    Write the graph's Mermaid diagram to `path` unless the file already holds
+    a diagram of the same structure. Accepts a StateGraph or a compiled app.
+    Returns True if the file was (re)written.
+    """
+    fingerprint = graph_fingerprint(graph)
+    if not force and cached_fingerprint(path) == fingerprint:
+        return False
+    app = graph.compile() if isinstance(graph, StateGraph) else graph
+    mermaid_code = app.get_graph().draw_mermaid()
+    with open(path, "w") as f:
+        f.write(mermaid_code.rstrip("\n") + "\n" + HASH_PREFIX + fingerprint + "\n")
+    return True
+
+def load_target(spec: str) -> Any:
+    """Resolve "module:attribute"; callables (e.g. create_workflow) are called"""
+    module_name, _, attribute = spec.partition(":")
+    target = getattr(importlib.import_module(module_name), attribute or "app")
+    if isinstance(target, StateGraph) or hasattr(target, "get_graph"):
+        return target
+    return target()
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Write a workflow's Mermaid diagram if its structure changed"
+    )
+    parser.add_argument(
+        "target",
+        help='"module:attribute" of a StateGraph, compiled app or factory, '
+        'e.g. graph:create_workflow',
+    )
+    parser.add_argument("--output", default=DEFAULT_OUTPUT)
+    parser.add_argument(
+        "--force", action="store_true", help="Redraw even if the structure is unchanged"
+    )
+    args = parser.parse_args(argv)
+
+    # Example modules are imported from the current directory
+    sys.path.insert(0, os.getcwd())
+    written = write_mermaid(load_target(args.target), args.output, force=args.force)
+    print(f"{'Wrote' if written else 'Unchanged'}: {args.output}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,299 @@
+"""
+Minimal in-process interpreter for StateGraph definitions.
+
+`GraphInterpreter(workflow)` flattens a StateGraph builder into a dispatch
+table of node functions, edges and routers and runs it with a plain loop:
+call the node, apply its update with the state's reducers, evaluate the
+router, repeat. There are no channels, checkpoints, tasks or callbacks, so a
+run costs little more than the node functions themselves, which makes
+millions of deterministic scenario runs practical.
+
+Supported: one active node at a time (plain edges and conditional edges
+with a single target per step), Annotated reducers, `Command(update, goto)`
+results from nodes without outgoing edges, `runtime`/`config` injection, and
+`interrupt()` with resume.
+Fan-out (several successors, waiting edges) is rejected with
+`UnsupportedGraphError` when the table is built; fan-out that only shows at
+run time (a router returning several targets or `Send`, `Command.goto` with
+several nodes) raises the same error when it happens. Use the compiled app
+for those graphs.
+
+    interpreter = GraphInterpreter(create_workflow(), context=PizzaRuntime.create())
+    run = interpreter.run(initial_state)
+    run.path          # ["triage", "pizza_agent", "continuation_agent", "await_user"]
+    run = interpreter.resume(run, "done")
+"""
+
+import copy
+import inspect
+import itertools
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from langchain_core.runnables.config import var_child_runnable_config
+from langgraph.channels.binop import BinaryOperatorAggregate
+from langgraph.constants import END, START
+from langgraph.errors import GraphInterrupt, GraphRecursionError
+from langgraph.runtime import Runtime
+from langgraph.types import Command, Send
+
+# interrupt() reads its resume value from the Pregel scratchpad in the run
+# config, which LangGraph does not expose publicly. requirements.txt pins the
+# release these internals come from, and the equivalence test against the
+# compiled app checks them; without them, graphs run but interrupt() does not
+try:
+    from langgraph._internal._constants import (
+        CONFIG_KEY_CHECKPOINT_NS,
+        CONFIG_KEY_SCRATCHPAD,
+        CONFIG_KEY_SEND,
+    )
+    from langgraph._internal._scratchpad import PregelScratchpad
+except ImportError:
+    PregelScratchpad = None
+
+DEFAULT_RECURSION_LIMIT = 25
+
+class UnsupportedGraphError(ValueError):
+    """The graph uses a feature the interpreter does not run (e.g. fan-out)"""
+
+@dataclass
+class Run:
+    """Result of running (or resuming) a graph with the interpreter"""
+    state: Dict[str, Any]
+    # Nodes executed by this call, in order
+    path: List[str] = field(default_factory=list)
+    # Set when a node called interrupt(): the node to resume and the interrupt value
+    paused_at: Optional[str] = None
+    interrupt_value: Any = None
+
+@dataclass
+class _Step:
+    """Dispatch-table entry for one node"""
+    name: str
+    func: Callable
+    inject: Tuple[str, ...]
+    # Exactly one of: a fixed successor, or a router with its path map
+    next_node: Optional[str] = None
+    router: Optional[Callable] = None
+    router_inject: Tuple[str, ...] = ()
+    path_map: Optional[Dict[Any, str]] = None
+
+def _unwrap(runnable: Any) -> Callable:
+    """The plain function behind a node/router runnable"""
+    func = getattr(runnable, "func", None)
+    if func is None:
+        raise TypeError(
+            f"Cannot interpret {runnable!r}: only function nodes are supported"
+        )
+    return func
+
+def _injected(func: Callable) -> Tuple[str, ...]:
+    """Names of the extra arguments LangGraph would pass (runtime, config)"""
+    parameters = inspect.signature(func).parameters
+    return tuple(name for name in ("runtime", "config") if name in parameters)
+
+class GraphInterpreter:
+    """Runs a StateGraph definition without the Pregel runtime"""
+
+    def __init__(
+        self,
+        workflow: Any,
+        context: Any = None,
+        recursion_limit: int = DEFAULT_RECURSION_LIMIT,
+        on_step: Optional[Callable[[str, Dict[str, Any], str], None]] = None,
+    ):
+        builder = getattr(workflow, "builder", workflow)
+        self.context = context
+        # Called as on_step(node, state, next_node) after each node's update is applied
+        self.on_step = on_step
+        self.recursion_limit = recursion_limit
+        self.runtime = Runtime(context=context)
+        # Reducer channels, which also start with a value (e.g. [] for list reducers)
+        self.reducer_channels = {
+            key: channel
+            for key, channel in builder.channels.items()
+            if isinstance(channel, BinaryOperatorAggregate)
+        }
+        self.reducers: Dict[str, Callable] = {
+            key: channel.operator for key, channel in self.reducer_channels.items()
+        }
+        if builder.waiting_edges:
+            raise UnsupportedGraphError(
+                "Waiting edges (fan-in) are not supported by the interpreter"
+            )
+
+        edges: Dict[str, List[str]] = {}
+        for start, end in builder.edges:
+            edges.setdefault(start, []).append(end)
+
+        self.table: Dict[str, _Step] = {}
+        for name in [START, *builder.nodes]:
+            if name == START:
+                step = _Step(START, func=None, inject=())
+            else:
+                func = _unwrap(builder.nodes[name].runnable)
+                step = _Step(name, func=func, inject=_injected(func))
+            targets = edges.get(name, [])
+            branches = list(builder.branches.get(name, {}).values())
+            if len(targets) + len(branches) > 1:
+                raise UnsupportedGraphError(
+                    f"Node {name!r} fans out to several successors; "
+                    "not supported by the interpreter"
+                )
+            if name != START and builder.nodes[name].ends and (targets or branches):
+                raise UnsupportedGraphError(
+                    f"Node {name!r} has both Command destinations and outgoing edges"
+                )
+            if targets:
+                step.next_node = targets[0]
+            elif branches:
+                branch = branches[0]
+                step.router = _unwrap(branch.path)
+                step.router_inject = _injected(step.router)
+                step.path_map = branch.ends
+            self.table[name] = step
+
+    def _config(self, resume: List[Any]) -> Dict[str, Any]:
+        if PregelScratchpad is None:
+            return {"configurable": {}}
+        counter = itertools.count()
+        scratchpad = PregelScratchpad(
+            step=0,
+            stop=self.recursion_limit,
+            call_counter=itertools.count().__next__,
+            interrupt_counter=counter.__next__,
+            get_null_resume=lambda consume=False: None,
+            resume=resume,
+            subgraph_counter=itertools.count().__next__,
+        )
+        return {"configurable": {
+            CONFIG_KEY_SCRATCHPAD: scratchpad,
+            CONFIG_KEY_CHECKPOINT_NS: "",
+            CONFIG_KEY_SEND: lambda writes: None,
+        }}
+
+    def _call(
+        self,
+        func: Callable,
+        inject: Tuple[str, ...],
+        state: Dict[str, Any],
+        config: Dict[str, Any],
+    ) -> Any:
+        if not inject:
+            return func(state)
+        kwargs = {}
+        for name in inject:
+            kwargs[name] = self.runtime if name == "runtime" else config
+        return func(state, **kwargs)
+
+    def _apply(self, state: Dict[str, Any], update: Any):
+        if update is None:
+            return
+        if isinstance(update, (list, tuple)):
+            raise UnsupportedGraphError(
+                "Nodes returning several updates are not supported by the interpreter"
+            )
+        reducers = self.reducers
+        for key, value in update.items():
+            reducer = reducers.get(key)
+            if reducer is not None and key in state:
+                state[key] = reducer(state[key], value)
+            else:
+                state[key] = value
+
+    def _route(self, step: _Step, state: Dict[str, Any], config: Dict[str, Any]) -> str:
+        if step.next_node is not None:
+            return step.next_node
+        if step.router is None:
+            return END
+        result = self._call(step.router, step.router_inject, dict(state), config)
+        if isinstance(result, (list, tuple)) or isinstance(result, Send):
+            if isinstance(result, (list, tuple)) and len(result) == 1:
+                result = result[0]
+            else:
+                raise UnsupportedGraphError(
+                    f"Router after {step.name!r} fanned out to {result!r}"
+                )
+        return step.path_map[result] if step.path_map else result
+
+    def _execute(
+        self, state: Dict[str, Any], node: str, path: List[str], resume: List[Any]
+    ) -> Run:
+        table = self.table
+        while node != END:
+            if len(path) >= self.recursion_limit:
+                raise GraphRecursionError(
+                    f"Recursion limit of {self.recursion_limit} reached "
+                    "without hitting a stop condition"
+                )
+            step = table[node]
+            config = self._config(resume)
+            resume = []
+            path.append(node)
+            token = var_child_runnable_config.set(config)
+            try:
+                update = self._call(step.func, step.inject, dict(state), config)
+            except GraphInterrupt as e:
+                interrupts = e.args[0] if e.args else ()
+                value = interrupts[0].value if interrupts else None
+                return Run(
+                    state=state, path=path, paused_at=node, interrupt_value=value
+                )
+            finally:
+                var_child_runnable_config.reset(token)
+            if isinstance(update, Command):
+                self._apply(state, update.update)
+                goto = update.goto
+                if goto and (step.next_node or step.router):
+                    raise UnsupportedGraphError(
+                        f"Node {node!r} has both Command.goto and outgoing edges"
+                    )
+                if isinstance(goto, (list, tuple)):
+                    if len(goto) > 1:
+                        raise UnsupportedGraphError(
+                            f"Node {node!r} fanned out to {goto!r}"
+                        )
+                    goto = goto[0] if goto else None
+                next_node = goto or self._route(step, state, config)
+            else:
+                self._apply(state, update)
+                next_node = self._route(step, state, config)
+            if self.on_step is not None:
+                self.on_step(node, state, next_node)
+            node = next_node
+        return Run(state=state, path=path)
+
+    def _initial_state(self) -> Dict[str, Any]:
+        state = {}
+        for key, channel in self.reducer_channels.items():
+            # The builder's channels are never written; copied so runs don't share it
+            if channel.is_available():
+                state[key] = copy.copy(channel.get())
+        return state
+
+    def run(self, input: Dict[str, Any]) -> Run:
+        """Run from START with `input` as the initial state"""
+        state = self._initial_state()
+        self._apply(state, input)
+        start = self._route(self.table[START], state, self._config([]))
+        return self._execute(state, start, [], [])
+
+    def resume(self, run: Run, value: Any) -> Run:
+        """Continue a paused run; `interrupt()` in the paused node returns `value`"""
+        if run.paused_at is None:
+            raise ValueError("Run is not paused")
+        return self._execute(dict(run.state), run.paused_at, [], [value])
+
+    def invoke_turn(self, run: Optional[Run], input: Any) -> Run:
+        """
+        Mirror `app.invoke` on a checkpointed thread: resume if paused, else start a run
+        with `input` merged into the state
+        """
+        if run is None:
+            return self.run(input)
+        if isinstance(input, Command):
+            return self.resume(run, input.resume)
+        state = dict(run.state)
+        self._apply(state, input)
+        start = self._route(self.table[START], state, self._config([]))
+        return self._execute(state, start, [], [])
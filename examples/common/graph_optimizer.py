@@ -0,0 +1,212 @@
+"""
+Static analysis and simplification of StateGraph builders, run before compile.
+
+`analyze(workflow)` inspects the declared structure (nodes, edges, waiting
+edges, conditional edges with their path maps or `Literal` return types, and
+`Command[Literal[...]]` node destinations) and reports:
+  - constant routers: conditional edges with a single possible target
+  - unreachable nodes: not reachable from START
+  - cycles with no exit: nodes on a cycle from which END cannot be reached
+
+`optimize_graph(workflow)` returns a copy of the builder with constant routers
+rewritten into plain edges, so the router is never evaluated; the original
+builder is left unchanged. Routers without a path map or `Literal` return
+type may go anywhere and are left alone.
+
+Usage, from an example directory:
+    python ../common/graph_optimizer.py graph:create_workflow
+    PYTHONPATH=.. python -m common.graph_optimizer graph:create_workflow
+"""
+
+import argparse
+import copy
+import os
+import sys
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Set, Tuple
+
+from langgraph.constants import END, START
+from langgraph.graph import StateGraph
+
+@dataclass
+class Finding:
+    """One simplification opportunity or structural problem"""
+    kind: str
+    nodes: Tuple[str, ...]
+    detail: str
+
+    def __str__(self) -> str:
+        return f"{self.kind}: {self.detail}"
+
+@dataclass
+class GraphReport:
+    """Result of `analyze`"""
+    findings: List[Finding] = field(default_factory=list)
+    # (source node, router name) -> the only target
+    constant_routers: Dict[Tuple[str, str], str] = field(default_factory=dict)
+
+    def of_kind(self, kind: str) -> List[Finding]:
+        return [finding for finding in self.findings if finding.kind == kind]
+
+    def __str__(self) -> str:
+        if not self.findings:
+            return "No simplifications found"
+        return "\n".join(str(finding) for finding in self.findings)
+
+def _builder(workflow) -> StateGraph:
+    return getattr(workflow, "builder", workflow)
+
+def _successors(builder: StateGraph) -> Dict[str, Set[str]]:
+    """
+    Every node each node may hand control to; routers without a path map may go anywhere
+    """
+    everywhere = set(builder.nodes) | {END}
+    successors: Dict[str, Set[str]] = defaultdict(set)
+    for start, end in builder.edges:
+        successors[start].add(end)
+    for starts, end in builder.waiting_edges:
+        for start in starts:
+            successors[start].add(end)
+    for start, branches in builder.branches.items():
+        for branch in branches.values():
+            successors[start].update(
+                branch.ends.values() if branch.ends else everywhere
+            )
+    for name, spec in builder.nodes.items():
+        if spec.ends:
+            successors[name].update(spec.ends)
+        # A node without any outgoing edge ends the run
+        if name not in successors:
+            successors[name].add(END)
+    return successors
+
+def _reachable(start: str, successors: Dict[str, Set[str]]) -> Set[str]:
+    seen, stack = {start}, [start]
+    while stack:
+        for successor in successors.get(stack.pop(), ()):
+            if successor not in seen:
+                seen.add(successor)
+                stack.append(successor)
+    return seen
+
+def _cycles(nodes: Set[str], successors: Dict[str, Set[str]]) -> List[List[str]]:
+    """Strongly connected components of `nodes` that contain a cycle (Kosaraju)"""
+    order: List[str] = []
+    visited: Set[str] = set()
+    for root in sorted(nodes):
+        if root in visited:
+            continue
+        visited.add(root)
+        stack = [(root, iter(sorted(successors.get(root, set()) & nodes)))]
+        while stack:
+            node, children = stack[-1]
+            child = next(children, None)
+            if child is None:
+                stack.pop()
+                order.append(node)
+            elif child not in visited:
+                visited.add(child)
+                stack.append(
+                    (child, iter(sorted(successors.get(child, set()) & nodes)))
+                )
+    predecessors: Dict[str, Set[str]] = defaultdict(set)
+    for node in nodes:
+        for successor in successors.get(node, set()) & nodes:
+            predecessors[successor].add(node)
+    components, assigned = [], set()
+    for root in reversed(order):
+        if root in assigned:
+            continue
+        component, stack = [], [root]
+        assigned.add(root)
+        while stack:
+            node = stack.pop()
+            component.append(node)
+            for predecessor in predecessors[node] - assigned:
+                assigned.add(predecessor)
+                stack.append(predecessor)
+        if len(component) > 1 or root in successors.get(root, ()):
+            components.append(sorted(component))
+    return components
+
+def analyze(workflow) -> GraphReport:
+    """Report constant routers, unreachable nodes and cycles with no exit"""
+    builder = _builder(workflow)
+    report = GraphReport()
+
+    for start, branches in builder.branches.items():
+        for name, branch in branches.items():
+            targets = set(branch.ends.values()) if branch.ends else None
+            if targets is not None and len(targets) == 1:
+                target = next(iter(targets))
+                report.constant_routers[(start, name)] = target
+                report.findings.append(Finding(
+                    "constant-router", (start,),
+                    f"{name} after {start} can only route to {target}; use a plain edge"
+                ))
+
+    successors = _successors(builder)
+    reachable = _reachable(START, successors)
+    for node in builder.nodes:
+        if node not in reachable:
+            report.findings.append(
+                Finding(
+                    "unreachable-node",
+                    (node,),
+                    f"{node} cannot be reached from {START}",
+                )
+            )
+
+    predecessors: Dict[str, Set[str]] = defaultdict(set)
+    for node, targets in successors.items():
+        for target in targets:
+            predecessors[target].add(node)
+    can_finish = _reachable(END, predecessors)
+    trapped = (reachable & set(builder.nodes)) - can_finish
+    for cycle in _cycles(trapped, successors):
+        report.findings.append(Finding(
+            "cycle-without-exit", tuple(cycle),
+            f"{' -> '.join(cycle + cycle[:1])} has no path to {END}"
+        ))
+    return report
+
+def optimize_graph(workflow, report: Optional[GraphReport] = None) -> StateGraph:
+    """Copy of the builder with constant routers replaced by plain edges"""
+    builder = _builder(workflow)
+    report = report or analyze(builder)
+    if not report.constant_routers:
+        return builder
+    optimized = copy.copy(builder)
+    optimized.edges = set(builder.edges)
+    optimized.branches = defaultdict(
+        dict, {start: dict(branches) for start, branches in builder.branches.items()}
+    )
+    for (start, name), target in report.constant_routers.items():
+        del optimized.branches[start][name]
+        if not optimized.branches[start]:
+            del optimized.branches[start]
+        optimized.edges.add((start, target))
+    return optimized
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Report static simplifications of a workflow graph"
+    )
+    parser.add_argument(
+        "target",
+        help='"module:attribute" of a StateGraph, compiled app or factory, '
+        'e.g. graph:create_workflow',
+    )
+    args = parser.parse_args(argv)
+
+    sys.path.insert(0, os.getcwd())
+    # The examples directory, so `common` imports when run as a script too
+    sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+    from common.diagrams import load_target
+    report = analyze(load_target(args.target))
+    print(report)
+    return 1 if report.of_kind("cycle-without-exit") else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,310 @@
+"""
+Per-node and per-router instrumentation for compiled LangGraph workflows.
+
+`GraphProfiler.instrument(app)` recompiles a compiled StateGraph with every
+node and every conditional-edge function wrapped in a probe that records
+wall time, CPU time (of the executing thread) and the net number of memory
+blocks allocated during the call. Calls are aggregated per node into log2
+latency histograms and exported as JSON or read in-process via `stats()`.
+
+Instrumentation is opt-in: uninstrumented apps pay nothing, and an
+instrumented app whose profiler is disabled pays one attribute check per
+call. `instrument_from_env(app)` instruments only when GRAPH_PROFILE is set;
+if its value ends in ".json" the stats are written there at exit.
+
+    GRAPH_PROFILE=profile.json python main.py
+
+Allocation counts come from `sys.getallocatedblocks()` and are process-wide,
+so nodes running in parallel see each other's allocations.
+"""
+
+import atexit
+import dataclasses
+import copy
+import json
+import os
+import sys
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from langchain_core.runnables import Runnable, RunnableConfig
+from langgraph.errors import GraphInterrupt
+
+PROFILE_ENV = "GRAPH_PROFILE"
+
+class LatencyHistogram:
+    """
+    Fixed log2 buckets over nanosecond samples.
+    Bucket 0 holds samples under 1 µs; bucket i holds [2^(i-1), 2^i) µs.
+    """
+
+    BUCKETS = 32
+
+    def __init__(self):
+        self.counts = [0] * self.BUCKETS
+        self.count = 0
+        self.total = 0
+        self.min = 0
+        self.max = 0
+
+    def add(self, ns: int):
+        index = min(max(ns, 0) // 1000, 2 ** (self.BUCKETS - 2)).bit_length()
+        self.counts[index] += 1
+        if not self.count or ns < self.min:
+            self.min = ns
+        if ns > self.max:
+            self.max = ns
+        self.count += 1
+        self.total += ns
+
+    def percentile(self, pct: float) -> float:
+        """
+        Upper bound in µs of the bucket holding the pct-th sample (capped at the max)
+        """
+        if not self.count:
+            return 0.0
+        rank = max(1, int(round(pct / 100 * self.count)))
+        seen = 0
+        for index, bucket in enumerate(self.counts):
+            seen += bucket
+            if seen >= rank:
+                return min(float(2 ** index if index else 1), self.max / 1000)
+        return self.max / 1000
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "mean_us": round(self.total / self.count / 1000, 3) if self.count else 0.0,
+            "min_us": round(self.min / 1000, 3),
+            "max_us": round(self.max / 1000, 3),
+            "p50_us": round(self.percentile(50), 3),
+            "p95_us": round(self.percentile(95), 3),
+            "p99_us": round(self.percentile(99), 3),
+            # Non-empty buckets keyed by their upper bound in µs
+            "buckets_us": {
+                str(2**i if i else 1): n for i, n in enumerate(self.counts) if n
+            },
+        }
+
+@dataclasses.dataclass
+class NodeStats:
+    """Aggregated measurements for one node or router"""
+    name: str
+    kind: str
+    calls: int = 0
+    errors: int = 0
+    interrupts: int = 0
+    alloc_blocks: int = 0
+    max_alloc_blocks: int = 0
+    wall: LatencyHistogram = dataclasses.field(default_factory=LatencyHistogram)
+    cpu: LatencyHistogram = dataclasses.field(default_factory=LatencyHistogram)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "kind": self.kind,
+            "calls": self.calls,
+            "errors": self.errors,
+            "interrupts": self.interrupts,
+            "alloc_blocks": {
+                "total": self.alloc_blocks,
+                "mean": round(self.alloc_blocks / self.calls, 1) if self.calls else 0.0,
+                "max": self.max_alloc_blocks
+            },
+            "wall": self.wall.to_dict(),
+            "cpu": self.cpu.to_dict()
+        }
+
+class GraphProfiler:
+    """Collects per-node and per-router measurements from instrumented apps"""
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self._stats: Dict[str, NodeStats] = {}
+        self._lock = threading.Lock()
+
+    def record(
+        self,
+        name: str,
+        kind: str,
+        wall_ns: int,
+        cpu_ns: int,
+        blocks: int,
+        outcome: str = "ok",
+    ):
+        with self._lock:
+            stats = self._stats.get(name)
+            if stats is None:
+                stats = self._stats[name] = NodeStats(name, kind)
+            stats.calls += 1
+            if outcome == "error":
+                stats.errors += 1
+            elif outcome == "interrupt":
+                stats.interrupts += 1
+            stats.alloc_blocks += blocks
+            if stats.calls == 1 or blocks > stats.max_alloc_blocks:
+                stats.max_alloc_blocks = blocks
+            stats.wall.add(wall_ns)
+            stats.cpu.add(cpu_ns)
+
+    def instrument(self, app):
+        """
+        Recompile a compiled StateGraph with probes around its nodes and routers.
+        The checkpointer, store, cache and interrupt settings carry over.
+        """
+        builder = copy.copy(app.builder)
+        builder.nodes = {
+            name: dataclasses.replace(
+                spec, runnable=_Probe(self, name, "node", spec.runnable)
+            )
+            for name, spec in app.builder.nodes.items()
+        }
+        builder.branches = {
+            start: {
+                name: branch._replace(
+                    path=_Probe(self, f"{start}:{name}", "router", branch.path)
+                )
+                for name, branch in branches.items()
+            }
+            for start, branches in app.builder.branches.items()
+        }
+        return builder.compile(
+            checkpointer=app.checkpointer,
+            store=app.store,
+            cache=app.cache,
+            interrupt_before=app.interrupt_before_nodes,
+            interrupt_after=app.interrupt_after_nodes,
+            debug=app.debug,
+            name=app.name,
+        )
+
+    def stats(self) -> Dict[str, Any]:
+        """Snapshot of all measurements: {"nodes": {...}, "routers": {...}}"""
+        with self._lock:
+            entries = [
+                stats.to_dict() | {"name": stats.name} for stats in self._stats.values()
+            ]
+        result: Dict[str, Dict[str, Any]] = {"nodes": {}, "routers": {}}
+        for entry in entries:
+            result[entry["kind"] + "s"][entry.pop("name")] = entry
+        return result
+
+    def node(self, name: str) -> Optional[NodeStats]:
+        return self._stats.get(name)
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+
+    def export_json(self, path: str):
+        with open(path, "w") as f:
+            json.dump(self.stats(), f, indent=2)
+            f.write("\n")
+
+    def report(self) -> str:
+        """Text table sorted by total wall time"""
+        with self._lock:
+            rows = sorted(
+                self._stats.values(), key=lambda s: s.wall.total, reverse=True
+            )
+            lines = [
+                f"{'name':<44} {'kind':<7} {'calls':>7} {'mean µs':>9} "
+                f"{'p95 µs':>9} {'cpu µs':>9} {'blocks':>8}"
+            ]
+            for s in rows:
+                calls = max(s.calls, 1)
+                lines.append(
+                    f"{s.name:<44} {s.kind:<7} {s.calls:>7} "
+                    f"{s.wall.total / calls / 1000:>9.1f} "
+                    f"{s.wall.percentile(95):>9.1f} {s.cpu.total / calls / 1000:>9.1f} "
+                    f"{s.alloc_blocks / calls:>8.1f}"
+                )
+        return "\n".join(lines)
+
+class _Probe(Runnable):
+    """Times calls to a node or router runnable and reports them to the profiler"""
+
+    def __init__(self, profiler: GraphProfiler, name: str, kind: str, inner: Runnable):
+        self.profiler = profiler
+        self.probe_name = name
+        self.kind = kind
+        self.inner = inner
+        self.name = getattr(inner, "name", None) or name
+
+    def invoke(
+        self, input: Any, config: Optional[RunnableConfig] = None, **kwargs: Any
+    ) -> Any:
+        if not self.profiler.enabled:
+            return self.inner.invoke(input, config, **kwargs)
+        outcome = "ok"
+        blocks = sys.getallocatedblocks()
+        cpu = time.thread_time_ns()
+        wall = time.perf_counter_ns()
+        try:
+            return self.inner.invoke(input, config, **kwargs)
+        except GraphInterrupt:
+            outcome = "interrupt"
+            raise
+        except Exception:
+            outcome = "error"
+            raise
+        finally:
+            wall = time.perf_counter_ns() - wall
+            cpu = time.thread_time_ns() - cpu
+            self.profiler.record(
+                self.probe_name,
+                self.kind,
+                wall,
+                cpu,
+                sys.getallocatedblocks() - blocks,
+                outcome,
+            )
+
+    async def ainvoke(
+        self, input: Any, config: Optional[RunnableConfig] = None, **kwargs: Any
+    ) -> Any:
+        # CPU time and allocations include whatever else ran on the event loop meanwhile
+        if not self.profiler.enabled:
+            return await self.inner.ainvoke(input, config, **kwargs)
+        outcome = "ok"
+        blocks = sys.getallocatedblocks()
+        cpu = time.thread_time_ns()
+        wall = time.perf_counter_ns()
+        try:
+            return await self.inner.ainvoke(input, config, **kwargs)
+        except GraphInterrupt:
+            outcome = "interrupt"
+            raise
+        except Exception:
+            outcome = "error"
+            raise
+        finally:
+            wall = time.perf_counter_ns() - wall
+            cpu = time.thread_time_ns() - cpu
+            self.profiler.record(
+                self.probe_name,
+                self.kind,
+                wall,
+                cpu,
+                sys.getallocatedblocks() - blocks,
+                outcome,
+            )
+
+# Profiler used by `instrument_from_env`
+default_profiler = GraphProfiler()
+_export_paths: List[str] = []
+
+def is_instrumented(app) -> bool:
+    """True if `app` was compiled by `GraphProfiler.instrument`"""
+    return any(isinstance(spec.runnable, _Probe) for spec in app.builder.nodes.values())
+
+def instrument_from_env(app, profiler: Optional[GraphProfiler] = None):
+    """Instrument `app` if GRAPH_PROFILE is set, otherwise return it unchanged"""
+    flag = os.environ.get(PROFILE_ENV, "")
+    if flag.lower() in ("", "0", "false", "off"):
+        return app
+    profiler = profiler or default_profiler
+    if flag.endswith(".json") and flag not in _export_paths:
+        _export_paths.append(flag)
+        atexit.register(profiler.export_json, flag)
+    return profiler.instrument(app)
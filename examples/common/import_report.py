@@ -0,0 +1,135 @@
+"""
+Cold-start and import-time report for example entry points.
+
+Runs `python -X importtime -c "import <module>"` in a fresh interpreter from
+the example's directory and reports the cumulative import cost per module
+and per top-level package, so the dependencies that dominate startup stand
+out. `cold_start` times a fresh interpreter importing the module; the
+startup budget test uses it.
+
+Usage, from an example directory:
+    python ../common/import_report.py main
+    python ../common/import_report.py chat --top 30 --json imports.json
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+@dataclass
+class ImportEntry:
+    """One line of -X importtime output (times in microseconds)"""
+    module: str
+    self_us: int
+    cumulative_us: int
+    depth: int
+
+def _run(code: str, cwd: str, *flags: str) -> subprocess.CompletedProcess:
+    return subprocess.run(
+        [sys.executable, *flags, "-c", code],
+        cwd=cwd,
+        capture_output=True,
+        text=True,
+        # Keep example side effects (profiling, logging) out of the measurement
+        env={
+            k: v
+            for k, v in os.environ.items()
+            if k not in ("GRAPH_PROFILE", "PIZZA_LOG_LEVEL")
+        },
+    )
+
+def import_times(module: str, cwd: str = ".") -> List[ImportEntry]:
+    """Parse -X importtime for importing `module` in a fresh interpreter"""
+    result = _run(f"import {module}", cwd, "-X", "importtime")
+    if result.returncode:
+        raise RuntimeError(f"import {module} failed:\n{result.stderr[-2000:]}")
+    entries = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip())) // 2
+        entries.append(
+            ImportEntry(name.strip(), int(self_us), int(cumulative_us), depth)
+        )
+    return entries
+
+def package_totals(entries: List[ImportEntry]) -> Dict[str, int]:
+    """Self time summed per top-level package, largest first"""
+    totals: Dict[str, int] = {}
+    for entry in entries:
+        package = entry.module.split(".")[0]
+        totals[package] = totals.get(package, 0) + entry.self_us
+    return dict(sorted(totals.items(), key=lambda item: item[1], reverse=True))
+
+def cold_start(module: str, cwd: str = ".", runs: int = 3) -> float:
+    """Fastest wall time in seconds of a fresh interpreter importing `module`"""
+    best = float("inf")
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = _run(f"import {module}", cwd)
+        elapsed = time.perf_counter() - start
+        if result.returncode:
+            raise RuntimeError(f"import {module} failed:\n{result.stderr[-2000:]}")
+        best = min(best, elapsed)
+    return best
+
+def report(module: str, cwd: str = ".", top: int = 20) -> Dict:
+    entries = import_times(module, cwd)
+    total = next(
+        (e.cumulative_us for e in reversed(entries) if e.module == module),
+        sum(e.self_us for e in entries),
+    )
+    slowest = sorted(entries, key=lambda e: e.cumulative_us, reverse=True)[:top]
+    return {
+        "module": module,
+        "python": sys.version.split()[0],
+        "modules_imported": len(entries),
+        "total_ms": round(total / 1000, 1),
+        "by_package_ms": {
+            name: round(us / 1000, 1)
+            for name, us in list(package_totals(entries).items())[:top]
+        },
+        "slowest_cumulative_ms": {
+            e.module: round(e.cumulative_us / 1000, 1) for e in slowest
+        },
+    }
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Per-module import cost of an example entry point"
+    )
+    parser.add_argument(
+        "module", help="Module to import from the current directory, e.g. main"
+    )
+    parser.add_argument("--top", type=int, default=20)
+    parser.add_argument(
+        "--json", metavar="FILE", help="Also write the report to this file"
+    )
+    args = parser.parse_args(argv)
+
+    result = report(args.module, os.getcwd(), args.top)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(result, f, indent=2)
+            f.write("\n")
+
+    print(
+        f"import {result['module']}: {result['total_ms']} ms, "
+        f"{result['modules_imported']} modules"
+    )
+    print("\nSelf time by top-level package:")
+    for name, ms in result["by_package_ms"].items():
+        print(f"  {name:<40} {ms:>8.1f} ms")
+    print("\nSlowest modules (cumulative, including their imports):")
+    for name, ms in result["slowest_cumulative_ms"].items():
+        print(f"  {name:<40} {ms:>8.1f} ms")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,227 @@
+"""
+Incremental parsing of a JSON object from a token stream.
+
+Agents that answer in JSON usually need only some of the keys to act: the
+pizza triage routes on `wants_pizza` and ignores the longer `reason` that
+follows it. `IncrementalJSONParser` consumes the generation as it streams,
+parses each top-level value as soon as it is complete, checks it against a
+schema, and reports when the required keys are in:
+
+    result = parse_json_stream(llm.stream(prompt), required=("wants_pizza",),
+                               schema={"wants_pizza": bool, "reason": str})
+    result.values          # {"wants_pizza": True}
+    result.stopped_early   # True: the stream was closed before "reason"
+
+Closing the stream closes the HTTP response, and Ollama stops generating
+when its client goes away, so the remaining tokens are never produced.
+Text before the opening brace (prose, a ```json fence) is skipped.
+"""
+
+import json
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, Optional, Sequence
+
+_LITERALS = ("true", "false", "null")
+
+class JSONStreamError(ValueError):
+    """The generation is not the expected JSON object"""
+
+@dataclass
+class JSONStreamResult:
+    values: Dict[str, Any]
+    # Text consumed, up to the point where parsing stopped
+    text: str
+    stopped_early: bool = False
+    tokens: int = 0
+
+def _matches(value: Any, expected: Any) -> bool:
+    types = expected if isinstance(expected, tuple) else (expected,)
+    # bool is an int subclass, but JSON true is not a number
+    if isinstance(value, bool) and bool not in types:
+        return False
+    return isinstance(value, types)
+
+class IncrementalJSONParser:
+    """
+    Parses one top-level JSON object fed in arbitrary pieces. `done` is set
+    once every key in `required` has a complete, schema-valid value, or
+    when the object closes if nothing is required.
+    """
+
+    def __init__(
+        self, required: Sequence[str] = (), schema: Optional[Dict[str, Any]] = None
+    ):
+        self.required = tuple(required)
+        self.schema = schema or {}
+        self.values: Dict[str, Any] = {}
+        self.done = False
+        self.closed = False
+        self._buffer = ""
+        self._position = 0
+        # before -> key -> colon -> value -> comma -> ... -> after
+        self._state = "before"
+        self._key: Optional[str] = None
+        self._start = 0
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+
+    @property
+    def text(self) -> str:
+        return self._buffer
+
+    def feed(self, text: str) -> bool:
+        """Consume more text; returns `done`"""
+        self._buffer += text
+        while not self.done and self._position < len(self._buffer):
+            self._step(self._buffer[self._position])
+            self._position += 1
+        return self.done
+
+    def _step(self, char: str):
+        state = self._state
+        if state == "before":
+            if char == "{":
+                self._state = "key"
+        elif state in ("key", "comma"):
+            if char == '"':
+                self._start, self._in_string, self._escape = self._position, True, False
+                self._state = "key_string"
+            elif char == "}":
+                self._close()
+            elif char == "," and state == "comma":
+                self._state = "key"
+            elif not char.isspace():
+                raise JSONStreamError(
+                    f"unexpected {char!r} before a key at {self._position}"
+                )
+        elif state == "key_string":
+            if self._string_ended(char):
+                self._key = json.loads(self._buffer[self._start:self._position + 1])
+                self._state = "colon"
+        elif state == "colon":
+            if char == ":":
+                self._state = "value"
+            elif not char.isspace():
+                raise JSONStreamError(f"expected ':' after {self._key!r}")
+        elif state == "value":
+            if char.isspace():
+                return
+            self._start, self._depth, self._in_string, self._escape = (
+                self._position,
+                0,
+                False,
+                False,
+            )
+            self._state = "in_value"
+            self._value_char(char)
+        elif state == "in_value":
+            self._value_char(char)
+
+    def _string_ended(self, char: str) -> bool:
+        if self._escape:
+            self._escape = False
+        elif char == "\\":
+            self._escape = True
+        elif char == '"':
+            self._in_string = False
+            return True
+        return False
+
+    def _value_char(self, char: str):
+        first = self._buffer[self._start]
+        if first == '"':
+            if self._position > self._start and self._string_ended(char):
+                self._finish_value(self._position + 1)
+            return
+        if first in "{[":
+            if self._in_string:
+                self._string_ended(char)
+            elif char == '"':
+                self._in_string = True
+            elif char in "{[":
+                self._depth += 1
+            elif char in "}]":
+                self._depth -= 1
+                if self._depth == 0:
+                    self._finish_value(self._position + 1)
+            return
+        # Scalar: a delimiter ends it; a literal can end without one
+        if char in ",}" or char.isspace():
+            self._finish_value(self._position)
+            if char == "}":
+                self._close()
+            elif char == ",":
+                self._state = "key"
+        elif self._buffer[self._start:self._position + 1] in _LITERALS:
+            self._finish_value(self._position + 1)
+
+    def _finish_value(self, end: int):
+        raw = self._buffer[self._start:end]
+        try:
+            value = json.loads(raw)
+        except json.JSONDecodeError as error:
+            raise JSONStreamError(
+                f"invalid value for {self._key!r}: {raw!r}"
+            ) from error
+        if self._key in self.schema and not _matches(value, self.schema[self._key]):
+            raise JSONStreamError(
+                f"{self._key!r} should be {self.schema[self._key]}, got {value!r}"
+            )
+        self.values[self._key] = value
+        self._state = "comma"
+        if self.required and all(key in self.values for key in self.required):
+            self.done = True
+
+    def _close(self):
+        missing = [key for key in self.required if key not in self.values]
+        if missing:
+            raise JSONStreamError(f"JSON object closed without {missing}")
+        self.closed = True
+        self._state = "after"
+        self.done = True
+
+    def finish(self) -> Dict[str, Any]:
+        """
+        Values once the generation has ended; raises if a required key or the object is
+        incomplete
+        """
+        missing = [key for key in self.required if key not in self.values]
+        if missing:
+            raise JSONStreamError(f"generation ended without {missing}")
+        if not self.required and not self.closed:
+            raise JSONStreamError("generation ended inside the JSON object")
+        return self.values
+
+def parse_json_stream(
+    chunks: Iterable[Any],
+    required: Sequence[str] = (),
+    schema: Optional[Dict[str, Any]] = None,
+    on_text: Optional[Callable[[str], None]] = None,
+) -> JSONStreamResult:
+    """
+    Feed `chunks` (strings or message chunks) to a parser until it is done,
+    then close the stream so nothing more is generated.
+    """
+    parser = IncrementalJSONParser(required, schema)
+    iterator = iter(chunks)
+    tokens = 0
+    try:
+        for chunk in iterator:
+            text = chunk if isinstance(chunk, str) else chunk.content
+            tokens += 1
+            if on_text is not None:
+                on_text(text)
+            if parser.feed(text):
+                # More than the closing whitespace may follow; do not wait for it
+                return JSONStreamResult(
+                    dict(parser.values),
+                    parser.text,
+                    stopped_early=not parser.closed,
+                    tokens=tokens,
+                )
+        return JSONStreamResult(dict(parser.finish()), parser.text, tokens=tokens)
+    finally:
+        close = getattr(iterator, "close", None)
+        if close is not None:
+            close()
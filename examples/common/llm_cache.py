@@ -0,0 +1,257 @@
+"""
+Exact-match LLM response cache for deterministic prompts.
+
+`ResponseCache` is a LangChain `BaseCache`, so it is enabled per chat model
+with `cache=` and therefore opt-in per node:
+
+    llm = default_registry.chat_model(
+        "mistral:latest", temperature=0.1, cache=default_response_cache()
+    )
+
+Entries are keyed by the model's LLM string (model name and parameters) and
+the rendered prompt. Lookups go to an in-memory LRU tier first, then to a
+SQLite tier on disk; both expire entries after `ttl` seconds. `metrics()`
+reports the hit ratio and the model latency saved by hits, measured from
+the misses that filled the entries.
+
+Only `invoke`/`batch` consult the cache; `stream` always calls the model.
+Streamed callers can use `cached_text`/`store_text`, which use the same
+keys as `invoke`.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Sequence, Tuple
+
+from langchain_core.caches import BaseCache
+from langchain_core.load import dumps
+from langchain_core.messages import AIMessage, message_to_dict, messages_from_dict
+from langchain_core.outputs import ChatGeneration, Generation
+
+# Next to this module, not in whatever directory the process runs from; an
+# empty LLM_CACHE_DB keeps the cache in memory only
+DEFAULT_CACHE_PATH = os.environ.get(
+    "LLM_CACHE_DB",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "llm_cache.db"),
+)
+DEFAULT_TTL = 24 * 3600
+DEFAULT_MAX_ENTRIES = 1024
+
+def _dumps(generations: Sequence[Generation]) -> str:
+    return json.dumps(
+        [
+            (
+                {"message": message_to_dict(generation.message)}
+                if isinstance(generation, ChatGeneration)
+                else {"text": generation.text}
+            )
+            for generation in generations
+        ]
+    )
+
+def _loads(data: str) -> Sequence[Generation]:
+    return [
+        (
+            ChatGeneration(message=messages_from_dict([item["message"]])[0])
+            if "message" in item
+            else Generation(text=item["text"])
+        )
+        for item in json.loads(data)
+    ]
+
+class ResponseCache(BaseCache):
+    """
+    Two-tier exact-match cache: an LRU of `max_entries` in memory in front
+    of an optional SQLite file at `path` (None keeps the memory tier only).
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        ttl: float = DEFAULT_TTL,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.clock = clock
+        self._lock = threading.Lock()
+        # key -> (generations, expires at, model latency in seconds)
+        self._memory: "OrderedDict[str, Tuple[Sequence[Generation], float, float]]" = (
+            OrderedDict()
+        )
+        # Misses waiting for their update(), to measure the model latency
+        self._pending: Dict[str, float] = {}
+        self._stats = {
+            "hits": 0,
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "misses": 0,
+            "latency_saved_s": 0.0,
+        }
+        self._conn = None
+        if path:
+            self._conn = sqlite3.connect(path, check_same_thread=False)
+            self._conn.execute(
+                """CREATE TABLE IF NOT EXISTS llm_responses (
+                key TEXT PRIMARY KEY, generations TEXT NOT NULL,
+                expires_at REAL NOT NULL, latency_s REAL NOT NULL)"""
+            )
+            self._conn.commit()
+
+    @staticmethod
+    def _key(prompt: str, llm_string: str) -> str:
+        return hashlib.sha256(f"{llm_string}\x00{prompt}".encode()).hexdigest()
+
+    def _remember(self, key: str, entry: Tuple[Sequence[Generation], float, float]):
+        """Insert into the LRU tier; caller holds the lock"""
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def _hit(
+        self, tier: str, latency_s: float, generations: Sequence[Generation]
+    ) -> Sequence[Generation]:
+        self._stats["hits"] += 1
+        self._stats[f"{tier}_hits"] += 1
+        self._stats["latency_saved_s"] += latency_s
+        return generations
+
+    def lookup(self, prompt: str, llm_string: str) -> Optional[Sequence[Generation]]:
+        key = self._key(prompt, llm_string)
+        now = self.clock()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                generations, expires_at, latency_s = entry
+                if expires_at > now:
+                    self._memory.move_to_end(key)
+                    return self._hit("memory", latency_s, generations)
+                del self._memory[key]
+            if self._conn is not None:
+                row = self._conn.execute(
+                    "SELECT generations, expires_at, latency_s FROM llm_responses "
+                    "WHERE key = ?",
+                    (key,),
+                ).fetchone()
+                if row is not None:
+                    if row[1] > now:
+                        generations = _loads(row[0])
+                        self._remember(key, (generations, row[1], row[2]))
+                        return self._hit("disk", row[2], generations)
+                    self._conn.execute(
+                        "DELETE FROM llm_responses WHERE key = ?", (key,)
+                    )
+                    self._conn.commit()
+            self._stats["misses"] += 1
+            self._pending[key] = time.perf_counter()
+        return None
+
+    def update(
+        self, prompt: str, llm_string: str, return_val: Sequence[Generation]
+    ) -> None:
+        key = self._key(prompt, llm_string)
+        finished = time.perf_counter()
+        with self._lock:
+            started = self._pending.pop(key, None)
+            latency_s = finished - started if started is not None else 0.0
+            expires_at = self.clock() + self.ttl
+            generations = list(return_val)
+            self._remember(key, (generations, expires_at, latency_s))
+            if self._conn is not None:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO llm_responses "
+                    "(key, generations, expires_at, latency_s) VALUES (?, ?, ?, ?)",
+                    (key, _dumps(generations), expires_at, latency_s),
+                )
+                self._conn.commit()
+
+    def clear(self, **kwargs: Any) -> None:
+        with self._lock:
+            self._memory.clear()
+            self._pending.clear()
+            if self._conn is not None:
+                self._conn.execute("DELETE FROM llm_responses")
+                self._conn.commit()
+
+    def purge_expired(self) -> int:
+        """Drop expired entries from both tiers; returns the disk rows removed"""
+        now = self.clock()
+        with self._lock:
+            for key in [
+                key
+                for key, (_, expires_at, _) in self._memory.items()
+                if expires_at <= now
+            ]:
+                del self._memory[key]
+            if self._conn is None:
+                return 0
+            removed = self._conn.execute(
+                "DELETE FROM llm_responses WHERE expires_at <= ?", (now,)
+            ).rowcount
+            self._conn.commit()
+            return removed
+
+    def metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+            lookups = stats["hits"] + stats["misses"]
+            disk_entries = (
+                self._conn.execute("SELECT COUNT(*) FROM llm_responses").fetchone()[0]
+                if self._conn is not None
+                else None
+            )
+            return {
+                **stats,
+                "lookups": lookups,
+                "hit_ratio": round(stats["hits"] / lookups, 3) if lookups else 0.0,
+                "latency_saved_s": round(stats["latency_saved_s"], 3),
+                "memory_entries": len(self._memory),
+                "disk_entries": disk_entries,
+            }
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+def _cache_key(llm: Any, input: Any) -> Tuple[str, str]:
+    """(prompt, llm_string) as the chat model's own cache lookup builds them"""
+    return dumps(llm._convert_input(input).to_messages()), llm._get_llm_string()
+
+def cached_text(llm: Any, input: Any) -> Optional[str]:
+    """Cached reply of `llm` (with `cache=` set) to `input`, for callers that stream"""
+    if not isinstance(llm.cache, BaseCache):
+        return None
+    generations = llm.cache.lookup(*_cache_key(llm, input))
+    return generations[0].text if generations else None
+
+def store_text(llm: Any, input: Any, text: str):
+    """
+    Cache `text` as the reply of `llm` to `input`, where `invoke` would find it too
+    """
+    if isinstance(llm.cache, BaseCache):
+        llm.cache.update(
+            *_cache_key(llm, input), [ChatGeneration(message=AIMessage(content=text))]
+        )
+
+_default_cache: Optional[ResponseCache] = None
+_default_lock = threading.Lock()
+
+def default_response_cache() -> ResponseCache:
+    """
+    Process-wide cache at LLM_CACHE_DB (default llm_cache.db next to this module;
+    empty for memory only), opened on first use
+    """
+    global _default_cache
+    with _default_lock:
+        if _default_cache is None:
+            _default_cache = ResponseCache(DEFAULT_CACHE_PATH or None)
+        return _default_cache
@@ -0,0 +1,307 @@
+"""
+Shared, pooled ChatOllama clients.
+
+Constructing `ChatOllama(...)` per call builds a new HTTP client, so every
+message pays for client setup and a fresh connection to Ollama. The
+registry returns one configured client per (model, base URL, parameters)
+and gives all clients of a base URL one keep-alive connection pool, shared
+across requests and threads:
+
+    llm = default_registry.chat_model("mistral:latest", temperature=0.1, timeout=10)
+    default_registry.metrics()   # requests, connections opened, reuse per base URL
+
+`timeout` is applied to the HTTP client; ChatOllama itself ignores a
+`timeout` argument. Connection limits and keep-alive expiry are set per
+registry. The Ollama client stack is imported on first use.
+
+Ollama unloads a model after `keep_alive` of inactivity (5 minutes by
+default), and the next request waits for it to load again. Clients send
+OLLAMA_KEEP_ALIVE (default 30m; -1 keeps models loaded) unless a
+`keep_alive` parameter is given. `warm_up` loads a model and evaluates the
+fixed system prompts that start its prompts, so Ollama can reuse their KV
+cache; entry points run it at start:
+
+    start_warm_up({"mistral:latest": [TRIAGE_SYSTEM_PROMPT]})
+    default_registry.metrics()["warm_up"]   # seconds (or the error) per model
+"""
+
+import os
+import threading
+import time
+from dataclasses import asdict, dataclass
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Mapping,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
+
+DEFAULT_MODEL = "mistral:latest"
+# OLLAMA_BASE_URL points every example at another server, e.g. common/ollama_stub.py
+DEFAULT_BASE_URL = os.environ.get("OLLAMA_BASE_URL", "http://127.0.0.1:11434")
+DEFAULT_KEEP_ALIVE = os.environ.get("OLLAMA_KEEP_ALIVE", "30m")
+# OLLAMA_WARMUP=0 skips the warm-up at start
+WARM_UP_ENABLED = os.environ.get("OLLAMA_WARMUP", "1") != "0"
+
+def keep_alive_value(value: Optional[str]) -> Optional[Union[int, str]]:
+    """
+    Ollama takes seconds as a number and durations ("30m") as a string; "" leaves the
+    server default
+    """
+    if value is None or value == "":
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        return value
+
+@dataclass
+class PoolMetrics:
+    """Requests sent through one base URL's pool and TCP connections it opened"""
+    requests: int = 0
+    connections_opened: int = 0
+
+    @property
+    def connections_reused(self) -> int:
+        return self.requests - self.connections_opened
+
+    @property
+    def reuse_ratio(self) -> float:
+        return self.connections_reused / self.requests if self.requests else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            **asdict(self),
+            "connections_reused": self.connections_reused,
+            "reuse_ratio": round(self.reuse_ratio, 3),
+        }
+
+def _counting_transport(
+    metrics: PoolMetrics, lock: threading.Lock, max_connections: int, **kwargs
+):
+    """
+    httpx transport (one connection pool) that counts requests and newly
+    opened connections, and admits at most `max_connections` requests at a
+    time. Requests beyond that wait here rather than in httpcore's pool,
+    which intermittently fails queued requests when more threads than
+    connections share it (httpcore 1.0.x, "Bad file descriptor").
+    """
+    import httpx
+
+    slots = threading.BoundedSemaphore(max_connections)
+
+    class ReleasingStream(httpx.SyncByteStream):
+        """Response body that frees its request slot when closed"""
+
+        def __init__(self, stream, release: Callable[[], None]):
+            self._stream = stream
+            self._release = release
+
+        def __iter__(self):
+            yield from self._stream
+
+        def close(self):
+            try:
+                self._stream.close()
+            finally:
+                self._release()
+
+    class CountingTransport(httpx.HTTPTransport):
+        def handle_request(self, request):
+            opened = []
+            released = threading.Event()
+
+            def trace(event: str, info: Dict[str, Any]):
+                if event == "connection.connect_tcp.complete":
+                    opened.append(True)
+
+            def release():
+                if not released.is_set():
+                    released.set()
+                    slots.release()
+
+            request.extensions = {**request.extensions, "trace": trace}
+            slots.acquire()
+            try:
+                response = super().handle_request(request)
+            except BaseException:
+                release()
+                raise
+            finally:
+                with lock:
+                    metrics.requests += 1
+                    metrics.connections_opened += len(opened)
+            response.stream = ReleasingStream(response.stream, release)
+            return response
+
+    return CountingTransport(
+        limits=httpx.Limits(max_connections=max_connections, **kwargs)
+    )
+
+def _freeze(value: Any) -> Any:
+    """Hashable form of a parameter value for the registry key"""
+    if isinstance(value, dict):
+        return tuple(sorted((key, _freeze(item)) for key, item in value.items()))
+    if isinstance(value, (list, tuple, set)):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+class ClientRegistry:
+    """
+    Configured ChatOllama clients keyed by model, base URL and parameters.
+    Clients of one base URL share a connection pool of at most
+    `max_connections` connections, of which `max_keepalive_connections` are
+    kept open for `keepalive_expiry` seconds between requests.
+    """
+
+    def __init__(self, max_connections: int = 8, max_keepalive_connections: int = 8,
+                 keepalive_expiry: float = 60.0):
+        self.max_connections = max_connections
+        self.max_keepalive_connections = max_keepalive_connections
+        self.keepalive_expiry = keepalive_expiry
+        self._lock = threading.Lock()
+        self._clients: Dict[Tuple, Any] = {}
+        self._transports: Dict[str, Any] = {}
+        self._metrics: Dict[str, PoolMetrics] = {}
+        self._warm_up: Dict[str, Dict[str, Any]] = {}
+
+    def _transport(self, base_url: str):
+        """Connection pool for `base_url`; caller holds the lock"""
+        transport = self._transports.get(base_url)
+        if transport is None:
+            metrics = self._metrics[base_url] = PoolMetrics()
+            transport = self._transports[base_url] = _counting_transport(
+                metrics, self._lock,
+                max_connections=self.max_connections,
+                max_keepalive_connections=self.max_keepalive_connections,
+                keepalive_expiry=self.keepalive_expiry,
+            )
+        return transport
+
+    def chat_model(self, model: str = DEFAULT_MODEL, base_url: str = DEFAULT_BASE_URL,
+                   timeout: Optional[float] = None, **params: Any):
+        """
+        Shared ChatOllama for this configuration; `params` are ChatOllama fields
+        (temperature, tags, ...)
+        """
+        keep_alive = keep_alive_value(DEFAULT_KEEP_ALIVE)
+        if keep_alive is not None:
+            params.setdefault("keep_alive", keep_alive)
+        key = (model, base_url, timeout, _freeze(params))
+        client = self._clients.get(key)
+        if client is not None:
+            return client
+        from langchain_ollama import ChatOllama
+        with self._lock:
+            client = self._clients.get(key)
+            if client is None:
+                client = self._clients[key] = ChatOllama(
+                    model=model,
+                    base_url=base_url,
+                    # Only the sync client shares the pool; an httpx transport is sync-
+                    # only
+                    sync_client_kwargs={
+                        "transport": self._transport(base_url),
+                        "timeout": timeout,
+                    },
+                    async_client_kwargs={"timeout": timeout},
+                    **params,
+                )
+        return client
+
+    def warm_up(
+        self,
+        model: str = DEFAULT_MODEL,
+        base_url: str = DEFAULT_BASE_URL,
+        system_prompts: Sequence[str] = (),
+        timeout: Optional[float] = None,
+    ) -> float:
+        """
+        Load `model` and evaluate each of `system_prompts` with a one-token
+        generation; later prompts starting with one of them only evaluate the
+        rest. Returns the seconds it took, also kept in `metrics()`.
+        """
+        from langchain_core.messages import HumanMessage, SystemMessage
+
+        llm = self.chat_model(
+            model, base_url, timeout=timeout, num_predict=1, tags=["nostream"]
+        )
+        start = time.perf_counter()
+        try:
+            for system_prompt in system_prompts or ("",):
+                llm.invoke(
+                    [SystemMessage(content=system_prompt)]
+                    if system_prompt
+                    else [HumanMessage(content="")]
+                )
+        except Exception as error:
+            with self._lock:
+                self._warm_up[model] = {"error": str(error)}
+            raise
+        seconds = time.perf_counter() - start
+        with self._lock:
+            self._warm_up[model] = {
+                "seconds": round(seconds, 3),
+                "system_prompts": len(system_prompts),
+            }
+        return seconds
+
+    def metrics(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Connection reuse per base URL, the number of configured clients and warm-up
+        results
+        """
+        with self._lock:
+            pools = {
+                base_url: metrics.to_dict()
+                for base_url, metrics in self._metrics.items()
+            }
+            return {
+                "clients": len(self._clients),
+                "pools": pools,
+                "warm_up": dict(self._warm_up),
+            }
+
+    def close(self):
+        """Close every pool; clients handed out before must not be used afterwards"""
+        with self._lock:
+            for transport in self._transports.values():
+                transport.close()
+            self._clients.clear()
+            self._transports.clear()
+            self._metrics.clear()
+            self._warm_up.clear()
+
+# Shared by the example agents and nodes
+default_registry = ClientRegistry()
+
+def start_warm_up(
+    system_prompts: Mapping[str, Iterable[str]],
+    registry: Optional[ClientRegistry] = None,
+    base_url: str = DEFAULT_BASE_URL,
+) -> Optional[threading.Thread]:
+    """
+    Warm up each model with its system prompts on a daemon thread, so the
+    first user request does not wait for the model to load. Failures (e.g.
+    Ollama not running yet) are only recorded in the metrics. Returns None
+    when OLLAMA_WARMUP=0.
+    """
+    if not WARM_UP_ENABLED:
+        return None
+    registry = registry or default_registry
+
+    def run():
+        for model, prompts in system_prompts.items():
+            try:
+                registry.warm_up(model, base_url, tuple(prompts))
+            except Exception:
+                pass
+
+    thread = threading.Thread(target=run, name="ollama-warm-up", daemon=True)
+    thread.start()
+    return thread
@@ -0,0 +1,188 @@
+"""
+Micro-batching dispatcher for concurrent, non-streamed LLM calls.
+
+Many sessions send near-simultaneous prompts, often identical ones (the
+same triage question for "hi" or "status?"). `LLMDispatcher` collects the
+requests that arrive within `window` seconds and dispatches them together:
+
+  * identical requests (same model configuration and prompt) share one
+    call, also when one arrives while that call is still in flight
+    (singleflight);
+  * the distinct calls run on at most `max_concurrency` worker threads, so
+    a burst queues here instead of overloading Ollama;
+  * every waiting caller gets the result, or the exception, of its call.
+
+    reply = default_dispatcher.invoke(llm, prompt)   # instead of llm.invoke(prompt)
+    default_dispatcher.metrics()   # submitted, coalesced, calls, batch sizes
+
+Ollama has no multi-prompt chat endpoint, so a batch is sent as parallel
+requests over the registry's shared connection pool. Only the first caller's
+`invoke` keyword arguments (callbacks included) are used for a shared call,
+which is why streamed calls do not go through the dispatcher.
+"""
+
+import json
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+DEFAULT_WINDOW = float(os.environ.get("LLM_BATCH_WINDOW_MS", "5")) / 1000
+DEFAULT_MAX_CONCURRENCY = int(os.environ.get("LLM_MAX_CONCURRENCY", "4"))
+DEFAULT_MAX_BATCH = 64
+
+def request_key(llm: Any, input: Any) -> Tuple[str, str]:
+    """Model configuration and rendered prompt; equal keys may share one call"""
+    from langchain_core.messages import message_to_dict
+    messages = llm._convert_input(input).to_messages()
+    return llm._get_llm_string(), json.dumps(
+        [message_to_dict(message) for message in messages], sort_keys=True
+    )
+
+class LLMDispatcher:
+    """
+    Collects requests for `window` seconds (or until `max_batch` are waiting),
+    coalesces identical ones and runs the rest on `max_concurrency` threads.
+    """
+
+    def __init__(
+        self,
+        window: float = DEFAULT_WINDOW,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        max_batch: int = DEFAULT_MAX_BATCH,
+    ):
+        self.window = window
+        self.max_concurrency = max_concurrency
+        self.max_batch = max_batch
+        self._lock = threading.Lock()
+        self._ready = threading.Condition(self._lock)
+        # Requests waiting for the window to close: (key, call, future)
+        self._pending: List[Tuple[Hashable, Callable[[], Any], Future]] = []
+        self._window_closes = 0.0
+        # key -> future of the queued or running call
+        self._inflight: Dict[Hashable, Future] = {}
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._flusher: Optional[threading.Thread] = None
+        self._closed = False
+        self._stats = {
+            "submitted": 0,
+            "coalesced": 0,
+            "calls": 0,
+            "errors": 0,
+            "batches": 0,
+            "max_batch": 0,
+        }
+
+    def submit(self, key: Hashable, call: Callable[[], Any]) -> Future:
+        """
+        Future for `call()`, shared with every other request of the same key still
+        pending or in flight
+        """
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("dispatcher is closed")
+            self._stats["submitted"] += 1
+            future = self._inflight.get(key)
+            if future is not None:
+                self._stats["coalesced"] += 1
+                return future
+            future = self._inflight[key] = Future()
+            if not self._pending:
+                self._window_closes = time.monotonic() + self.window
+            self._pending.append((key, call, future))
+            self._start()
+            self._ready.notify()
+        return future
+
+    def invoke(
+        self, llm: Any, input: Any, timeout: Optional[float] = None, **kwargs: Any
+    ) -> Any:
+        """`llm.invoke(input, **kwargs)` through the dispatcher"""
+        return self.submit(
+            request_key(llm, input), lambda: llm.invoke(input, **kwargs)
+        ).result(timeout)
+
+    def _start(self):
+        """Start the worker pool and the flusher thread; caller holds the lock"""
+        if self._flusher is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_concurrency, thread_name_prefix="llm-dispatch"
+            )
+            self._flusher = threading.Thread(
+                target=self._flush_loop, name="llm-dispatch-flusher", daemon=True
+            )
+            self._flusher.start()
+
+    def _flush_loop(self):
+        while True:
+            with self._lock:
+                while not self._closed and (
+                    not self._pending
+                    or (
+                        len(self._pending) < self.max_batch
+                        and time.monotonic() < self._window_closes
+                    )
+                ):
+                    self._ready.wait(
+                        None
+                        if not self._pending
+                        else self._window_closes - time.monotonic()
+                    )
+                batch, self._pending = self._pending, []
+                if batch:
+                    self._stats["batches"] += 1
+                    self._stats["max_batch"] = max(self._stats["max_batch"], len(batch))
+                closed = self._closed
+            for key, call, future in batch:
+                self._executor.submit(self._run, key, call, future)
+            if closed:
+                return
+
+    def _run(self, key: Hashable, call: Callable[[], Any], future: Future):
+        try:
+            result = call()
+        except BaseException as error:
+            with self._lock:
+                self._stats["calls"] += 1
+                self._stats["errors"] += 1
+                del self._inflight[key]
+            future.set_exception(error)
+        else:
+            with self._lock:
+                self._stats["calls"] += 1
+                del self._inflight[key]
+            future.set_result(result)
+
+    def metrics(self) -> Dict[str, Any]:
+        """
+        Requests submitted, coalesced into another call, calls made and batch sizes
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            dispatched = stats["submitted"] - stats["coalesced"]
+            return {
+                **stats,
+                "coalesced_ratio": (
+                    round(stats["coalesced"] / stats["submitted"], 3)
+                    if stats["submitted"]
+                    else 0.0
+                ),
+                "mean_batch": (
+                    round(dispatched / stats["batches"], 2) if stats["batches"] else 0.0
+                ),
+                "in_flight": len(self._inflight),
+            }
+
+    def close(self):
+        """Dispatch what is pending, wait for running calls and stop the threads"""
+        with self._lock:
+            self._closed = True
+            self._ready.notify()
+            flusher, executor = self._flusher, self._executor
+        if flusher is not None:
+            flusher.join()
+            executor.shutdown(wait=True)
+
+# Shared by the example agents and nodes
+default_dispatcher = LLMDispatcher()
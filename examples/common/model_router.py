@@ -0,0 +1,332 @@
+"""
+Tiered model selection per task class, with latency SLOs.
+
+A one-word routing decision does not need the model that writes product
+answers. Each LLM-backed node declares a `TaskProfile`: its task class
+("routing", "answer", "agent", ...), the latency it should stay under (its
+SLO) and the HTTP timeout of one call. A pool maps each task class to
+models in order of preference, e.g. small, fast models first for routing:
+
+    LLM_MODEL_POOLS='{"routing": ["qwen2.5:0.5b", "mistral:latest"],
+                      "answer": ["mistral:latest"]}'
+
+(or the path of a JSON file with that object). Classes without a pool use
+DEFAULT_MODEL, as every node did before.
+
+`ModelRouter` picks the first model of the pool that meets the SLO:
+
+  * observed latency per (model, task class) is an exponentially weighted
+    mean; a model whose mean exceeds the SLO, or whose call failed with a
+    transport error or timeout, is skipped for `cooldown` seconds. Other
+    errors (e.g. an answer that does not parse) are not held against it;
+  * after the cool-down it gets one probe call, whose latency replaces its
+    old mean, so a model that recovered is used again. Other callers skip
+    it while the probe runs;
+  * if every model of the pool is over its SLO, the fastest one is used.
+
+`call` runs a non-streamed call and falls back to the next model of the
+pool when one fails with a transport error or timeout; streamed calls,
+which cannot be retried once tokens went out, use `track` and only inform
+later selections:
+
+    reply = default_router.call(TRIAGE_TASK, lambda m: llm_for(m).invoke(prompt))
+    with default_router.track(ANSWER_TASK) as model:
+        for token in llm_for(model).stream(prompt): ...
+    default_router.metrics()   # latency, usage, fallbacks, selections per class
+"""
+
+import json
+import os
+import sys
+import threading
+import time
+from collections import Counter, deque
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import (
+    Any,
+    Callable,
+    Deque,
+    Dict,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Tuple,
+    TypeVar,
+)
+
+from common.llm_clients import DEFAULT_MODEL, ClientRegistry, default_registry
+
+T = TypeVar("T")
+
+# Task class -> models in order of preference, as JSON or a JSON file path
+DEFAULT_POOLS = os.environ.get("LLM_MODEL_POOLS", "")
+DEFAULT_COOLDOWN = float(os.environ.get("LLM_MODEL_COOLDOWN_S", "30"))
+# Weight of the newest latency in the mean
+DEFAULT_ALPHA = 0.3
+# Calls before the mean counts against the SLO
+DEFAULT_MIN_SAMPLES = 3
+
+@dataclass(frozen=True)
+class TaskProfile:
+    """
+    What a node asks of its model: task class, latency SLO and timeout of one call
+    (seconds)
+    """
+    task_class: str
+    slo: float
+    timeout: Optional[float] = None
+
+@dataclass
+class _ModelStats:
+    calls: int = 0
+    errors: int = 0
+    mean: Optional[float] = None
+    # Skipped until then (time.monotonic); 0 while the model meets its SLO
+    demoted_until: float = 0.0
+    demotions: int = 0
+    # A call after the cool-down is running; other callers keep skipping it
+    probing: bool = False
+    recent: Deque[float] = field(default_factory=lambda: deque(maxlen=200))
+
+def is_model_error(exc: BaseException) -> bool:
+    """
+    Transport errors and timeouts, which say the model (or its server) is
+    unavailable or too slow; content errors, such as an answer that does not
+    parse, say nothing about it and are not held against it.
+    """
+    if isinstance(exc, (ConnectionError, TimeoutError)):
+        return True
+    # Only loaded if a client raised one of them
+    httpx = sys.modules.get("httpx")
+    if httpx is not None and isinstance(exc, httpx.TransportError):
+        return True
+    ollama = sys.modules.get("ollama")
+    return ollama is not None and isinstance(exc, ollama.ResponseError)
+
+def load_pools(value: str) -> Dict[str, List[str]]:
+    """Pools from a JSON object or the path of a JSON file; "" for none"""
+    if not value:
+        return {}
+    if not value.lstrip().startswith("{"):
+        with open(value) as f:
+            value = f.read()
+    pools = json.loads(value)
+    return {
+        task_class: [models] if isinstance(models, str) else list(models)
+        for task_class, models in pools.items()
+    }
+
+def _percentile(ordered: Sequence[float], pct: float) -> float:
+    rank = max(1, int(round(pct / 100 * len(ordered))))
+    return ordered[min(rank, len(ordered)) - 1]
+
+class ModelRouter:
+    """
+    Chooses a model per task profile from its pool and learns from observed latency
+    """
+
+    def __init__(
+        self,
+        pools: Optional[Mapping[str, Sequence[str]]] = None,
+        default_model: str = DEFAULT_MODEL,
+        registry: Optional[ClientRegistry] = None,
+        cooldown: float = DEFAULT_COOLDOWN,
+        alpha: float = DEFAULT_ALPHA,
+        min_samples: int = DEFAULT_MIN_SAMPLES,
+    ):
+        self.pools = {
+            task_class: list(models) for task_class, models in (pools or {}).items()
+        }
+        self.default_model = default_model
+        self.registry = registry or default_registry
+        self.cooldown = cooldown
+        self.alpha = alpha
+        self.min_samples = min_samples
+        self._lock = threading.Lock()
+        self._stats: Dict[Tuple[str, str], _ModelStats] = {}
+        self._selections: Dict[str, Counter] = {}
+        self._fallbacks = 0
+
+    @classmethod
+    def from_env(cls) -> "ModelRouter":
+        """Pools from LLM_MODEL_POOLS, cool-down from LLM_MODEL_COOLDOWN_S"""
+        return cls(load_pools(DEFAULT_POOLS))
+
+    def pool(self, task_class: str) -> List[str]:
+        return self.pools.get(task_class) or [self.default_model]
+
+    def models(self) -> List[str]:
+        """Every model of any pool, e.g. for the warm-up"""
+        models = [self.default_model] + [
+            model for pool in self.pools.values() for model in pool
+        ]
+        return list(dict.fromkeys(models))
+
+    def candidates(self, profile: TaskProfile) -> List[str]:
+        """
+        The pool in the order to try: models meeting the SLO by preference,
+        then the rest fastest first
+        """
+        with self._lock:
+            return self._candidates(profile, time.monotonic())
+
+    def _candidates(self, profile: TaskProfile, now: float) -> List[str]:
+        """Caller holds the lock"""
+        healthy, slow = [], []
+        for model in self.pool(profile.task_class):
+            stats = self._stats.get((model, profile.task_class))
+            if stats is None or (stats.demoted_until <= now and not stats.probing):
+                healthy.append(model)
+            else:
+                mean = stats.mean if stats.mean is not None else float("inf")
+                slow.append((mean, model))
+        return healthy + [model for _, model in sorted(slow)]
+
+    def select(self, profile: TaskProfile) -> str:
+        return self._select(profile)[0]
+
+    def _select(
+        self, profile: TaskProfile, skip: Sequence[str] = ()
+    ) -> Tuple[Optional[str], bool]:
+        """The model to use next and whether the call is its probe after a cool-down"""
+        now = time.monotonic()
+        with self._lock:
+            remaining = [
+                model for model in self._candidates(profile, now) if model not in skip
+            ]
+            if not remaining:
+                return None, False
+            model = remaining[0]
+            self._selections.setdefault(profile.task_class, Counter())[model] += 1
+            self._fallbacks += int(bool(skip))
+            stats = self._stats.get((model, profile.task_class))
+            probe = bool(stats and stats.demoted_until and stats.demoted_until <= now
+                         and not stats.probing)
+            if probe:
+                # The only call deciding whether it is used again
+                stats.probing = True
+            return model, probe
+
+    def record(self, model: str, profile: TaskProfile, seconds: float,
+               error: bool = False, probe: bool = False):
+        """
+        Latency of one call (or its failure); demotes the model if it misses
+        the SLO. The result of a probe replaces the model's old mean.
+        """
+        with self._lock:
+            stats = self._stats.setdefault((model, profile.task_class), _ModelStats())
+            stats.calls += 1
+            if error:
+                stats.errors += 1
+            else:
+                stats.recent.append(seconds)
+                fresh = stats.mean is None or probe
+                stats.mean = seconds if fresh else (
+                    self.alpha * seconds + (1 - self.alpha) * stats.mean
+                )
+            if probe:
+                stats.probing = False
+            slow = not error and stats.mean > profile.slo and (
+                probe or len(stats.recent) >= self.min_samples
+            )
+            if probe and not (error or slow):
+                stats.demoted_until = 0.0
+            elif (error or slow) and (probe or not stats.demoted_until):
+                stats.demoted_until = time.monotonic() + self.cooldown
+                stats.demotions += 1
+
+    def _release(self, model: str, profile: TaskProfile, probe: bool):
+        """A call ended with a content error: no latency to record"""
+        if probe:
+            with self._lock:
+                self._stats[(model, profile.task_class)].probing = False
+
+    def _finished(self, model: str, profile: TaskProfile, probe: bool, start: float,
+                  exc: Optional[BaseException] = None):
+        if exc is not None and not is_model_error(exc):
+            self._release(model, profile, probe)
+        else:
+            self.record(model, profile, time.perf_counter() - start,
+                        error=exc is not None, probe=probe)
+
+    @contextmanager
+    def track(self, profile: TaskProfile) -> Iterator[str]:
+        """Select a model and record how long the block using it took"""
+        model, probe = self._select(profile)
+        start = time.perf_counter()
+        try:
+            yield model
+        except BaseException as exc:
+            self._finished(model, profile, probe, start, exc)
+            raise
+        self._finished(model, profile, probe, start)
+
+    def call(self, profile: TaskProfile, run: Callable[[str], T]) -> T:
+        """
+        `run(model)` with the selected model, then with the next ones of the
+        pool while it fails with transport errors or timeouts; other errors
+        propagate at once
+        """
+        tried: List[str] = []
+        pool_size = len(self.pool(profile.task_class))
+        while True:
+            model, probe = self._select(profile, tried)
+            start = time.perf_counter()
+            try:
+                result = run(model)
+            except Exception as exc:
+                self._finished(model, profile, probe, start, exc)
+                tried.append(model)
+                if not is_model_error(exc) or len(tried) == pool_size:
+                    raise
+                continue
+            self._finished(model, profile, probe, start)
+            return result
+
+    def chat_model(self, model: str, profile: TaskProfile, **params: Any):
+        """The registry's shared client for `model` with the profile's timeout"""
+        return self.registry.chat_model(model=model, timeout=profile.timeout, **params)
+
+    def metrics(self) -> Dict[str, Any]:
+        """
+        Latency and usage per model and task class, fallbacks and the models chosen per
+        task class
+        """
+        now = time.monotonic()
+        with self._lock:
+            models: Dict[str, Dict[str, Any]] = {}
+            for (model, task_class), stats in sorted(self._stats.items()):
+                ordered = sorted(stats.recent)
+                models.setdefault(model, {})[task_class] = {
+                    "calls": stats.calls,
+                    "errors": stats.errors,
+                    "mean_ms": (
+                        round(stats.mean * 1e3, 1) if stats.mean is not None else None
+                    ),
+                    "p50_ms": (
+                        round(_percentile(ordered, 50) * 1e3, 1) if ordered else None
+                    ),
+                    "p95_ms": (
+                        round(_percentile(ordered, 95) * 1e3, 1) if ordered else None
+                    ),
+                    "demotions": stats.demotions,
+                    "demoted": stats.demoted_until > now,
+                }
+            return {
+                "pools": {
+                    task_class: self.pool(task_class)
+                    for task_class in sorted(set(self.pools) | set(self._selections))
+                },
+                "models": models,
+                "selections": {
+                    task_class: dict(counts)
+                    for task_class, counts in self._selections.items()
+                },
+                "fallbacks": self._fallbacks,
+            }
+
+# Shared by the example agents and nodes; LLM_MODEL_POOLS configures it
+default_router = ModelRouter.from_env()
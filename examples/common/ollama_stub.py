@@ -0,0 +1,558 @@
+"""
+Ollama-compatible stub server for hermetic tests and benchmarks.
+
+Speaks the parts of the Ollama HTTP API the examples use: `/api/chat` and
+`/api/generate`, streamed (NDJSON) or not, plus `/api/tags` and
+`/api/version`. Replies come from, in order:
+
+  1. `script`: replies handed out once each, in order;
+  2. `rules`: (regex, reply) pairs matched against the chat messages
+     (joined by newlines, system prompt first) or the prompt; the reply
+     may use the match's groups (`\\1`);
+  3. `default_reply`.
+
+Model speed is simulated: `ttft` seconds before the first token, then
+`tokens_per_sec` (0 for no delay), with at most `parallel` generations at
+a time like OLLAMA_NUM_PARALLEL. `error_rate` of the requests fail with an
+HTTP 500 and Ollama's error body. A stream the client closes stops, like
+Ollama's, and counts as cancelled. The time a request spent queued for a
+slot or "generating" is counted as model time, so a benchmark can subtract
+it from what it measured and keep only the orchestration overhead.
+
+Loading and prompt evaluation are simulated too, for time-to-first-token
+measurements: a model that is not loaded takes `load_time` seconds first
+and stays loaded for the request's `keep_alive` (default 5m; a request
+without messages or prompt only loads or, with keep_alive 0, unloads it).
+Prompt tokens are evaluated at `prompt_tokens_per_sec`, except for the
+longest prefix shared with one of the last `parallel` prompts of the model,
+which Ollama takes from its KV cache:
+
+    with OllamaStub(rules=DEFAULT_RULES, ttft=0.2, tokens_per_sec=30) as stub:
+        llm = registry.chat_model("mistral:latest", stub.base_url)
+        ...
+        stub.metrics()   # requests, errors, tokens, model time
+
+Standalone, e.g. in place of Ollama for the example apps:
+
+    python -m common.ollama_stub --port 11434 --ttft-ms 300 --tokens-per-sec 25
+"""
+
+import argparse
+import json
+import random
+import re
+import threading
+import time
+from collections import deque
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+DEFAULT_REPLY = "OK"
+
+# Replies for the prompts of the bundled examples, so they run end to end
+DEFAULT_RULES: Tuple[Tuple[str, str], ...] = (
+    # cs pizza triage
+    (
+        r"triage agent for a pizza.*User input: \"[^\"]*\b(no|exit|quit|bye)\b",
+        '{"wants_pizza": false, "reason": "The user wants to leave"}',
+    ),
+    (
+        r"triage agent for a pizza",
+        '{"wants_pizza": true, "reason": "The user mentions pizza"}',
+    ),
+    (
+        r"pizza recommendation agent",
+        "I recommend the Classic Margherita - tomato, mozzarella and basil.",
+    ),
+    # cs network routing fallback
+    (r"Routing-Agent.*Nutzeranfrage:.*\b(produ[ck]t)", "Product"),
+    (r"Routing-Agent.*Nutzeranfrage:.*\b(jira|ticket)", "Jira"),
+    (r"Routing-Agent.*Nutzeranfrage:.*\b(confluence|wiki)", "Confluence"),
+    (r"Routing-Agent.*Nutzeranfrage:.*\b(status|online)", "Status"),
+    (r"Routing-Agent", "end"),
+    # ReAct agents: answer without tools
+    (
+        r"Final Answer:",
+        "Thought: I now know the final answer\nFinal Answer: Das ist eine Testantwort.",
+    ),
+)
+
+_TOKEN = re.compile(r"\s*\S+")
+
+def tokenize(text: str) -> List[str]:
+    """Word-sized tokens that join back to `text`"""
+    tokens = _TOKEN.findall(text)
+    rest = text[sum(len(token) for token in tokens):]
+    if rest and tokens:
+        tokens[-1] += rest
+    return tokens or [text]
+
+def keep_alive_seconds(value: Any) -> float:
+    """
+    Ollama's keep_alive (seconds, or a duration such as "5m"); negative keeps the model
+    loaded
+    """
+    if value is None:
+        return 300.0
+    if isinstance(value, str):
+        match = re.fullmatch(r"\s*(-?\d+(?:\.\d+)?)\s*(ms|s|m|h)?\s*", value)
+        if match is None:
+            return 300.0
+        seconds = (
+            float(match.group(1))
+            * {"ms": 0.001, "s": 1, "m": 60, "h": 3600}[match.group(2) or "s"]
+        )
+    else:
+        seconds = float(value)
+    return float("inf") if seconds < 0 else seconds
+
+def _shared_prefix(first: List[str], second: List[str]) -> int:
+    count = 0
+    for a, b in zip(first, second):
+        if a != b:
+            break
+        count += 1
+    return count
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat().replace("+00:00", "Z")
+
+class OllamaStub(ThreadingHTTPServer):
+    """
+    The stub server; `start()` serves it on a daemon thread (also as a
+    context manager) and `port=0` picks a free port.
+    """
+    daemon_threads = True
+    request_queue_size = 1024
+
+    def __init__(
+        self,
+        script: Iterable[str] = (),
+        rules: Sequence[Tuple[str, str]] = (),
+        default_reply: str = DEFAULT_REPLY,
+        ttft: float = 0.0,
+        tokens_per_sec: float = 0.0,
+        error_rate: float = 0.0,
+        parallel: int = 4,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        seed: Optional[int] = None,
+        load_time: float = 0.0,
+        prompt_tokens_per_sec: float = 0.0,
+    ):
+        super().__init__((host, port), OllamaStubHandler)
+        self.script = deque(script)
+        self.rules = [
+            (re.compile(pattern, re.IGNORECASE | re.DOTALL), reply)
+            for pattern, reply in rules
+        ]
+        self.default_reply = default_reply
+        self.ttft = ttft
+        self.tokens_per_sec = tokens_per_sec
+        self.error_rate = error_rate
+        self.load_time = load_time
+        self.prompt_tokens_per_sec = prompt_tokens_per_sec
+        self.parallel = parallel
+        self.slots = threading.Semaphore(parallel)
+        # Loaded models and when they expire; recent prompts per model (its KV cache)
+        self._loaded: Dict[str, float] = {}
+        self._ready: Dict[str, float] = {}
+        self._prompt_cache: Dict[str, deque] = {}
+        self.rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._stats = {
+            "requests": 0,
+            "errors": 0,
+            "cancelled": 0,
+            "tokens": 0,
+            "model_time_s": 0.0,
+            "loads": 0,
+            "prompt_tokens": 0,
+            "prompt_tokens_cached": 0,
+        }
+        self.requests_by_path: Dict[str, int] = {}
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "OllamaStub":
+        self._thread = threading.Thread(
+            target=self.serve_forever, name="ollama-stub", daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self._thread is not None:
+            self.shutdown()
+            self._thread.join()
+            self._thread = None
+        self.server_close()
+
+    def __enter__(self) -> "OllamaStub":
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def reply_for(self, text: str) -> str:
+        """Next scripted reply, else the first matching rule, else the default"""
+        with self._lock:
+            if self.script:
+                return self.script.popleft()
+        for pattern, reply in self.rules:
+            match = pattern.search(text)
+            if match:
+                return match.expand(reply)
+        return self.default_reply
+
+    def prepare(
+        self, model: str, prompt: List[str], keep_alive: Any
+    ) -> Tuple[float, float, int]:
+        """
+        Load `model` if needed and look up `prompt` in its cache. Returns the
+        seconds to simulate for loading and for prompt evaluation, and the
+        number of prompt tokens evaluated.
+        """
+        now = time.monotonic()
+        keep = keep_alive_seconds(keep_alive)
+        with self._lock:
+            if self._loaded.get(model, 0.0) <= now:
+                self._prompt_cache.pop(model, None)
+                self._ready[model] = now + self.load_time
+                self._stats["loads"] += 1
+            # Requests arriving while the model loads wait for the rest of it
+            load = max(0.0, self._ready[model] - now)
+            cache = self._prompt_cache.setdefault(model, deque(maxlen=self.parallel))
+            best, cached = None, 0
+            for index, previous in enumerate(cache):
+                shared = _shared_prefix(previous, prompt)
+                if shared > cached:
+                    best, cached = index, shared
+            # The slot with the longest match is reused, else the oldest one
+            if best is not None:
+                del cache[best]
+            if prompt:
+                cache.append(prompt)
+            evaluated = len(prompt) - cached
+            self._stats["prompt_tokens"] += evaluated
+            self._stats["prompt_tokens_cached"] += cached
+            if keep == 0:
+                self._loaded.pop(model, None)
+                self._prompt_cache.pop(model, None)
+            else:
+                self._loaded[model] = self._ready[model] + keep
+        evaluation = (
+            evaluated / self.prompt_tokens_per_sec
+            if self.prompt_tokens_per_sec
+            else 0.0
+        )
+        return load, evaluation, evaluated
+
+    def loaded_models(self) -> List[str]:
+        now = time.monotonic()
+        with self._lock:
+            return sorted(
+                model for model, expires in self._loaded.items() if expires > now
+            )
+
+    def should_fail(self) -> bool:
+        with self._lock:
+            return self.error_rate > 0 and self.rng.random() < self.error_rate
+
+    def record(
+        self,
+        path: str,
+        tokens: int = 0,
+        model_time: float = 0.0,
+        error: bool = False,
+        cancelled: bool = False,
+    ):
+        with self._lock:
+            self._stats["requests"] += 1
+            self._stats["errors"] += int(error)
+            self._stats["cancelled"] += int(cancelled)
+            self._stats["tokens"] += tokens
+            self._stats["model_time_s"] += model_time
+            self.requests_by_path[path] = self.requests_by_path.get(path, 0) + 1
+
+    def metrics(self) -> Dict[str, Any]:
+        """
+        Requests, errors and cancelled streams, tokens streamed and simulated model time
+        """
+        with self._lock:
+            return {
+                **self._stats,
+                "model_time_s": round(self._stats["model_time_s"], 4),
+                "by_path": dict(self.requests_by_path),
+            }
+
+    def reset_metrics(self):
+        with self._lock:
+            # Loaded models and their caches are server state and stay
+            self._stats = dict.fromkeys(self._stats, 0)
+            self._stats["model_time_s"] = 0.0
+            self.requests_by_path.clear()
+
+class OllamaStubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Streamed parts are small writes; with Nagle each one waits for the
+    # client's delayed ACK (~40 ms), which would count as our overhead
+    disable_nagle_algorithm = True
+    server: OllamaStub
+
+    def do_GET(self):
+        if self.path == "/api/tags":
+            self._send_json(
+                200,
+                {
+                    "models": [
+                        {"name": "mistral:latest", "model": "mistral:latest", "size": 0}
+                    ]
+                },
+            )
+        elif self.path == "/api/version":
+            self._send_json(200, {"version": "0.0.0-stub"})
+        else:
+            self._send_json(404, {"error": f"unknown path {self.path}"})
+
+    def do_HEAD(self):
+        self.send_response(200)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        request = json.loads(self.rfile.read(length) or b"{}")
+        if self.path == "/api/chat":
+            messages = request.get("messages") or []
+            text = "\n".join(message.get("content", "") for message in messages)
+            # Roles are part of the rendered prompt the cache compares
+            prompt = [
+                token
+                for message in messages
+                for token in [f"<{message.get('role', 'user')}>"]
+                + tokenize(message.get("content", ""))
+            ]
+            self._generate(request, text, prompt, chat=True, load_only=not messages)
+        elif self.path == "/api/generate":
+            text = request.get("prompt", "")
+            prompt = tokenize(request.get("system", "") + text) if text else []
+            self._generate(request, text, prompt, chat=False, load_only=not text)
+        else:
+            self._send_json(404, {"error": f"unknown path {self.path}"})
+
+    def _generate(
+        self,
+        request: Dict[str, Any],
+        text: str,
+        prompt: List[str],
+        chat: bool,
+        load_only: bool = False,
+    ):
+        stub = self.server
+        queued = time.perf_counter()
+        model = request.get("model", "stub")
+        with stub.slots:
+            if stub.should_fail():
+                stub.record(
+                    self.path, error=True, model_time=time.perf_counter() - queued
+                )
+                self._send_json(500, {"error": "injected stub error"})
+                return
+            load, evaluation, evaluated = stub.prepare(
+                model, prompt, request.get("keep_alive")
+            )
+            if load_only:
+                time.sleep(load)
+                elapsed = time.perf_counter() - queued
+                self._send_json(
+                    200,
+                    self._part(model, "", chat, done=True, elapsed=elapsed, load=load),
+                )
+                stub.record(self.path, model_time=elapsed)
+                return
+            tokens = tokenize(stub.reply_for(text))
+            # Before the first token: load, prompt evaluation, then the configured delay
+            first_token = load + evaluation + stub.ttft
+            usage = {
+                "load": load,
+                "prompt_eval_count": evaluated,
+                "prompt_eval": evaluation,
+            }
+            interval = 1 / stub.tokens_per_sec if stub.tokens_per_sec else 0.0
+            if request.get("stream", True):
+                self.send_response(200)
+                self.send_header("Content-Type", "application/x-ndjson")
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+                time.sleep(first_token)
+                sent = 0
+                try:
+                    for index, token in enumerate(tokens):
+                        if index and interval:
+                            time.sleep(interval)
+                        self._write_chunk(self._part(model, token, chat, done=False))
+                        sent += 1
+                    elapsed = time.perf_counter() - queued
+                    self._write_chunk(
+                        self._part(
+                            model,
+                            "",
+                            chat,
+                            done=True,
+                            eval_count=len(tokens),
+                            elapsed=elapsed,
+                            **usage,
+                        )
+                    )
+                    self.wfile.write(b"0\r\n\r\n")
+                except (BrokenPipeError, ConnectionResetError):
+                    # The client closed the stream; like Ollama, stop generating
+                    self.close_connection = True
+                    stub.record(
+                        self.path,
+                        tokens=sent,
+                        model_time=time.perf_counter() - queued,
+                        cancelled=True,
+                    )
+                    return
+            else:
+                time.sleep(first_token + interval * max(0, len(tokens) - 1))
+                elapsed = time.perf_counter() - queued
+                self._send_json(
+                    200,
+                    self._part(
+                        model,
+                        "".join(tokens),
+                        chat,
+                        done=True,
+                        eval_count=len(tokens),
+                        elapsed=elapsed,
+                        **usage,
+                    ),
+                )
+        stub.record(self.path, tokens=len(tokens), model_time=elapsed)
+
+    @staticmethod
+    def _part(
+        model: str,
+        content: str,
+        chat: bool,
+        done: bool,
+        eval_count: int = 0,
+        elapsed: float = 0.0,
+        load: float = 0.0,
+        prompt_eval_count: int = 0,
+        prompt_eval: float = 0.0,
+    ) -> Dict[str, Any]:
+        part: Dict[str, Any] = {"model": model, "created_at": _now(), "done": done}
+        if chat:
+            part["message"] = {"role": "assistant", "content": content}
+        else:
+            part["response"] = content
+        if done:
+            part.update({
+                "done_reason": "stop",
+                "total_duration": int(elapsed * 1e9),
+                "load_duration": int(load * 1e9),
+                "prompt_eval_count": prompt_eval_count,
+                "prompt_eval_duration": int(prompt_eval * 1e9),
+                "eval_count": eval_count,
+                "eval_duration": int(max(0.0, elapsed - load - prompt_eval) * 1e9),
+            })
+        return part
+
+    def _write_chunk(self, part: Dict[str, Any]):
+        data = (json.dumps(part) + "\n").encode()
+        self.wfile.write(b"%x\r\n%s\r\n" % (len(data), data))
+        self.wfile.flush()
+
+    def _send_json(self, status: int, body: Dict[str, Any]):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+def load_rules(path: str) -> List[Tuple[str, str]]:
+    """Rules from a JSON list of {"match": regex, "reply": text}"""
+    with open(path) as f:
+        return [(rule["match"], rule["reply"]) for rule in json.load(f)]
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Ollama-compatible stub server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=11434)
+    parser.add_argument(
+        "--rules",
+        help="JSON list of {match, reply}; default: replies for the bundled examples",
+    )
+    parser.add_argument(
+        "--reply", default=DEFAULT_REPLY, help="Reply when no rule matches"
+    )
+    parser.add_argument(
+        "--ttft-ms", type=float, default=0.0, help="Delay before the first token"
+    )
+    parser.add_argument(
+        "--tokens-per-sec",
+        type=float,
+        default=0.0,
+        help="Streaming speed; 0 for no delay",
+    )
+    parser.add_argument(
+        "--error-rate",
+        type=float,
+        default=0.0,
+        help="Share of requests failing with HTTP 500",
+    )
+    parser.add_argument(
+        "--parallel", type=int, default=4, help="Generations served at once"
+    )
+    parser.add_argument("--seed", type=int)
+    parser.add_argument(
+        "--load-ms",
+        type=float,
+        default=0.0,
+        help="Time to load a model that is not loaded",
+    )
+    parser.add_argument(
+        "--prompt-tokens-per-sec",
+        type=float,
+        default=0.0,
+        help="Prompt evaluation speed for tokens not in the prefix cache; "
+        "0 for no delay",
+    )
+    args = parser.parse_args(argv)
+
+    stub = OllamaStub(
+        rules=load_rules(args.rules) if args.rules else DEFAULT_RULES,
+        default_reply=args.reply,
+        ttft=args.ttft_ms / 1000,
+        tokens_per_sec=args.tokens_per_sec,
+        error_rate=args.error_rate,
+        parallel=args.parallel,
+        host=args.host,
+        port=args.port,
+        seed=args.seed,
+        load_time=args.load_ms / 1000,
+        prompt_tokens_per_sec=args.prompt_tokens_per_sec,
+    )
+    print(f"Ollama stub listening on {stub.base_url}")
+    try:
+        stub.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stub.server_close()
+
+if __name__ == "__main__":
+    main()
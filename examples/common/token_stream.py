@@ -0,0 +1,169 @@
+"""
+Token streaming for LLM-backed graph nodes.
+
+`stream_turn(app, input, on_token=...)` runs one turn of a compiled graph
+with LangGraph's "messages" stream mode, so tokens produced by chat models
+inside nodes reach `on_token` as they are generated instead of after the
+node returns. Each turn reports time-to-first-token separately from total
+latency. Chat models tagged "nostream" (e.g. a classifier whose output is not
+shown to the user) are not streamed.
+
+    state, stats = stream_turn(
+        app, {"messages": [...]}, on_token=lambda text, node: print(text, end="")
+    )
+    print(stats)    # first token 312 ms, total 2410 ms, 57 tokens
+
+ReAct agents generate Thought/Action steps before the answer; tokens from
+nodes listed in `react_nodes` are reduced to the text after "Final Answer:".
+Generations tagged "direct_answer" in those nodes (an answer phrased without
+the agent loop) are streamed as they are.
+"""
+
+import sys
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Collection, Dict, Optional, TextIO, Tuple
+
+from langchain_core.messages import AIMessageChunk
+
+# Marks a generation in a ReAct node that is the answer itself
+DIRECT_ANSWER_TAG = "direct_answer"
+
+# Called with (token text, node name)
+TokenCallback = Callable[[str, str], None]
+
+@dataclass
+class TurnStats:
+    """Latency of one streamed turn (seconds)"""
+    total_s: float = 0.0
+    # None when no token was streamed, e.g. turns handled without an LLM
+    first_token_s: Optional[float] = None
+    tokens: int = 0
+
+    def __str__(self) -> str:
+        if self.first_token_s is None:
+            return f"total {self.total_s * 1000:.0f} ms, no tokens streamed"
+        return (
+            f"first token {self.first_token_s * 1000:.0f} ms, "
+            f"total {self.total_s * 1000:.0f} ms, {self.tokens} tokens"
+        )
+
+class FinalAnswerFilter:
+    """
+    Passes on only the final answer of ReAct generations: the text after the
+    marker, per LLM call. Generations without the marker (Thought/Action
+    steps) are dropped.
+    """
+
+    def __init__(self, marker: str = "Final Answer:"):
+        self.marker = marker
+        self.generation: Optional[str] = None
+        self.buffer = ""
+        self.answering = False
+
+    def feed(self, text: str, generation: Optional[str] = None) -> str:
+        """Text of this token to show ("" while still before the marker)"""
+        if generation != self.generation:
+            self.generation, self.buffer, self.answering = generation, "", False
+        if not self.answering:
+            self.buffer += text
+            position = self.buffer.find(self.marker)
+            if position < 0:
+                return ""
+            self.answering = True
+            text, self.buffer = self.buffer[position + len(self.marker):], ""
+        # Whitespace between the marker and the answer is dropped
+        if not self.buffer:
+            text = text.lstrip()
+            self.buffer = text
+        return text
+
+class TokenPrinter:
+    """
+    `on_token` callback for console clients: prints tokens as they arrive,
+    after `prefix` and a `before_first()` hook (e.g. flushing log output) that
+    run once per turn.
+    """
+
+    def __init__(
+        self,
+        prefix: str = "",
+        before_first: Optional[Callable[[], None]] = None,
+        stream: Optional[TextIO] = None,
+    ):
+        self.prefix = prefix
+        self.before_first = before_first
+        self.stream = stream
+        self.started = False
+
+    def __call__(self, text: str, node: str):
+        stream = self.stream or sys.stdout
+        if not self.started:
+            self.started = True
+            if self.before_first is not None:
+                self.before_first()
+            stream.write(self.prefix)
+        stream.write(text)
+        stream.flush()
+
+    def end_turn(self) -> bool:
+        """Finish the printed line; returns whether anything was printed this turn"""
+        printed, self.started = self.started, False
+        if printed:
+            (self.stream or sys.stdout).write("\n")
+        return printed
+
+def _chunk_text(chunk: AIMessageChunk) -> str:
+    content = chunk.content
+    if isinstance(content, str):
+        return content
+    # Content blocks, e.g. [{"type": "text", "text": ...}]
+    return "".join(
+        block.get("text", "") if isinstance(block, dict) else str(block)
+        for block in content
+    )
+
+def stream_turn(
+    app: Any,
+    input: Any,
+    config: Optional[Dict] = None,
+    on_token: Optional[TokenCallback] = None,
+    nodes: Optional[Collection[str]] = None,
+    react_nodes: Collection[str] = (),
+    **kwargs,
+) -> Tuple[Optional[Dict], TurnStats]:
+    """
+    Run one turn of `app`, passing LLM tokens from `nodes` (default: all) to
+    `on_token(text, node)` as they arrive. Tokens from `react_nodes` are
+    reduced to the final answer first. Extra keyword arguments (e.g.
+    `context`) go to `app.stream`. Returns the state after the turn and its
+    latency; the first token is the first one passed to `on_token`.
+    """
+    stats = TurnStats()
+    state = None
+    final_answer = FinalAnswerFilter()
+    start = time.perf_counter()
+    for mode, payload in app.stream(
+        input, config, stream_mode=["messages", "values"], **kwargs
+    ):
+        if mode == "values":
+            state = payload
+            continue
+        chunk, metadata = payload
+        node = metadata.get("langgraph_node", "")
+        if not isinstance(chunk, AIMessageChunk) or (
+            nodes is not None and node not in nodes
+        ):
+            continue
+        text = _chunk_text(chunk)
+        if node in react_nodes and DIRECT_ANSWER_TAG not in metadata.get("tags", ()):
+            text = final_answer.feed(text, chunk.id)
+        if not text:
+            continue
+        if stats.first_token_s is None:
+            stats.first_token_s = time.perf_counter() - start
+        stats.tokens += 1
+        if on_token is not None:
+            on_token(text, node)
+    stats.total_s = time.perf_counter() - start
+    return state, stats
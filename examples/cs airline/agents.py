@@ -1,17 +1,33 @@
 from abc import ABC, abstractmethod
+from typing import Any, Dict, Tuple
 
-from langchain_core.output_parsers import StrOutputParser
-from langchain_ollama import ChatOllama
+from langchain_core.runnables import Runnable
 from langchain.prompts import PromptTemplate
 from langchain.tools import Tool
 from state import CustomerState
 import inspect
-import json
+import os
 import random
+import sys
+
+# Shared example helpers live one directory up
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from common.agent_chains import default_chains
+from common.json_stream import parse_json_stream
+from common.llm_clients import default_registry
+from common.model_router import TaskProfile, default_router
 
 
 # Define the base class for tasks
 class AgentBase(ABC):
+    # Value types by key of the JSON answer, and the keys the agent needs;
+    # generation stops once those are complete (or when the object closes)
+    output_schema: Dict[str, Any] = {}
+    required_keys: Tuple[str, ...] = ()
+    # Task class, latency SLO and timeout (seconds); LLM_MODEL_POOLS maps the
+    # task class to the models to use
+    task = TaskProfile("answer", slo=10.0, timeout=60)
+
     def __init__(self, state: CustomerState):
         self.state = state
 
@@ -19,24 +35,40 @@ class AgentBase(ABC):
     def get_prompt_template(self) -> str:
         pass
 
-    def execute(self) -> CustomerState:
+    def prompt(self) -> PromptTemplate:
+        """The class's template, parsed on first use"""
+        return default_chains.prompt(type(self), self._build_prompt)
 
-        # Define the prompt template
-        template = self.get_prompt_template()
-        prompt = PromptTemplate.from_template(template)
-        llm = ChatOllama(
-            model="mistral:latest",
-            base_url="http://127.0.0.1:11434",
-            temperature=0.1,
-            timeout=60
+    def _build_prompt(self) -> PromptTemplate:
+        return PromptTemplate.from_template(self.get_prompt_template())
+
+    def chain(self, llm) -> Runnable:
+        """
+        prompt | llm | parser, built once per class and model; runnables are
+        immutable, so threads share it
+        """
+        return default_chains.chain(type(self), llm, self._build_prompt)
+
+    def decide(self, model: str) -> Dict[str, Any]:
+        # Shared client with a pooled keep-alive connection; the Ollama client
+        # stack is loaded on first use
+        llm = default_registry.chat_model(
+            model=model, temperature=0.1, timeout=self.task.timeout
         )
-        llm_chain = prompt | llm | StrOutputParser()
-        generation = llm_chain.invoke({
+        # Template and chain are built once per class; only the inputs are bound here
+        llm_chain = self.chain(llm)
+        # Parsed while streaming instead of json.loads on the full generation
+        return parse_json_stream(llm_chain.stream({
             "flight_number": self.state["flight_number"],
             # "use_tool": self.state["use_tool"],
             # "tools_list": self.state["tools_list"]
-        })
-        data = json.loads(generation)
+        }), self.required_keys, self.output_schema).values
+
+    def execute(self) -> CustomerState:
+
+        # Nothing is shown while it streams, so a model of the pool that fails
+        # is replaced by the next one
+        data = default_router.call(self.task, self.decide)
         # self.state["use_tool"] = data.get("use_tool", False)
         # self.state["tool_exec"] = generation
 
@@ -57,6 +89,11 @@ class ChatAgent(AgentBase):
         """
 
 class ToolAgent(AgentBase):
+    output_schema = {"function": str, "args": list}
+    required_keys = ("function", "args")
+    # Picks a tool and its arguments: a short, structured answer
+    task = TaskProfile("tool", slo=5.0, timeout=60)
+
     def get_prompt_template(self) -> str:
         return """
             History: 
@@ -1,9 +1,16 @@
+import os
+import sys
+
 from langgraph.graph import StateGraph, END
 
 from edges import checking_required_data
 from nodes import Triage, AskForFlightNumber, GetFlightDetails
 from state import CustomerState
 
+# Shared example helpers live one directory up
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from common.graph_profiler import instrument_from_env
+
 
 workflow = StateGraph(CustomerState)
 
@@ -31,24 +38,20 @@ workflow.add_conditional_edges(
 )
 
 
-# Compile the workflow into a runnable app
-app = workflow.compile()
-
-# Mermaid-String ausgeben
-mermaid_code = app.get_graph().draw_mermaid()
-# print(mermaid_code)
+# Compile the workflow into a runnable app (per-node timings with
+# GRAPH_PROFILE=<file>.json)
+app = instrument_from_env(workflow.compile())
 
-# Optional: Mermaid-Code in Datei speichern
-with open("workflow_graph.mmd", "w") as f:
-    f.write(mermaid_code)
-
-# Initialize the state
-initial_state = CustomerState(
-    flight_number = "A-123",
-)
+# Mermaid-Diagramm nur auf Anfrage erzeugen:
+#     python3 ../common/diagrams.py main:workflow
 
-for s in app.stream(initial_state):
-    # Print the current state
-    print("for s in app.stream(initial_state):")
-    print(s)
+if __name__ == "__main__":
+    # Initialize the state
+    initial_state = CustomerState(
+        flight_number = "A-123",
+    )
 
+    for s in app.stream(initial_state):
+        # Print the current state
+        print("for s in app.stream(initial_state):")
+        print(s)
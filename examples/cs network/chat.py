@@ -1,11 +1,37 @@
+import os
+import sys
+
 from langchain_core.messages import HumanMessage
 from langgraph.constants import END
 from langgraph.graph import StateGraph
 from state import GraphState
-from node import triage_agent, triage_router, jira_node, confluence_node, status_node, product_agent, product_router
+from node import (
+    triage_agent,
+    triage_router,
+    jira_node,
+    confluence_node,
+    status_node,
+    product_agent,
+    product_router,
+    warm_up_prompts,
+)
+
+# Shared example helpers live one directory up
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from common.graph_profiler import instrument_from_env
+from common.llm_clients import start_warm_up
+from common.model_router import default_router
+from common.token_stream import TokenPrinter, stream_turn
+
+# Nodes whose LLM output is shown while it is generated; the product agent
+# is a ReAct agent, so only its final answer (or its direct answer) is streamed
+STREAMED_NODES = ("product_agent",)
+REACT_NODES = ("product_agent",)
 
 def create_workflow():
-    """Create and compile the workflow graph."""
+    """
+    Create and compile the workflow graph (instrumented when GRAPH_PROFILE is set).
+    """
     workflow = StateGraph(GraphState)
     workflow.add_node("triage", triage_agent)
     workflow.add_node("product_agent", product_agent)
@@ -26,11 +52,14 @@ def create_workflow():
     })
     workflow.add_conditional_edges("product_agent", product_router)
 
-    return workflow.compile()
+    return instrument_from_env(workflow.compile())
 
 def chat_loop():
     """Interactive chat loop with the cs network graph."""
+    # Load the models of the pools and the prompt prefixes while the user types
+    start_warm_up({model: warm_up_prompts() for model in default_router.models()})
     app = create_workflow()
+    show_token = TokenPrinter(prefix="\n🤖 Assistant: ")
 
     print("🤖 CS Network Assistant gestartet!")
     print("Verfügbare Bereiche: Product, Jira, Confluence, Status")
@@ -54,18 +83,21 @@ def chat_loop():
                 "messages": [HumanMessage(content=user_input)]
             }
 
-            # Process through the graph
+            # Process through the graph; the answer is printed while it is generated
             print("🔄 Verarbeitung...")
-            result = app.invoke(input_message)
-
-            # Display results
-            print("\n" + "="*50)
-            for msg in result["messages"]:
-                if msg.type == "ai":
-                    print(f"🤖 Assistant: {msg.content}")
-                elif msg.type == "human":
-                    print(f"👤 Sie: {msg.content}")
-            print("="*50 + "\n")
+            result, stats = stream_turn(app, input_message, on_token=show_token,
+                                        nodes=STREAMED_NODES, react_nodes=REACT_NODES)
+
+            # Display results that were not streamed (answers without an LLM)
+            if not show_token.end_turn():
+                print("\n" + "="*50)
+                for msg in result["messages"]:
+                    if msg.type == "ai":
+                        print(f"🤖 Assistant: {msg.content}")
+                    elif msg.type == "human":
+                        print(f"👤 Sie: {msg.content}")
+                print("="*50)
+            print(f"⏱️  {stats}\n")
 
         except KeyboardInterrupt:
             print("\n👋 Chat beendet!")
@@ -1,7 +1,14 @@
+import os
+import sys
+
 from chat import create_workflow
 
-app = create_workflow()
+# Shared example helpers live one directory up
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from common.diagrams import write_mermaid
 
-mermaid_code = app.get_graph().draw_mermaid()
-with open("workflow_graph.mmd", "w") as f:
-    f.write(mermaid_code)
+# Redraws only if the graph structure changed since workflow_graph.mmd was written
+written = write_mermaid(
+    create_workflow(), "workflow_graph.mmd", force="--force" in sys.argv
+)
+print("workflow_graph.mmd " + ("written" if written else "unchanged"))
@@ -1,34 +1,120 @@
-from langchain.agents import create_react_agent, AgentExecutor
-from langchain_core.messages import AIMessage, HumanMessage
-from langchain_core.prompts import PromptTemplate
-from langchain_ollama import ChatOllama
+import os
+import sys
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional
+
+from langchain_core.messages import AIMessage
+from langchain_core.output_parsers import StrOutputParser
+from langchain_core.prompts import ChatPromptTemplate
 from langgraph.constants import END
 
+from product_intents import ProductIntent, ProductPathStats, parse_product_request
+from speculation import Speculator
 from state import GraphState
-from tools import fetch_product, get_product_categories, get_products
+from triage import HybridTriage, lexicon_scores
 
+# Shared example helpers live one directory up
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from common.llm_cache import default_response_cache
+from common.llm_clients import default_registry
+from common.llm_dispatcher import default_dispatcher
+from common.model_router import TaskProfile, default_router
+from common.token_stream import DIRECT_ANSWER_TAG
 
-def triage_agent(state: GraphState) -> GraphState:
-    user_message = state["messages"][-1].content
-    llm = ChatOllama(
-        model="mistral:latest",
-        base_url="http://127.0.0.1:11434",
-        temperature=0.1,
-        timeout=10
-    )
-    system_prompt = (
-        "Du bist ein Routing-Agent. Ordne die folgende Nutzeranfrage einer Kategorie zu: \n"
-        "Mögliche Kategorien: Product, Jira, Confluence, Status\n"
-        "Gib nur eine dieser Kategorien als Antwort zurück. Wenn keine passt, gibt 'end' zurück."
-    )
-    prompt = f"System:{system_prompt}\nNutzeranfrage: {HumanMessage(content=user_message).content}"
-    response = llm.invoke(prompt)
+# The ReAct agent stack and the HTTP tools are imported by the nodes that use
+# them, and the Ollama client by the registry on first use, so building the
+# graph does not load them
+
+# The prompts are a fixed system message followed by the user's text as its own
+# message: every prompt of a node starts with the same tokens, so Ollama reuses
+# their evaluation (KV cache) and only evaluates the user message
+
+# What each LLM call needs; LLM_MODEL_POOLS maps the task classes to models
+# (e.g. a small, fast one for routing), the router keeps each within its
+# latency SLO (seconds). Served at /metrics/llm by the web server
+TRIAGE_TASK = TaskProfile("routing", slo=1.0, timeout=10)
+ANSWER_TASK = TaskProfile("answer", slo=5.0, timeout=10)
+AGENT_TASK = TaskProfile("agent", slo=20.0, timeout=10)
+
+TRIAGE_PROMPT = ChatPromptTemplate.from_messages(
+    [
+        (
+            "system",
+            "Du bist ein Routing-Agent. "
+            "Ordne die folgende Nutzeranfrage einer Kategorie zu: \n"
+            "Mögliche Kategorien: Product, Jira, Confluence, Status\n"
+            "Gib nur eine dieser Kategorien als Antwort zurück. "
+            "Wenn keine passt, gibt 'end' zurück.",
+        ),
+        ("human", "Nutzeranfrage: {user_message}"),
+    ]
+)
+
+def _llm_category(user_message: str) -> str:
+    """Ask the LLM for the category of a message the local classifier is unsure about"""
+    # The category is not shown to the user, so its tokens are not streamed;
+    # repeated requests ("status?") are answered from the response cache
+    prompt = TRIAGE_PROMPT.invoke({"user_message": user_message})
+
+    def classify(model: str):
+        llm = default_registry.chat_model(
+            model=model,
+            temperature=0.1,
+            timeout=TRIAGE_TASK.timeout,
+            tags=["nostream"],
+            cache=default_response_cache(),
+        )
+        # Concurrent sessions asking the same question share one call
+        return default_dispatcher.invoke(llm, prompt)
+
+    # A model of the routing pool that fails is replaced by the next one
+    response = default_router.call(TRIAGE_TASK, classify)
     category = response.content.strip().lower()
     if category not in ["product", "jira", "confluence", "status"]:
         category = "end"
+    return category
+
+@lru_cache(maxsize=None)
+def hybrid_triage() -> HybridTriage:
+    """Shared rule-first classifier; TRIAGE_* environment variables configure it"""
+    return HybridTriage.from_env(_llm_category)
+
+# Prefetches started before the triage decides (SPECULATIVE_TRIAGE=1); hit
+# rate and time saved are served at /metrics/llm by the web server
+speculator = Speculator()
+
+def _speculative_prefetches(user_message: str) -> Dict[str, Callable[[], Any]]:
+    """
+    Downstream work cheap signals make likely: the tool call of a direct product
+    request, the status probe
+    """
+    prefetches: Dict[str, Callable[[], Any]] = {}
+    intent = parse_product_request(user_message)
+    if intent is not None:
+        prefetches["product"] = lambda: _call_product_tool(intent)
+    if "status" in lexicon_scores(user_message):
+        prefetches["status"] = probe_systems
+    return prefetches
+
+def triage_agent(state: GraphState) -> GraphState:
+    user_message = state["messages"][-1].content
+    # With speculation on, likely downstream work runs while the triage decides
+    speculation_id = (
+        speculator.start(_speculative_prefetches(user_message))
+        if speculator.enabled
+        else None
+    )
+    category = "end"
+    try:
+        # Lexicon and linear model first; the LLM only below the confidence threshold
+        category = hybrid_triage().classify(user_message).category
+    finally:
+        # Prefetches of other routes are discarded
+        speculator.resolve(speculation_id, category)
 
     # Store the routing decision in state and return state
     state["routing_decision"] = category
+    state["speculation_id"] = speculation_id
     return state
 
 def triage_router(state: GraphState) -> str:
@@ -43,21 +129,8 @@ def product_router(state: GraphState) -> str:
 
     return END
 
-def product_agent(state: GraphState) -> GraphState:
-    user_message = state["messages"][-1].content
-
-    # Create ReAct agent with tools
-    llm = ChatOllama(
-        model="mistral:latest",
-        base_url="http://127.0.0.1:11434",
-        temperature=0.1,
-        timeout=10
-    )
-
-    tools = [fetch_product, get_products, get_product_categories]
-
-    # ReAct prompt template
-    react_prompt = PromptTemplate.from_template("""
+# ReAct prompt of the product agent, parsed once at import
+PRODUCT_REACT_PROMPT = ChatPromptTemplate.from_messages([("system", """
     You are a product assistant helping customers with product inquiries.
     You have access to the following tools:
 
@@ -68,7 +141,8 @@ def product_agent(state: GraphState) -> GraphState:
     Question: the input question you need to answer
     Thought: you should always think about what to do
     Important Rules:
-    - In the `Action:` line, write only the exact tool name (from [{tool_names}]), without parentheses or additions.
+    - In the `Action:` line, write only the exact tool name (from [{tool_names}]),
+      without parentheses or additions.
     - In the `Action Input:` line, write only the input for the tool.
     - If you no longer need any tools, write:
         Action: none
@@ -78,26 +152,131 @@ def product_agent(state: GraphState) -> GraphState:
     Thought: I now know the final answer
     Final Answer: the final answer to the original input question.
 
-    Always respond in German in the `Final Answer`. When retrieving product information, summarize it clearly.
-
+    Always respond in German in the `Final Answer`. When retrieving product
+    information, summarize it clearly.
+    """), ("human", """
     Question: {input}
     {agent_scratchpad}
-    """)
+    """)])
 
+# Phrases the result of a tool the product node called directly
+PRODUCT_ANSWER_PROMPT = ChatPromptTemplate.from_messages([("system", """
+    You are a product assistant helping customers with product inquiries.
+    Answer the question using only the tool result in the message.
+
+    Always respond in German. When retrieving product information, summarize it clearly.
+    """), ("human", """
+    Question: {input}
+    Tool result: {observation}
+    """)])
+
+def warm_up_prompts() -> List[str]:
+    """System messages the node prompts start with, for the warm-up at start"""
+    from langchain_core.tools import render_text_description
+    from tools import PRODUCT_TOOLS
+
+    # Rendered like create_react_agent renders the tools
+    react = PRODUCT_REACT_PROMPT.messages[0].format(
+        tools=render_text_description(PRODUCT_TOOLS),
+        tool_names=", ".join(tool.name for tool in PRODUCT_TOOLS),
+    )
+    return [TRIAGE_PROMPT.messages[0].format().content, react.content,
+            PRODUCT_ANSWER_PROMPT.messages[0].format().content]
+
+# Direct answers vs agent runs, served at /metrics/llm by the web server
+product_paths = ProductPathStats()
+
+def _product_llm(model: str, task: TaskProfile):
+    return default_registry.chat_model(
+        model=model, temperature=0.1, timeout=task.timeout
+    )
+
+@lru_cache(maxsize=None)
+def product_executor(model: str = default_router.default_model):
+    """
+    ReAct agent and executor for open product questions, built once per model and shared
+    by all sessions
+    """
+    from langchain.agents import create_react_agent, AgentExecutor
+    from tools import PRODUCT_TOOLS
+
+    # Its steps are not printed because the final answer is streamed to the
+    # chat as it is generated
+    agent = create_react_agent(
+        _product_llm(model, AGENT_TASK), PRODUCT_TOOLS, PRODUCT_REACT_PROMPT
+    )
+    return AgentExecutor(
+        agent=agent,
+        tools=PRODUCT_TOOLS,
+        verbose=False,
+        max_iterations=5,
+        handle_parsing_errors=True,
+    )
+
+def _call_product_tool(intent: ProductIntent) -> str:
+    from tools import PRODUCT_TOOLS
+
+    tool = next(tool for tool in PRODUCT_TOOLS if tool.name == intent.tool)
+    return tool.invoke(intent.arguments())
+
+def _direct_product_answer(
+    user_message: str, intent: ProductIntent, speculation_id: Optional[str] = None
+) -> str:
+    """
+    Call the one tool the request needs (or take its prefetched result) and let the LLM
+    phrase it
+    """
+    observation = speculator.claim(
+        speculation_id, "product", lambda: _call_product_tool(intent)
+    )
     try:
-        # Create and execute ReAct agent
-        agent = create_react_agent(llm, tools, react_prompt)
-        agent_executor = AgentExecutor(agent=agent, tools=tools, verbose=True, max_iterations=5,handle_parsing_errors=True)
+        # Streamed to the chat, so a slow model is not retried, only avoided next time
+        with default_router.track(ANSWER_TASK) as model:
+            chain = (
+                PRODUCT_ANSWER_PROMPT
+                | _product_llm(model, ANSWER_TASK)
+                | StrOutputParser()
+            )
+            # Tagged so the chat streams these tokens without waiting for "Final
+            # Answer:"
+            answer = chain.invoke({"input": user_message, "observation": observation},
+                                  config={"tags": [DIRECT_ANSWER_TAG]})
+    except Exception as e:
+        print(f"Error phrasing product answer: {e}")
+        product_paths.record("unphrased")
+        return observation
+    return answer.strip() or observation
 
-        result = agent_executor.invoke({"input": user_message})
-        response_content = result.get("output", "Entschuldigung, ich konnte Ihre Anfrage nicht bearbeiten.")
+def product_agent(state: GraphState) -> GraphState:
+    user_message = state["messages"][-1].content
+
+    try:
+        # Requests answered by one tool call skip the agent loop
+        intent = parse_product_request(user_message)
+        if intent is not None:
+            response_content = _direct_product_answer(
+                user_message, intent, state.get("speculation_id")
+            )
+            product_paths.record("direct", intent.tool)
+        else:
+            with default_router.track(AGENT_TASK) as model:
+                result = product_executor(model).invoke({"input": user_message})
+            response_content = result.get(
+                "output", "Entschuldigung, ich konnte Ihre Anfrage nicht bearbeiten."
+            )
+            product_paths.record("agent")
 
         return {"messages": state["messages"] + [AIMessage(content=response_content)]}
 
     except Exception as e:
         print(f"Error in product ReAct agent: {e}")
+        product_paths.record("error")
         state["routing_decision"] = "triage"
-        return {"messages": state["messages"] + [AIMessage(content="Fehler beim Verarbeiten Ihrer Produktanfrage. Wie kann ich Ihnen sonst helfen?")]}
+        reply = AIMessage(
+            content="Fehler beim Verarbeiten Ihrer Produktanfrage. "
+            "Wie kann ich Ihnen sonst helfen?"
+        )
+        return {"messages": state["messages"] + [reply]}
 
 def jira_node(state: GraphState) -> GraphState:
     query = state["messages"][-1].content
@@ -109,8 +288,9 @@ def confluence_node(state: GraphState) -> GraphState:
     answer = query
     return {"messages": state["messages"] + [AIMessage(content=answer)]}
 
-def status_node(state: GraphState) -> GraphState:
-    systems = [
+def probe_systems() -> List[Dict[str, Any]]:
+    """Availability of the monitored systems"""
+    return [
         {"name": "Database", "available": True},
         {"name": "API", "available": True},
         {"name": "Frontend", "available": False},
@@ -118,7 +298,13 @@ def status_node(state: GraphState) -> GraphState:
         {"name": "Cache", "available": True}
     ]
 
-    offline_systems = [system["name"] for system in systems if not system["available"]]
+def status_node(state: GraphState) -> GraphState:
+    # Probed while the triage decided, if speculation is on
+    systems = speculator.claim(state.get("speculation_id"), "status", probe_systems)
+
+    offline_systems = [
+        system["name"] for system in systems if not system["available"]
+    ]
 
     if not offline_systems:
         answer = "Everything works"
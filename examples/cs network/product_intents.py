@@ -0,0 +1,108 @@
+"""
+Direct product requests that need exactly one tool call.
+
+"Erzähle mir was zu Produkt 3" is answered by `fetch_product("3")` alone, yet
+the ReAct agent spends up to five LLM iterations deciding to call it.
+`parse_product_request(text)` recognizes such requests deterministically:
+
+  - exactly one product id ("Produkt 3", "Artikel Nr. 7", "product #12")
+    -> fetch_product(id)
+  - the list of categories ("Welche Kategorien gibt es?")
+    -> get_product_categories()
+  - the list of products ("Zeig mir alle Produkte")
+    -> get_products()
+
+and returns None for everything else: several ids, comparisons,
+recommendations, filters ("Produkte unter 20 $"). Those remain with the agent
+loop. The product node calls the tool itself and uses the LLM only to phrase
+the answer.
+"""
+
+import re
+import threading
+from collections import Counter
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+_PRODUCT_ID = re.compile(
+    r"(?:\b(?:produkt|product|artikel|item)"
+    r"(?:\s*-?\s*(?:nr\.?|nummer|number|id))?|\bid)"
+    r"\s*[#:]?\s*(\d{1,4})\b"
+)
+_NUMBER = re.compile(r"\b\d+\b")
+_CATEGORIES = re.compile(
+    r"\b(?:kategorien|categories)\b|\bwelche\s+kategorie\b|\bwhat\s+category\b"
+)
+_PRODUCT_LIST = re.compile(
+    r"\balle[nrs]?\s+(?:\w+\s+)?produkte\b|\ball\s+(?:the\s+)?products\b"
+    r"|\bproduktliste\b|\bproduct\s+list\b|\b(?:welche|was\s+für)\s+produkte\b"
+    r"|\b(?:what|which)\s+products\b"
+    r"|\blist\s+(?:of\s+)?(?:all\s+)?products\b"
+)
+# Questions that need reasoning over tool results
+_OPEN_QUESTION = re.compile(
+    r"\b(?:vergleich\w*|compare\w*|unterschied\w*|difference|vs|versus|besser\w*|better"
+    r"|empf[ie]\w*|recommend\w*|best\w*|günstigst\w*|billigst\w*|teuerst\w*|cheapest"
+    r"|warum|why|ähnlich\w*|similar|alternative\w*|oder|or)\b"
+)
+# Restrictions the list tools cannot apply
+_FILTER = re.compile(
+    r"\b(?:kategorie|category|preis\w*|price\w*|unter|über|under|over"
+    r"|mit|with|ohne|without|für|for|bis|ab)\b"
+)
+
+@dataclass(frozen=True)
+class ProductIntent:
+    """A tool call that answers the request on its own"""
+    tool: str
+    product_id: Optional[str] = None
+
+    def arguments(self) -> Dict[str, str]:
+        return {"product_id": self.product_id} if self.product_id is not None else {}
+
+def parse_product_request(text: str) -> Optional[ProductIntent]:
+    """The single tool call answering `text`, or None if it needs the agent"""
+    lowered = text.lower()
+    if _OPEN_QUESTION.search(lowered):
+        return None
+    match = _PRODUCT_ID.search(lowered)
+    if match is not None:
+        # "Produkt 3 und 5" is a comparison
+        if len(set(_NUMBER.findall(lowered))) > 1:
+            return None
+        return ProductIntent("fetch_product", str(int(match.group(1))))
+    if _NUMBER.search(lowered):
+        return None
+    if _CATEGORIES.search(lowered):
+        return ProductIntent("get_product_categories")
+    if _PRODUCT_LIST.search(lowered) and not _FILTER.search(lowered):
+        return ProductIntent("get_products")
+    return None
+
+class ProductPathStats:
+    """How product requests were answered: directly, per tool, or by the agent loop"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts: Counter = Counter()
+        self._tools: Counter = Counter()
+
+    def record(self, path: str, tool: Optional[str] = None):
+        with self._lock:
+            self._counts[path] += 1
+            if tool is not None:
+                self._tools[tool] += 1
+
+    def stats(self) -> Dict:
+        with self._lock:
+            direct, agent = self._counts["direct"], self._counts["agent"]
+            total = direct + agent
+            return {
+                "direct": direct,
+                "agent": agent,
+                "direct_share": round(direct / total, 3) if total else 0.0,
+                "direct_by_tool": dict(self._tools),
+                # Direct answers shown as the raw tool result because phrasing failed
+                "unphrased": self._counts["unphrased"],
+                "errors": self._counts["error"],
+            }
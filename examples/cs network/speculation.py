@@ -0,0 +1,184 @@
+"""
+Speculative prefetching while the triage decides.
+
+A product request runs strictly in sequence: triage (possibly an LLM call),
+then the product node, then its HTTP tool call. Cheap signals often predict
+the route before the triage has decided: "Produkt 3" will need
+`fetch_product("3")`, "Status?" the status probe. With speculation on
+(SPECULATIVE_TRIAGE=1), the triage node starts that work on a thread pool
+before classifying:
+
+    speculation_id = speculator.start({"product": lambda: fetch(...)})
+    decision = triage.classify(text)
+    speculator.resolve(speculation_id, decision.category)
+
+`resolve` discards the prefetches of the routes the triage did not choose
+(a running HTTP call finishes, its result is dropped). The node of the
+chosen route takes its prefetch with `claim`, or computes the value itself
+when there is none:
+
+    observation = speculator.claim(speculation_id, "product", lambda: fetch(...))
+
+`metrics()` reports the hit rate (prefetches used / prefetches resolved),
+the time saved (prefetch work already done when claimed) and the time spent
+on discarded work.
+"""
+
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Mapping, Optional
+
+DEFAULT_ENABLED = os.environ.get("SPECULATIVE_TRIAGE", "0") == "1"
+DEFAULT_MAX_WORKERS = int(os.environ.get("SPECULATIVE_MAX_WORKERS", "4"))
+# Prefetches nobody claimed or resolved are dropped after this many seconds
+DEFAULT_TTL = 60.0
+
+@dataclass
+class _Prefetch:
+    route: str
+    future: Future
+    started: float
+    finished: Optional[float] = None
+
+class Speculator:
+    """
+    Runs likely downstream work concurrently with the triage and hands it to the node
+    that needs it
+    """
+
+    def __init__(
+        self,
+        enabled: bool = DEFAULT_ENABLED,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        ttl: float = DEFAULT_TTL,
+    ):
+        self.enabled = enabled
+        self.max_workers = max_workers
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._pending: Dict[str, Dict[str, _Prefetch]] = {}
+        self._stats = {"started": 0, "hits": 0, "misses": 0, "expired": 0, "failed": 0}
+        self._saved_s = 0.0
+        self._wasted_s = 0.0
+
+    def start(self, prefetches: Mapping[str, Callable[[], Any]]) -> Optional[str]:
+        """
+        Run each route's prefetch; returns the id to resolve and claim them with (None
+        when off or nothing to do)
+        """
+        if not self.enabled or not prefetches:
+            return None
+        speculation_id = uuid.uuid4().hex
+        with self._lock:
+            self._expire(time.perf_counter())
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix="speculate"
+                )
+            entries = self._pending[speculation_id] = {}
+            for route, call in prefetches.items():
+                entry = entries[route] = _Prefetch(
+                    route, self._executor.submit(call), time.perf_counter()
+                )
+                entry.future.add_done_callback(
+                    lambda _, entry=entry: self._finished(entry)
+                )
+                self._stats["started"] += 1
+        return speculation_id
+
+    def _finished(self, entry: _Prefetch):
+        entry.finished = time.perf_counter()
+
+    def _expire(self, now: float):
+        """Drop speculations older than the TTL; caller holds the lock"""
+        for speculation_id, entries in list(self._pending.items()):
+            if all(now - entry.started > self.ttl for entry in entries.values()):
+                del self._pending[speculation_id]
+                self._stats["expired"] += len(entries)
+
+    def resolve(self, speculation_id: Optional[str], route: str):
+        """
+        The triage chose `route`: keep its prefetch for the node, discard the others
+        """
+        if speculation_id is None:
+            return
+        with self._lock:
+            entries = self._pending.get(speculation_id, {})
+            discarded = [entries.pop(name) for name in list(entries) if name != route]
+            if not entries:
+                self._pending.pop(speculation_id, None)
+            self._stats["misses"] += len(discarded)
+        for entry in discarded:
+            # Work that has not started is dropped; running work ends and counts as
+            # wasted
+            entry.future.cancel()
+            entry.future.add_done_callback(
+                lambda future, entry=entry: self._wasted(entry, future)
+            )
+
+    def _wasted(self, entry: _Prefetch, future: Future):
+        if future.cancelled():
+            return
+        with self._lock:
+            self._wasted_s += (entry.finished or time.perf_counter()) - entry.started
+
+    def claim(
+        self, speculation_id: Optional[str], route: str, compute: Callable[[], Any]
+    ) -> Any:
+        """
+        The prefetched value for `route`, waiting for it if it is still
+        running; `compute()` when there is none or it failed.
+        """
+        with self._lock:
+            entry = (
+                self._pending.get(speculation_id, {}).pop(route, None)
+                if speculation_id
+                else None
+            )
+            if speculation_id and not self._pending.get(speculation_id, True):
+                del self._pending[speculation_id]
+        if entry is None:
+            return compute()
+        claimed = time.perf_counter()
+        try:
+            value = entry.future.result()
+        except Exception:
+            with self._lock:
+                self._stats["failed"] += 1
+            return compute()
+        with self._lock:
+            self._stats["hits"] += 1
+            # Work done before the node asked for it; the rest it waited for
+            self._saved_s += min(entry.finished or claimed, claimed) - entry.started
+        return value
+
+    def metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            resolved = self._stats["hits"] + self._stats["misses"]
+            return {
+                "enabled": self.enabled,
+                **self._stats,
+                "hit_rate": (
+                    round(self._stats["hits"] / resolved, 3) if resolved else 0.0
+                ),
+                "saved_ms": round(self._saved_s * 1e3, 1),
+                "mean_saved_ms": (
+                    round(self._saved_s * 1e3 / self._stats["hits"], 1)
+                    if self._stats["hits"]
+                    else 0.0
+                ),
+                "wasted_ms": round(self._wasted_s * 1e3, 1),
+                "pending": sum(len(entries) for entries in self._pending.values()),
+            }
+
+    def close(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+            self._pending.clear()
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
@@ -3,4 +3,6 @@ from typing import Annotated, TypedDict, Optional
 class GraphState(TypedDict):
     messages: Annotated[list, "List of messages"]
     routing_decision: Optional[str]
+    # Prefetches started during triage, claimed by the chosen node (speculation.py)
+    speculation_id: Optional[str]
 
@@ -0,0 +1,151 @@
+"""
+Test suite for the product node: direct tool calls and the shared ReAct executor.
+"""
+
+import os
+import sys
+import unittest
+from unittest import mock
+
+from langchain.agents import create_react_agent
+from langchain_core.language_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage, HumanMessage
+
+import node
+from chat import REACT_NODES, STREAMED_NODES, create_workflow
+from product_intents import ProductIntent, parse_product_request
+from triage import HybridTriage
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from common.token_stream import stream_turn
+
+PRODUCT_3 = {
+    "title": "Mens Casual Slim Fit",
+    "price": 15.99,
+    "category": "men's clothing",
+    "rating": {"rate": 2.1, "count": 430},
+    "description": "Slim fit shirt",
+}
+
+def fake_llm(*replies: str) -> GenericFakeChatModel:
+    return GenericFakeChatModel(
+        messages=iter([AIMessage(content=reply) for reply in replies])
+    )
+
+def store_response(payload):
+    return mock.Mock(status_code=200, json=mock.Mock(return_value=payload))
+
+class TestProductIntents(unittest.TestCase):
+    """Requests answered by one tool call are recognized without the LLM"""
+
+    def test_direct_requests(self):
+        for text, intent in [
+            ("Erzähle mir was zu Produkt 3", ProductIntent("fetch_product", "3")),
+            ("Was kostet Artikel Nr. 07?", ProductIntent("fetch_product", "7")),
+            ("Tell me about product #12", ProductIntent("fetch_product", "12")),
+            ("Welche Kategorien gibt es?", ProductIntent("get_product_categories")),
+            ("Zeig mir alle Produkte", ProductIntent("get_products")),
+            ("Which products do you have?", ProductIntent("get_products")),
+        ]:
+            with self.subTest(text=text):
+                self.assertEqual(parse_product_request(text), intent)
+
+    def test_open_questions_stay_with_the_agent(self):
+        for text in [
+            "Vergleiche Produkt 3 und Produkt 5",
+            "Produkt 3 und 5",
+            "Ist Produkt 3 besser als 4?",
+            "Welches Produkt empfiehlst du für den Sommer?",
+            "Welche Produkte gibt es unter 20 $?",
+            "Welche Produkte gibt es in der Kategorie electronics?",
+            "Was ist das günstigste Produkt?",
+            "Ich suche ein Geschenk",
+        ]:
+            with self.subTest(text=text):
+                self.assertIsNone(parse_product_request(text))
+
+class TestProductAgent(unittest.TestCase):
+    """The node calls tools directly when it can and shares one executor otherwise"""
+
+    def setUp(self):
+        node.product_executor.cache_clear()
+        self.addCleanup(node.product_executor.cache_clear)
+        self.stats = node.product_paths.stats()
+
+    def run_agent(self, text: str) -> str:
+        state = node.product_agent(
+            {"messages": [HumanMessage(content=text)], "routing_decision": "product"}
+        )
+        return state["messages"][-1].content
+
+    def test_direct_fetch_phrased_by_llm(self):
+        llm = fake_llm("Produkt 3 ist ein Slim-Fit-Hemd für 15,99 $.")
+        with mock.patch.object(
+            node.default_registry, "chat_model", lambda **kwargs: llm
+        ), mock.patch(
+            "tools.requests.get", return_value=store_response(PRODUCT_3)
+        ) as get, mock.patch.object(
+            node, "product_executor", side_effect=AssertionError("agent loop used")
+        ):
+            answer = self.run_agent("Erzähle mir was zu Produkt 3")
+        self.assertEqual(answer, "Produkt 3 ist ein Slim-Fit-Hemd für 15,99 $.")
+        get.assert_called_once_with("https://fakestoreapi.com/products/3")
+        stats = node.product_paths.stats()
+        self.assertEqual(stats["direct"], self.stats["direct"] + 1)
+        self.assertEqual(stats["direct_by_tool"]["fetch_product"],
+                         self.stats["direct_by_tool"].get("fetch_product", 0) + 1)
+
+    def test_tool_result_shown_when_phrasing_fails(self):
+        llm = mock.Mock()
+        llm.invoke.side_effect = ConnectionError("ollama down")
+        with mock.patch.object(
+            node.default_registry, "chat_model", lambda **kwargs: llm
+        ), mock.patch("tools.requests.get", return_value=store_response([PRODUCT_3])):
+            answer = self.run_agent("Welche Kategorien gibt es?")
+        self.assertEqual(answer, "Verfügbare Kategorien: men's clothing")
+        self.assertEqual(
+            node.product_paths.stats()["unphrased"], self.stats["unphrased"] + 1
+        )
+
+    def test_open_question_uses_shared_executor(self):
+        llm = fake_llm(
+            "Thought: I now know the final answer\nFinal Answer: Nimm Produkt 3.",
+            "Thought: I now know the final answer\nFinal Answer: Nimm Produkt 4.",
+        )
+        with mock.patch.object(
+            node.default_registry, "chat_model", lambda **kwargs: llm
+        ), mock.patch(
+            "langchain.agents.create_react_agent", wraps=create_react_agent
+        ) as create:
+            first = self.run_agent("Was empfiehlst du mir?")
+            second = self.run_agent("Und was noch?")
+        self.assertEqual((first, second), ("Nimm Produkt 3.", "Nimm Produkt 4."))
+        self.assertEqual(create.call_count, 1)
+        self.assertEqual(node.product_paths.stats()["agent"], self.stats["agent"] + 2)
+
+    def test_direct_answer_streamed(self):
+        """
+        The phrased answer reaches the chat although it has no "Final Answer:" marker
+        """
+        llm = fake_llm("Produkt 3 ist ein Hemd.")
+        triage = HybridTriage(lambda text: "end", log_path=None, audit_rate=0.0)
+        tokens = []
+        with mock.patch.object(
+            node.default_registry, "chat_model", lambda **kwargs: llm
+        ), mock.patch(
+            "tools.requests.get", return_value=store_response(PRODUCT_3)
+        ), mock.patch.object(
+            node, "hybrid_triage", lambda: triage
+        ):
+            state, stats = stream_turn(
+                create_workflow(),
+                {"messages": [HumanMessage(content="Produkt 3?")]},
+                nodes=STREAMED_NODES,
+                react_nodes=REACT_NODES,
+                on_token=lambda text, name: tokens.append(text),
+            )
+        self.assertEqual("".join(tokens), "Produkt 3 ist ein Hemd.")
+        self.assertEqual(state["messages"][-1].content, "Produkt 3 ist ein Hemd.")
+
+if __name__ == "__main__":
+    unittest.main()
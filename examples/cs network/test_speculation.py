@@ -0,0 +1,153 @@
+"""
+Test suite for speculative prefetching during triage.
+"""
+
+import threading
+import time
+import unittest
+from unittest import mock
+
+from langchain_core.language_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage, HumanMessage
+
+import node
+from chat import create_workflow
+from speculation import Speculator
+from triage import HybridTriage
+
+PRODUCT_3 = {
+    "title": "Mens Casual Slim Fit",
+    "price": 15.99,
+    "category": "men's clothing",
+}
+
+class TestSpeculator(unittest.TestCase):
+    """Prefetches are handed to the chosen route and discarded for the others"""
+
+    def setUp(self):
+        self.speculator = Speculator(enabled=True)
+        self.addCleanup(self.speculator.close)
+
+    def test_hit_uses_the_prefetch(self):
+        speculation_id = self.speculator.start(
+            {"product": lambda: "prefetched", "status": lambda: "probe"}
+        )
+        time.sleep(0.05)
+        self.speculator.resolve(speculation_id, "product")
+        self.assertEqual(
+            self.speculator.claim(speculation_id, "product", lambda: "computed"),
+            "prefetched",
+        )
+        # Claimed once; the discarded route computes its own value
+        self.assertEqual(
+            self.speculator.claim(speculation_id, "product", lambda: "computed"),
+            "computed",
+        )
+        self.assertEqual(
+            self.speculator.claim(speculation_id, "status", lambda: "computed"),
+            "computed",
+        )
+        metrics = self.speculator.metrics()
+        self.assertEqual(
+            (metrics["started"], metrics["hits"], metrics["misses"]), (2, 1, 1)
+        )
+        self.assertEqual((metrics["hit_rate"], metrics["pending"]), (0.5, 0))
+
+    def test_miss_counts_wasted_work(self):
+        release = threading.Event()
+
+        def slow():
+            release.wait(timeout=5)
+            return "late"
+
+        speculation_id = self.speculator.start({"product": slow})
+        time.sleep(0.05)
+        self.speculator.resolve(speculation_id, "end")
+        release.set()
+        deadline = time.monotonic() + 5
+        while (
+            self.speculator.metrics()["wasted_ms"] == 0 and time.monotonic() < deadline
+        ):
+            time.sleep(0.01)
+        metrics = self.speculator.metrics()
+        self.assertEqual(
+            (metrics["misses"], metrics["hits"], metrics["pending"]), (1, 0, 0)
+        )
+        self.assertGreaterEqual(metrics["wasted_ms"], 40)
+
+    def test_failed_prefetch_and_disabled(self):
+        def fail():
+            raise ConnectionError("store down")
+
+        speculation_id = self.speculator.start({"product": fail})
+        self.speculator.resolve(speculation_id, "product")
+        self.assertEqual(
+            self.speculator.claim(speculation_id, "product", lambda: "computed"),
+            "computed",
+        )
+        self.assertEqual(self.speculator.metrics()["failed"], 1)
+        disabled = Speculator(enabled=False)
+        self.assertIsNone(disabled.start({"product": fail}))
+        self.assertEqual(
+            disabled.claim(None, "product", lambda: "computed"), "computed"
+        )
+
+class TestSpeculativeTriage(unittest.TestCase):
+    """The product tool call overlaps a slow triage LLM call"""
+
+    DELAY = 0.2
+
+    def setUp(self):
+        self.speculator = Speculator(enabled=True)
+        self.addCleanup(self.speculator.close)
+
+    def slow_llm(self, category: str):
+        def classify(text: str) -> str:
+            time.sleep(self.DELAY)
+            return category
+        return classify
+
+    def slow_store(self, url: str):
+        time.sleep(self.DELAY)
+        return mock.Mock(status_code=200, json=mock.Mock(return_value=PRODUCT_3))
+
+    def run_turn(self, text: str, category: str):
+        # Threshold 1.0: every message goes to the (slow) LLM
+        triage = HybridTriage(
+            self.slow_llm(category), threshold=1.0, log_path=None, audit_rate=0.0
+        )
+        llm = GenericFakeChatModel(
+            messages=iter([AIMessage(content="Produkt 3 ist ein Hemd.")])
+        )
+        with mock.patch.object(node, "speculator", self.speculator), mock.patch.object(
+            node, "hybrid_triage", lambda: triage
+        ), mock.patch.object(
+            node.default_registry, "chat_model", lambda **kwargs: llm
+        ), mock.patch(
+            "tools.requests.get", side_effect=self.slow_store
+        ) as get:
+            start = time.perf_counter()
+            state = create_workflow().invoke({"messages": [HumanMessage(content=text)]})
+            return state, time.perf_counter() - start, get
+
+    def test_prefetch_committed_when_triage_agrees(self):
+        state, elapsed, get = self.run_turn("Erzähle mir was zu Produkt 3", "product")
+        self.assertEqual(state["messages"][-1].content, "Produkt 3 ist ein Hemd.")
+        self.assertEqual(get.call_count, 1)
+        # Triage and tool call overlapped instead of taking 2 * DELAY
+        self.assertLess(elapsed, 2 * self.DELAY)
+        metrics = self.speculator.metrics()
+        self.assertEqual((metrics["hits"], metrics["misses"]), (1, 0))
+        self.assertGreater(metrics["saved_ms"], self.DELAY * 1e3 * 0.5)
+
+    def test_prefetch_discarded_when_triage_disagrees(self):
+        state, _, get = self.run_turn("Produkt 3 Status", "status")
+        self.assertEqual(state["messages"][-1].content, "Offline systems: Frontend")
+        metrics = self.speculator.metrics()
+        self.assertEqual(
+            (metrics["started"], metrics["hits"], metrics["misses"]), (2, 1, 1)
+        )
+        self.assertEqual(state["routing_decision"], "status")
+
+if __name__ == "__main__":
+    unittest.main()
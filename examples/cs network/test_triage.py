@@ -0,0 +1,153 @@
+"""
+Test suite for the hybrid rule-first triage.
+"""
+
+import json
+import os
+import random
+import tempfile
+import threading
+import time
+import unittest
+
+from triage import (
+    HybridTriage,
+    LinearTriageModel,
+    main,
+    read_log,
+    rule_decision,
+    training_examples,
+)
+
+class TestHybridTriage(unittest.TestCase):
+    """Test the local paths, the LLM fallback and the decision log"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.log_path = os.path.join(self.tmp.name, "decisions.jsonl")
+        self.llm_calls = []
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def llm(self, text: str) -> str:
+        self.llm_calls.append(text)
+        return "end" if text == "Hallo" else "status"
+
+    def triage(self, **kwargs) -> HybridTriage:
+        llm = kwargs.pop("llm", self.llm)
+        triage = HybridTriage(
+            llm,
+            log_path=kwargs.pop("log_path", self.log_path),
+            audit_rate=kwargs.pop("audit_rate", 0.0),
+            **kwargs
+        )
+        self.addCleanup(triage.close)
+        return triage
+
+    def test_lexicon(self):
+        for text, category in [
+            ("status?", "status"),
+            ("Produkt 3", "product"),
+            ("Ticket NET-42", "jira"),
+            ("Wo ist die Doku?", "confluence"),
+            ("Ist die API down?", "status"),
+        ]:
+            with self.subTest(text=text):
+                self.assertEqual(rule_decision(text).category, category)
+        self.assertIsNone(rule_decision("Hallo"))
+        # Two categories match: not confident enough on its own
+        self.assertLess(
+            rule_decision("Welche Produkte sind verfügbar?").confidence, 0.8
+        )
+
+    def test_llm_only_below_threshold(self):
+        triage = self.triage()
+        self.assertEqual(triage.classify("status?").path, "rules")
+        self.assertEqual(triage.classify("Hallo").category, "end")
+        self.assertEqual(self.llm_calls, ["Hallo"])
+        # Raising the threshold sends everything to the LLM
+        strict = self.triage(threshold=0.99)
+        self.assertEqual(strict.classify("status?").path, "llm")
+        self.assertEqual(triage.stats()["llm_calls_avoided"], 0.5)
+
+    def test_decision_log_and_audit(self):
+        triage = self.triage(audit_rate=1.0, rng=random.Random(0))
+        triage.classify("Ticket NET-42")
+        triage.classify("Hallo")
+        # Waits for the audit, which logs its decision when the LLM answers
+        triage.close()
+        records = {record["path"]: record for record in read_log(self.log_path)}
+        self.assertEqual(sorted(records), ["llm", "rules"])
+        self.assertEqual(records["rules"]["llm_category"], "status")
+        stats = triage.stats()
+        self.assertEqual((stats["audited"], stats["audit_agreement"]), (1, 0.0))
+
+    def test_audit_runs_in_background(self):
+        release = threading.Event()
+
+        def slow_llm(text: str) -> str:
+            release.wait(timeout=5)
+            return "status"
+
+        triage = self.triage(llm=slow_llm, audit_rate=1.0)
+        start = time.perf_counter()
+        self.assertEqual(triage.classify("status?").path, "rules")
+        self.assertLess(time.perf_counter() - start, 1.0)
+        release.set()
+        triage.close()
+        self.assertEqual(triage.stats()["audit_agreement"], 1.0)
+
+    def test_no_audit_without_log(self):
+        triage = self.triage(log_path="", audit_rate=1.0)
+        self.assertEqual(triage.classify("status?").path, "rules")
+        triage.close()
+        self.assertEqual((self.llm_calls, triage.stats()["audited"]), ([], 0))
+
+    def test_log_rotation_and_default_off(self):
+        triage = self.triage(log_max_bytes=300)
+        for _ in range(6):
+            triage.classify("status?")
+        triage.close()
+        self.assertTrue(os.path.exists(self.log_path + ".1"))
+        self.assertLessEqual(os.path.getsize(self.log_path + ".1"), 300 + 200)
+        # One rotated file is kept; older lines are dropped
+        self.assertTrue(0 < len(read_log(self.log_path)) < 6)
+        self.assertEqual(HybridTriage(self.llm).log_path, "")
+
+    def test_model_trained_from_log(self):
+        """LLM-labelled decisions train the linear model, which then avoids the LLM"""
+        with open(self.log_path, "w") as f:
+            for text, category in [
+                ("Guten Morgen", "end"),
+                ("Hallo zusammen", "end"),
+                ("Hallo Team", "end"),
+                ("Läuft der Server noch", "status"),
+                ("Läuft die Datenbank", "status"),
+                ("Server Wartung heute", "status"),
+            ]:
+                f.write(
+                    json.dumps(
+                        {
+                            "text": text,
+                            "category": category,
+                            "path": "llm",
+                            "llm_category": category,
+                        }
+                    )
+                    + "\n"
+                )
+        model_path = os.path.join(self.tmp.name, "model.json")
+        self.assertEqual(
+            main(["train", "--log", self.log_path, "--out", model_path]), 0
+        )
+
+        model = LinearTriageModel.load(model_path)
+        self.assertEqual(len(training_examples(read_log(self.log_path))), 6)
+        triage = self.triage(model=model, threshold=0.7)
+        decision = triage.classify("Hallo")
+        self.assertEqual((decision.category, decision.path), ("end", "model"))
+        self.assertEqual(self.llm_calls, [])
+
+if __name__ == "__main__":
+    unittest.main()
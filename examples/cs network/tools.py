@@ -76,3 +76,6 @@ def get_product_categories() -> str:
             return "Fehler beim Abrufen der Kategorien."
     except Exception as e:
         return f"Fehler beim Abrufen der Kategorien: {str(e)}"
+
+# Tools of the product agent; the product node also calls them directly
+PRODUCT_TOOLS = [fetch_product, get_products, get_product_categories]
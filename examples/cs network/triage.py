@@ -0,0 +1,426 @@
+"""
+Hybrid triage for the network router: rules first, the LLM only when unsure.
+
+`HybridTriage.classify(text)` tries, in order:
+  1. a keyword/regex lexicon per category,
+  2. a small linear model (multinomial naive Bayes over words and word
+     pairs) trained from logged decisions,
+and calls the LLM only when neither reaches `threshold` confidence.
+
+With TRIAGE_LOG=<file>, every decision is appended to a JSONL log with the
+message, the path taken (rules/model/llm) and its confidence. The log is off
+by default because it holds user messages verbatim; past TRIAGE_LOG_MAX_BYTES
+it is rotated to <file>.1. With a log and TRIAGE_AUDIT_RATE > 0 a share of the
+locally decided messages is also sent to the LLM in the background, so the log
+records how often the local paths disagree with it without the user waiting
+for that call. The LLM-labelled lines are the training data for the model:
+
+    python triage.py report --log triage_decisions.jsonl
+    python triage.py train --log triage_decisions.jsonl --out triage_model.json
+"""
+
+import argparse
+import json
+import math
+import os
+import random
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+DEFAULT_THRESHOLD = float(os.environ.get("TRIAGE_CONFIDENCE", "0.8"))
+# Off unless set: the log holds user messages verbatim
+DEFAULT_LOG_PATH = os.environ.get("TRIAGE_LOG", "")
+DEFAULT_LOG_MAX_BYTES = int(
+    os.environ.get("TRIAGE_LOG_MAX_BYTES", str(10 * 1024 * 1024))
+)
+DEFAULT_MODEL_PATH = os.environ.get("TRIAGE_MODEL") or os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "triage_model.json"
+)
+# Off unless set: each audit is an extra LLM call, only useful with a log
+DEFAULT_AUDIT_RATE = float(os.environ.get("TRIAGE_AUDIT_RATE", "0"))
+# Audits waiting for the LLM; further ones are skipped rather than queued
+MAX_PENDING_AUDITS = 4
+
+# Keyword/regex lexicon (German and English); matched on the lowercased message
+LEXICON: Dict[str, Tuple[str, ...]] = {
+    "product": (
+        r"\bprodu[ck]te?\b",
+        r"\bprodukt\s*\d+",
+        r"\bartikel\b",
+        r"\bkategorien?\b",
+        r"\bpreis",
+        r"\bsortiment\b",
+        r"\bcategor(y|ies)\b",
+    ),
+    "jira": (
+        r"\bjira\b",
+        r"\btickets?\b",
+        r"\bissues?\b",
+        r"\bbugs?\b",
+        r"\bsprint\b",
+        r"\bstory\b",
+        r"\b[a-z]{2,10}-\d+\b",
+    ),
+    "confluence": (
+        r"\bconfluence\b",
+        r"\bwiki\b",
+        r"\bdoku(mentation)?\b",
+        r"\bdocumentation\b",
+        r"\bhandbuch\b",
+        r"\banleitung\b",
+    ),
+    "status": (
+        r"\bstatus\b",
+        r"\bonline\b",
+        r"\boffline\b",
+        r"\berreichbar\b",
+        r"\bverfügbar",
+        r"\bausfall\b",
+        r"\bstörung\b",
+        r"\b(is|ist)\s+\w+\s+down\b",
+        r"\bdown\b",
+        r"\bsysteme?\b",
+        r"\blaufen\b",
+    ),
+}
+_COMPILED = {
+    category: [re.compile(pattern) for pattern in patterns]
+    for category, patterns in LEXICON.items()
+}
+_WORD = re.compile(r"\w+")
+
+@dataclass
+class TriageDecision:
+    """A routing decision and how it was reached"""
+    category: str
+    # 0..1; LLM answers count as 1.0
+    confidence: float
+    # "rules", "model" or "llm"
+    path: str
+
+def lexicon_scores(text: str) -> Dict[str, int]:
+    """Number of lexicon patterns per category that match `text`"""
+    lowered = text.lower()
+    scores = {
+        category: sum(1 for pattern in patterns if pattern.search(lowered))
+        for category, patterns in _COMPILED.items()
+    }
+    return {category: score for category, score in scores.items() if score}
+
+def rule_decision(text: str) -> Optional[TriageDecision]:
+    """Lexicon vote; confidence falls when several categories match"""
+    scores = lexicon_scores(text)
+    if not scores:
+        return None
+    category, best = max(scores.items(), key=lambda item: item[1])
+    share = best / sum(scores.values())
+    # One matching pattern alone is good evidence; more matches add a little
+    confidence = share * min(0.99, 0.85 + 0.05 * (best - 1))
+    return TriageDecision(category, round(confidence, 3), "rules")
+
+def features(text: str) -> List[str]:
+    words = _WORD.findall(text.lower())
+    return words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+
+class LinearTriageModel:
+    """Multinomial naive Bayes: linear in log space, trained in one pass"""
+
+    def __init__(self, alpha: float = 1.0):
+        self.alpha = alpha
+        self.class_counts: Counter = Counter()
+        self.feature_counts: Dict[str, Counter] = {}
+        self.totals: Counter = Counter()
+        self.vocabulary: set = set()
+
+    @property
+    def trained(self) -> bool:
+        return len(self.class_counts) >= 2
+
+    def fit(self, examples: Iterable[Tuple[str, str]]) -> "LinearTriageModel":
+        for text, category in examples:
+            self.class_counts[category] += 1
+            counts = self.feature_counts.setdefault(category, Counter())
+            for feature in features(text):
+                counts[feature] += 1
+                self.totals[category] += 1
+                self.vocabulary.add(feature)
+        return self
+
+    def predict_proba(self, text: str) -> Dict[str, float]:
+        if not self.trained:
+            return {}
+        total_examples = sum(self.class_counts.values())
+        size = len(self.vocabulary) + 1
+        tokens = [feature for feature in features(text) if feature in self.vocabulary]
+        scores = {}
+        for category, count in self.class_counts.items():
+            counts = self.feature_counts[category]
+            denominator = self.totals[category] + self.alpha * size
+            scores[category] = math.log(count / total_examples) + sum(
+                math.log((counts[feature] + self.alpha) / denominator)
+                for feature in tokens
+            )
+        top = max(scores.values())
+        exp = {category: math.exp(score - top) for category, score in scores.items()}
+        norm = sum(exp.values())
+        return {category: value / norm for category, value in exp.items()}
+
+    def predict(self, text: str) -> Optional[TriageDecision]:
+        probabilities = self.predict_proba(text)
+        if not probabilities:
+            return None
+        category, confidence = max(probabilities.items(), key=lambda item: item[1])
+        return TriageDecision(category, round(confidence, 3), "model")
+
+    def save(self, path: str):
+        with open(path, "w") as f:
+            json.dump({
+                "alpha": self.alpha,
+                "class_counts": self.class_counts,
+                "feature_counts": self.feature_counts,
+            }, f)
+
+    @classmethod
+    def load(cls, path: str) -> "LinearTriageModel":
+        with open(path) as f:
+            data = json.load(f)
+        model = cls(data["alpha"])
+        model.class_counts = Counter(data["class_counts"])
+        for category, counts in data["feature_counts"].items():
+            model.feature_counts[category] = Counter(counts)
+            model.totals[category] = sum(counts.values())
+            model.vocabulary.update(counts)
+        return model
+
+def read_log(path: str) -> List[Dict]:
+    """Records of the log and of its rotated predecessor, oldest first"""
+    records = []
+    for part in (path + ".1", path):
+        if os.path.exists(part):
+            with open(part, encoding="utf-8") as f:
+                records.extend(json.loads(line) for line in f if line.strip())
+    return records
+
+def training_examples(records: Iterable[Dict]) -> List[Tuple[str, str]]:
+    """LLM-labelled messages: LLM decisions and audited local decisions"""
+    return [
+        (record["text"], record["llm_category"])
+        for record in records
+        if record.get("llm_category")
+    ]
+
+class HybridTriage:
+    """
+    Routes a message with the lexicon or the linear model when one of them
+    reaches `threshold`, and with `llm_classify(text)` otherwise.
+    """
+
+    def __init__(
+        self,
+        llm_classify: Callable[[str], str],
+        threshold: float = DEFAULT_THRESHOLD,
+        model: Optional[LinearTriageModel] = None,
+        log_path: Optional[str] = DEFAULT_LOG_PATH,
+        audit_rate: float = DEFAULT_AUDIT_RATE,
+        rng: Optional[random.Random] = None,
+        log_max_bytes: int = DEFAULT_LOG_MAX_BYTES,
+    ):
+        self.llm_classify = llm_classify
+        self.threshold = threshold
+        self.model = model
+        self.log_path = log_path
+        self.log_max_bytes = log_max_bytes
+        self.audit_rate = audit_rate
+        self.rng = rng or random.Random()
+        self._lock = threading.Lock()
+        self._log_file = None
+        self._auditor: Optional[ThreadPoolExecutor] = None
+        self._pending_audits = 0
+        self.paths: Counter = Counter()
+        self.audits: Counter = Counter()
+
+    @classmethod
+    def from_env(cls, llm_classify: Callable[[str], str]) -> "HybridTriage":
+        """
+        Threshold, log, audit rate and model (if trained already) from TRIAGE_* settings
+        """
+        model = (
+            LinearTriageModel.load(DEFAULT_MODEL_PATH)
+            if os.path.exists(DEFAULT_MODEL_PATH)
+            else None
+        )
+        return cls(llm_classify, model=model)
+
+    def local_decision(self, text: str) -> Optional[TriageDecision]:
+        """Most confident of the lexicon and the model, if any"""
+        candidates = [rule_decision(text)]
+        if self.model is not None:
+            candidates.append(self.model.predict(text))
+        candidates = [candidate for candidate in candidates if candidate is not None]
+        return (
+            max(candidates, key=lambda candidate: candidate.confidence)
+            if candidates
+            else None
+        )
+
+    def classify(self, text: str) -> TriageDecision:
+        start = time.perf_counter()
+        local = self.local_decision(text)
+        llm_category = None
+        if local is not None and local.confidence >= self.threshold:
+            decision = local
+        else:
+            llm_category = self.llm_classify(text)
+            decision = TriageDecision(llm_category, 1.0, "llm")
+        self._record(text, decision, local, llm_category, time.perf_counter() - start)
+        return decision
+
+    def _record(
+        self,
+        text: str,
+        decision: TriageDecision,
+        local: Optional[TriageDecision],
+        llm_category: Optional[str],
+        elapsed: float,
+    ):
+        record = {
+            "ts": round(time.time(), 3),
+            "text": text,
+            **asdict(decision),
+            "local": asdict(local) if local is not None else None,
+            "llm_category": llm_category,
+            "ms": round(elapsed * 1000, 2),
+        }
+        audit = (
+            decision.path != "llm"
+            and self.log_path
+            and self.audit_rate
+            and self.rng.random() < self.audit_rate
+        )
+        with self._lock:
+            self.paths[decision.path] += 1
+            if audit and self._pending_audits < MAX_PENDING_AUDITS:
+                # The LLM's answer is logged with the decision once it arrives
+                if self._auditor is None:
+                    self._auditor = ThreadPoolExecutor(
+                        max_workers=1, thread_name_prefix="triage-audit"
+                    )
+                self._pending_audits += 1
+                self._auditor.submit(self._audit, record)
+            else:
+                self._write_log(record)
+
+    def _audit(self, record: Dict[str, Any]):
+        try:
+            llm_category = self.llm_classify(record["text"])
+        except Exception as e:
+            print(f"Triage audit failed: {e}")
+            llm_category = None
+        with self._lock:
+            self._pending_audits -= 1
+            if llm_category is not None:
+                record["llm_category"] = llm_category
+                self.audits[
+                    "agree" if llm_category == record["category"] else "disagree"
+                ] += 1
+            self._write_log(record)
+
+    def _write_log(self, record: Dict[str, Any]):
+        """
+        Append to the open log, rotating it past `log_max_bytes`; caller holds the lock
+        """
+        if not self.log_path:
+            return
+        if self._log_file is None:
+            self._log_file = open(self.log_path, "a", encoding="utf-8")
+        self._log_file.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self._log_file.flush()
+        if self.log_max_bytes and self._log_file.tell() >= self.log_max_bytes:
+            self._log_file.close()
+            self._log_file = None
+            os.replace(self.log_path, self.log_path + ".1")
+
+    def close(self):
+        """Wait for running audits and close the log"""
+        with self._lock:
+            auditor, self._auditor = self._auditor, None
+        if auditor is not None:
+            auditor.shutdown(wait=True)
+        with self._lock:
+            if self._log_file is not None:
+                self._log_file.close()
+                self._log_file = None
+
+    def stats(self) -> Dict:
+        """
+        Decisions per path, share of LLM calls avoided and audited agreement with the
+        LLM
+        """
+        with self._lock:
+            return summarize(self.paths, self.audits)
+
+def summarize(paths: Counter, audits: Counter) -> Dict:
+    total = sum(paths.values())
+    audited = sum(audits.values())
+    return {
+        "decisions": total,
+        "paths": dict(paths),
+        "llm_calls_avoided": round(1 - paths["llm"] / total, 3) if total else 0.0,
+        "audited": audited,
+        "audit_agreement": round(audits["agree"] / audited, 3) if audited else None,
+    }
+
+def report(records: List[Dict]) -> Dict:
+    """Summary of a decision log"""
+    paths = Counter(record["path"] for record in records)
+    audits = Counter(
+        "agree" if record["llm_category"] == record["category"] else "disagree"
+        for record in records if record["path"] != "llm" and record.get("llm_category")
+    )
+    return summarize(paths, audits)
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Hybrid triage decision log tools")
+    commands = parser.add_subparsers(dest="command", required=True)
+    report_parser = commands.add_parser(
+        "report", help="Paths taken, LLM calls avoided and audited agreement"
+    )
+    report_parser.add_argument(
+        "--log", default=DEFAULT_LOG_PATH or None, required=not DEFAULT_LOG_PATH
+    )
+    train_parser = commands.add_parser(
+        "train", help="Train the linear model from LLM-labelled decisions"
+    )
+    train_parser.add_argument(
+        "--log", default=DEFAULT_LOG_PATH or None, required=not DEFAULT_LOG_PATH
+    )
+    train_parser.add_argument("--out", default=DEFAULT_MODEL_PATH)
+    args = parser.parse_args(argv)
+
+    records = read_log(args.log)
+    if args.command == "report":
+        print(json.dumps(report(records), indent=2))
+        return 0
+    examples = training_examples(records)
+    model = LinearTriageModel().fit(examples)
+    if not model.trained:
+        print(
+            f"Need LLM-labelled decisions of at least two categories in {args.log}; "
+            f"found {len(examples)} examples"
+        )
+        return 1
+    model.save(args.out)
+    print(
+        f"Trained on {len(examples)} examples ({dict(model.class_counts)}), "
+        f"wrote {args.out}"
+    )
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
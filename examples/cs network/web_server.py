@@ -8,7 +8,13 @@ import os
 # Add current directory to Python path
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-from chat import create_workflow
+from chat import create_workflow, STREAMED_NODES, REACT_NODES
+from node import hybrid_triage, product_paths, speculator, warm_up_prompts
+from common.llm_cache import default_response_cache
+from common.llm_clients import default_registry, start_warm_up
+from common.llm_dispatcher import default_dispatcher
+from common.model_router import default_router
+from common.token_stream import stream_turn
 
 app = Flask(__name__)
 app.config['SECRET_KEY'] = 'cs-network-secret'
@@ -21,6 +27,25 @@ workflow_app = create_workflow()
 def index():
     return render_template('index.html')
 
+@app.route('/metrics/llm')
+def llm_metrics():
+    # Configured Ollama clients, connection reuse per Ollama server, warm-up, response
+    # cache
+    # hits, calls shared by the dispatcher, the triage paths taken (LLM calls
+    # avoided by the local classifier), product requests answered without the agent
+    # loop,
+    # the hit rate of the work started speculatively during triage and the
+    # latency and usage of each model per task class
+    return jsonify({
+        **default_registry.metrics(),
+        "response_cache": default_response_cache().metrics(),
+        "dispatcher": default_dispatcher.metrics(),
+        "triage": hybrid_triage().stats(),
+        "product_paths": product_paths.stats(),
+        "speculation": speculator.metrics(),
+        "models": default_router.metrics(),
+    })
+
 @socketio.on('connect')
 def handle_connect():
     print('Client connected')
@@ -41,7 +66,15 @@ def handle_chat_message(data):
             "messages": [HumanMessage(content=user_message)]
         }
         
-        result = workflow_app.invoke(input_message)
+        # Tokens are sent as they are generated; the full answer follows as 'message'
+        result, stats = stream_turn(
+            workflow_app,
+            input_message,
+            on_token=lambda text, node: emit('token', {'content': text}),
+            nodes=STREAMED_NODES,
+            react_nodes=REACT_NODES,
+        )
+        print(f'Answered: {stats}')
         
         # Extract AI response
         ai_response = ""
@@ -53,7 +86,19 @@ def handle_chat_message(data):
         if not ai_response:
             ai_response = "Entschuldigung, ich konnte keine Antwort generieren."
             
-        emit('message', {'type': 'bot', 'content': ai_response})
+        emit(
+            'message',
+            {
+                'type': 'bot',
+                'content': ai_response,
+                'first_token_ms': (
+                    None
+                    if stats.first_token_s is None
+                    else round(stats.first_token_s * 1000)
+                ),
+                'total_ms': round(stats.total_s * 1000),
+            },
+        )
         
     except Exception as e:
         print(f'Error processing message: {e}')
@@ -62,4 +107,6 @@ def handle_chat_message(data):
 if __name__ == '__main__':
     print("🚀 CS Network Web Interface startet...")
     print("Öffnen Sie http://localhost:5000 in Ihrem Browser")
+    # The first message does not wait for the model to load
+    start_warm_up({model: warm_up_prompts() for model in default_router.models()})
     socketio.run(app, host='0.0.0.0', port=5000, debug=True, allow_unsafe_werkzeug=True)
\ No newline at end of file
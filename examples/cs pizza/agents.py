@@ -1,39 +1,151 @@
 from abc import ABC, abstractmethod
-from langchain_core.output_parsers import StrOutputParser
-from langchain_ollama import ChatOllama
-from langchain.prompts import PromptTemplate
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from langchain_core.prompts import ChatPromptTemplate
+from langchain_core.runnables import Runnable
 from langchain.tools import Tool
 from state import PizzaState
 import json
+import os
+import sys
+
+# Shared example helpers live one directory up
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from common.agent_chains import default_chains
+from common.json_stream import parse_json_stream
+from common.llm_cache import cached_text, default_response_cache, store_text
+from common.llm_clients import default_registry
+from common.llm_dispatcher import default_dispatcher, request_key
+from common.model_router import TaskProfile, default_router
 
 # Define the base class for agents
 class AgentBase(ABC):
+    # Agents with deterministic prompts answer repeated inputs from the response cache
+    cache_responses = False
+    # Agents answering in JSON: value types by key, and the keys the decision
+    # needs; generation stops once those are complete
+    output_schema: Dict[str, Any] = {}
+    required_keys: Tuple[str, ...] = ()
+    # Task class, latency SLO and timeout (seconds); LLM_MODEL_POOLS maps the
+    # task class to the models to use
+    task = TaskProfile("answer", slo=10.0, timeout=60)
+
     def __init__(self, state: PizzaState):
         self.state = state
+        # Parsed JSON answer of agents with `required_keys`
+        self.result: Optional[Dict[str, Any]] = None
+
+    @abstractmethod
+    def get_system_prompt(self) -> str:
+        """Fixed instructions, sent as the system message"""
+        pass
 
     @abstractmethod
-    def get_prompt_template(self) -> str:
+    def get_user_template(self) -> str:
+        """
+        The part that changes per call, sent as the user message after the instructions
+        """
         pass
 
-    def execute(self) -> PizzaState:
-        # Define the prompt template
-        template = self.get_prompt_template()
-        prompt = PromptTemplate.from_template(template)
-        llm = ChatOllama(
-            model="mistral:latest",
-            base_url="http://127.0.0.1:11434",
-            temperature=0.1,
-            timeout=60
+    def prompt(self) -> ChatPromptTemplate:
+        """
+        The class's template, parsed on first use. Every prompt starts with
+        the same system message, so Ollama reuses its evaluated prefix and
+        only evaluates the user message.
+        """
+        return default_chains.prompt(type(self), self._build_prompt)
+
+    def _build_prompt(self) -> ChatPromptTemplate:
+        return ChatPromptTemplate.from_messages(
+            [
+                ("system", self.get_system_prompt()),
+                ("human", self.get_user_template()),
+            ]
         )
-        llm_chain = prompt | llm | StrOutputParser()
-        generation = llm_chain.invoke({
+
+    def chain(self, llm) -> Runnable:
+        """
+        prompt | llm | parser, built once per class and model; runnables are
+        immutable, so threads share it
+        """
+        return default_chains.chain(type(self), llm, self._build_prompt)
+
+    def decide(self, llm, inputs: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Values of the JSON answer, parsed while it streams; the generation is
+        cancelled as soon as `required_keys` are complete. Repeated prompts
+        come from the response cache (if the model has one) and concurrent
+        identical prompts share one generation.
+        """
+        prompt = self.prompt().invoke(inputs)
+        cached = cached_text(llm, prompt)
+        if cached is not None:
+            return parse_json_stream(
+                [cached], self.required_keys, self.output_schema
+            ).values
+
+        def generate() -> Dict[str, Any]:
+            values = parse_json_stream(
+                llm.stream(prompt), self.required_keys, self.output_schema
+            ).values
+            # The decision, not the cancelled generation, is what a repeat needs
+            store_text(llm, prompt, json.dumps(values))
+            return values
+
+        return dict(
+            default_dispatcher.submit(request_key(llm, prompt), generate).result()
+        )
+
+    def llm(self, model: str):
+        """
+        Shared client with a pooled keep-alive connection; the Ollama client stack is
+        loaded on first use
+        """
+        options = {"cache": default_response_cache()} if self.cache_responses else {}
+        return default_registry.chat_model(
+            model=model, temperature=0.1, timeout=self.task.timeout, **options
+        )
+
+    def generate(self, llm, inputs: Dict[str, Any]) -> str:
+        """The whole answer of a call that is not streamed"""
+        if self.required_keys:
+            # A decision rather than prose, kept parsed in `result`
+            self.result = self.decide(llm, inputs)
+            return json.dumps(self.result)
+        # Only invoke consults the cache, so a cached reply arrives at once;
+        # the dispatcher shares one call among sessions sending the same prompt
+        return default_dispatcher.invoke(llm, self.prompt().invoke(inputs)).content
+
+    def execute(self, on_token: Optional[Callable[[str], None]] = None) -> PizzaState:
+        inputs = {
             "user_input": self.state["user_input"],
             "pizza_request": self.state.get("pizza_request", ""),
-        })
+        }
+        if self.required_keys or self.cache_responses:
+            # Not streamed, so a model of the pool that fails is replaced by
+            # the next one; `on_token` gets the answer once
+            generation = default_router.call(
+                self.task, lambda model: self.generate(self.llm(model), inputs)
+            )
+            if on_token is not None:
+                on_token(generation)
+        else:
+            # Streamed: `on_token` sees each token as it is generated, and inside a
+            # graph run the tokens also reach stream_mode="messages". Tokens that
+            # went out cannot be retried, so a slow model is only avoided next time
+            with default_router.track(self.task) as model:
+                # Template and chain are built once per class; only the inputs are bound
+                # here
+                llm_chain = self.chain(self.llm(model))
+                tokens = []
+                for token in llm_chain.stream(inputs):
+                    tokens.append(token)
+                    if on_token is not None:
+                        on_token(token)
+            generation = "".join(tokens)
         
-        # For this simple example, we'll use the generation as-is
-        # In a more complex scenario, you might parse JSON responses
-        print(f"Agent response: {generation}")
+        # Prose answers are used as-is; JSON agents keep the parsed values in `result`
+        if on_token is None:
+            print(f"Agent response: {generation}")
         
         return self.state
 
@@ -50,10 +162,16 @@ def find_pizza_tool(pizza_request: str) -> str:
     
     pizza_request_lower = pizza_request.lower()
     for pizza_name, description in available_pizzas.items():
-        if pizza_name in pizza_request_lower or any(ingredient.lower() in pizza_request_lower for ingredient in description.split()):
+        ingredients = description.lower().split()
+        if pizza_name in pizza_request_lower or any(
+            ingredient in pizza_request_lower for ingredient in ingredients
+        ):
             return f"{pizza_name.title()}: {description}"
     
-    return "Margherita: Classic Margherita - tomato, mozzarella, basil (default recommendation)"
+    return (
+        "Margherita: Classic Margherita - tomato, mozzarella, basil "
+        "(default recommendation)"
+    )
 
 # Define the pizza finding tool
 pizza_finder_tool = Tool(
@@ -64,28 +182,39 @@ pizza_finder_tool = Tool(
 
 # Define agents
 class TriageAgentLLM(AgentBase):
-    def get_prompt_template(self) -> str:
+    cache_responses = True
+    output_schema = {"wants_pizza": bool, "reason": str}
+    # Routing needs only the flag; the reason is not generated
+    required_keys = ("wants_pizza",)
+    # A one-word decision: the fast models of the routing pool
+    task = TaskProfile("routing", slo=2.0, timeout=60)
+
+    def get_system_prompt(self) -> str:
         return """
         You are a triage agent for a pizza ordering system.
-        User input: "{user_input}"
         
         Determine if the user wants to order pizza or wants to exit.
         Respond with JSON in this format:
         {{"wants_pizza": true/false, "reason": "explanation"}}
         
-        If the user mentions pizza, food, hungry, order, or similar terms, set wants_pizza to true.
-        If the user says no, exit, quit, bye, or similar terms, set wants_pizza to false.
+        If the user mentions pizza, food, hungry, order, or similar terms,
+        set wants_pizza to true.
+        If the user says no, exit, quit, bye, or similar terms,
+        set wants_pizza to false.
         """
 
+    def get_user_template(self) -> str:
+        return 'User input: "{user_input}"'
+
 class PizzaAgentLLM(AgentBase):
-    def get_prompt_template(self) -> str:
+    def get_system_prompt(self) -> str:
         return """
         You are a pizza recommendation agent.
-        User's pizza request: "{pizza_request}"
         
         Available tools: find_pizza - finds matching pizza based on preferences
         
-        Use the find_pizza tool to find the best matching pizza for the user's request.
+        Use the find_pizza tool to find the best matching pizza for the user's
+        request.
         Then provide a friendly response recommending the pizza.
         
         Available pizzas:
@@ -94,4 +223,15 @@ class PizzaAgentLLM(AgentBase):
         - Hawaiian: tomato, mozzarella, ham, pineapple  
         - Veggie Supreme: tomato, mozzarella, peppers, mushrooms, onions
         - Meat Lovers: tomato, mozzarella, pepperoni, sausage, bacon
-        """
\ No newline at end of file
+        """
+    def get_user_template(self) -> str:
+        return "User's pizza request: \"{pizza_request}\""
+
+def warm_up_prompts() -> List[str]:
+    """
+    System messages the LLM agents start their prompts with, for the warm-up at start
+    """
+    return [
+        agent({}).prompt().messages[0].format().content
+        for agent in (TriageAgentLLM, PizzaAgentLLM)
+    ]
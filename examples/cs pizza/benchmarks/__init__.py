@@ -0,0 +1,4 @@
+"""
+Benchmarks for the cs_pizza application.
+Run from the cs pizza directory, e.g. `python -m benchmarks.bench_promotions`.
+"""
@@ -0,0 +1,238 @@
+"""
+Concurrent batch session driver.
+Runs a corpus of scripted multi-turn conversations through the compiled pizza
+graph with a configurable thread or process pool and writes sessions/sec,
+per-turn latency percentiles and error counts as JSON, so runs can be
+compared over time.
+
+Each session's turns run sequentially on one worker (a reply resumes the run
+paused at `await_user`); sessions run concurrently.
+
+Usage:
+    python -m benchmarks.batch_sessions --workers 8 --repeat 50 --output batch.json
+    python -m benchmarks.batch_sessions --synthetic 1000 --executor process --workers 4
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import random
+import sqlite3
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from langgraph.types import Command
+
+from state import StateManager
+from runtime import PizzaRuntime
+from checkpointing import PizzaCheckpointer, session_config
+from graph import create_workflow
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+from common.graph_optimizer import optimize_graph
+
+DEFAULT_CORPUS = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "conversations.json"
+)
+
+SYNTHETIC_OPENERS = [
+    "I want to order a {pizza} pizza",
+    "Give me a {pizza} pizza",
+    "I'm hungry, get me a {pizza} pizza",
+]
+SYNTHETIC_FOLLOW_UPS = [
+    "another {pizza} pizza",
+    "add a {pizza} pizza",
+    "also a {pizza} pizza",
+]
+SYNTHETIC_CLOSERS = ["done, thanks", "that's all", "finish"]
+SYNTHETIC_PIZZAS = ["margherita", "pepperoni", "hawaiian", "veggie", "meat lovers"]
+
+@dataclass
+class SessionResult:
+    """Outcome of one scripted conversation"""
+    name: str
+    turn_latencies: List[float] = field(default_factory=list)
+    errors: List[str] = field(default_factory=list)
+    unused_turns: int = 0
+
+class SessionRunner:
+    """Compiled graph, checkpointer and shared services used by one worker"""
+
+    def __init__(self, db_path: str = ":memory:"):
+        checkpointer = PizzaCheckpointer(
+            sqlite3.connect(db_path, check_same_thread=False)
+        )
+        self.app = optimize_graph(create_workflow()).compile(checkpointer=checkpointer)
+        self.runtime = PizzaRuntime.create()
+
+    def run(self, conversation: Dict[str, Any], session_id: str) -> SessionResult:
+        """Play a conversation turn by turn; errors end the session"""
+        result = SessionResult(name=conversation.get("name", session_id))
+        config = session_config(session_id)
+        turns = conversation["turns"]
+        for index, user_input in enumerate(turns):
+            if index == 0:
+                turn_input = StateManager.create_initial_state(user_input, session_id)
+            else:
+                snapshot = self.app.get_state(config)
+                if snapshot.interrupts:
+                    turn_input = Command(resume=user_input)
+                elif snapshot.values.get("requires_user_input"):
+                    turn_input = StateManager.user_turn(user_input)
+                else:
+                    # The conversation ended before the script did
+                    result.unused_turns = len(turns) - index
+                    break
+            start = time.perf_counter()
+            try:
+                self.app.invoke(turn_input, config, context=self.runtime)
+            except Exception as e:
+                result.errors.append(type(e).__name__)
+                break
+            finally:
+                result.turn_latencies.append(time.perf_counter() - start)
+        self.app.checkpointer.delete_thread(session_id)
+        return result
+
+def load_corpus(path: str) -> List[Dict[str, Any]]:
+    with open(path) as f:
+        return json.load(f)
+
+def synthetic_corpus(
+    sessions: int, max_pizzas: int = 4, seed: int = 0
+) -> List[Dict[str, Any]]:
+    """Random multi-pizza conversations"""
+    rng = random.Random(seed)
+    corpus = []
+    for i in range(sessions):
+        pizzas = [
+            rng.choice(SYNTHETIC_PIZZAS) for _ in range(rng.randint(1, max_pizzas))
+        ]
+        turns = [rng.choice(SYNTHETIC_OPENERS).format(pizza=pizzas[0])]
+        turns += [
+            rng.choice(SYNTHETIC_FOLLOW_UPS).format(pizza=pizza) for pizza in pizzas[1:]
+        ]
+        turns.append(rng.choice(SYNTHETIC_CLOSERS))
+        corpus.append({"name": f"synthetic-{i}", "turns": turns})
+    return corpus
+
+def percentile(ordered: List[float], pct: float) -> float:
+    """Nearest-rank percentile of pre-sorted values"""
+    if not ordered:
+        return 0.0
+    rank = max(1, int(round(pct / 100 * len(ordered))))
+    return ordered[min(rank, len(ordered)) - 1]
+
+# Process pool workers build their own runner once
+_worker_runner: Optional[SessionRunner] = None
+
+def _init_process_worker():
+    global _worker_runner
+    sys.stdout = open(os.devnull, "w")
+    _worker_runner = SessionRunner()
+
+def _run_in_process(job) -> SessionResult:
+    conversation, session_id = job
+    return _worker_runner.run(conversation, session_id)
+
+def run_batch(
+    conversations: List[Dict[str, Any]], workers: int = 4, executor: str = "thread"
+) -> Dict[str, Any]:
+    """Run all conversations concurrently and summarize the results"""
+    jobs = [
+        (conversation, f"batch-{i}") for i, conversation in enumerate(conversations)
+    ]
+    start = time.perf_counter()
+    if executor == "process":
+        with ProcessPoolExecutor(
+            max_workers=workers, initializer=_init_process_worker
+        ) as pool:
+            results = list(
+                pool.map(
+                    _run_in_process, jobs, chunksize=max(1, len(jobs) // (workers * 4))
+                )
+            )
+    else:
+        runner = SessionRunner()
+        with contextlib.redirect_stdout(io.StringIO()), ThreadPoolExecutor(
+            max_workers=workers
+        ) as pool:
+            results = list(pool.map(lambda job: runner.run(*job), jobs))
+    elapsed = time.perf_counter() - start
+
+    latencies = sorted(
+        latency for result in results for latency in result.turn_latencies
+    )
+    errors = Counter(error for result in results for error in result.errors)
+    return {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "config": {
+            "executor": executor,
+            "workers": workers,
+            "python": platform.python_version(),
+            "cpu_count": os.cpu_count(),
+        },
+        "sessions": len(results),
+        "turns": len(latencies),
+        "failed_sessions": sum(1 for result in results if result.errors),
+        "errors": dict(errors),
+        "unused_turns": sum(result.unused_turns for result in results),
+        "elapsed_s": round(elapsed, 4),
+        "sessions_per_sec": round(len(results) / elapsed, 2) if elapsed else 0.0,
+        "turns_per_sec": round(len(latencies) / elapsed, 2) if elapsed else 0.0,
+        "turn_latency_ms": {
+            "mean": (
+                round(sum(latencies) / len(latencies) * 1e3, 3) if latencies else 0.0
+            ),
+            "p50": round(percentile(latencies, 50) * 1e3, 3),
+            "p95": round(percentile(latencies, 95) * 1e3, 3),
+            "p99": round(percentile(latencies, 99) * 1e3, 3),
+            "max": round(latencies[-1] * 1e3, 3) if latencies else 0.0,
+        },
+    }
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(
+        description="Run scripted pizza conversations concurrently"
+    )
+    parser.add_argument(
+        "--corpus", default=DEFAULT_CORPUS, help="JSON list of {name, turns}"
+    )
+    parser.add_argument(
+        "--synthetic", type=int, help="Generate this many random conversations instead"
+    )
+    parser.add_argument(
+        "--repeat", type=int, default=1, help="Repeat the corpus this many times"
+    )
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--executor", choices=["thread", "process"], default="thread")
+    parser.add_argument("--output", help="Write the JSON report to this file")
+    args = parser.parse_args(argv)
+
+    conversations = (
+        synthetic_corpus(args.synthetic) if args.synthetic else load_corpus(args.corpus)
+    )
+    report = run_batch(
+        conversations * args.repeat, workers=args.workers, executor=args.executor
+    )
+    report["config"]["corpus"] = (
+        "synthetic" if args.synthetic else os.path.basename(args.corpus)
+    )
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    print(output)
+
+if __name__ == "__main__":
+    main()
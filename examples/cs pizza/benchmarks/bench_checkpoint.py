@@ -0,0 +1,131 @@
+"""
+Checkpointing benchmark.
+Measures the compact PizzaStateSerializer against LangGraph's JsonPlusSerializer,
+how quickly a freshly started process resumes sessions from the SQLite
+checkpointer, and how much storage pruning saves over many turns.
+
+Usage:
+    python -m benchmarks.bench_checkpoint --sessions 50 --turns 10
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import random
+import statistics
+import tempfile
+import time
+from typing import List
+
+from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+from langgraph.types import Command
+
+from state import StateManager
+from runtime import PizzaRuntime
+from checkpointing import (
+    PizzaCheckpointer,
+    PizzaStateSerializer,
+    session_config,
+    DEFAULT_KEEP_LAST,
+)
+
+PIZZA_REQUESTS = [
+    "I want a pepperoni pizza",
+    "yes another margherita pizza",
+    "add a hawaiian pizza",
+    "also a veggie pizza",
+    "one more meat lovers pizza",
+]
+
+def run_sessions(app, runtime: PizzaRuntime, sessions: int, turns: int):
+    """Multi-pizza sessions: every turn adds one pizza to the order"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        for i in range(sessions):
+            session_id = f"session-{i}"
+            config = session_config(session_id)
+            app.invoke(
+                StateManager.create_initial_state(PIZZA_REQUESTS[0], session_id),
+                config,
+                context=runtime,
+            )
+            for turn in range(1, turns):
+                app.invoke(
+                    Command(resume=PIZZA_REQUESTS[turn % len(PIZZA_REQUESTS)]),
+                    config,
+                    context=runtime,
+                )
+
+def timed(fn, repeat: int) -> List[float]:
+    latencies = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark pizza state checkpointing")
+    parser.add_argument("--sessions", type=int, default=50)
+    parser.add_argument("--turns", type=int, default=10)
+    parser.add_argument("--resumes", type=int, default=500)
+    args = parser.parse_args()
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        from main import workflow
+    runtime = PizzaRuntime.create()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        databases = {}
+        for name, keep_last in (("unpruned", None), ("pruned", DEFAULT_KEEP_LAST)):
+            path = os.path.join(tmp, f"{name}.db")
+            checkpointer = PizzaCheckpointer.open(path, keep_last=keep_last)
+            app = workflow.compile(checkpointer=checkpointer)
+            start = time.perf_counter()
+            run_sessions(app, runtime, args.sessions, args.turns)
+            elapsed = time.perf_counter() - start
+            databases[name] = (path, checkpointer.storage_stats(), elapsed)
+
+        print(f"Sessions: {args.sessions}, turns per session: {args.turns}")
+        print("\nStorage:")
+        for name, (path, stats, elapsed) in databases.items():
+            print(
+                f"  {name:<9} {stats['checkpoints']:6d} checkpoints "
+                f"{stats['writes']:6d} writes "
+                f"{stats['payload_bytes'] / 1024:8.1f} KiB payload "
+                f"{(elapsed / (args.sessions * args.turns)) * 1e3:6.2f} ms/turn"
+            )
+
+        # Serializer comparison on the largest final state
+        path = databases["pruned"][0]
+        app = workflow.compile(checkpointer=PizzaCheckpointer.open(path))
+        state = app.get_state(session_config("session-0")).values
+        items = len(state["current_order"].items)
+        print(f"\nSerializer (final state, {items}-pizza order):")
+        for name, serde in (
+            ("JsonPlusSerializer", JsonPlusSerializer()),
+            ("PizzaStateSerializer", PizzaStateSerializer()),
+        ):
+            typed = serde.dumps_typed(state)
+            dumps = timed(lambda: serde.dumps_typed(state), 2000)
+            loads = timed(lambda: serde.loads_typed(typed), 2000)
+            print(
+                f"  {name:<22} {len(typed[1]):6d} B  "
+                f"dumps {statistics.mean(dumps) * 1e6:6.1f} us  "
+                f"loads {statistics.mean(loads) * 1e6:6.1f} us"
+            )
+
+        # Resume from a restarted worker: a new connection and compiled graph
+        start = time.perf_counter()
+        restarted = workflow.compile(checkpointer=PizzaCheckpointer.open(path))
+        startup = time.perf_counter() - start
+        rng = random.Random(0)
+        resumes = timed(lambda: restarted.get_state(
+            session_config(f"session-{rng.randrange(args.sessions)}")), args.resumes)
+        ordered = sorted(resumes)
+        print(f"\nResume after restart: startup {startup * 1e3:.2f} ms, "
+              f"get_state p50 {statistics.median(resumes) * 1e3:.3f} ms, "
+              f"p95 {ordered[int(len(ordered) * 0.95) - 1] * 1e3:.3f} ms")
+
+if __name__ == "__main__":
+    main()
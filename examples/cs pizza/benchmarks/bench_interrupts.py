@@ -0,0 +1,116 @@
+"""
+Interrupt benchmark.
+Counts node executions (started, and completed without pausing) and latency
+per user turn for multi-pizza orders when the reply is delivered by:
+  - restream:  the run ends at the continuation question and every reply
+               starts a new run from triage (previous behaviour)
+  - interrupt: the run pauses at `await_user` and the reply resumes it there
+
+Usage:
+    python -m benchmarks.bench_interrupts --sessions 200 --pizzas 4
+"""
+
+import argparse
+import contextlib
+import io
+import sqlite3
+import statistics
+import time
+from collections import Counter
+from typing import Any, Dict, List, Tuple
+
+from langgraph.types import Command
+
+from state import StateManager
+from runtime import PizzaRuntime
+from checkpointing import PizzaCheckpointer, session_config
+from graph import create_workflow
+
+PIZZA_REQUESTS = [
+    "another margherita pizza",
+    "add a hawaiian pizza",
+    "also a veggie pizza",
+    "one more meat lovers pizza",
+]
+
+def session_inputs(pizzas: int) -> List[str]:
+    """User turns for one session: the first order, more pizzas, then done"""
+    follow_ups = [PIZZA_REQUESTS[i % len(PIZZA_REQUESTS)] for i in range(pizzas - 1)]
+    return ["I want a pepperoni pizza"] + follow_ups + ["done, thanks"]
+
+def run_turn(
+    app, turn_input: Any, config: Dict, runtime: PizzaRuntime
+) -> Tuple[Counter, Counter]:
+    """Stream one user turn and count the nodes that started and completed"""
+    started, completed = Counter(), Counter()
+    for event in app.stream(turn_input, config, context=runtime, stream_mode="debug"):
+        payload = event["payload"]
+        if event["type"] == "task":
+            started[payload["name"]] += 1
+        elif event["type"] == "task_result" and not payload.get("interrupts"):
+            completed[payload["name"]] += 1
+    return started, completed
+
+def run_sessions(app, sessions: int, pizzas: int, interrupt: bool):
+    runtime = PizzaRuntime.create()
+    started, completed, latencies = Counter(), Counter(), []
+    turns = 0
+    with contextlib.redirect_stdout(io.StringIO()):
+        for i in range(sessions):
+            session_id = f"session-{i}"
+            config = session_config(session_id)
+            for turn, user_input in enumerate(session_inputs(pizzas)):
+                if turn == 0:
+                    turn_input = StateManager.create_initial_state(
+                        user_input, session_id
+                    )
+                elif interrupt:
+                    turn_input = Command(resume=user_input)
+                else:
+                    turn_input = StateManager.user_turn(user_input)
+                start = time.perf_counter()
+                turn_started, turn_completed = run_turn(
+                    app, turn_input, config, runtime
+                )
+                if turn:
+                    latencies.append(time.perf_counter() - start)
+                    started += turn_started
+                    completed += turn_completed
+                    turns += 1
+    return started, completed, turns, latencies
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark node executions per user turn"
+    )
+    parser.add_argument("--sessions", type=int, default=200)
+    parser.add_argument(
+        "--pizzas", type=int, default=4, help="Pizzas ordered per session"
+    )
+    args = parser.parse_args()
+
+    print(f"Sessions: {args.sessions}, pizzas per order: {args.pizzas}")
+    print("Follow-up turns only (the first turn is identical in both modes)\n")
+    for name, interrupt in (("restream", False), ("interrupt", True)):
+        checkpointer = PizzaCheckpointer(
+            sqlite3.connect(":memory:", check_same_thread=False)
+        )
+        app = create_workflow(wait_for_user=interrupt).compile(
+            checkpointer=checkpointer
+        )
+        started, completed, turns, latencies = run_sessions(
+            app, args.sessions, args.pizzas, interrupt
+        )
+        print(f"{name:<10} started {sum(started.values()) / turns:5.2f} nodes/turn  "
+              f"completed {sum(completed.values()) / turns:5.2f} nodes/turn  "
+              f"mean {statistics.mean(latencies) * 1e3:6.2f} ms/turn")
+        print(
+            "           "
+            + ", ".join(
+                f"{node} {count / turns:.2f}"
+                for node, count in sorted(completed.items())
+            )
+        )
+
+if __name__ == "__main__":
+    main()
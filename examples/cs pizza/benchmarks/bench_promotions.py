@@ -0,0 +1,134 @@
+"""
+Promotion engine benchmark.
+Compiles a synthetic campaign of promotion rules and scores a large batch of
+synthetic orders, comparing the indexed engine against a linear rule scan.
+
+Usage:
+    python -m benchmarks.bench_promotions --rules 1000 --orders 100000
+"""
+
+import argparse
+import random
+import time
+from typing import List, Dict, Any
+
+from state import Order, Pizza
+from services.promotion_service import PromotionEngine, PromotionRule, OrderFeatures
+from benchmarks.synthetic import generate_catalog, generate_orders
+
+def generate_rules(
+    count: int, catalog: List[Pizza], rng: random.Random
+) -> List[Dict[str, Any]]:
+    """
+    Generate a campaign dominated by targeted promotions (combos, ingredient
+    deals, happy hours, weekday specials) with a few global thresholds.
+    """
+    pizzas = [pizza.name for pizza in catalog]
+    ingredients = sorted(
+        {i for pizza in catalog for i in pizza.ingredients} - {'tomato', 'mozzarella'}
+    )
+    rules = []
+
+    for i in range(count):
+        kind = rng.choices(
+            ['combo', 'ingredient', 'happy_hour', 'weekday', 'threshold'],
+            weights=[30, 25, 20, 20, 5],
+        )[0]
+        when: Dict[str, Any] = {}
+        if kind == 'combo':
+            when['pizzas'] = rng.sample(pizzas, 2)
+        elif kind == 'ingredient':
+            when['ingredients'] = rng.sample(ingredients, 2)
+            when['min_items'] = rng.randint(1, 3)
+        elif kind == 'threshold':
+            when['min_total'] = rng.choice([40, 60, 80, 100, 150])
+            when['min_items'] = rng.randint(2, 4)
+        elif kind == 'happy_hour':
+            start = rng.randint(0, 23)
+            when['hours'] = [start, (start + rng.randint(1, 3)) % 24]
+            when['pizzas'] = [rng.choice(pizzas)]
+        else:
+            when['weekdays'] = [rng.randrange(7)]
+            when['ingredients'] = [rng.choice(ingredients)]
+
+        rules.append({
+            "id": f"{kind}_{i}",
+            "message": f"Promotion {i} ({kind})",
+            "when": when,
+            "reward": {"percent_off": rng.choice([5, 10, 15])} if rng.random() < 0.5
+                      else {"amount_off": rng.choice([1, 2, 5])},
+            "priority": rng.randint(0, 3)
+        })
+    return rules
+
+def linear_scan(rules: List[PromotionRule], orders: List[Order]) -> float:
+    """Baseline: evaluate every rule against every order (if-chain equivalent)"""
+    total_savings = 0.0
+    for order in orders:
+        features = OrderFeatures.from_order(order)
+        matched = sorted((rule for rule in rules if rule.matches(features)),
+                         key=lambda rule: -rule.priority)
+        stacked = sum(
+            rule.savings_for(features.total) for rule in matched if rule.stackable
+        )
+        exclusive = max(
+            (
+                rule.savings_for(features.total)
+                for rule in matched
+                if not rule.stackable
+            ),
+            default=0.0,
+        )
+        total_savings += stacked + exclusive
+    return total_savings
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the promotion rule engine")
+    parser.add_argument("--rules", type=int, default=1000)
+    parser.add_argument("--orders", type=int, default=100000)
+    parser.add_argument(
+        "--catalog", type=int, default=200, help="Synthetic catalog size"
+    )
+    parser.add_argument("--linear-sample", type=int, default=5000,
+                        help="Orders used to time the linear-scan baseline")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    catalog = generate_catalog(args.catalog, rng)
+    definitions = generate_rules(args.rules, catalog, rng)
+    orders = generate_orders(args.orders, catalog, rng)
+
+    start = time.perf_counter()
+    engine = PromotionEngine.from_definitions(definitions)
+    compile_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    summary = engine.simulate_campaign(orders)
+    bulk_time = time.perf_counter() - start
+
+    sample = orders[:args.linear_sample]
+    start = time.perf_counter()
+    linear_scan(engine.rules, sample)
+    linear_time = (time.perf_counter() - start) / len(sample) * len(orders)
+
+    print(f"Rules: {args.rules}, orders: {args.orders}, catalog: {len(catalog)} pizzas")
+    print(f"Compile time:           {compile_time * 1000:.1f} ms")
+    print(
+        f"Bulk evaluation:        {bulk_time:.2f} s "
+        f"({len(orders) / bulk_time:,.0f} orders/s)"
+    )
+    print(
+        f"Linear scan (estimate): {linear_time:.2f} s "
+        f"({len(orders) / linear_time:,.0f} orders/s)"
+    )
+    print(f"Speedup:                {linear_time / bulk_time:.1f}x")
+    print(
+        f"Rules evaluated/order:  {engine.evaluated_rules / len(orders):.1f} "
+        f"(of {args.rules})"
+    )
+    print(f"Promoted orders:        {summary['promoted_orders']} / {summary['orders']}")
+    print(f"Total savings:          ${summary['total_savings']:,.2f}")
+
+if __name__ == "__main__":
+    main()
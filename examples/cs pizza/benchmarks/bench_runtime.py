@@ -0,0 +1,110 @@
+"""
+Runtime context benchmark.
+Compares per-turn latency of the pizza graph when services are rebuilt for
+every run (approximating the previous per-call construction) against a
+single shared PizzaRuntime built once at startup.
+
+Usage:
+    python -m benchmarks.bench_runtime --turns 2000
+"""
+
+import argparse
+import contextlib
+import io
+import statistics
+import time
+from typing import Callable, List
+
+from state import StateManager
+from runtime import PizzaRuntime
+from nodes import TriageAgent, PizzaAgent, ContinuationAgent
+
+SAMPLE_INPUTS = [
+    "I want to order a pepperoni pizza",
+    "Give me a meat lovers pizza",
+    "I'm hungry and want something with vegetables",
+    "Something with pineapple please",
+    "No thanks, I don't want anything",
+]
+
+def time_turns(turns: int, run_turn: Callable[[int], None]) -> List[float]:
+    """Run `turns` turns and return per-turn latencies in seconds"""
+    latencies = []
+    with contextlib.redirect_stdout(io.StringIO()):
+        for i in range(turns):
+            start = time.perf_counter()
+            run_turn(i)
+            latencies.append(time.perf_counter() - start)
+    return latencies
+
+def summarize(name: str, latencies: List[float]):
+    ordered = sorted(latencies)
+    p95 = ordered[int(len(ordered) * 0.95) - 1]
+    print(f"{name:<28} mean {statistics.mean(latencies) * 1e6:8.1f} us   "
+          f"p50 {statistics.median(latencies) * 1e6:8.1f} us   p95 {p95 * 1e6:8.1f} us")
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark shared vs per-run pizza services"
+    )
+    parser.add_argument("--turns", type=int, default=2000)
+    args = parser.parse_args()
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        from main import workflow
+    app = workflow.compile()
+
+    shared = PizzaRuntime.create()
+
+    def initial_state(i: int):
+        return StateManager.create_initial_state(
+            SAMPLE_INPUTS[i % len(SAMPLE_INPUTS)], f"session-{i}"
+        )
+
+    def run_nodes(state, services_for_call: Callable[[], PizzaRuntime]):
+        """One turn of business logic without the graph runtime"""
+        state = StateManager.apply(state, TriageAgent(state, services_for_call()))
+        if state['wants_pizza']:
+            state = StateManager.apply(state, PizzaAgent(state, services_for_call()))
+            ContinuationAgent(state, services_for_call())
+
+    def nodes_per_call(i: int):
+        run_nodes(initial_state(i), PizzaRuntime.create)
+
+    def nodes_shared(i: int):
+        run_nodes(initial_state(i), lambda: shared)
+
+    def per_run_services(i: int):
+        app.invoke(initial_state(i), context=PizzaRuntime.create())
+
+    def shared_services(i: int):
+        app.invoke(initial_state(i), context=shared)
+
+    # Warm up imports and caches before measuring
+    time_turns(50, shared_services)
+
+    print(f"Turns: {args.turns}")
+
+    print("\nBusiness logic only (nodes called directly):")
+    before = time_turns(args.turns, nodes_per_call)
+    after = time_turns(args.turns, nodes_shared)
+    summarize("Services per node call", before)
+    summarize("Shared PizzaRuntime", after)
+    speedup = statistics.mean(before) / statistics.mean(after)
+    print(f"Speedup (mean):              {speedup:.2f}x")
+
+    print("\nFull graph (app.invoke):")
+    before = time_turns(args.turns, per_run_services)
+    after = time_turns(args.turns, shared_services)
+    summarize("Services per run", before)
+    summarize("Shared PizzaRuntime", after)
+    speedup = statistics.mean(before) / statistics.mean(after)
+    print(f"Speedup (mean):              {speedup:.2f}x")
+    cache = shared.search_cache
+    print(
+        f"Search cache hit ratio:      "
+        f"{cache.hits / max(1, cache.hits + cache.misses):.1%}"
+    )
+
+if __name__ == "__main__":
+    main()
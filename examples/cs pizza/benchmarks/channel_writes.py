@@ -0,0 +1,182 @@
+"""
+Channel write report.
+Replays sample conversations through the pizza graph and reports, for every
+step, which state channels the node wrote and how large the streamed update
+was. Runs the current delta-returning graph next to a legacy variant whose
+nodes return the full state, approximating the previous behaviour.
+
+Usage:
+    python -m benchmarks.channel_writes --runs 500
+    python -m benchmarks.channel_writes --trace "I want a pepperoni pizza"
+"""
+
+import argparse
+import contextlib
+import io
+import pickle
+import statistics
+import time
+from collections import Counter
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, TypedDict, get_type_hints
+
+from langgraph.graph import StateGraph, END
+from langgraph.runtime import Runtime
+
+from state import PizzaState, StateManager
+from nodes import TriageAgent, PizzaAgent, ContinuationAgent
+from edges import route_after_triage, route_after_pizza, route_after_continuation
+from runtime import PizzaRuntime
+
+SAMPLE_INPUTS = [
+    "I want to order a pepperoni pizza",
+    "Give me a meat lovers pizza",
+    "I'm hungry and want something with vegetables",
+    "Something with pineapple please",
+    "No thanks, I don't want anything",
+]
+
+NODES = {
+    "triage": TriageAgent,
+    "pizza_agent": PizzaAgent,
+    "continuation_agent": ContinuationAgent,
+}
+
+@dataclass
+class StepWrites:
+    """Channels written by one node in one step"""
+    step: int
+    node: str
+    channels: List[str]
+    payload_bytes: int
+
+def legacy_state_schema() -> type:
+    """PizzaState without reducers, so every returned key overwrites its channel"""
+    hints = get_type_hints(PizzaState)
+    return TypedDict("LegacyPizzaState", hints)
+
+def build_graph(legacy: bool = False):
+    """Compile the pizza graph; `legacy` nodes return the full state every step"""
+    def make_node(node: Callable) -> Callable:
+        if legacy:
+            def run(state, runtime: Runtime[PizzaRuntime]):
+                return StateManager.apply(state, node(state, runtime.context))
+        else:
+            def run(state, runtime: Runtime[PizzaRuntime]):
+                return node(state, runtime.context)
+        return run
+
+    def make_router(router: Callable) -> Callable:
+        # Routers are annotated with PizzaState; hide that from the legacy schema
+        return (lambda state: router(state)) if legacy else router
+
+    workflow = StateGraph(
+        legacy_state_schema() if legacy else PizzaState, context_schema=PizzaRuntime
+    )
+    for name, node in NODES.items():
+        workflow.add_node(name, make_node(node))
+    workflow.set_entry_point("triage")
+    workflow.add_conditional_edges("triage", make_router(route_after_triage),
+                                   {"pizza_agent": "pizza_agent", "__end__": END})
+    workflow.add_conditional_edges("pizza_agent", make_router(route_after_pizza),
+                                   {"continuation_agent": "continuation_agent"})
+    # Runs are replayed one turn at a time, so waiting for the user ends the run
+    workflow.add_conditional_edges(
+        "continuation_agent",
+        make_router(route_after_continuation),
+        {"triage": "triage", "await_user": END, "__end__": END},
+    )
+    return workflow.compile()
+
+def channel_write_report(
+    app, state: PizzaState, context: PizzaRuntime
+) -> List[StepWrites]:
+    """Stream one run and record the channels written at every step"""
+    report = []
+    for step, chunk in enumerate(
+        app.stream(state, context=context, stream_mode="updates"), start=1
+    ):
+        for node, update in chunk.items():
+            update = update or {}
+            report.append(StepWrites(
+                step=step,
+                node=node,
+                channels=sorted(update),
+                payload_bytes=len(pickle.dumps(update))
+            ))
+    return report
+
+def summarize(name: str, reports: List[List[StepWrites]], latencies: List[float]):
+    steps = [entry for report in reports for entry in report]
+    writes = [len(entry.channels) for entry in steps]
+    sizes = [entry.payload_bytes for entry in steps]
+    per_step = statistics.mean(latencies) / max(1, len(steps) / len(reports))
+    print(
+        f"{name:<24} {statistics.mean(writes):6.1f} ch/step  "
+        f"{statistics.mean(sizes):8.0f} B/step  "
+        f"{sum(sizes) / len(reports):8.0f} B/run  {per_step * 1e6:7.1f} us/step"
+    )
+
+def print_trace(report: List[StepWrites]):
+    for entry in report:
+        print(f"  step {entry.step} {entry.node:<20} {len(entry.channels):2d} channels "
+              f"{entry.payload_bytes:6d} B  {', '.join(entry.channels)}")
+
+def run(app, runs: int, context: PizzaRuntime):
+    reports, latencies = [], []
+    with contextlib.redirect_stdout(io.StringIO()):
+        for i in range(runs):
+            state = StateManager.create_initial_state(
+                SAMPLE_INPUTS[i % len(SAMPLE_INPUTS)], f"session-{i}"
+            )
+            start = time.perf_counter()
+            reports.append(channel_write_report(app, state, context))
+            latencies.append(time.perf_counter() - start)
+    return reports, latencies
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(
+        description="Report state channel writes per graph step"
+    )
+    parser.add_argument("--runs", type=int, default=500)
+    parser.add_argument("--trace", help="Print the per-step writes of a single input")
+    args = parser.parse_args(argv)
+
+    context = PizzaRuntime.create()
+    graphs = {
+        "Legacy (full state)": build_graph(legacy=True),
+        "Partial updates": build_graph(),
+    }
+
+    if args.trace:
+        for name, app in graphs.items():
+            print(f"{name}:")
+            with contextlib.redirect_stdout(io.StringIO()):
+                report = channel_write_report(
+                    app, StateManager.create_initial_state(args.trace), context
+                )
+            print_trace(report)
+        return
+
+    # Warm up imports and caches before measuring
+    for app in graphs.values():
+        run(app, 20, context)
+
+    print(f"Runs: {args.runs}")
+    written: Dict[str, Counter] = {}
+    for name, app in graphs.items():
+        reports, latencies = run(app, args.runs, context)
+        summarize(name, reports, latencies)
+        written[name] = Counter(
+            channel
+            for report in reports
+            for entry in report
+            for channel in entry.channels
+        )
+
+    print("\nWrites per channel (partial updates):")
+    for channel, count in written["Partial updates"].most_common():
+        print(f"  {channel:<24} {count}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,324 @@
+"""
+Scenario fuzzer for the pizza graph.
+Generates random multi-turn conversations from a seeded vocabulary (pizza
+names, ingredients, continuation/exit phrases, filler words, odd casing and
+punctuation), runs them through the in-process graph interpreter and checks
+properties that must hold for every conversation. Failing conversations are
+shrunk to a minimal reproduction. With --compare N the first N scenarios are
+also run on the compiled LangGraph app and must take the same node path on
+every turn.
+
+Usage:
+    python -m benchmarks.fuzz_scenarios --scenarios 100000 --seed 7
+    python -m benchmarks.fuzz_scenarios --scenarios 2000 --compare 500
+"""
+
+import argparse
+import os
+import random
+import sqlite3
+import sys
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Tuple
+
+from langgraph.types import Command
+
+from state import StateManager
+from runtime import PizzaRuntime
+from checkpointing import PizzaCheckpointer, session_config
+from graph import create_workflow
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+from common.graph_interpreter import GraphInterpreter
+
+PIZZA_WORDS = [
+    "margherita",
+    "pepperoni",
+    "hawaiian",
+    "veggie",
+    "meat lovers",
+    "pizza",
+    "pineapple",
+    "ham",
+    "mushrooms",
+    "basil",
+    "bacon",
+    "sausage",
+    "anchovies",
+    "vegetables",
+    "cheese",
+]
+ORDER_WORDS = [
+    "i want",
+    "give me",
+    "order",
+    "get me",
+    "i'd like",
+    "craving",
+    "hungry",
+    "buy",
+    "love",
+]
+CONTINUE_WORDS = ["another", "add", "more", "also", "yes", "one more", "again", "extra"]
+FINISH_WORDS = [
+    "done",
+    "finish",
+    "that's all",
+    "complete order",
+    "no",
+    "stop",
+    "bye",
+    "nothing else",
+    "checkout",
+]
+FILLER_WORDS = [
+    "please",
+    "thanks",
+    "um",
+    "right now",
+    "a",
+    "the",
+    "with",
+    "and",
+    "for dinner",
+    "asap",
+    "?",
+    "!",
+    "",
+]
+
+# Turns of one generated conversation are capped so scenarios stay short
+MAX_TURNS = 6
+# Fresh services every N scenarios keep the order registry from growing without bound
+RUNTIME_REFRESH = 5000
+
+def generate_conversation(rng: random.Random) -> List[str]:
+    """One random conversation: an opener followed by follow-up replies"""
+    def phrase(*pools: List[str]) -> str:
+        words = [rng.choice(pool) for pool in pools for _ in range(rng.randint(0, 2))]
+        rng.shuffle(words)
+        text = " ".join(word for word in words if word)
+        mode = rng.random()
+        if mode < 0.1:
+            text = text.upper()
+        elif mode < 0.2:
+            text = text.title()
+        return text
+    turns = [
+        phrase(
+            ORDER_WORDS,
+            PIZZA_WORDS,
+            FILLER_WORDS,
+            FINISH_WORDS if rng.random() < 0.1 else [""],
+        )
+    ]
+    for _ in range(rng.randint(0, MAX_TURNS - 1)):
+        if rng.random() < 0.6:
+            turns.append(phrase(CONTINUE_WORDS, PIZZA_WORDS, FILLER_WORDS))
+        else:
+            turns.append(
+                phrase(
+                    FINISH_WORDS,
+                    FILLER_WORDS,
+                    CONTINUE_WORDS if rng.random() < 0.2 else [""],
+                )
+            )
+    return turns
+
+@dataclass
+class Outcome:
+    """Per-turn node paths and the final state of one conversation"""
+    paths: List[List[str]]
+    state: Dict
+    paused: bool
+
+def run_interpreted(interpreter: GraphInterpreter, turns: List[str]) -> Outcome:
+    run, paths = None, []
+    for index, user_input in enumerate(turns):
+        if index == 0:
+            turn_input = StateManager.create_initial_state(user_input, "")
+        elif run.paused_at:
+            turn_input = Command(resume=user_input)
+        else:
+            break
+        run = interpreter.invoke_turn(run, turn_input)
+        paths.append(run.path)
+    return Outcome(paths, run.state, run.paused_at is not None)
+
+def run_compiled(
+    app, runtime: PizzaRuntime, turns: List[str], session_id: str
+) -> Outcome:
+    config, paths = session_config(session_id), []
+    for index, user_input in enumerate(turns):
+        if index == 0:
+            turn_input = StateManager.create_initial_state(user_input, "")
+        elif app.get_state(config).interrupts:
+            turn_input = Command(resume=user_input)
+        else:
+            break
+        paths.append(
+            [
+                event["payload"]["name"]
+                for event in app.stream(
+                    turn_input, config, context=runtime, stream_mode="debug"
+                )
+                if event["type"] == "task"
+            ]
+        )
+    snapshot = app.get_state(config)
+    app.checkpointer.delete_thread(session_id)
+    return Outcome(paths, snapshot.values, bool(snapshot.interrupts))
+
+def allowed_transitions(workflow) -> Dict[str, set]:
+    """Successors each node may route to, from the graph's edges and path maps"""
+    builder = workflow.builder if hasattr(workflow, "builder") else workflow
+    transitions: Dict[str, set] = {}
+    for start, end in builder.edges:
+        transitions.setdefault(start, set()).add(end)
+    for start, branches in builder.branches.items():
+        for branch in branches.values():
+            transitions.setdefault(start, set()).update(branch.ends.values())
+    return transitions
+
+def check_properties(outcome: Outcome, transitions: Dict[str, set]) -> List[str]:
+    """Invariants every conversation must satisfy; returns the violations"""
+    problems = []
+    pizzas_added = 0
+    for index, path in enumerate(outcome.paths):
+        expected_start = "triage" if index == 0 else "await_user"
+        if not path or path[0] != expected_start:
+            problems.append(
+                f"turn {index} starts at {path[:1]}, expected {expected_start}"
+            )
+        for a, b in zip(path, path[1:]):
+            if b not in transitions.get(a, ()):
+                problems.append(f"turn {index}: illegal transition {a} -> {b}")
+        pizzas_added += path.count("pizza_agent")
+
+    state = outcome.state
+    order = state.get("current_order")
+    quantity = sum(item.quantity for item in order.items) if order else 0
+    if quantity != pizzas_added:
+        problems.append(
+            f"order holds {quantity} pizzas but pizza_agent ran {pizzas_added} times"
+        )
+    if (
+        order
+        and abs(order.total_amount - sum(item.total_price for item in order.items))
+        > 0.005
+    ):
+        problems.append(f"order total {order.total_amount} does not match its items")
+    if outcome.paused and not state.get("requires_user_input"):
+        problems.append("paused without waiting for user input")
+    if not outcome.paused and not state.get("exit_reason"):
+        problems.append("conversation ended without an exit reason")
+    if state.get("validation_errors"):
+        problems.append(f"validation errors: {state['validation_errors']}")
+    return problems
+
+def shrink(turns: List[str], still_fails: Callable[[List[str]], bool]) -> List[str]:
+    """Greedily drop turns, then words, while the conversation still fails"""
+    changed = True
+    while changed:
+        changed = False
+        for i in range(len(turns) - 1, -1, -1):
+            candidate = turns[:i] + turns[i + 1:]
+            if candidate and still_fails(candidate):
+                turns, changed = candidate, True
+        for i, turn in enumerate(turns):
+            words = turn.split()
+            for j in range(len(words) - 1, -1, -1):
+                candidate = (
+                    turns[:i] + [" ".join(words[:j] + words[j + 1 :])] + turns[i + 1 :]
+                )
+                if still_fails(candidate):
+                    turns, words, changed = candidate, words[:j] + words[j + 1:], True
+    return turns
+
+def fuzz(scenarios: int, seed: int = 0, compare: int = 0) -> Dict:
+    """
+    Run `scenarios` random conversations; the first `compare` also on the compiled app
+    """
+    rng = random.Random(seed)
+    workflow = create_workflow()
+    transitions = allowed_transitions(workflow)
+    interpreter = None
+    app = runtime = None
+    if compare:
+        app = workflow.compile(
+            checkpointer=PizzaCheckpointer(
+                sqlite3.connect(":memory:", check_same_thread=False)
+            )
+        )
+        runtime = PizzaRuntime.create()
+
+    failures: List[Tuple[List[str], List[str]]] = []
+    mismatches: List[Tuple[List[str], List[List[str]], List[List[str]]]] = []
+    turns_run = 0
+    start = time.perf_counter()
+    for index in range(scenarios):
+        if index % RUNTIME_REFRESH == 0:
+            interpreter = GraphInterpreter(workflow, context=PizzaRuntime.create())
+        turns = generate_conversation(rng)
+        outcome = run_interpreted(interpreter, turns)
+        turns_run += len(outcome.paths)
+        problems = check_properties(outcome, transitions)
+        if problems:
+            fails = lambda candidate: bool(
+                check_properties(run_interpreted(interpreter, candidate), transitions)
+            )
+            failures.append((shrink(turns, fails), problems))
+        if index < compare:
+            compiled = run_compiled(app, runtime, turns, f"fuzz-{index}")
+            if compiled.paths != outcome.paths:
+                mismatches.append((turns, outcome.paths, compiled.paths))
+    elapsed = time.perf_counter() - start
+    return {
+        "scenarios": scenarios,
+        "turns": turns_run,
+        "seed": seed,
+        "compared": min(compare, scenarios),
+        "elapsed_s": round(elapsed, 3),
+        "scenarios_per_sec": round(scenarios / elapsed, 1) if elapsed else 0.0,
+        "failures": failures,
+        "mismatches": mismatches,
+    }
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Fuzz pizza conversations through the graph interpreter"
+    )
+    parser.add_argument("--scenarios", type=int, default=10000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--compare",
+        type=int,
+        default=0,
+        help="Also run the first N on the compiled app",
+    )
+    args = parser.parse_args(argv)
+
+    result = fuzz(args.scenarios, args.seed, args.compare)
+    print(
+        f"{result['scenarios']} scenarios ({result['turns']} turns) "
+        f"in {result['elapsed_s']} s "
+        f"= {result['scenarios_per_sec']} scenarios/s, seed {result['seed']}"
+    )
+    if args.compare:
+        print(
+            f"Compared with the compiled app: {result['compared']} scenarios, "
+            f"{len(result['mismatches'])} path mismatches"
+        )
+    for turns, interpreted, compiled in result["mismatches"][:5]:
+        print(
+            f"  MISMATCH {turns}\n"
+            f"    interpreter {interpreted}\n"
+            f"    compiled    {compiled}"
+        )
+    for turns, problems in result["failures"][:5]:
+        print(f"  FAILED {turns}: {'; '.join(problems)}")
+    return 1 if result["failures"] or result["mismatches"] else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
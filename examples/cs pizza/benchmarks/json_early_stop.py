@@ -0,0 +1,115 @@
+"""
+Early-stopped JSON decisions benchmark.
+Times the pizza triage decision against the bundled Ollama stub at a given
+generation speed: parsing the full reply after it has been generated
+(json.loads, as before) versus the incremental parser, which closes the
+stream once `wants_pizza` is complete and so never generates the reason.
+
+Usage:
+    python -m benchmarks.json_early_stop --tokens-per-sec 30 --requests 10
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from agents import TriageAgentLLM
+from benchmarks.batch_sessions import percentile
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+from common.json_stream import parse_json_stream
+from common.llm_clients import ClientRegistry
+from common.ollama_stub import OllamaStub
+
+REPLY = (
+    '{"wants_pizza": true, "reason": '
+    '"The user explicitly mentions wanting to order a pizza, '
+    'which clearly indicates interest in food and in using the pizza ordering system."}'
+)
+
+def run_benchmark(
+    requests: int = 10, ttft: float = 0.1, tokens_per_sec: float = 30.0
+) -> Dict[str, Any]:
+    registry = ClientRegistry()
+    agent = TriageAgentLLM(
+        {"user_input": "I want to order a pizza", "pizza_request": ""}
+    )
+    runs = []
+    try:
+        with OllamaStub(
+            default_reply=REPLY, ttft=ttft, tokens_per_sec=tokens_per_sec
+        ) as stub:
+            llm = registry.chat_model("mistral:latest", stub.base_url, temperature=0.1)
+            prompt = agent.prompt().invoke(
+                {"user_input": agent.state["user_input"], "pizza_request": ""}
+            )
+            modes = {
+                "full_generation": lambda: json.loads(llm.invoke(prompt).content),
+                "early_stop": lambda: parse_json_stream(
+                    llm.stream(prompt), agent.required_keys, agent.output_schema
+                ).values,
+            }
+            for mode, decide in modes.items():
+                stub.reset_metrics()
+                latencies = []
+                for _ in range(requests):
+                    start = time.perf_counter()
+                    decision = decide()
+                    latencies.append(time.perf_counter() - start)
+                # Cancelled streams are recorded once the stub notices the closed
+                # connection
+                time.sleep(2 / tokens_per_sec if tokens_per_sec else 0.05)
+                metrics = stub.metrics()
+                latencies.sort()
+                runs.append({
+                    "mode": mode,
+                    "wants_pizza": decision["wants_pizza"],
+                    "latency_ms": {
+                        "mean": round(sum(latencies) / requests * 1e3, 1),
+                        "p50": round(percentile(latencies, 50) * 1e3, 1),
+                        "max": round(latencies[-1] * 1e3, 1),
+                    },
+                    "tokens_generated": metrics["tokens"],
+                    "cancelled": metrics["cancelled"],
+                })
+    finally:
+        registry.close()
+    runs[1]["speedup"] = round(
+        runs[0]["latency_ms"]["mean"] / runs[1]["latency_ms"]["mean"], 2
+    )
+    return {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "config": {
+            "requests": requests,
+            "ttft_ms": ttft * 1e3,
+            "tokens_per_sec": tokens_per_sec,
+            "python": platform.python_version(),
+            "cpu_count": os.cpu_count(),
+        },
+        "runs": runs,
+    }
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(
+        description="Compare full and early-stopped triage decisions"
+    )
+    parser.add_argument("--requests", type=int, default=10)
+    parser.add_argument("--ttft-ms", type=float, default=100.0)
+    parser.add_argument("--tokens-per-sec", type=float, default=30.0)
+    parser.add_argument("--output", help="Write the JSON report to this file")
+    args = parser.parse_args(argv)
+
+    report = run_benchmark(args.requests, args.ttft_ms / 1e3, args.tokens_per_sec)
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    print(output)
+
+if __name__ == "__main__":
+    main()
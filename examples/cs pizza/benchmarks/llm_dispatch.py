@@ -0,0 +1,203 @@
+"""
+LLM dispatcher benchmark.
+Simulates bursts of concurrent users that each send a triage prompt and
+compares calling the model directly with going through the micro-batching
+dispatcher. The model is the bundled Ollama stub (common/ollama_stub.py)
+with an injected time to first token and a fixed number of parallel slots
+(like OLLAMA_NUM_PARALLEL), so the run needs no Ollama and shows queueing,
+not model speed.
+
+Prompts are drawn from `--distinct` variants with a skewed distribution
+(a few openers are very common), so identical prompts arrive together as
+they do from real sessions.
+
+Usage:
+    python -m benchmarks.llm_dispatch --users 50 100 250 500 --latency-ms 200
+    python -m benchmarks.llm_dispatch --distinct 1000 --output dispatch.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from benchmarks.batch_sessions import SYNTHETIC_OPENERS, SYNTHETIC_PIZZAS, percentile
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+from common.llm_clients import ClientRegistry
+from common.llm_dispatcher import LLMDispatcher
+from common.ollama_stub import OllamaStub
+
+TRIAGE_PROMPT = (
+    "You are a triage agent for a pizza ordering system.\n"
+    'User input: "{user_input}"\n'
+    "Respond with JSON."
+)
+
+def prompt_variants(distinct: int) -> List[str]:
+    """`distinct` user openers; earlier ones are the common phrasings"""
+    variants = [
+        opener.format(pizza=pizza)
+        for opener in SYNTHETIC_OPENERS
+        for pizza in SYNTHETIC_PIZZAS
+    ]
+    variants += [
+        f"I want to order pizza number {index}"
+        for index in range(max(0, distinct - len(variants)))
+    ]
+    return variants[:distinct]
+
+def user_prompts(users: int, distinct: int, seed: int = 0) -> List[str]:
+    """One prompt per user, Zipf-like over the variants"""
+    variants = prompt_variants(distinct)
+    weights = [1 / (rank + 1) for rank in range(len(variants))]
+    return [
+        TRIAGE_PROMPT.format(user_input=text)
+        for text in random.Random(seed).choices(variants, weights, k=users)
+    ]
+
+def run_burst(
+    mode: str, prompts: List[str], stub: OllamaStub, max_concurrency: int, window: float
+) -> Dict[str, Any]:
+    """All users send at once; latency is measured per user from the common start"""
+    registry = ClientRegistry(
+        max_connections=max_concurrency, max_keepalive_connections=max_concurrency
+    )
+    llm = registry.chat_model(
+        "mistral:latest", stub.base_url, temperature=0.1, tags=["nostream"]
+    )
+    dispatcher = (
+        LLMDispatcher(window=window, max_concurrency=max_concurrency)
+        if mode == "dispatcher"
+        else None
+    )
+    upstream_before = stub.metrics()["requests"]
+    start_gate = threading.Barrier(len(prompts) + 1)
+
+    def user(prompt: str) -> float:
+        start_gate.wait()
+        started = time.perf_counter()
+        if dispatcher is not None:
+            dispatcher.invoke(llm, prompt)
+        else:
+            llm.invoke(prompt)
+        return time.perf_counter() - started
+
+    with ThreadPoolExecutor(max_workers=len(prompts)) as pool:
+        futures = [pool.submit(user, prompt) for prompt in prompts]
+        start_gate.wait()
+        start = time.perf_counter()
+        latencies = sorted(future.result() for future in futures)
+        elapsed = time.perf_counter() - start
+    result = {
+        "mode": mode,
+        "users": len(prompts),
+        "distinct_prompts": len(set(prompts)),
+        "upstream_calls": stub.metrics()["requests"] - upstream_before,
+        "elapsed_s": round(elapsed, 4),
+        "requests_per_sec": round(len(prompts) / elapsed, 2) if elapsed else 0.0,
+        "latency_ms": {
+            "p50": round(percentile(latencies, 50) * 1e3, 1),
+            "p95": round(percentile(latencies, 95) * 1e3, 1),
+            "max": round(latencies[-1] * 1e3, 1),
+        },
+    }
+    if dispatcher is not None:
+        dispatcher.close()
+        metrics = dispatcher.metrics()
+        result["dispatcher"] = {
+            key: metrics[key]
+            for key in ("coalesced", "batches", "mean_batch", "max_batch")
+        }
+    registry.close()
+    return result
+
+def run_benchmark(
+    users: List[int],
+    distinct: int = 40,
+    latency: float = 0.2,
+    parallel: int = 4,
+    max_concurrency: int = 4,
+    window: float = 0.005,
+) -> Dict[str, Any]:
+    runs = []
+    with OllamaStub(
+        default_reply='{"wants_pizza": true, "reason": "stub"}',
+        ttft=latency,
+        parallel=parallel,
+    ) as stub:
+        for count in users:
+            prompts = user_prompts(count, distinct)
+            direct = run_burst("direct", prompts, stub, max_concurrency, window)
+            batched = run_burst("dispatcher", prompts, stub, max_concurrency, window)
+            batched["throughput_gain"] = round(
+                batched["requests_per_sec"] / direct["requests_per_sec"], 2
+            )
+            runs += [direct, batched]
+    return {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "config": {
+            "distinct": distinct,
+            "latency_ms": latency * 1e3,
+            "stub_parallel": parallel,
+            "max_concurrency": max_concurrency,
+            "window_ms": window * 1e3,
+            "python": platform.python_version(),
+            "cpu_count": os.cpu_count(),
+        },
+        "runs": runs,
+    }
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(
+        description="Compare direct LLM calls with the micro-batching dispatcher"
+    )
+    parser.add_argument(
+        "--users",
+        type=int,
+        nargs="+",
+        default=[50, 100, 250, 500],
+        help="Concurrent users per burst",
+    )
+    parser.add_argument(
+        "--distinct", type=int, default=40, help="Number of distinct user openers"
+    )
+    parser.add_argument(
+        "--latency-ms", type=float, default=200.0, help="Stub model latency per request"
+    )
+    parser.add_argument(
+        "--parallel", type=int, default=4, help="Requests the stub model serves at once"
+    )
+    parser.add_argument(
+        "--max-concurrency",
+        type=int,
+        default=4,
+        help="Connections (direct) / dispatcher workers",
+    )
+    parser.add_argument("--window-ms", type=float, default=5.0)
+    parser.add_argument("--output", help="Write the JSON report to this file")
+    args = parser.parse_args(argv)
+
+    report = run_benchmark(
+        args.users,
+        args.distinct,
+        args.latency_ms / 1e3,
+        args.parallel,
+        args.max_concurrency,
+        args.window_ms / 1e3,
+    )
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    print(output)
+
+if __name__ == "__main__":
+    main()
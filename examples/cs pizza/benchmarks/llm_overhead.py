@@ -0,0 +1,163 @@
+"""
+LLM orchestration overhead benchmark.
+Sends sequential requests through the client stack the agents use
+(registry client, streaming, prompt | model | parser chain, dispatcher) to
+the bundled Ollama stub, and subtracts the model time the stub simulated
+from the measured latency. What is left is our overhead per call: client
+setup, serialization, LangChain callbacks and parsing. It is independent
+of model speed, so it can be compared across CPU-only machines.
+
+`setup_us` compares preparing an agent call the old way (parse the
+template and build prompt | llm | parser on every call) with the agents'
+cached per-class template and chain, without any request.
+
+Usage:
+    python -m benchmarks.llm_overhead --requests 200
+    python -m benchmarks.llm_overhead --ttft-ms 200 --tokens-per-sec 30 \
+        --output overhead.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+import timeit
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+from langchain_core.output_parsers import StrOutputParser
+from langchain_core.prompts import ChatPromptTemplate, PromptTemplate
+
+from agents import PizzaAgentLLM
+from benchmarks.batch_sessions import percentile
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+from common.llm_clients import ClientRegistry
+from common.llm_dispatcher import LLMDispatcher
+from common.ollama_stub import OllamaStub
+
+REPLY = (
+    "I recommend the Classic Margherita - tomato, mozzarella and basil. "
+    "Enjoy your pizza!"
+)
+PROMPT = PromptTemplate.from_template(
+    "You are a pizza recommendation agent.\nUser's pizza request: \"{pizza_request}\""
+)
+
+def measure(
+    name: str, call: Callable[[int], Any], stub: OllamaStub, requests: int
+) -> Dict[str, Any]:
+    """
+    Latency of `requests` sequential calls and the part of it not spent in the model
+    """
+    call(-1)  # warm up: client construction and first connection
+    stub.reset_metrics()
+    latencies = []
+    for index in range(requests):
+        start = time.perf_counter()
+        call(index)
+        latencies.append(time.perf_counter() - start)
+    model_time = stub.metrics()["model_time_s"]
+    total = sum(latencies)
+    latencies.sort()
+    return {
+        "path": name,
+        "requests": requests,
+        "latency_ms": {
+            "mean": round(total / requests * 1e3, 3),
+            "p50": round(percentile(latencies, 50) * 1e3, 3),
+            "p95": round(percentile(latencies, 95) * 1e3, 3),
+        },
+        "model_ms": round(model_time / requests * 1e3, 3),
+        "overhead_ms": round((total - model_time) / requests * 1e3, 3),
+    }
+
+def setup_cost(llm, iterations: int = 2000) -> Dict[str, float]:
+    """
+    Microseconds to get a ready chain for one PizzaAgentLLM call: rebuilt vs cached
+    """
+    agent = PizzaAgentLLM({"user_input": "", "pizza_request": "veggie"})
+
+    def rebuilt():
+        messages = [
+            ("system", agent.get_system_prompt()),
+            ("human", agent.get_user_template()),
+        ]
+        ChatPromptTemplate.from_messages(messages) | llm | StrOutputParser()
+
+    agent.chain(llm)
+    rebuilt_s = min(timeit.repeat(rebuilt, number=iterations, repeat=3)) / iterations
+    cached_s = (
+        min(timeit.repeat(lambda: agent.chain(llm), number=iterations, repeat=3))
+        / iterations
+    )
+    return {"rebuilt": round(rebuilt_s * 1e6, 2), "cached": round(cached_s * 1e6, 2),
+            "saved": round((rebuilt_s - cached_s) * 1e6, 2)}
+
+def run_benchmark(
+    requests: int = 200, ttft: float = 0.0, tokens_per_sec: float = 0.0
+) -> Dict[str, Any]:
+    registry = ClientRegistry()
+    dispatcher = LLMDispatcher(window=0.0)
+    try:
+        with OllamaStub(
+            default_reply=REPLY, ttft=ttft, tokens_per_sec=tokens_per_sec
+        ) as stub:
+            llm = registry.chat_model("mistral:latest", stub.base_url, temperature=0.1)
+            chain = PROMPT | llm | StrOutputParser()
+            paths = {
+                "invoke": lambda index: llm.invoke(f"pizza {index}"),
+                "stream": lambda index: list(llm.stream(f"pizza {index}")),
+                "chain": lambda index: chain.invoke(
+                    {"pizza_request": f"pizza {index}"}
+                ),
+                "dispatcher": lambda index: dispatcher.invoke(llm, f"pizza {index}"),
+            }
+            runs = [measure(name, call, stub, requests) for name, call in paths.items()]
+            setup = setup_cost(llm)
+    finally:
+        dispatcher.close()
+        registry.close()
+    return {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "config": {
+            "requests": requests,
+            "ttft_ms": ttft * 1e3,
+            "tokens_per_sec": tokens_per_sec,
+            "python": platform.python_version(),
+            "cpu_count": os.cpu_count(),
+        },
+        "runs": runs,
+        "setup_us": setup,
+    }
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(
+        description="Measure LLM client overhead against the Ollama stub"
+    )
+    parser.add_argument(
+        "--requests", type=int, default=200, help="Sequential requests per path"
+    )
+    parser.add_argument(
+        "--ttft-ms", type=float, default=0.0, help="Stub delay before the first token"
+    )
+    parser.add_argument(
+        "--tokens-per-sec",
+        type=float,
+        default=0.0,
+        help="Stub streaming speed; 0 for no delay",
+    )
+    parser.add_argument("--output", help="Write the JSON report to this file")
+    args = parser.parse_args(argv)
+
+    report = run_benchmark(args.requests, args.ttft_ms / 1e3, args.tokens_per_sec)
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    print(output)
+
+if __name__ == "__main__":
+    main()
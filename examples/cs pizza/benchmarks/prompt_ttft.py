@@ -0,0 +1,192 @@
+"""
+Time-to-first-token benchmark for prompt layout, keep_alive and warm-up.
+
+- cold_vs_warm: the first triage request after the server started, without
+  and with `start_warm_up` (model load and system prompt evaluated before
+  the request arrives).
+- before_vs_after: a series of triage requests with different user input,
+  with the previous layout (one text, the user input in the middle of the
+  instructions) and with the agents' layout (fixed system message, then the
+  user message). Only the second keeps a shared prefix Ollama can reuse.
+
+Against the bundled Ollama stub, which simulates model loading and prompt
+evaluation outside its prefix cache; with --base-url against a real Ollama,
+where the model is unloaded (keep_alive 0) before each cold run.
+
+Usage:
+    python -m benchmarks.prompt_ttft --requests 10
+    python -m benchmarks.prompt_ttft --load-ms 3000 --prompt-tokens-per-sec 150
+    python -m benchmarks.prompt_ttft --base-url http://127.0.0.1:11434 \
+        --output ttft.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from itertools import cycle, islice
+from typing import Any, Dict, Iterator, List, Optional
+
+import httpx
+
+from agents import TriageAgentLLM
+from benchmarks.batch_sessions import SYNTHETIC_OPENERS, SYNTHETIC_PIZZAS, percentile
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+from common.llm_clients import DEFAULT_MODEL, ClientRegistry, start_warm_up
+from common.ollama_stub import OllamaStub
+
+REPLY = '{"wants_pizza": true, "reason": "The user mentions pizza"}'
+
+# The triage prompt before it was split into system and user messages
+BEFORE_TEMPLATE = """
+        You are a triage agent for a pizza ordering system.
+        User input: "{user_input}"
+
+        Determine if the user wants to order pizza or wants to exit.
+        Respond with JSON in this format:
+        {{"wants_pizza": true/false, "reason": "explanation"}}
+
+        If the user mentions pizza, food, hungry, order, or similar terms, set wants_pizza to true.
+        If the user says no, exit, quit, bye, or similar terms, set wants_pizza to false.
+        """
+
+def time_to_first_token(llm, prompt: Any) -> float:
+    start = time.perf_counter()
+    stream = iter(llm.stream(prompt))
+    try:
+        next(stream)
+        return time.perf_counter() - start
+    finally:
+        stream.close()
+
+def unload(base_url: str, model: str):
+    """Ask Ollama to unload the model, so the next request loads it"""
+    httpx.post(
+        f"{base_url}/api/generate", json={"model": model, "keep_alive": 0}, timeout=60
+    ).raise_for_status()
+
+@contextmanager
+def fresh_server(base_url: Optional[str], model: str, **stub_options) -> Iterator[str]:
+    """
+    A server with the model not loaded: a new stub, or the real server after unloading
+    """
+    if base_url:
+        unload(base_url, model)
+        yield base_url
+    else:
+        with OllamaStub(default_reply=REPLY, **stub_options) as stub:
+            yield stub.base_url
+
+def summary(latencies: List[float]) -> Dict[str, float]:
+    ordered = sorted(latencies)
+    return {
+        "mean": round(sum(ordered) / len(ordered) * 1e3, 1),
+        "p50": round(percentile(ordered, 50) * 1e3, 1),
+        "p95": round(percentile(ordered, 95) * 1e3, 1),
+    }
+
+def run_benchmark(
+    requests: int = 10,
+    base_url: Optional[str] = None,
+    model: str = DEFAULT_MODEL,
+    load_time: float = 1.5,
+    prompt_tokens_per_sec: float = 200.0,
+    tokens_per_sec: float = 30.0,
+) -> Dict[str, Any]:
+    stub_options = {
+        "load_time": load_time,
+        "prompt_tokens_per_sec": prompt_tokens_per_sec,
+        "tokens_per_sec": tokens_per_sec,
+    }
+    agent = TriageAgentLLM({})
+    system_prompt = agent.prompt().messages[0].format().content
+    # Different user input per request, as in real sessions
+    inputs = [opener.format(pizza=pizza) for opener, pizza in
+              islice(zip(cycle(SYNTHETIC_OPENERS), cycle(SYNTHETIC_PIZZAS)), requests)]
+    layouts = {
+        "before": lambda text: BEFORE_TEMPLATE.format(user_input=text),
+        "after": lambda text: agent.prompt().invoke({"user_input": text}),
+    }
+    runs = []
+    registry = ClientRegistry()
+    try:
+        for warm in (False, True):
+            with fresh_server(base_url, model, **stub_options) as url:
+                if warm:
+                    start_warm_up({model: [system_prompt]}, registry, url).join()
+                llm = registry.chat_model(model, url, temperature=0.1)
+                first = time_to_first_token(llm, layouts["after"](inputs[0]))
+            runs.append(
+                {
+                    "comparison": "cold_vs_warm",
+                    "mode": "warm" if warm else "cold",
+                    "first_request_ttft_ms": round(first * 1e3, 1),
+                }
+            )
+        for layout, build in layouts.items():
+            with fresh_server(base_url, model, **stub_options) as url:
+                llm = registry.chat_model(model, url, temperature=0.1)
+                # Loads the model; the series below measures the prompt layout only
+                time_to_first_token(llm, "hi")
+                latencies = [time_to_first_token(llm, build(text)) for text in inputs]
+            runs.append(
+                {
+                    "comparison": "before_vs_after",
+                    "mode": layout,
+                    "requests": requests,
+                    "ttft_ms": summary(latencies),
+                }
+            )
+    finally:
+        registry.close()
+    return {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "config": {
+            "requests": requests,
+            "server": base_url or "stub",
+            "model": model,
+            "stub_load_ms": None if base_url else load_time * 1e3,
+            "stub_prompt_tokens_per_sec": None if base_url else prompt_tokens_per_sec,
+            "python": platform.python_version(),
+            "cpu_count": os.cpu_count(),
+        },
+        "runs": runs,
+    }
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(
+        description="Measure time to first token: cold vs warm, prompt layouts"
+    )
+    parser.add_argument(
+        "--requests", type=int, default=10, help="Requests per prompt layout"
+    )
+    parser.add_argument(
+        "--base-url", help="Measure a real Ollama server instead of the stub"
+    )
+    parser.add_argument("--model", default=DEFAULT_MODEL)
+    parser.add_argument(
+        "--load-ms", type=float, default=1500.0, help="Stub: time to load the model"
+    )
+    parser.add_argument("--prompt-tokens-per-sec", type=float, default=200.0,
+                        help="Stub: prompt evaluation speed outside the prefix cache")
+    parser.add_argument(
+        "--tokens-per-sec", type=float, default=30.0, help="Stub: generation speed"
+    )
+    parser.add_argument("--output", help="Write the JSON report to this file")
+    args = parser.parse_args(argv)
+
+    report = run_benchmark(args.requests, args.base_url, args.model, args.load_ms / 1e3,
+                           args.prompt_tokens_per_sec, args.tokens_per_sec)
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    print(output)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,503 @@
+"""
+Microbenchmark and regression suite for the pizza hot paths.
+Times the agent nodes, routers, catalog search, recommendations, order
+operations and a full app.invoke against a synthetic catalog and orders of
+configurable size, then compares the results with a stored baseline and
+exits non-zero when a path regresses beyond its tolerance: the threshold,
+or more (up to twice the threshold) for a case whose timings vary more than
+that between runs.
+
+Usage:
+    python -m benchmarks.suite                        # compare with baseline.json
+    python -m benchmarks.suite --save-baseline        # record a new baseline
+    python -m benchmarks.suite --only search --catalog 1000 --threshold 0.15
+"""
+
+import argparse
+import contextlib
+import itertools
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional
+
+from state import Order, StateManager
+from nodes import TriageAgent, PizzaAgent, ContinuationAgent
+from edges import (
+    route_after_triage,
+    route_after_pizza,
+    route_after_continuation,
+    route_after_await_user,
+)
+from runtime import PizzaRuntime
+from services.pizza_service import PizzaCatalogService
+from graph import create_workflow
+from benchmarks.synthetic import generate_catalog, generate_orders
+
+DEFAULT_BASELINE = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "baseline.json"
+)
+DEFAULT_THRESHOLD = 0.25
+# Whole-suite runs per measurement; each case reports its median run
+DEFAULT_RUNS = 3
+# A case may also move by this multiple of its run-to-run spread, but never by
+# more than MAX_TOLERANCE times the threshold
+NOISE_FACTOR = 3.0
+MAX_TOLERANCE = 2.0
+
+USER_INPUTS = [
+    "I want to order a pepperoni pizza",
+    "Give me a meat lovers pizza",
+    "I'm hungry and want something with vegetables",
+    "No thanks, I don't want anything",
+    "something with pineapple and ham",
+]
+
+@dataclass
+class SuiteConfig:
+    """
+    Sizes of the synthetic workload; part of the baseline so results stay comparable
+    """
+    catalog: int = 200
+    orders: int = 200
+    order_items: int = 8
+    seed: int = 42
+
+class Workload:
+    """Synthetic catalog, orders and services shared by the benchmark cases"""
+
+    def __init__(self, config: SuiteConfig):
+        rng = random.Random(config.seed)
+        self.catalog = generate_catalog(config.catalog, rng)
+        self.orders = generate_orders(config.orders, self.catalog, rng)
+        self.runtime = PizzaRuntime.create(
+            catalog_service=PizzaCatalogService(self.catalog)
+        )
+        self.queries = [
+            f"I want a {pizza.name} pizza"
+            for pizza in rng.sample(self.catalog, min(50, len(self.catalog)))
+        ]
+        self.queries += [
+            f"something with {' and '.join(pizza.ingredients[2:4])}"
+            for pizza in rng.sample(self.catalog, min(50, len(self.catalog)))
+        ]
+        self.large_order = Order(items=[])
+        for pizza in rng.sample(
+            self.catalog, min(config.order_items, len(self.catalog))
+        ):
+            self.runtime.order_service.add_pizza_to_order(self.large_order, pizza)
+
+def cycle(values: List) -> Callable[[], object]:
+    """Endless round-robin over values without allocating per call"""
+    state = {"index": 0}
+    def next_value():
+        state["index"] = (state["index"] + 1) % len(values)
+        return values[state["index"]]
+    return next_value
+
+# Each case takes the workload and returns the zero-argument operation to time
+CASES: Dict[str, Callable[[Workload], Callable[[], object]]] = {}
+
+def case(name: str):
+    def register(setup: Callable[[Workload], Callable[[], object]]):
+        CASES[name] = setup
+        return setup
+    return register
+
+@case("triage_agent")
+def _triage(w: Workload):
+    states = cycle(
+        [StateManager.create_initial_state(text, "bench") for text in USER_INPUTS]
+    )
+    return lambda: TriageAgent(states(), w.runtime)
+
+@case("pizza_agent")
+def _pizza(w: Workload):
+    requests = cycle(w.queries)
+    def run():
+        state = StateManager.create_initial_state("", "bench")
+        state["pizza_request"] = requests()
+        state["current_order"] = Order(items=[])
+        return PizzaAgent(state, w.runtime)
+    return run
+
+@case("continuation_agent")
+def _continuation(w: Workload):
+    state = StateManager.create_initial_state("", "bench")
+    state["current_order"] = w.large_order
+    return lambda: ContinuationAgent(state, w.runtime)
+
+@case("routers")
+def _routers(w: Workload):
+    state = StateManager.create_initial_state("", "bench")
+    state.update(wants_pizza=True, requires_user_input=True)
+    def run():
+        route_after_triage(state)
+        route_after_pizza(state)
+        route_after_continuation(state)
+        return route_after_await_user(state)
+    return run
+
+@case("search_pizzas")
+def _search(w: Workload):
+    queries = cycle(w.queries)
+    return lambda: w.runtime.catalog_service.search_pizzas(queries(), max_results=3)
+
+@case("search_pizzas_cached")
+def _search_cached(w: Workload):
+    queries = cycle(w.queries)
+    return lambda: w.runtime.search_pizzas(queries(), max_results=3)
+
+@case("recommend_similar_pizzas")
+def _similar(w: Workload):
+    pizzas = cycle(w.catalog)
+    return lambda: w.runtime.pizza_recommendations.recommend_similar_pizzas(
+        pizzas(), count=2
+    )
+
+@case("order_build")
+def _order_build(w: Workload):
+    order_service = w.runtime.order_service
+    pizzas = [item.pizza for item in w.large_order.items]
+    def run():
+        order = Order(items=[])
+        for pizza in pizzas:
+            order_service.add_pizza_to_order(order, pizza)
+        return order
+    return run
+
+@case("order_summary")
+def _order_summary(w: Workload):
+    return lambda: w.runtime.order_service.get_order_summary(w.large_order)
+
+@case("order_validate")
+def _order_validate(w: Workload):
+    orders = cycle(w.orders)
+    return lambda: w.runtime.order_service.validate_order(orders())
+
+@case("order_add_ons")
+def _order_add_ons(w: Workload):
+    orders = cycle(w.orders)
+    return lambda: w.runtime.order_recommendations.suggest_add_ons(orders())
+
+@case("app_invoke")
+def _app_invoke(w: Workload):
+    app = create_workflow().compile()
+    inputs = cycle(USER_INPUTS)
+    sessions = itertools.count()
+    def run():
+        # A new session per call, ended afterwards, so no order grows over the loop
+        session_id = f"bench-{next(sessions)}"
+        app.invoke(
+            StateManager.create_initial_state(inputs(), session_id), context=w.runtime
+        )
+        w.runtime.end_session(session_id)
+    return run
+
+def measure(
+    operation: Callable[[], object], min_time: float, repeat: int
+) -> Dict[str, float]:
+    """
+    Calibrate a loop count taking ~min_time, then time `repeat` rounds; per-call
+    microseconds
+    """
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            operation()
+        if time.perf_counter() - start >= min_time or number >= 1 << 20:
+            break
+        number *= 2
+    rounds = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            operation()
+        rounds.append((time.perf_counter() - start) / number * 1e6)
+    return {
+        "median_us": statistics.median(rounds),
+        "min_us": min(rounds),
+        "loops": number,
+    }
+
+def _reference_operation():
+    """Fixed pure-Python work used to gauge the machine's current speed"""
+    total = 0
+    for i in range(2000):
+        total += i * i % 7
+    return {"total": total, "items": [str(i) for i in range(50)]}
+
+def measure_relative(
+    operation: Callable[[], object], min_time: float, repeat: int
+) -> Dict[str, float]:
+    """
+    Time a case and add `relative`: its fastest round divided by the fastest
+    round of a reference loop timed right around it, which cancels out
+    machine-wide slowdowns (shared hosts, throttling).
+    """
+    before = measure(_reference_operation, min_time / 2, 3)["min_us"]
+    result = measure(operation, min_time, repeat)
+    after = measure(_reference_operation, min_time / 2, 3)["min_us"]
+    result["relative"] = result["min_us"] / min(before, after)
+    return result
+
+def combine_runs(samples: List[Dict[str, float]]) -> Dict[str, float]:
+    """
+    Median of each measure over several runs of a case, plus `noise`: the median
+    deviation of the runs' relative times from their median, as a share of it
+    (unlike the range, one outlier run does not widen it)
+    """
+    relative = [sample["relative"] for sample in samples]
+    median = statistics.median(relative)
+    deviation = statistics.median(abs(value - median) for value in relative)
+    return {
+        "median_us": statistics.median(sample["median_us"] for sample in samples),
+        "min_us": statistics.median(sample["min_us"] for sample in samples),
+        "loops": max(sample["loops"] for sample in samples),
+        "relative": median,
+        "noise": deviation / median,
+    }
+
+def run_suite(
+    config: SuiteConfig,
+    only: Optional[str] = None,
+    min_time: float = 0.1,
+    repeat: int = 7,
+    workload: Optional[Workload] = None,
+    runs: int = DEFAULT_RUNS,
+) -> Dict[str, Dict[str, float]]:
+    """
+    Time every case (or those whose name contains `only`) in `runs` passes over
+    the suite, so a slow spell of the machine affects one run of many cases
+    rather than every run of one case
+    """
+    workload = workload or Workload(config)
+    names = [name for name in CASES if not only or only in name]
+    samples: Dict[str, List[Dict[str, float]]] = {name: [] for name in names}
+    # Nodes and routers print progress; keep it out of the measurements' output
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        for _ in range(runs):
+            for name in names:
+                samples[name].append(
+                    measure_relative(CASES[name](workload), min_time, repeat)
+                )
+    return {name: combine_runs(samples[name]) for name in names}
+
+def confirm_regressions(
+    results: Dict[str, Dict[str, float]],
+    baseline: Dict[str, Dict[str, float]],
+    threshold: float,
+    workload: Workload,
+    min_time: float,
+    repeat: int,
+    attempts: int = 2,
+    runs: int = DEFAULT_RUNS,
+) -> Dict[str, Dict[str, float]]:
+    """
+    Re-measure apparent regressions in up to `attempts` more sets of `runs` runs;
+    a case then reports the median of all its confirmation runs, so one noisy
+    spell does not fail the suite and a lucky run does not pass it
+    """
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        for row in compare(results, baseline, threshold):
+            name = row["case"]
+            samples: List[Dict[str, float]] = []
+            for _ in range(attempts):
+                if row["status"] != "REGRESSED":
+                    break
+                samples += [
+                    measure_relative(CASES[name](workload), min_time, repeat)
+                    for _ in range(runs)
+                ]
+                results[name] = combine_runs(samples)
+                row = compare({name: results[name]}, baseline, threshold)[0]
+    return results
+
+def compare(results: Dict[str, Dict[str, float]], baseline: Dict[str, Dict[str, float]],
+            threshold: float) -> List[Dict[str, object]]:
+    """
+    Classify every case against the baseline by its machine-relative time
+    (fastest round over the reference loop), the least noise-sensitive measure.
+    A case's tolerance is the threshold, or NOISE_FACTOR times its run-to-run
+    spread (in the baseline or now) if that is larger, capped at MAX_TOLERANCE
+    times the threshold.
+    """
+    rows = []
+    for name, result in results.items():
+        reference = baseline.get(name)
+        if reference is None:
+            rows.append({"case": name, "current": result["min_us"], "baseline": None,
+                         "change": None, "tolerance": None, "status": "new"})
+            continue
+        change = result["relative"] / reference["relative"] - 1
+        noise = max(reference.get("noise", 0.0), result.get("noise", 0.0))
+        tolerance = min(
+            max(threshold, NOISE_FACTOR * noise), MAX_TOLERANCE * threshold
+        )
+        status = (
+            "REGRESSED"
+            if change > tolerance
+            else "improved" if change < -tolerance else "ok"
+        )
+        rows.append(
+            {
+                "case": name,
+                "current": result["min_us"],
+                "baseline": reference["min_us"],
+                "change": change,
+                "tolerance": tolerance,
+                "status": status,
+            }
+        )
+    return rows
+
+def load_baseline(path: str) -> Optional[Dict]:
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+def save_baseline(path: str, config: SuiteConfig, results: Dict[str, Dict[str, float]]):
+    baseline = {
+        "config": vars(config),
+        "environment": {
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+        },
+        "results": {
+            name: {key: round(value, 4) for key, value in result.items()}
+            for name, result in results.items()
+        },
+    }
+    with open(path, "w") as f:
+        json.dump(baseline, f, indent=2)
+        f.write("\n")
+
+def print_rows(rows: List[Dict[str, object]]):
+    print(
+        f"{'case':<26} {'baseline us':>12} {'current us':>12} {'change':>8} "
+        f"{'allowed':>8}  status"
+    )
+    print(f"{'':<26} {'(fastest)':>12} {'(fastest)':>12} {'(rel.)':>8}")
+    for row in rows:
+        baseline = (
+            f"{row['baseline']:12.2f}" if row["baseline"] is not None else f"{'-':>12}"
+        )
+        change = f"{row['change']:+8.1%}" if row["change"] is not None else f"{'-':>8}"
+        tolerance = (
+            f"{row['tolerance']:8.0%}" if row["tolerance"] is not None else f"{'-':>8}"
+        )
+        print(
+            f"{row['case']:<26} {baseline} {row['current']:12.2f} {change} "
+            f"{tolerance}  {row['status']}"
+        )
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Pizza hot-path microbenchmarks with regression check"
+    )
+    parser.add_argument(
+        "--catalog",
+        type=int,
+        default=SuiteConfig.catalog,
+        help="Synthetic catalog size",
+    )
+    parser.add_argument(
+        "--orders", type=int, default=SuiteConfig.orders, help="Synthetic orders"
+    )
+    parser.add_argument("--order-items", type=int, default=SuiteConfig.order_items,
+                        help="Pizzas in the order used by summary/continuation cases")
+    parser.add_argument("--seed", type=int, default=SuiteConfig.seed)
+    parser.add_argument("--only", help="Run only cases whose name contains this string")
+    parser.add_argument(
+        "--min-time", type=float, default=0.1, help="Seconds per timing round"
+    )
+    parser.add_argument("--repeat", type=int, default=7, help="Timing rounds per case")
+    parser.add_argument(
+        "--runs",
+        type=int,
+        default=DEFAULT_RUNS,
+        help="Passes over the suite; each case reports its median pass",
+    )
+    parser.add_argument(
+        "--confirm",
+        type=int,
+        default=2,
+        help="Re-measure apparent regressions this many times before failing",
+    )
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument(
+        "--save-baseline",
+        action="store_true",
+        help="Store these results as the baseline",
+    )
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="Allowed relative slowdown before failing (0.25 = 25%%)")
+    args = parser.parse_args(argv)
+
+    config = SuiteConfig(
+        catalog=args.catalog,
+        orders=args.orders,
+        order_items=args.order_items,
+        seed=args.seed,
+    )
+    workload = Workload(config)
+    results = run_suite(
+        config,
+        only=args.only,
+        min_time=args.min_time,
+        repeat=args.repeat,
+        workload=workload,
+        runs=args.runs,
+    )
+
+    if args.save_baseline:
+        save_baseline(args.baseline, config, results)
+        print_rows(compare(results, {}, args.threshold))
+        print(f"\nBaseline saved to {args.baseline}")
+        return 0
+
+    baseline = load_baseline(args.baseline)
+    if baseline is None:
+        print_rows(compare(results, {}, args.threshold))
+        print(
+            f"\nNo baseline at {args.baseline}; run with --save-baseline to create one"
+        )
+        return 0
+    if baseline["config"] != vars(config):
+        print(
+            f"Baseline was recorded with {baseline['config']}, not {vars(config)}; "
+            "not comparable"
+        )
+        return 2
+
+    results = confirm_regressions(
+        results,
+        baseline["results"],
+        args.threshold,
+        workload,
+        args.min_time,
+        args.repeat,
+        attempts=args.confirm,
+        runs=args.runs,
+    )
+    rows = compare(results, baseline["results"], args.threshold)
+    print_rows(rows)
+    regressed = [row["case"] for row in rows if row["status"] == "REGRESSED"]
+    if regressed:
+        print(
+            f"\n{len(regressed)} case(s) regressed beyond their tolerance: "
+            f"{', '.join(regressed)}"
+        )
+        return 1
+    print(f"\nNo regressions beyond the tolerances (threshold {args.threshold:.0%})")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
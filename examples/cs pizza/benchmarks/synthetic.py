@@ -0,0 +1,45 @@
+"""
+Synthetic catalogs and orders shared by the benchmarks.
+"""
+
+import random
+from datetime import datetime, timedelta
+from typing import List
+
+from state import Order, OrderItem, Pizza
+from services.pizza_service import PizzaCatalogService
+
+def generate_catalog(
+    size: int, rng: random.Random, ingredient_pool: int = 80
+) -> List[Pizza]:
+    """Generate a synthetic catalog on top of the built-in pizzas"""
+    ingredients = [f"ingredient_{i}" for i in range(ingredient_pool)]
+    catalog = PizzaCatalogService().get_all_pizzas()
+    for i in range(max(0, size - len(catalog))):
+        catalog.append(
+            Pizza(
+                name=f"special {i}",
+                description=f"Synthetic special pizza {i}",
+                ingredients=['tomato', 'mozzarella']
+                + rng.sample(ingredients, rng.randint(2, 5)),
+                price=round(rng.uniform(9, 20), 2),
+            )
+        )
+    return catalog
+
+def generate_orders(
+    count: int, catalog: List[Pizza], rng: random.Random
+) -> List[Order]:
+    """Generate orders with 1-4 pizzas created across a week"""
+    start = datetime(2024, 1, 1)
+    orders = []
+    for _ in range(count):
+        created_at = start + timedelta(minutes=rng.randrange(7 * 24 * 60))
+        items = [
+            OrderItem(
+                rng.choice(catalog), quantity=rng.randint(1, 3), timestamp=created_at
+            )
+            for _ in range(rng.randint(1, 4))
+        ]
+        orders.append(Order(items=items, created_at=created_at))
+    return orders
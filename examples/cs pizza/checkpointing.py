@@ -0,0 +1,250 @@
+"""
+Disk-backed checkpointing for the pizza workflow.
+Sessions are stored in a local SQLite database with the session id as the
+LangGraph thread id, so a restarted worker can resume any session from its
+last checkpoint. State objects are encoded with a compact msgpack format, and
+old checkpoints are pruned so storage does not grow with every turn.
+"""
+
+import os
+import sqlite3
+from datetime import datetime
+from typing import Any, Dict, Optional, Tuple
+
+import ormsgpack
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import ChannelVersions, Checkpoint, CheckpointMetadata
+from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+from langgraph.checkpoint.sqlite import SqliteSaver
+
+from state import (
+    Pizza,
+    Order,
+    OrderItem,
+    OrderStatus,
+    ConversationContext,
+    ConversationStatus,
+    ContextUpdate,
+)
+
+# Next to this module, not in whatever directory the process runs from
+DEFAULT_DB_PATH = os.environ.get("PIZZA_CHECKPOINT_DB") or os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "pizza_sessions.db"
+)
+DEFAULT_KEEP_LAST = 4
+
+# msgpack extension codes for pizza state objects
+EXT_PIZZA = 1
+EXT_ORDER_ITEM = 2
+EXT_ORDER = 3
+EXT_CONVERSATION_CONTEXT = 4
+EXT_CONTEXT_UPDATE = 5
+EXT_CONVERSATION_STATUS = 6
+EXT_ORDER_STATUS = 7
+EXT_DATETIME = 8
+
+_OPTIONS = (
+    ormsgpack.OPT_NON_STR_KEYS
+    | ormsgpack.OPT_PASSTHROUGH_DATACLASS
+    | ormsgpack.OPT_PASSTHROUGH_DATETIME
+    | ormsgpack.OPT_PASSTHROUGH_ENUM
+)
+
+def _pack(obj: Any) -> bytes:
+    return ormsgpack.packb(obj, default=_encode, option=_OPTIONS)
+
+def _unpack(data: bytes) -> Any:
+    return ormsgpack.unpackb(data, ext_hook=_decode, option=ormsgpack.OPT_NON_STR_KEYS)
+
+def _encode(obj: Any) -> ormsgpack.Ext:
+    """Encode pizza state objects as positional field tuples"""
+    if isinstance(obj, Pizza):
+        return ormsgpack.Ext(
+            EXT_PIZZA,
+            _pack((obj.name, obj.description, obj.ingredients, obj.price, obj.size)),
+        )
+    if isinstance(obj, OrderItem):
+        return ormsgpack.Ext(EXT_ORDER_ITEM, _pack(
+            (obj.pizza, obj.quantity, obj.special_instructions, obj.timestamp)))
+    if isinstance(obj, Order):
+        return ormsgpack.Ext(
+            EXT_ORDER, _pack((obj.items, obj.status, obj.created_at, obj.total_amount))
+        )
+    if isinstance(obj, ConversationContext):
+        return ormsgpack.Ext(EXT_CONVERSATION_CONTEXT, _pack(
+            (obj.turn_count, obj.status, obj.last_agent, obj.conversation_history)))
+    if isinstance(obj, ContextUpdate):
+        return ormsgpack.Ext(EXT_CONTEXT_UPDATE, _pack((obj.turns, obj.status)))
+    if isinstance(obj, ConversationStatus):
+        return ormsgpack.Ext(EXT_CONVERSATION_STATUS, obj.value.encode())
+    if isinstance(obj, OrderStatus):
+        return ormsgpack.Ext(EXT_ORDER_STATUS, obj.value.encode())
+    if isinstance(obj, datetime):
+        return ormsgpack.Ext(EXT_DATETIME, obj.isoformat().encode())
+    raise TypeError(
+        f"Unsupported type for pizza state serializer: {type(obj).__name__}"
+    )
+
+def _decode(code: int, data: bytes) -> Any:
+    if code == EXT_CONVERSATION_STATUS:
+        return ConversationStatus(data.decode())
+    if code == EXT_ORDER_STATUS:
+        return OrderStatus(data.decode())
+    if code == EXT_DATETIME:
+        return datetime.fromisoformat(data.decode())
+
+    fields = _unpack(data)
+    if code == EXT_PIZZA:
+        return Pizza(*fields)
+    if code == EXT_ORDER_ITEM:
+        return OrderItem(*fields)
+    if code == EXT_ORDER:
+        items, status, created_at, total_amount = fields
+        order = Order(items, status=status, created_at=created_at)
+        order.total_amount = total_amount
+        return order
+    if code == EXT_CONVERSATION_CONTEXT:
+        return ConversationContext(*fields)
+    if code == EXT_CONTEXT_UPDATE:
+        turns, status = fields
+        return ContextUpdate(turns=tuple(tuple(turn) for turn in turns), status=status)
+    raise ValueError(f"Unknown pizza state extension code: {code}")
+
+class PizzaStateSerializer:
+    """
+    Checkpoint serializer for PizzaState.
+    Pizza, Order, ConversationContext and the enums are stored as compact
+    positional msgpack extensions instead of LangGraph's generic
+    module/class/keyword encoding. Values containing any other type fall back
+    to JsonPlusSerializer.
+    """
+
+    TYPE = "pizza-msgpack"
+
+    def __init__(self):
+        self.fallback = JsonPlusSerializer()
+
+    def dumps(self, obj: Any) -> bytes:
+        return self.fallback.dumps(obj)
+
+    def loads(self, data: bytes) -> Any:
+        return self.fallback.loads(data)
+
+    def dumps_typed(self, obj: Any) -> Tuple[str, bytes]:
+        if obj is None or isinstance(obj, (bytes, bytearray)):
+            return self.fallback.dumps_typed(obj)
+        try:
+            return self.TYPE, _pack(obj)
+        except (TypeError, ormsgpack.MsgpackEncodeError):
+            return self.fallback.dumps_typed(obj)
+
+    def loads_typed(self, data: Tuple[str, bytes]) -> Any:
+        type_, payload = data
+        if type_ == self.TYPE:
+            return _unpack(payload)
+        return self.fallback.loads_typed(data)
+
+class PizzaCheckpointer(SqliteSaver):
+    """
+    SQLite checkpointer that keeps only the newest `keep_last` checkpoints
+    (and their pending writes) per session. `keep_last=None` disables pruning.
+    """
+
+    def __init__(
+        self, conn: sqlite3.Connection, keep_last: Optional[int] = DEFAULT_KEEP_LAST
+    ):
+        super().__init__(conn, serde=PizzaStateSerializer())
+        self.keep_last = keep_last
+
+    @classmethod
+    def open(
+        cls, path: str = DEFAULT_DB_PATH, keep_last: Optional[int] = DEFAULT_KEEP_LAST
+    ) -> "PizzaCheckpointer":
+        """Open (or create) a checkpoint database shared by the graph's threads"""
+        conn = sqlite3.connect(path, check_same_thread=False)
+        # WAL is enabled by setup(); NORMAL sync is durable across process crashes
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return cls(conn, keep_last=keep_last)
+
+    def put(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        saved = super().put(config, checkpoint, metadata, new_versions)
+        if self.keep_last is not None:
+            configurable = saved["configurable"]
+            self.prune(configurable["thread_id"], configurable["checkpoint_ns"])
+        return saved
+
+    def prune(
+        self, thread_id: str, checkpoint_ns: str = "", keep_last: Optional[int] = None
+    ) -> int:
+        """
+        Delete all but the newest checkpoints of a thread; returns checkpoints removed
+        """
+        keep_last = keep_last or self.keep_last or 1
+        with self.cursor() as cur:
+            oldest_kept = cur.execute(
+                """SELECT checkpoint_id FROM checkpoints
+                   WHERE thread_id = ? AND checkpoint_ns = ?
+                   ORDER BY checkpoint_id DESC LIMIT 1 OFFSET ?""",
+                (str(thread_id), checkpoint_ns, keep_last - 1),
+            ).fetchone()
+            if oldest_kept is None:
+                return 0
+            # Checkpoint ids increase over time. Writes are pruned by id, not by
+            # "has no checkpoint row": checkpoints are saved in the background, so
+            # the pending writes (e.g. an interrupt) of a checkpoint that is not
+            # stored yet may already be there
+            cur.execute(
+                "DELETE FROM checkpoints "
+                "WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id < ?",
+                (str(thread_id), checkpoint_ns, oldest_kept[0]),
+            )
+            removed = cur.rowcount
+            if removed:
+                cur.execute(
+                    "DELETE FROM writes "
+                    "WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id < ?",
+                    (str(thread_id), checkpoint_ns, oldest_kept[0]),
+                )
+        return removed
+
+    def prune_all(self, keep_last: Optional[int] = None) -> int:
+        """
+        Apply pruning to every stored thread, e.g. for a database written without it
+        """
+        with self.cursor(transaction=False) as cur:
+            threads = cur.execute(
+                "SELECT DISTINCT thread_id, checkpoint_ns FROM checkpoints"
+            ).fetchall()
+        return sum(
+            self.prune(thread_id, checkpoint_ns, keep_last)
+            for thread_id, checkpoint_ns in threads
+        )
+
+    def storage_stats(self) -> Dict[str, int]:
+        """Row counts and stored payload bytes"""
+        with self.cursor(transaction=False) as cur:
+            checkpoints, checkpoint_bytes = cur.execute(
+                "SELECT COUNT(*), COALESCE(SUM(LENGTH(checkpoint)), 0) FROM checkpoints"
+            ).fetchone()
+            writes, write_bytes = cur.execute(
+                "SELECT COUNT(*), COALESCE(SUM(LENGTH(value)), 0) FROM writes"
+            ).fetchone()
+            threads = cur.execute(
+                "SELECT COUNT(DISTINCT thread_id) FROM checkpoints"
+            ).fetchone()[0]
+        return {
+            "threads": threads,
+            "checkpoints": checkpoints,
+            "writes": writes,
+            "payload_bytes": checkpoint_bytes + write_bytes
+        }
+
+def session_config(session_id: str) -> RunnableConfig:
+    """Graph config addressing a session's checkpoint thread"""
+    return {"configurable": {"thread_id": session_id}}
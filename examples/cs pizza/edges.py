@@ -1,5 +1,9 @@
 from typing import Literal
 from state import PizzaState
+from pizza_logging import get_logger
+
+# Routing decisions are high volume: DEBUG, and sampled when PIZZA_LOG_SAMPLE is set
+logger = get_logger("edges")
 
 def route_after_triage(state: PizzaState) -> Literal["pizza_agent", "__end__"]:
     """
@@ -9,29 +13,46 @@ def route_after_triage(state: PizzaState) -> Literal["pizza_agent", "__end__"]:
     wants_pizza = state.get('wants_pizza', False)
     
     if wants_pizza:
-        print("Routing: User wants pizza -> pizza_agent")
+        logger.debug("Routing: User wants pizza -> pizza_agent")
         return "pizza_agent"
     else:
-        print("Routing: User doesn't want pizza -> __end__")
+        logger.debug("Routing: User doesn't want pizza -> __end__")
         return "__end__"
 
 def route_after_pizza(state: PizzaState) -> Literal["continuation_agent"]:
     """
     Routing function after pizza agent - always goes to continuation.
     """
-    print("Routing: Pizza processed -> continuation_agent")
+    logger.debug("Routing: Pizza processed -> continuation_agent")
     return "continuation_agent"
 
-def route_after_continuation(state: PizzaState) -> Literal["triage", "__end__"]:
+def route_after_continuation(
+    state: PizzaState,
+) -> Literal["triage", "await_user", "__end__"]:
     """
     Routing function after continuation agent.
-    Routes back to triage if user wants another pizza, otherwise ends.
+    Routes back to triage if user wants another pizza, waits for the user's
+    reply when one is needed, otherwise ends.
     """
     continue_ordering = state.get('continue_ordering', False)
     
     if continue_ordering:
-        print("Routing: User wants another pizza -> triage")
+        logger.debug("Routing: User wants another pizza -> triage")
         return "triage"
+    elif state.get('requires_user_input', False):
+        logger.debug("Routing: Waiting for user -> await_user")
+        return "await_user"
+    else:
+        logger.debug("Routing: Order complete -> __end__")
+        return "__end__"
+
+def route_after_await_user(state: PizzaState) -> Literal["pizza_agent", "__end__"]:
+    """
+    Routing function after the user's reply to the continuation question.
+    """
+    if state.get('wants_pizza', False):
+        logger.debug("Routing: User wants another pizza -> pizza_agent")
+        return "pizza_agent"
     else:
-        print("Routing: Order complete -> __end__")
-        return "__end__"
\ No newline at end of file
+        logger.debug("Routing: Order complete -> __end__")
+        return "__end__"
@@ -0,0 +1,101 @@
+"""
+Pizza workflow graph definition.
+Node wrappers adapt the business-logic nodes to LangGraph: shared services
+arrive through the run context, and the continuation point is a real
+interrupt, so a user's reply resumes the graph at the node that was waiting.
+"""
+
+from langgraph.graph import StateGraph, END
+from langgraph.runtime import Runtime
+from langgraph.types import interrupt
+
+from nodes import TriageAgent, PizzaAgent, ContinuationAgent, AwaitUserAgent
+from state import PizzaState
+from edges import (
+    route_after_triage,
+    route_after_pizza,
+    route_after_continuation,
+    route_after_await_user,
+)
+from runtime import PizzaRuntime
+
+# Initialize agent nodes; shared services arrive through the run context
+def triage_agent_node(state: PizzaState, runtime: Runtime[PizzaRuntime]) -> PizzaState:
+    return TriageAgent(state, runtime.context)
+
+def pizza_agent_node(state: PizzaState, runtime: Runtime[PizzaRuntime]) -> PizzaState:
+    return PizzaAgent(state, runtime.context)
+
+def continuation_agent_node(
+    state: PizzaState, runtime: Runtime[PizzaRuntime]
+) -> PizzaState:
+    return ContinuationAgent(state, runtime.context)
+
+def await_user_node(state: PizzaState, runtime: Runtime[PizzaRuntime]) -> PizzaState:
+    # Pauses the run; resuming with Command(resume=<reply>) re-enters here
+    user_input = interrupt({
+        "question": "Would you like to add another pizza or complete your order?",
+        "session_id": state.get("session_id")
+    })
+    return AwaitUserAgent(state, user_input, runtime.context)
+
+def create_workflow(wait_for_user: bool = True) -> StateGraph:
+    """
+    Build the (uncompiled) pizza ordering graph.
+    With `wait_for_user=False` the run ends at the continuation question and
+    the reply has to start a new run from triage (the pre-interrupt behaviour).
+    """
+    workflow = StateGraph(PizzaState, context_schema=PizzaRuntime)
+
+    # Add nodes
+    workflow.add_node("triage", triage_agent_node)
+    workflow.add_node("pizza_agent", pizza_agent_node)
+    workflow.add_node("continuation_agent", continuation_agent_node)
+    if wait_for_user:
+        workflow.add_node("await_user", await_user_node)
+
+    # Set entry point
+    workflow.set_entry_point("triage")
+
+    # Add conditional edges
+    workflow.add_conditional_edges(
+        "triage",
+        route_after_triage,
+        {
+            "pizza_agent": "pizza_agent",
+            "__end__": END,
+        },
+    )
+
+    # Pizza agent goes to continuation
+    workflow.add_conditional_edges(
+        "pizza_agent",
+        route_after_pizza,
+        {
+            "continuation_agent": "continuation_agent",
+        },
+    )
+
+    # Continuation agent waits for the user's reply (or loops back to triage / ends)
+    workflow.add_conditional_edges(
+        "continuation_agent",
+        route_after_continuation,
+        {
+            "triage": "triage",
+            "await_user": "await_user" if wait_for_user else END,
+            "__end__": END,
+        },
+    )
+
+    # The reply either starts another pizza search or finishes the order
+    if wait_for_user:
+        workflow.add_conditional_edges(
+            "await_user",
+            route_after_await_user,
+            {
+                "pizza_agent": "pizza_agent",
+                "__end__": END,
+            },
+        )
+
+    return workflow
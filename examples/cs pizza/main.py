@@ -1,76 +1,51 @@
-from langchain_ollama import ChatOllama
-from langgraph.graph import StateGraph, END
+import argparse
+import atexit
+import os
+import sys
+from typing import Optional
 
-from nodes import TriageAgent, PizzaAgent, ContinuationAgent
-from state import PizzaState, StateManager, ConversationContext
-from edges import route_after_triage, route_after_pizza, route_after_continuation
-from agents import TriageAgentLLM, PizzaAgentLLM
-from services.conversation_service import ConversationService
-from services.pizza_service import PizzaCatalogService
-from services.order_service import OrderService
-
-# Initialize agent nodes
-def triage_agent_node(state: PizzaState) -> PizzaState:
-    return TriageAgent(state)
+from langgraph.types import Command
 
-def pizza_agent_node(state: PizzaState) -> PizzaState:
-    return PizzaAgent(state)
+from state import PizzaState, StateManager, ConversationContext
+from runtime import PizzaRuntime
+from checkpointing import PizzaCheckpointer, session_config
+from graph import create_workflow
+from pizza_logging import configure_logging, flush_logging
 
-def continuation_agent_node(state: PizzaState) -> PizzaState:
-    return ContinuationAgent(state)
+# Shared example helpers live one directory up
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from common.graph_optimizer import optimize_graph
+from common.graph_profiler import default_profiler, instrument_from_env, is_instrumented
+from common.token_stream import TokenPrinter, stream_turn
 
 # Create the workflow
-workflow = StateGraph(PizzaState)
-
-# Add nodes
-workflow.add_node("triage", triage_agent_node)
-workflow.add_node("pizza_agent", pizza_agent_node)
-workflow.add_node("continuation_agent", continuation_agent_node)
-
-# Set entry point
-workflow.set_entry_point("triage")
-
-# Add conditional edges
-workflow.add_conditional_edges(
-    "triage",
-    route_after_triage,
-    {
-        "pizza_agent": "pizza_agent",
-        "__end__": END,
-    },
-)
+workflow = create_workflow()
 
-# Pizza agent goes to continuation
-workflow.add_conditional_edges(
-    "pizza_agent",
-    route_after_pizza,
-    {
-        "continuation_agent": "continuation_agent",
-    },
-)
+# The runnable app, compiled on first use so importing this module opens no
+# database (see get_app)
+app = None
 
-# Continuation agent can loop back to triage or end
-workflow.add_conditional_edges(
-    "continuation_agent",
-    route_after_continuation,
-    {
-        "triage": "triage",
-        "__end__": END,
-    },
-)
+# Services, catalog snapshot and caches shared by every run of the app
+pizza_runtime = PizzaRuntime.create()
 
-# Compile the workflow into a runnable app
-app = workflow.compile()
+# The Mermaid diagram is written on demand, not at import:
+#     python3 ../common/diagrams.py graph:create_workflow
 
-# Generate Mermaid diagram
-mermaid_code = app.get_graph().draw_mermaid()
-
-# Save Mermaid code to file
-with open("workflow_graph.mmd", "w") as f:
-    f.write(mermaid_code)
-
-print("Pizza ordering workflow created successfully!")
-print("Mermaid diagram saved to workflow_graph.mmd")
+def get_app():
+    """
+    Compile the workflow into a runnable app on first use; sessions are
+    checkpointed to SQLite with the session id as thread id so they survive
+    restarts; per-node timings are recorded with GRAPH_PROFILE=<file>.json or
+    --profile <file>. Constant routers (route_after_pizza) are compiled as
+    plain edges.
+    """
+    global app
+    if app is None:
+        compiled = optimize_graph(workflow).compile(
+            checkpointer=PizzaCheckpointer.open()
+        )
+        app = instrument_from_env(compiled)
+    return app
 
 # Enhanced test scenarios with new architecture
 def test_pizza_workflow():
@@ -78,7 +53,8 @@ def test_pizza_workflow():
     print("TESTING ENHANCED PIZZA WORKFLOW")
     print("="*50)
     
-    conversation_service = ConversationService()
+    conversation_service = pizza_runtime.conversation_service
+    app = get_app()
     
     test_cases = [
         {
@@ -116,16 +92,23 @@ def test_pizza_workflow():
             step_count = 0
             max_steps = 10  # Prevent infinite loops
             
-            for step in app.stream(initial_state):
+            for step in app.stream(
+                initial_state, session_config(session_id), context=pizza_runtime
+            ):
                 step_count += 1
                 if step_count > max_steps:
                     print("  Max steps reached - stopping to prevent infinite loop")
                     break
                     
                 final_result = step
+                # Let the agents' log lines for this step come out first
+                flush_logging()
                 # Print step info
                 for node_name, node_state in step.items():
                     print(f"  Step {step_count} - {node_name}:")
+                    if node_name == "__interrupt__":
+                        print("    Waiting for user reply")
+                        continue
                     if node_state.get('found_pizza'):
                         print(f"    Found pizza: {node_state['found_pizza']}")
                     if node_state.get('exit_reason'):
@@ -134,6 +117,7 @@ def test_pizza_workflow():
                         print(f"    Error: {node_state['last_error']}")
             
             # Show final conversation summary
+            flush_logging()
             summary = conversation_service.get_conversation_summary(session_id)
             if summary:
                 print(f"  Final status: {summary['status']}")
@@ -143,51 +127,92 @@ def test_pizza_workflow():
             print(f"  Test failed with error: {str(e)}")
         finally:
             # Cleanup session
-            conversation_service.cleanup_session(session_id)
+            pizza_runtime.end_session(session_id)
+            app.checkpointer.delete_thread(session_id)
         
         print("-" * 50)
 
-def interactive_pizza_session():
+def resume_session(session_id: str) -> Optional[PizzaState]:
+    """Load a session's state from its last checkpoint"""
+    snapshot = get_app().get_state(session_config(session_id))
+    if not snapshot.values:
+        return None
+    pizza_runtime.conversation_service.restore_session(session_id, snapshot.values)
+    return snapshot.values
+
+def interactive_pizza_session(session_id: Optional[str] = None):
     """Interactive session for testing the enhanced workflow"""
     print("\n" + "="*50)
     print("INTERACTIVE PIZZA ORDERING SESSION")
     print("="*50)
     print("Type 'quit' to exit the session")
     
-    conversation_service = ConversationService()
+    conversation_service = pizza_runtime.conversation_service
+    app = get_app()
     
-    # Get initial user input
-    initial_input = input("\nWhat would you like to order today? ")
-    if initial_input.lower() == 'quit':
-        return
+    if session_id:
+        # Resume a session saved by a previous process
+        state = resume_session(session_id)
+        if state is None:
+            print(f"No saved session {session_id}")
+            return
+        turn_count = state["conversation_context"].turn_count
+        print(f"Resumed session {session_id} at turn {turn_count}")
+        turn_input = None
+    else:
+        # Get initial user input
+        initial_input = input("\nWhat would you like to order today? ")
+        if initial_input.lower() == 'quit':
+            return
+        
+        # Create session
+        session_id, state = conversation_service.create_session(initial_input)
+        print(
+            f"Session {session_id} (resume with: python3 main.py --resume {session_id})"
+        )
+        turn_input = state
     
-    # Create session
-    session_id, state = conversation_service.create_session(initial_input)
+    config = session_config(session_id)
+    # Pending log lines are written before the first token of a turn
+    show_token = TokenPrinter(before_first=flush_logging)
+    turn_stats = []
     
     try:
-        while conversation_service.should_continue_conversation(session_id):
-            # Run one iteration of the workflow
-            step_count = 0
-            for step in app.stream(state):
-                step_count += 1
-                if step_count > 5:  # Prevent runaway
-                    break
-                    
-                # Update state with latest step
-                for node_name, node_state in step.items():
-                    state = node_state
+        snapshot = app.get_state(config)
+        while True:
+            if turn_input is not None:
+                # Run the workflow until it finishes or pauses for the user;
+                # tokens of LLM-backed nodes are printed as they arrive
+                _, stats = stream_turn(
+                    app, turn_input, config, on_token=show_token, context=pizza_runtime
+                )
+                show_token.end_turn()
+                turn_stats.append(stats)
+                
+                # The checkpoint holds the state with every node update applied
+                snapshot = app.get_state(config)
+                state = snapshot.values
+                conversation_service.update_session_state(session_id, state)
+            
+            if not conversation_service.should_continue_conversation(session_id):
+                break
             
             # Check if we need user input
-            if state.get('requires_user_input', False):
-                # Get next user input
+            waiting = bool(snapshot.interrupts)
+            if waiting or state.get('requires_user_input', False):
+                # Get next user input once the agents' output is written
+                flush_logging()
                 next_input = input("\nYour response: ")
                 if next_input.lower() == 'quit':
                     break
                     
-                # Add input to session
                 conversation_service.add_user_input(session_id, next_input)
-                state["user_input"] = next_input
-                state["requires_user_input"] = False
+                if waiting:
+                    # Resume at the node waiting for the reply
+                    turn_input = Command(resume=next_input)
+                else:
+                    # Start a new run with only the changed fields
+                    turn_input = StateManager.user_turn(next_input)
             else:
                 break
     
@@ -197,6 +222,7 @@ def interactive_pizza_session():
         print(f"\nSession error: {str(e)}")
     finally:
         # Show final summary
+        flush_logging()
         summary = conversation_service.get_conversation_summary(session_id)
         if summary:
             print(f"\n--- Session Summary ---")
@@ -204,15 +230,57 @@ def interactive_pizza_session():
             print(f"Total turns: {summary['turn_count']}")
             if summary.get('has_order'):
                 print("Order was created during session")
+        if turn_stats:
+            # Time to first token is what the user waits for; total is the whole turn
+            streamed = [
+                stats.first_token_s
+                for stats in turn_stats
+                if stats.first_token_s is not None
+            ]
+            average_total = sum(stats.total_s for stats in turn_stats) / len(turn_stats)
+            print(
+                f"Average turn latency: {average_total * 1000:.0f} ms "
+                f"over {len(turn_stats)} turns"
+            )
+            if streamed:
+                average_first = sum(streamed) / len(streamed)
+                print(
+                    f"Average time to first token: {average_first * 1000:.0f} ms "
+                    f"over {len(streamed)} streamed turns"
+                )
         
-        conversation_service.cleanup_session(session_id)
+        pizza_runtime.end_session(session_id)
         print("Session ended. Thanks for testing!")
 
 if __name__ == "__main__":
-    # Run automated tests
-    test_pizza_workflow()
+    parser = argparse.ArgumentParser(description="Pizza ordering workflow")
+    parser.add_argument(
+        "--resume",
+        metavar="SESSION_ID",
+        help="Resume a checkpointed interactive session",
+    )
+    parser.add_argument(
+        "--profile",
+        metavar="FILE",
+        help="Write per-node and per-router timings to this JSON file",
+    )
+    args = parser.parse_args()
+    
+    if args.profile:
+        if not is_instrumented(get_app()):
+            app = default_profiler.instrument(app)
+        atexit.register(default_profiler.export_json, args.profile)
     
-    # Offer interactive session
-    user_choice = input("\nWould you like to try the interactive session? (y/n): ")
-    if user_choice.lower() in ['y', 'yes']:
-        interactive_pizza_session()
\ No newline at end of file
+    # The agents' INFO lines are the conversation; PIZZA_LOG_LEVEL=DEBUG adds routing
+    configure_logging(os.environ.get("PIZZA_LOG_LEVEL", "INFO"))
+    
+    if args.resume:
+        interactive_pizza_session(args.resume)
+    else:
+        # Run automated tests
+        test_pizza_workflow()
+        
+        # Offer interactive session
+        user_choice = input("\nWould you like to try the interactive session? (y/n): ")
+        if user_choice.lower() in ['y', 'yes']:
+            interactive_pizza_session()
@@ -1,20 +1,27 @@
+import logging
+
 from state import PizzaState, StateManager, ConversationStatus, Pizza, Order, OrderItem
-from services.pizza_service import PizzaCatalogService, PizzaRecommendationService
-from services.order_service import OrderService, OrderValidationError
-from services.conversation_service import ConversationService
-from typing import List
+from services.order_service import OrderValidationError
+from runtime import PizzaRuntime, get_default_runtime
+from typing import List, Optional
+from pizza_logging import get_logger
+
+logger = get_logger("nodes")
 
-def TriageAgent(state: PizzaState) -> PizzaState:
+def TriageAgent(
+    state: PizzaState, services: Optional[PizzaRuntime] = None
+) -> PizzaState:
     """
     Enhanced triage agent using conversation service for better context management.
     Determines if user wants pizza, wants to exit, or is continuing a conversation.
+    Like all nodes, returns a partial state update with only the changed fields.
     """
-    conversation_service = ConversationService()
+    conversation_service = (services or get_default_runtime()).conversation_service
     user_input = state.get('user_input', '').lower()
     context = state['conversation_context']
     
     # Add turn to conversation context
-    context.add_turn(user_input, "triage")
+    turn = StateManager.add_turn(user_input, "triage")
     
     # Handle continuation scenarios
     if context.status == ConversationStatus.AWAITING_CONTINUATION:
@@ -22,15 +29,22 @@ def TriageAgent(state: PizzaState) -> PizzaState:
         
         if wants_to_continue:
             # User wants another pizza - reset for new order
-            state = StateManager.reset_for_new_order(state)
-            state = StateManager.transition_to_pizza_search(state, user_input)
-            print(f"Triage: User wants another pizza - starting new order: {user_input}")
+            update = StateManager.merge(
+                turn,
+                StateManager.reset_for_new_order(state),
+                StateManager.transition_to_pizza_search(state, user_input)
+            )
+            logger.info(
+                "Triage: User wants another pizza - starting new order: %s", user_input
+            )
         else:
             # User wants to finish
-            state = StateManager.transition_to_exit(state, "User finished ordering")
-            print(f"Triage: User finished ordering - ending session")
+            update = StateManager.merge(
+                turn, StateManager.transition_to_exit(state, "User finished ordering")
+            )
+            logger.info("Triage: User finished ordering - ending session")
         
-        return state
+        return update
     
     # Initial triage logic with enhanced keywords
     pizza_keywords = [
@@ -48,142 +62,215 @@ def TriageAgent(state: PizzaState) -> PizzaState:
     if (user_input.startswith('no') or 
         any(keyword in user_input for keyword in exit_keywords if keyword != 'no')):
         
-        state = StateManager.transition_to_exit(state, "User declined pizza order")
-        print(f"Triage: User wants to exit - {state['exit_reason']}")
+        update = StateManager.merge(
+            turn, StateManager.transition_to_exit(state, "User declined pizza order")
+        )
+        logger.info("Triage: User wants to exit - %s", update['exit_reason'])
     
     elif any(keyword in user_input for keyword in pizza_keywords):
         # User wants pizza
-        state = StateManager.transition_to_pizza_search(state, user_input)
-        print(f"Triage: User wants pizza - forwarding request: {user_input}")
+        update = StateManager.merge(
+            turn, StateManager.transition_to_pizza_search(state, user_input)
+        )
+        logger.info("Triage: User wants pizza - forwarding request: %s", user_input)
     
     else:
         # Ambiguous input - default to pizza search with clarification
-        state = StateManager.transition_to_pizza_search(state, user_input)
-        print(f"Triage: Ambiguous input, forwarding to pizza agent for clarification: {user_input}")
+        update = StateManager.merge(
+            turn, StateManager.transition_to_pizza_search(state, user_input)
+        )
+        logger.info(
+            "Triage: Ambiguous input, forwarding to pizza agent for clarification: %s",
+            user_input,
+        )
     
-    return state
+    return update
 
-def PizzaAgent(state: PizzaState) -> PizzaState:
+def PizzaAgent(
+    state: PizzaState, services: Optional[PizzaRuntime] = None
+) -> PizzaState:
     """
     Enhanced pizza agent using pizza catalog service for improved matching.
     Processes pizza requests and manages order creation.
     """
-    print("PizzaAgent: Processing pizza request...")
+    logger.debug("PizzaAgent: Processing pizza request...")
     
-    # Initialize services
-    catalog_service = PizzaCatalogService()
-    order_service = OrderService()
+    # Shared services
+    services = services or get_default_runtime()
+    order_service = services.order_service
     
     pizza_request = state.get('pizza_request', '')
-    context = state['conversation_context']
-    
-    # Add turn to conversation context
-    context.add_turn(pizza_request, "pizza_agent")
     
-    # Clear previous errors
-    state = StateManager.clear_errors(state)
+    # Add turn to conversation context (errors were cleared when the search started)
+    update = StateManager.add_turn(pizza_request, "pizza_agent")
     
     try:
         # Search for matching pizzas using the enhanced service
-        search_result = catalog_service.search_pizzas(pizza_request, max_results=3)
+        search_result = services.search_pizzas(pizza_request, max_results=3)
         
         if not search_result.matches:
             # No matches found - provide default recommendation
-            default_pizza = catalog_service.get_pizza_by_name('margherita')
+            default_pizza = services.default_pizza
             search_result.matches = [default_pizza] if default_pizza else []
             search_result.confidence_score = 0.3
-            print("PizzaAgent: No matches found, offering default recommendation")
+            logger.info("PizzaAgent: No matches found, offering default recommendation")
         
         # Store search results in state
-        state['matched_pizzas'] = search_result.matches
         best_match = search_result.matches[0] if search_result.matches else None
-        state['selected_pizza'] = best_match
+        update['matched_pizzas'] = search_result.matches
+        update['selected_pizza'] = best_match
         
         # Create or get current order
-        current_order = state.get('current_order')
+        session_id = state.get('session_id') or ''
+        current_order = state.get(
+            'current_order'
+        ) or order_service.get_order_for_session(session_id)
         if not current_order:
-            current_order = order_service.create_order(state.get('session_id', ''))
-            state['current_order'] = current_order
+            current_order = order_service.create_order(session_id)
+        update['current_order'] = current_order
         
         # Add selected pizza to order
         if best_match:
             try:
                 order_item = order_service.add_pizza_to_order(current_order, best_match)
-                state['found_pizza'] = str(best_match)
+                update['found_pizza'] = str(best_match)
                 
-                print(f"PizzaAgent: Added {best_match.name} to order - {best_match.description}")
+                logger.info(
+                    "PizzaAgent: Added %s to order - %s",
+                    best_match.name,
+                    best_match.description,
+                )
                 
-                # Provide recommendations if confidence is low
+                # Provide recommendations if confidence is low; computed at every
+                # log level so a failure reaches the state the same way
                 if search_result.confidence_score < 0.7:
-                    recommendation_service = PizzaRecommendationService(catalog_service)
-                    similar_pizzas = recommendation_service.recommend_similar_pizzas(best_match, count=2)
+                    similar_pizzas = services.similar_pizzas(best_match, count=2)
                     
-                    if similar_pizzas:
+                    if similar_pizzas and logger.isEnabledFor(logging.INFO):
                         similar_names = [p.name for p in similar_pizzas]
-                        print(f"PizzaAgent: Low confidence match. Consider: {', '.join(similar_names)}")
+                        logger.info(
+                            "PizzaAgent: Low confidence match. Consider: %s",
+                            ', '.join(similar_names),
+                        )
                 
                 # Transition to continuation state
-                state = StateManager.transition_to_continuation(state)
+                update = StateManager.merge(
+                    update, StateManager.transition_to_continuation(state)
+                )
                 
             except OrderValidationError as e:
                 error_msg = f"Failed to add pizza to order: {str(e)}"
-                state = StateManager.add_error(state, error_msg)
-                print(f"PizzaAgent: {error_msg}")
+                update = StateManager.merge(
+                    update, StateManager.add_error(state, error_msg)
+                )
+                logger.warning("PizzaAgent: %s", error_msg)
         
         else:
             error_msg = "No suitable pizza found for your request"
-            state = StateManager.add_error(state, error_msg)
-            print(f"PizzaAgent: {error_msg}")
+            update = StateManager.merge(
+                update, StateManager.add_error(state, error_msg)
+            )
+            logger.warning("PizzaAgent: %s", error_msg)
     
     except Exception as e:
         error_msg = f"Error processing pizza request: {str(e)}"
-        state = StateManager.add_error(state, error_msg)
-        print(f"PizzaAgent: {error_msg}")
+        update = StateManager.merge(update, StateManager.add_error(state, error_msg))
+        logger.error("PizzaAgent: %s", error_msg, exc_info=True)
     
-    return state
+    return update
 
-def ContinuationAgent(state: PizzaState) -> PizzaState:
+def ContinuationAgent(
+    state: PizzaState, services: Optional[PizzaRuntime] = None
+) -> PizzaState:
     """
     Enhanced continuation agent with order management and proper state transitions.
     Handles order completion, continuation, and provides order summary.
     """
-    print("ContinuationAgent: Pizza added to order!")
+    logger.info("ContinuationAgent: Pizza added to order!")
     
-    # Initialize services
-    order_service = OrderService()
-    conversation_service = ConversationService()
+    # Shared services
+    services = services or get_default_runtime()
+    order_service = services.order_service
     
-    context = state['conversation_context']
     current_order = state.get('current_order')
     
     # Add turn to conversation context
-    context.add_turn("order_processed", "continuation_agent")
+    update = StateManager.add_turn("order_processed", "continuation_agent")
     
-    # Provide order summary
+    # Provide order summary; built at every log level, so its errors reach the
+    # state regardless of logging, and only the output is skipped when INFO is off
     if current_order:
         try:
             order_summary = order_service.get_order_summary(current_order)
-            print(f"ContinuationAgent: Current order: {order_summary['item_count']} items, Total: ${order_summary['total_amount']:.2f}")
-            
-            # Show current items
-            for i, item in enumerate(order_summary['items'], 1):
-                print(f"  {i}. {item['pizza_name']} x{item['quantity']} - ${item['total_price']:.2f}")
-            
-            # Provide suggestions
-            suggestions = order_service.OrderRecommendationService(order_service).suggest_add_ons(current_order)
-            if suggestions:
-                print(f"ContinuationAgent: Suggestions: {', '.join(suggestions)}")
+            suggestions = services.order_recommendations.suggest_add_ons(current_order)
+            if logger.isEnabledFor(logging.INFO):
+                logger.info("ContinuationAgent: Current order: %d items, Total: $%.2f",
+                            order_summary['item_count'], order_summary['total_amount'])
+                
+                # Show current items
+                for i, item in enumerate(order_summary['items'], 1):
+                    logger.info(
+                        "  %d. %s x%d - $%.2f",
+                        i,
+                        item['pizza_name'],
+                        item['quantity'],
+                        item['total_price'],
+                    )
+                
+                # Provide suggestions
+                if suggestions:
+                    logger.info(
+                        "ContinuationAgent: Suggestions: %s", ', '.join(suggestions)
+                    )
                 
         except Exception as e:
             error_msg = f"Error generating order summary: {str(e)}"
-            state = StateManager.add_error(state, error_msg)
-            print(f"ContinuationAgent: {error_msg}")
+            update = StateManager.merge(
+                update, StateManager.add_error(state, error_msg)
+            )
+            logger.warning("ContinuationAgent: %s", error_msg)
     
     # Set state to await user input for continuation decision
-    state = StateManager.transition_to_continuation(state)
+    update = StateManager.merge(update, StateManager.transition_to_continuation(state))
     
-    print("ContinuationAgent: Would you like to add another pizza or complete your order?")
-    print("  - Say 'another pizza' or 'add more' to continue ordering")  
-    print("  - Say 'done', 'finish', or 'complete order' to checkout")
+    logger.info(
+        "ContinuationAgent: Would you like to add another pizza or complete your order?"
+    )
+    logger.info("  - Say 'another pizza' or 'add more' to continue ordering")
+    logger.info("  - Say 'done', 'finish', or 'complete order' to checkout")
+    
+    return update
+
+def AwaitUserAgent(
+    state: PizzaState, user_input: str, services: Optional[PizzaRuntime] = None
+) -> PizzaState:
+    """
+    Handles the user's reply at the continuation point.
+    The graph pauses before this node until the reply arrives, then resumes
+    here: another pizza goes straight to the pizza search, anything else
+    finishes the order.
+    """
+    conversation_service = (services or get_default_runtime()).conversation_service
+    context = state['conversation_context']
+    
+    turn = StateManager.user_turn(user_input)
+    normalized_input = user_input.lower()
+    
+    if conversation_service.detect_continuation_intent(normalized_input, context):
+        update = StateManager.merge(
+            turn,
+            StateManager.reset_for_new_order(state),
+            StateManager.transition_to_pizza_search(state, normalized_input),
+            {"requires_user_input": False}
+        )
+        logger.info(
+            "AwaitUser: User wants another pizza - starting new order: %s",
+            normalized_input,
+        )
+    else:
+        update = StateManager.merge(
+            turn, StateManager.transition_to_exit(state, "User finished ordering")
+        )
+        logger.info("AwaitUser: User finished ordering - ending session")
     
-    return state
\ No newline at end of file
+    return update
@@ -0,0 +1,173 @@
+"""
+Leveled, buffered logging for the pizza workflow.
+Nodes and routers log through `get_logger` with %-style arguments, so a
+disabled level costs one cached level check and no string formatting. The
+default level is WARNING; `configure_logging` (or PIZZA_LOG_LEVEL) turns on
+INFO/DEBUG output.
+
+Records are handed to a queue and formatted and written by a background
+listener thread, so graph steps never block on console or file I/O. High-volume
+DEBUG lines (routing decisions) can be sampled down to one in N per message.
+
+    PIZZA_LOG_LEVEL=DEBUG PIZZA_LOG_FORMAT=json PIZZA_LOG_SAMPLE=10 python main.py
+"""
+
+import atexit
+import json
+import logging
+import os
+import queue
+import sys
+import threading
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, Optional, TextIO, Tuple
+
+ROOT_LOGGER = "pizza"
+DEFAULT_LEVEL = "WARNING"
+CONSOLE_FORMAT = "%(message)s"
+DETAILED_FORMAT = "%(asctime)s %(levelname)-7s %(name)s: %(message)s"
+
+# Log arguments of these types are safe to format later on the listener thread
+_IMMUTABLE_ARGS = (str, int, float, bool, type(None), tuple, frozenset)
+
+def get_logger(name: str) -> logging.Logger:
+    """Logger under the `pizza` hierarchy, e.g. get_logger("nodes") -> pizza.nodes"""
+    return logging.getLogger(f"{ROOT_LOGGER}.{name}")
+
+class SamplingFilter(logging.Filter):
+    """
+    Passes one in every `every` records at or below `max_level`, counted per
+    message template, so each distinct routing decision still shows up.
+    Records above `max_level` always pass.
+    """
+
+    def __init__(self, every: int = 10, max_level: int = logging.DEBUG):
+        super().__init__()
+        self.every = max(1, every)
+        self.max_level = max_level
+        self._counts: Dict[Tuple[str, str], int] = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno > self.max_level or self.every == 1:
+            return True
+        key = (record.name, str(record.msg))
+        with self._lock:
+            count = self._counts.get(key, 0)
+            self._counts[key] = count + 1
+        return count % self.every == 0
+
+class DeferredQueueHandler(QueueHandler):
+    """
+    Queue handler that leaves message formatting to the listener thread.
+    The stdlib handler formats every record before enqueueing it; here only
+    records with mutable arguments are rendered eagerly (they could change
+    before the listener gets to them).
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        args = record.args
+        if args and not (
+            isinstance(args, tuple)
+            and all(isinstance(a, _IMMUTABLE_ARGS) for a in args)
+        ):
+            record.msg = record.getMessage()
+            record.args = None
+        return record
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line; `extra` fields passed to the log call are included"""
+
+    _RESERVED = frozenset(logging.LogRecord("", 0, "", 0, "", None, None).__dict__) | {
+        "message",
+        "asctime",
+    }
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": round(record.created, 6),
+            "level": record.levelname,
+            "logger": record.name,
+            "thread": record.threadName,
+            "message": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in self._RESERVED:
+                entry[key] = value
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+_listener: Optional[QueueListener] = None
+_queue_handler: Optional[QueueHandler] = None
+_configure_lock = threading.Lock()
+
+def configure_logging(
+    level: Optional[str] = None,
+    fmt: Optional[str] = None,
+    sample_every: Optional[int] = None,
+    stream: Optional[TextIO] = None,
+    buffered: bool = True,
+) -> logging.Logger:
+    """
+    Attach a handler to the `pizza` logger; safe to call again to reconfigure.
+
+    level:        logging level name; default PIZZA_LOG_LEVEL or WARNING
+    fmt:          "console" (message only), "detailed" or "json";
+                  default PIZZA_LOG_FORMAT or console
+    sample_every: keep one in N DEBUG records per message;
+                  default PIZZA_LOG_SAMPLE or 1 (no sampling)
+    stream:       output stream, default stdout
+    buffered:     write from a background listener thread instead of the caller's
+    """
+    level = (level or os.environ.get("PIZZA_LOG_LEVEL") or DEFAULT_LEVEL).upper()
+    fmt = (fmt or os.environ.get("PIZZA_LOG_FORMAT") or "console").lower()
+    if sample_every is None:
+        sample_every = int(os.environ.get("PIZZA_LOG_SAMPLE", "1"))
+
+    output = logging.StreamHandler(stream or sys.stdout)
+    if fmt == "json":
+        output.setFormatter(JsonFormatter())
+    elif fmt == "detailed":
+        output.setFormatter(logging.Formatter(DETAILED_FORMAT))
+    else:
+        output.setFormatter(logging.Formatter(CONSOLE_FORMAT))
+
+    with _configure_lock:
+        shutdown_logging()
+        logger = logging.getLogger(ROOT_LOGGER)
+        logger.setLevel(level)
+        logger.propagate = False
+
+        global _listener, _queue_handler
+        if buffered:
+            handler: logging.Handler = DeferredQueueHandler(queue.SimpleQueue())
+            _listener = QueueListener(handler.queue, output, respect_handler_level=True)
+            _listener.start()
+        else:
+            handler = output
+        if sample_every > 1:
+            handler.addFilter(SamplingFilter(sample_every))
+        _queue_handler = handler
+        logger.addHandler(handler)
+    return logger
+
+def flush_logging():
+    """Wait until every queued record has been written"""
+    with _configure_lock:
+        if _listener is not None:
+            _listener.stop()
+            _listener.start()
+
+def shutdown_logging():
+    """Drain the queue and detach the handler installed by `configure_logging`"""
+    global _listener, _queue_handler
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+    if _queue_handler is not None:
+        logging.getLogger(ROOT_LOGGER).removeHandler(_queue_handler)
+        _queue_handler.close()
+        _queue_handler = None
+
+atexit.register(shutdown_logging)
@@ -0,0 +1,122 @@
+"""
+Long-lived runtime context for the pizza workflow.
+Built once when the graph is compiled and passed to every node through
+LangGraph's run context, so services, catalog indexes and caches survive
+across turns instead of being rebuilt on every node call.
+"""
+
+from typing import Dict, List, Optional, Tuple, Any
+from dataclasses import dataclass, field, replace
+from collections import OrderedDict
+import threading
+
+from state import Pizza
+from services.conversation_service import ConversationService
+from services.pizza_service import (
+    PizzaCatalogService,
+    PizzaRecommendationService,
+    PizzaMatchResult,
+)
+from services.order_service import OrderService, OrderRecommendationService
+from services.promotion_service import PromotionEngine
+
+class LRUCache:
+    """Small thread-safe LRU cache"""
+
+    def __init__(self, max_size: int = 1024):
+        self.max_size = max_size
+        self._data: "OrderedDict[Any, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Any) -> Optional[Any]:
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return self._data[key]
+            self.misses += 1
+            return None
+
+    def put(self, key: Any, value: Any):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+@dataclass
+class PizzaRuntime:
+    """Shared services, catalog snapshot and caches for pizza graph nodes"""
+    conversation_service: ConversationService
+    catalog_service: PizzaCatalogService
+    order_service: OrderService
+    pizza_recommendations: PizzaRecommendationService
+    order_recommendations: OrderRecommendationService
+    catalog_snapshot: Tuple[Pizza, ...]
+    default_pizza: Optional[Pizza]
+    search_cache: LRUCache = field(default_factory=LRUCache)
+    similar_cache: LRUCache = field(default_factory=LRUCache)
+
+    @classmethod
+    def create(cls, catalog_service: Optional[PizzaCatalogService] = None,
+               promotion_engine: Optional[PromotionEngine] = None) -> "PizzaRuntime":
+        """Build all services once"""
+        catalog_service = catalog_service or PizzaCatalogService()
+        order_service = OrderService()
+        return cls(
+            conversation_service=ConversationService(),
+            catalog_service=catalog_service,
+            order_service=order_service,
+            pizza_recommendations=PizzaRecommendationService(catalog_service),
+            order_recommendations=OrderRecommendationService(
+                order_service, promotion_engine
+            ),
+            catalog_snapshot=tuple(catalog_service.get_all_pizzas()),
+            default_pizza=catalog_service.get_pizza_by_name('margherita'),
+        )
+
+    def end_session(self, session_id: str):
+        """Drop what the services keep for a finished session"""
+        self.conversation_service.cleanup_session(session_id)
+        self.order_service.end_session(session_id)
+
+    def search_pizzas(self, query: str, max_results: int = 3) -> PizzaMatchResult:
+        """Catalog search memoized per query; callers receive their own copy"""
+        key = (query, max_results)
+        result = self.search_cache.get(key)
+        if result is None:
+            result = self.catalog_service.search_pizzas(query, max_results=max_results)
+            self.search_cache.put(key, result)
+        return replace(result, matches=list(result.matches))
+
+    def similar_pizzas(self, pizza: Pizza, count: int = 2) -> List[Pizza]:
+        """Similar-pizza recommendations memoized per pizza"""
+        key = (pizza, count)
+        similar = self.similar_cache.get(key)
+        if similar is None:
+            similar = self.pizza_recommendations.recommend_similar_pizzas(
+                pizza, count=count
+            )
+            self.similar_cache.put(key, similar)
+        return list(similar)
+
+_default_runtime: Optional[PizzaRuntime] = None
+_default_runtime_lock = threading.Lock()
+
+def get_default_runtime() -> PizzaRuntime:
+    """Process-wide runtime for callers that run nodes outside a compiled graph"""
+    global _default_runtime
+    if _default_runtime is None:
+        with _default_runtime_lock:
+            if _default_runtime is None:
+                _default_runtime = PizzaRuntime.create()
+    return _default_runtime
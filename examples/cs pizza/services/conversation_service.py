@@ -30,6 +30,13 @@ class ConversationService:
         
         return session_id, state
     
+    def restore_session(self, session_id: str, state: PizzaState):
+        """Register a session restored from a checkpoint (e.g. after a restart)"""
+        self._sessions[session_id] = state
+        self._conversation_history.setdefault(session_id, [])
+        self._log_conversation_turn(session_id, "Session restored", "system",
+                                    state["conversation_context"].status.value)
+    
     def get_session_state(self, session_id: str) -> Optional[PizzaState]:
         """Get the current state for a session"""
         return self._sessions.get(session_id)
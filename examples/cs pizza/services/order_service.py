@@ -4,10 +4,17 @@ Handles order lifecycle, validation, and persistence.
 """
 
 from typing import List, Optional, Dict
+from collections import OrderedDict
 from datetime import datetime
 from state import Order, OrderItem, OrderStatus, Pizza
+from services.promotion_service import PromotionEngine, DEFAULT_PROMOTIONS
+import threading
 import uuid
 
+# Orders kept for the sessions' later turns; past this the least recently
+# used session's order is dropped, so a long-running process stays bounded
+DEFAULT_MAX_SESSIONS = 1024
+
 class OrderValidationError(Exception):
     """Exception raised for order validation errors"""
     pass
@@ -15,17 +22,50 @@ class OrderValidationError(Exception):
 class OrderService:
     """Service for managing order lifecycle and operations"""
     
-    def __init__(self):
-        self._orders: Dict[str, Order] = {}
+    def __init__(self, max_sessions: int = DEFAULT_MAX_SESSIONS):
+        self.max_sessions = max_sessions
+        self._orders: "OrderedDict[str, Order]" = OrderedDict()
+        self._session_orders: "OrderedDict[str, str]" = OrderedDict()
         self._order_history: List[Order] = []
+        self._lock = threading.Lock()
     
     def create_order(self, session_id: str) -> Order:
         """Create a new empty order"""
         order = Order(items=[], status=OrderStatus.PENDING)
         order_id = str(uuid.uuid4())
-        self._orders[order_id] = order
+        with self._lock:
+            self._orders[order_id] = order
+            if session_id:
+                # A session's earlier order is no longer looked up
+                previous = self._session_orders.pop(session_id, None)
+                if previous:
+                    self._orders.pop(previous, None)
+                self._session_orders[session_id] = order_id
+            while len(self._session_orders) > self.max_sessions:
+                _, evicted = self._session_orders.popitem(last=False)
+                self._orders.pop(evicted, None)
+            while len(self._orders) > self.max_sessions:
+                self._orders.popitem(last=False)
         return order
     
+    def get_order_for_session(self, session_id: str) -> Optional[Order]:
+        """Get the most recent order created for a session"""
+        with self._lock:
+            order_id = self._session_orders.get(session_id)
+            if order_id is None:
+                return None
+            self._session_orders.move_to_end(session_id)
+            return self._orders.get(order_id)
+    
+    def end_session(self, session_id: str) -> bool:
+        """Forget the order of a finished session"""
+        with self._lock:
+            order_id = self._session_orders.pop(session_id, None)
+            if order_id is None:
+                return False
+            self._orders.pop(order_id, None)
+            return True
+    
     def add_pizza_to_order(self, order: Order, pizza: Pizza, quantity: int = 1, 
                           special_instructions: Optional[str] = None) -> OrderItem:
         """Add a pizza to an existing order"""
@@ -155,8 +195,15 @@ class OrderService:
 class OrderRecommendationService:
     """Service for order-based recommendations"""
     
-    def __init__(self, order_service: OrderService):
+    def __init__(
+        self,
+        order_service: OrderService,
+        promotion_engine: Optional[PromotionEngine] = None,
+    ):
         self.order_service = order_service
+        self.promotion_engine = promotion_engine or PromotionEngine.from_definitions(
+            DEFAULT_PROMOTIONS
+        )
     
     def suggest_add_ons(self, order: Order) -> List[str]:
         """Suggest add-ons based on current order"""
@@ -189,16 +236,4 @@ class OrderRecommendationService:
     
     def calculate_savings_opportunities(self, order: Order) -> Dict:
         """Calculate potential savings or deals"""
-        opportunities = {
-            "potential_savings": 0.0,
-            "suggestions": []
-        }
-        
-        if len(order.items) >= 2:
-            opportunities["suggestions"].append("2+ pizzas qualify for 10% discount")
-            opportunities["potential_savings"] = order.total_amount * 0.1
-        
-        if order.total_amount >= 30:
-            opportunities["suggestions"].append("Orders over $30 get free delivery")
-        
-        return opportunities
\ No newline at end of file
+        return self.promotion_engine.evaluate(order).to_dict()
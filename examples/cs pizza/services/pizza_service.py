@@ -18,8 +18,16 @@ class PizzaMatchResult:
 class PizzaCatalogService:
     """Service for managing pizza catalog and search operations"""
     
-    def __init__(self):
-        self._catalog = self._initialize_catalog()
+    def __init__(self, pizzas: Optional[List[Pizza]] = None):
+        """
+        Use the built-in catalog, or `pizzas` (e.g. a synthetic catalog for benchmarks)
+        """
+        if pizzas is None:
+            self._catalog = self._initialize_catalog()
+        else:
+            self._catalog = {
+                pizza.name.lower().replace(' ', '_'): pizza for pizza in pizzas
+            }
         self._ingredient_index = self._build_ingredient_index()
     
     def _initialize_catalog(self) -> Dict[str, Pizza]:
@@ -0,0 +1,428 @@
+"""
+Promotion rule engine.
+Compiles declarative promotion rules into an indexed predicate structure so
+that only rules whose trigger features match an order are evaluated.
+"""
+
+from typing import List, Optional, Dict, Any, Iterable, Tuple, FrozenSet
+from dataclasses import dataclass, field
+from collections import Counter
+from bisect import bisect_right
+from datetime import datetime
+from state import Order, Pizza
+import json
+
+class PromotionRuleError(Exception):
+    """Exception raised for invalid promotion rule definitions"""
+    pass
+
+# Keys accepted in the "when" and "reward" sections of a rule definition
+_CONDITION_KEYS = {
+    'min_items',
+    'min_total',
+    'pizzas',
+    'ingredients',
+    'hours',
+    'weekdays',
+}
+_REWARD_KEYS = {'percent_off', 'amount_off', 'free_delivery', 'stackable'}
+
+# Upper bound on cached candidate lists (one per pizza-set/hour/weekday signature)
+_CANDIDATE_CACHE_SIZE = 10000
+
+# Built-in promotions (previously hard-coded in OrderRecommendationService)
+DEFAULT_PROMOTIONS: List[Dict[str, Any]] = [
+    {
+        "id": "multi_pizza_discount",
+        "message": "2+ pizzas qualify for 10% discount",
+        "when": {"min_items": 2},
+        "reward": {"percent_off": 10}
+    },
+    {
+        "id": "free_delivery_30",
+        "message": "Orders over $30 get free delivery",
+        "when": {"min_total": 30},
+        "reward": {"free_delivery": True}
+    }
+]
+
+def _hour_window(start: int, end: int) -> FrozenSet[int]:
+    """Hours covered by a [start, end) window; windows may wrap past midnight"""
+    if start <= end:
+        return frozenset(range(start, end))
+    return frozenset(range(start, 24)) | frozenset(range(0, end))
+
+@dataclass(frozen=True)
+class PromotionRule:
+    """A single declarative promotion rule"""
+    rule_id: str
+    message: str
+    min_items: int = 0
+    min_total: float = 0.0
+    pizzas: FrozenSet[str] = frozenset()
+    ingredients: FrozenSet[str] = frozenset()
+    hours: Optional[FrozenSet[int]] = None
+    weekdays: Optional[FrozenSet[int]] = None
+    discount_rate: float = 0.0
+    amount_off: float = 0.0
+    free_delivery: bool = False
+    stackable: bool = False
+    priority: int = 0
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "PromotionRule":
+        """
+        Build a rule from its declarative form.
+
+        Example:
+            {"id": "combo", "message": "Pepperoni + Margherita: $5 off",
+             "when": {"pizzas": ["pepperoni", "margherita"], "hours": [11, 14]},
+             "reward": {"amount_off": 5}}
+        """
+        if 'id' not in data or 'message' not in data:
+            raise PromotionRuleError("Promotion rule requires 'id' and 'message'")
+
+        when = data.get('when', {})
+        reward = data.get('reward', {})
+
+        unknown = (set(when) - _CONDITION_KEYS) | (set(reward) - _REWARD_KEYS)
+        if unknown:
+            raise PromotionRuleError(
+                f"Rule {data['id']}: unknown keys {', '.join(sorted(unknown))}"
+            )
+
+        hours = when.get('hours')
+        if hours is not None:
+            if len(hours) != 2 or not all(0 <= h <= 24 for h in hours):
+                raise PromotionRuleError(
+                    f"Rule {data['id']}: 'hours' must be [start, end) within 0-24"
+                )
+            hours = _hour_window(int(hours[0]), int(hours[1]))
+
+        weekdays = when.get('weekdays')
+        if weekdays is not None:
+            weekdays = frozenset(int(day) for day in weekdays)
+
+        return cls(
+            rule_id=data['id'],
+            message=data['message'],
+            min_items=int(when.get('min_items', 0)),
+            min_total=float(when.get('min_total', 0.0)),
+            pizzas=frozenset(name.lower() for name in when.get('pizzas', [])),
+            ingredients=frozenset(name.lower() for name in when.get('ingredients', [])),
+            hours=hours,
+            weekdays=weekdays,
+            discount_rate=float(reward.get('percent_off', 0.0)) / 100,
+            amount_off=float(reward.get('amount_off', 0.0)),
+            free_delivery=bool(reward.get('free_delivery', False)),
+            stackable=bool(reward.get('stackable', False)),
+            priority=int(data.get('priority', 0))
+        )
+
+    def matches(self, features: "OrderFeatures") -> bool:
+        """Evaluate the full predicate against extracted order features"""
+        if features.item_count < self.min_items or features.total < self.min_total:
+            return False
+        if self.pizzas and not self.pizzas <= features.pizzas:
+            return False
+        if self.ingredients and not self.ingredients <= features.ingredients:
+            return False
+        if self.hours is not None and features.hour not in self.hours:
+            return False
+        if self.weekdays is not None and features.weekday not in self.weekdays:
+            return False
+        return True
+
+    def savings_for(self, total: float) -> float:
+        """Monetary value of this rule for an order total"""
+        return min(total, total * self.discount_rate + self.amount_off)
+
+@dataclass(frozen=True)
+class OrderFeatures:
+    """Features of an order that promotion rules can trigger on"""
+    item_count: int
+    total: float
+    pizzas: FrozenSet[str]
+    ingredients: FrozenSet[str]
+    hour: int
+    weekday: int
+
+    @classmethod
+    def from_order(cls, order: Order, at: Optional[datetime] = None) -> "OrderFeatures":
+        """
+        Extract features from an order, using its creation time unless `at` is given
+        """
+        pizzas, ingredients = composition_features(item.pizza for item in order.items)
+        return cls.from_composition(order, pizzas, ingredients, at)
+
+    @classmethod
+    def from_composition(
+        cls,
+        order: Order,
+        pizzas: FrozenSet[str],
+        ingredients: FrozenSet[str],
+        at: Optional[datetime] = None,
+    ) -> "OrderFeatures":
+        """Build features when pizza and ingredient sets are already known"""
+        when = at or order.created_at or datetime.now()
+        return cls(
+            item_count=len(order.items),
+            total=order.total_amount,
+            pizzas=pizzas,
+            ingredients=ingredients,
+            hour=when.hour,
+            weekday=when.weekday()
+        )
+
+def composition_features(
+    pizzas: Iterable[Pizza],
+) -> Tuple[FrozenSet[str], FrozenSet[str]]:
+    """Pizza names and ingredients present in a set of pizzas"""
+    pizzas = list(pizzas)
+    names = frozenset(pizza.name.lower() for pizza in pizzas)
+    ingredients = frozenset(
+        ingredient.lower() for pizza in pizzas for ingredient in pizza.ingredients
+    )
+    return names, ingredients
+
+@dataclass
+class PromotionResult:
+    """Promotions that apply to a single order"""
+    applied: List[PromotionRule] = field(default_factory=list)
+    potential_savings: float = 0.0
+    free_delivery: bool = False
+
+    @property
+    def suggestions(self) -> List[str]:
+        return [rule.message for rule in self.applied]
+
+    def to_dict(self) -> Dict:
+        """Legacy format used by OrderRecommendationService"""
+        return {
+            "potential_savings": self.potential_savings,
+            "suggestions": self.suggestions
+        }
+
+class PromotionEngine:
+    """
+    Compiled promotion rules.
+
+    Rules with required pizzas/ingredients are indexed under every required
+    token and only become candidates once all of them are present in the
+    order (counting index). Other rules are indexed under their hour window,
+    their weekdays, or (threshold-only rules) a sorted minimum total / item
+    count list. Looking up an order's features therefore yields only
+    candidate rules, and just their residual conditions are evaluated.
+    """
+
+    def __init__(self, rules: Iterable[PromotionRule]):
+        self._rules: List[PromotionRule] = list(rules)
+        self._token_index: Dict[Tuple[str, str], List[int]] = {}
+        self._required_tokens: Dict[int, int] = {}
+        self._hour_index: Dict[int, List[int]] = {}
+        self._weekday_index: Dict[int, List[int]] = {}
+        self._total_thresholds: List[float] = []
+        self._total_rules: List[int] = []
+        self._item_thresholds: List[int] = []
+        self._item_rules: List[int] = []
+        self._token_only: List[bool] = []
+        self._rank: List[int] = []
+        self._candidate_cache: Dict[Tuple, Tuple[int, ...]] = {}
+        self.evaluated_rules = 0
+        self._compile()
+
+    @classmethod
+    def from_definitions(
+        cls, definitions: Iterable[Dict[str, Any]]
+    ) -> "PromotionEngine":
+        """Compile an engine from declarative rule dictionaries"""
+        return cls(PromotionRule.from_dict(definition) for definition in definitions)
+
+    @classmethod
+    def from_json(cls, path: str) -> "PromotionEngine":
+        """Compile an engine from a JSON file containing a list of rule definitions"""
+        with open(path) as f:
+            return cls.from_definitions(json.load(f))
+
+    @property
+    def rules(self) -> List[PromotionRule]:
+        return list(self._rules)
+
+    def _compile(self):
+        """Build the trigger indexes"""
+        seen_ids = set()
+        for rule in self._rules:
+            if rule.rule_id in seen_ids:
+                raise PromotionRuleError(f"Duplicate promotion rule id: {rule.rule_id}")
+            seen_ids.add(rule.rule_id)
+
+        # Application order: highest priority first, then declaration order
+        order = sorted(
+            range(len(self._rules)),
+            key=lambda index: (-self._rules[index].priority, index),
+        )
+        self._rank = [0] * len(self._rules)
+        for rank, index in enumerate(order):
+            self._rank[index] = rank
+
+        totals, items = [], []
+        for index, rule in enumerate(self._rules):
+            tokens = self._conjunctive_tokens(rule)
+            # Rules decided by their tokens alone skip predicate evaluation
+            self._token_only.append(
+                bool(tokens)
+                and rule.min_items <= 1
+                and rule.min_total <= 0
+                and rule.hours is None
+                and rule.weekdays is None
+            )
+            if tokens:
+                self._required_tokens[index] = len(tokens)
+                for token in tokens:
+                    self._token_index.setdefault(token, []).append(index)
+            elif rule.hours is not None:
+                for hour in rule.hours:
+                    self._hour_index.setdefault(hour, []).append(index)
+            elif rule.weekdays is not None:
+                for day in rule.weekdays:
+                    self._weekday_index.setdefault(day, []).append(index)
+            elif rule.min_total > 0:
+                totals.append((rule.min_total, index))
+            else:
+                items.append((rule.min_items, index))
+
+        totals.sort()
+        items.sort()
+        self._total_thresholds = [threshold for threshold, _ in totals]
+        self._total_rules = [index for _, index in totals]
+        self._item_thresholds = [threshold for threshold, _ in items]
+        self._item_rules = [index for _, index in items]
+
+    @staticmethod
+    def _conjunctive_tokens(rule: PromotionRule) -> List[Tuple[str, str]]:
+        return ([('pizza', name) for name in rule.pizzas] +
+                [('ingredient', name) for name in rule.ingredients])
+
+    def _token_candidates(self, features: OrderFeatures) -> Tuple[int, ...]:
+        """
+        Rules whose required pizzas and ingredients are all present; cached per
+        composition
+        """
+        signature = (features.pizzas, features.ingredients)
+        cached = self._candidate_cache.get(signature)
+        if cached is not None:
+            return cached
+
+        hits = Counter()
+        for token in ([('pizza', name) for name in features.pizzas] +
+                      [('ingredient', name) for name in features.ingredients]):
+            bucket = self._token_index.get(token)
+            if bucket:
+                hits.update(bucket)
+
+        required = self._required_tokens
+        cached = tuple(
+            index for index, count in hits.items() if count == required[index]
+        )
+        if len(self._candidate_cache) >= _CANDIDATE_CACHE_SIZE:
+            self._candidate_cache.clear()
+        self._candidate_cache[signature] = cached
+        return cached
+
+    def candidate_rules(self, features: OrderFeatures) -> List[int]:
+        """Indices of rules whose trigger features match (before residual evaluation)"""
+        candidates = list(self._token_candidates(features))
+        candidates.extend(self._hour_index.get(features.hour, ()))
+        candidates.extend(self._weekday_index.get(features.weekday, ()))
+        candidates.extend(
+            self._total_rules[: bisect_right(self._total_thresholds, features.total)]
+        )
+        candidates.extend(
+            self._item_rules[: bisect_right(self._item_thresholds, features.item_count)]
+        )
+        return candidates
+
+    def evaluate_features(self, features: OrderFeatures) -> PromotionResult:
+        """Evaluate candidate rules for pre-extracted features"""
+        candidates = self.candidate_rules(features)
+        self.evaluated_rules += len(candidates)
+
+        rules = self._rules
+        token_only = self._token_only
+        matched = [index for index in candidates
+                   if token_only[index] or rules[index].matches(features)]
+        matched.sort(key=self._rank.__getitem__)
+
+        result = PromotionResult()
+        best_exclusive = 0.0
+        for index in matched:
+            rule = rules[index]
+            result.applied.append(rule)
+            savings = rule.savings_for(features.total)
+            if rule.stackable:
+                result.potential_savings += savings
+            else:
+                best_exclusive = max(best_exclusive, savings)
+            result.free_delivery = result.free_delivery or rule.free_delivery
+
+        result.potential_savings += best_exclusive
+        return result
+
+    def evaluate(self, order: Order, at: Optional[datetime] = None) -> PromotionResult:
+        """Evaluate all applicable promotions for a single order"""
+        return self.evaluate_features(OrderFeatures.from_order(order, at))
+
+    def evaluate_many(
+        self, orders: Iterable[Order], at: Optional[datetime] = None
+    ) -> List[PromotionResult]:
+        """Bulk mode: score many orders at once"""
+        return [
+            self.evaluate_features(features)
+            for _, features in self._iter_features(orders, at)
+        ]
+
+    def _iter_features(self, orders: Iterable[Order], at: Optional[datetime]):
+        """
+        Extract features for many orders, sharing work between orders with the same
+        pizzas
+        """
+        compositions: Dict[FrozenSet[Pizza], Tuple[FrozenSet[str], FrozenSet[str]]] = {}
+        for order in orders:
+            key = frozenset(item.pizza for item in order.items)
+            composition = compositions.get(key)
+            if composition is None:
+                composition = compositions[key] = composition_features(key)
+            yield order, OrderFeatures.from_composition(
+                order, composition[0], composition[1], at
+            )
+
+    def simulate_campaign(
+        self, orders: Iterable[Order], at: Optional[datetime] = None
+    ) -> Dict:
+        """Aggregate promotion impact over a set of orders for what-if simulations"""
+        rule_hits = Counter()
+        order_count = 0
+        promoted_orders = 0
+        free_deliveries = 0
+        total_revenue = 0.0
+        total_savings = 0.0
+
+        for order, features in self._iter_features(orders, at):
+            result = self.evaluate_features(features)
+            order_count += 1
+            total_revenue += order.total_amount
+            total_savings += result.potential_savings
+            if result.applied:
+                promoted_orders += 1
+                rule_hits.update(rule.rule_id for rule in result.applied)
+            if result.free_delivery:
+                free_deliveries += 1
+
+        return {
+            "orders": order_count,
+            "promoted_orders": promoted_orders,
+            "free_deliveries": free_deliveries,
+            "total_revenue": total_revenue,
+            "total_savings": total_savings,
+            "rule_hits": dict(rule_hits)
+        }
@@ -1,4 +1,15 @@
-from typing import TypedDict, Optional, List, Dict, Any, Literal
+from typing import (
+    TypedDict,
+    Optional,
+    List,
+    Dict,
+    Any,
+    Literal,
+    Tuple,
+    Annotated,
+    Union,
+    get_type_hints,
+)
 from dataclasses import dataclass
 from datetime import datetime
 from enum import Enum
@@ -100,11 +111,55 @@ class ConversationContext:
         self.last_agent = agent_name
         self.conversation_history.append(f"Turn {self.turn_count} ({agent_name}): {user_input}")
 
+@dataclass
+class ContextUpdate:
+    """Partial update to the conversation context, applied by its reducer"""
+    turns: Tuple[Tuple[str, str], ...] = ()
+    status: Optional[ConversationStatus] = None
+    
+    def merge(self, other: "ContextUpdate") -> "ContextUpdate":
+        """Combine two updates, applying `other` after this one"""
+        return ContextUpdate(
+            turns=self.turns + other.turns,
+            status=other.status if other.status is not None else self.status
+        )
+
+def merge_conversation_context(
+    current: Optional[ConversationContext],
+    update: Union[ConversationContext, ContextUpdate, None],
+) -> ConversationContext:
+    """Reducer for the conversation context: appends turns and applies status changes"""
+    if update is None:
+        return current
+    if isinstance(update, ConversationContext) or current is None:
+        # A full context replaces the current one (e.g. a new session)
+        return update
+    
+    context = ConversationContext(
+        turn_count=current.turn_count,
+        status=current.status,
+        last_agent=current.last_agent,
+        conversation_history=list(current.conversation_history)
+    )
+    for user_input, agent_name in update.turns:
+        context.add_turn(user_input, agent_name)
+    if update.status is not None:
+        context.status = update.status
+    return context
+
+def merge_validation_errors(
+    current: Optional[List[str]], update: Optional[List[str]]
+) -> Optional[List[str]]:
+    """Reducer for validation errors: new errors are appended, None clears them"""
+    if update is None:
+        return None
+    return (current or []) + list(update)
+
 class PizzaState(TypedDict):
     """Enhanced state management for pizza ordering workflow"""
     # Core conversation state
     user_input: str
-    conversation_context: ConversationContext
+    conversation_context: Annotated[ConversationContext, merge_conversation_context]
     
     # Legacy fields for backward compatibility  
     wants_pizza: Optional[bool]
@@ -117,7 +172,7 @@ class PizzaState(TypedDict):
     current_order: Optional[Order]
     matched_pizzas: Optional[List[Pizza]]
     selected_pizza: Optional[Pizza]
-    validation_errors: Optional[List[str]]
+    validation_errors: Annotated[Optional[List[str]], merge_validation_errors]
     
     # Session management
     session_id: Optional[str]
@@ -132,7 +187,11 @@ class PizzaState(TypedDict):
     retry_count: int
 
 class StateManager:
-    """State management utility class"""
+    """
+    State management utility class.
+    Transitions return partial updates (only the fields they change), which
+    LangGraph merges into the state using the reducers declared on PizzaState.
+    """
     
     @staticmethod
     def create_initial_state(user_input: str, session_id: str = None) -> PizzaState:
@@ -157,62 +216,132 @@ class StateManager:
             "retry_count": 0
         }
     
+    @staticmethod
+    def add_turn(user_input: str, agent_name: str) -> PizzaState:
+        """Record a conversation turn"""
+        return {
+            "conversation_context": ContextUpdate(turns=((user_input, agent_name),))
+        }
+    
+    @staticmethod
+    def user_turn(user_input: str) -> PizzaState:
+        """Input for a follow-up turn of an existing (checkpointed) session"""
+        return {
+            "user_input": user_input,
+            "requires_user_input": False,
+            **StateManager.add_turn(user_input, "user")
+        }
+    
     @staticmethod
     def transition_to_pizza_search(state: PizzaState, pizza_request: str) -> PizzaState:
         """Transition state to pizza search mode"""
-        state["wants_pizza"] = True
-        state["pizza_request"] = pizza_request
-        state["conversation_context"].status = ConversationStatus.PROCESSING_ORDER
-        state["next_action"] = "pizza_search"
-        return state
+        return {
+            "wants_pizza": True,
+            "pizza_request": pizza_request,
+            "conversation_context": ContextUpdate(
+                status=ConversationStatus.PROCESSING_ORDER
+            ),
+            "next_action": "pizza_search",
+            **StateManager.clear_errors(state),
+        }
     
     @staticmethod
     def transition_to_continuation(state: PizzaState) -> PizzaState:
         """Transition state to continuation mode"""
-        state["conversation_context"].status = ConversationStatus.AWAITING_CONTINUATION
-        state["next_action"] = "continuation"
-        state["requires_user_input"] = True
-        return state
+        return {
+            "conversation_context": ContextUpdate(
+                status=ConversationStatus.AWAITING_CONTINUATION
+            ),
+            "next_action": "continuation",
+            "requires_user_input": True,
+        }
     
     @staticmethod
     def transition_to_exit(state: PizzaState, reason: str) -> PizzaState:
         """Transition state to exit mode"""
-        state["wants_pizza"] = False
-        state["exit_reason"] = reason
-        state["conversation_context"].status = ConversationStatus.EXITED
-        state["next_action"] = "exit"
-        return state
+        return {
+            "wants_pizza": False,
+            "exit_reason": reason,
+            "conversation_context": ContextUpdate(status=ConversationStatus.EXITED),
+            "next_action": "exit"
+        }
     
     @staticmethod
     def add_error(state: PizzaState, error: str) -> PizzaState:
         """Add an error to the state"""
-        if state["validation_errors"] is None:
-            state["validation_errors"] = []
-        state["validation_errors"].append(error)
-        state["last_error"] = error
-        state["retry_count"] += 1
-        return state
+        return {
+            "validation_errors": [error],
+            "last_error": error,
+            "retry_count": state.get("retry_count", 0) + 1
+        }
     
     @staticmethod
     def clear_errors(state: PizzaState) -> PizzaState:
         """Clear errors from state"""
-        state["validation_errors"] = None
-        state["last_error"] = None
-        state["retry_count"] = 0
-        return state
+        return {
+            "validation_errors": None,
+            "last_error": None,
+            "retry_count": 0
+        }
     
     @staticmethod
     def reset_for_new_order(state: PizzaState) -> PizzaState:
         """Reset state fields for a new pizza order while preserving context"""
-        state["pizza_request"] = None
-        state["found_pizza"] = None
-        state["matched_pizzas"] = None
-        state["selected_pizza"] = None
-        state["continue_ordering"] = None
-        state["next_action"] = "triage"
-        state["requires_user_input"] = True
-        StateManager.clear_errors(state)
-        return state
+        return {
+            "pizza_request": None,
+            "found_pizza": None,
+            "matched_pizzas": None,
+            "selected_pizza": None,
+            "continue_ordering": None,
+            "next_action": "triage",
+            "requires_user_input": True,
+            **StateManager.clear_errors(state)
+        }
+    
+    @staticmethod
+    def merge(*updates: PizzaState) -> PizzaState:
+        """
+        Combine partial updates produced within one node, in order.
+        Context updates and new validation errors accumulate; other fields
+        take the last value.
+        """
+        merged: Dict[str, Any] = {}
+        for update in updates:
+            for key, value in update.items():
+                previous = merged.get(key)
+                if (
+                    key == "conversation_context"
+                    and isinstance(previous, ContextUpdate)
+                    and isinstance(value, ContextUpdate)
+                ):
+                    value = previous.merge(value)
+                elif key == "validation_errors" and previous and value:
+                    value = previous + value
+                merged[key] = value
+        return merged
+    
+    @staticmethod
+    def apply(state: PizzaState, update: Optional[PizzaState]) -> PizzaState:
+        """
+        Apply a partial update to a full state outside of a compiled graph,
+        using the same reducers as the graph. Returns a new state dict.
+        """
+        new_state = dict(state)
+        for key, value in (update or {}).items():
+            reducer = _STATE_REDUCERS.get(key)
+            new_state[key] = reducer(new_state.get(key), value) if reducer else value
+        return new_state
+
+def _state_reducers() -> Dict[str, Any]:
+    """Reducers declared via Annotated on PizzaState"""
+    hints = get_type_hints(PizzaState, include_extras=True)
+    return {
+        key: hint.__metadata__[-1]
+        for key, hint in hints.items()
+        if getattr(hint, "__metadata__", None) and callable(hint.__metadata__[-1])
+    }
+
+_STATE_REDUCERS = _state_reducers()
 
 # Type aliases for better readability
 AgentResponse = Dict[str, Any]
@@ -0,0 +1,89 @@
+"""
+Test suite for the per-class prompt templates and chains of the LLM agents.
+"""
+
+import os
+import sys
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+
+import agents
+from agents import PizzaAgentLLM, TriageAgentLLM
+from state import StateManager
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from common.agent_chains import AgentChains, default_chains
+from common.llm_clients import default_registry
+
+class TestAgentChains(unittest.TestCase):
+    """Templates are parsed and chains built once per agent class"""
+
+    def setUp(self):
+        self.state = StateManager.create_initial_state("I want a veggie pizza", "s1")
+        self.state["pizza_request"] = "veggie"
+        self.llm = FakeListChatModel(responses=["Try the Veggie Supreme"])
+
+    def test_template_parsed_once_per_class(self):
+        default_chains.clear()
+        with mock.patch.object(
+            agents.ChatPromptTemplate,
+            "from_messages",
+            wraps=agents.ChatPromptTemplate.from_messages,
+        ) as from_messages:
+            for _ in range(3):
+                PizzaAgentLLM(self.state).prompt()
+                TriageAgentLLM(self.state).prompt()
+        self.assertEqual(from_messages.call_count, 2)
+        self.assertIsNot(
+            PizzaAgentLLM(self.state).prompt(), TriageAgentLLM(self.state).prompt()
+        )
+
+    def test_chain_shared_across_calls_and_threads(self):
+        first = PizzaAgentLLM(self.state).chain(self.llm)
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            chains = list(
+                pool.map(lambda _: PizzaAgentLLM(self.state).chain(self.llm), range(8))
+            )
+        self.assertTrue(all(chain is first for chain in chains))
+        self.assertEqual(
+            first.invoke({"user_input": "", "pizza_request": "veggie"}),
+            "Try the Veggie Supreme",
+        )
+
+    def test_chain_kept_per_model(self):
+        first = PizzaAgentLLM(self.state).chain(self.llm)
+        other = FakeListChatModel(responses=["Margherita"])
+        second = PizzaAgentLLM(self.state).chain(other)
+        self.assertIsNot(second, first)
+        with mock.patch.object(default_registry, "chat_model", lambda **kwargs: other):
+            PizzaAgentLLM(self.state).execute(on_token=lambda token: None)
+        # Alternating models (pool fallback) reuses both chains
+        self.assertIs(PizzaAgentLLM(self.state).chain(self.llm), first)
+        self.assertIs(PizzaAgentLLM(self.state).chain(other), second)
+
+    def test_chains_bounded(self):
+        models = [
+            FakeListChatModel(responses=["x"])
+            for _ in range(default_chains.max_chains + 5)
+        ]
+        for llm in models:
+            PizzaAgentLLM(self.state).chain(llm)
+        self.assertEqual(len(default_chains), default_chains.max_chains)
+
+    def test_chains_evict_least_recently_used(self):
+        chains = AgentChains(max_chains=2)
+        build = PizzaAgentLLM(self.state)._build_prompt
+        first, second, third = (FakeListChatModel(responses=["x"]) for _ in range(3))
+        kept = chains.chain(PizzaAgentLLM, first, build)
+        chains.chain(PizzaAgentLLM, second, build)
+        self.assertIs(chains.chain(PizzaAgentLLM, first, build), kept)
+        chains.chain(PizzaAgentLLM, third, build)
+        # `second` was evicted, `first` was used more recently
+        self.assertIs(chains.chain(PizzaAgentLLM, first, build), kept)
+        self.assertEqual(len(chains), 2)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,55 @@
+"""
+Test suite for the concurrent batch session driver.
+"""
+
+import json
+import unittest
+from benchmarks.batch_sessions import (
+    run_batch,
+    synthetic_corpus,
+    load_corpus,
+    percentile,
+    DEFAULT_CORPUS,
+)
+
+class TestBatchSessions(unittest.TestCase):
+    """Test concurrent conversation replay and its report"""
+
+    def test_report_counts_turns_and_errors(self):
+        """Every played turn is timed and failing sessions are counted by error type"""
+        conversations = [
+            {
+                "name": "two pizzas",
+                "turns": [
+                    "Give me a margherita pizza",
+                    "another pepperoni pizza",
+                    "done",
+                ],
+            },
+            {"name": "declines", "turns": ["No thanks", "are you sure?"]},
+            {"name": "broken", "turns": [None]},
+        ]
+        report = run_batch(conversations * 2, workers=3)
+
+        self.assertEqual(report["sessions"], 6)
+        self.assertEqual(report["turns"], 2 * (3 + 1 + 1))
+        self.assertEqual(report["unused_turns"], 2)
+        self.assertEqual(report["failed_sessions"], 2)
+        self.assertEqual(report["errors"], {"AttributeError": 2})
+        self.assertGreater(report["sessions_per_sec"], 0)
+        self.assertLessEqual(
+            report["turn_latency_ms"]["p50"], report["turn_latency_ms"]["p99"]
+        )
+        json.dumps(report)
+
+    def test_corpora(self):
+        """The bundled corpus loads and synthetic corpora are reproducible"""
+        self.assertTrue(
+            all(conversation["turns"] for conversation in load_corpus(DEFAULT_CORPUS))
+        )
+        self.assertEqual(synthetic_corpus(5, seed=1), synthetic_corpus(5, seed=1))
+        self.assertEqual(percentile([1, 2, 3, 4], 50), 2)
+        self.assertEqual(percentile([1, 2, 3, 4], 99), 4)
+
+if __name__ == "__main__":
+    unittest.main()
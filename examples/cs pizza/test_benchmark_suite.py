@@ -0,0 +1,116 @@
+"""
+Test suite for the microbenchmark regression checks.
+"""
+
+import json
+import os
+import tempfile
+import unittest
+from benchmarks.suite import (
+    SuiteConfig,
+    Workload,
+    CASES,
+    run_suite,
+    combine_runs,
+    compare,
+    save_baseline,
+    load_baseline,
+    main,
+)
+
+class TestBenchmarkSuite(unittest.TestCase):
+    """Test case execution, baselines and regression detection"""
+
+    def test_every_case_runs(self):
+        """All registered hot paths execute against a small synthetic workload"""
+        results = run_suite(
+            SuiteConfig(catalog=20, orders=10, order_items=3),
+            min_time=0.001,
+            repeat=1,
+            runs=2,
+        )
+        self.assertEqual(set(results), set(CASES))
+        for result in results.values():
+            self.assertGreater(result["min_us"], 0)
+            self.assertGreater(result["relative"], 0)
+            self.assertGreaterEqual(result["noise"], 0)
+
+    def test_regression_classification(self):
+        """Slowdowns beyond the threshold regress; large speedups are reported"""
+        baseline = {name: {"min_us": 5, "relative": 1.0} for name in "abc"}
+        results = {
+            "a": {"min_us": 5, "relative": 1.1},
+            "b": {"min_us": 5, "relative": 1.5},
+            "c": {"min_us": 5, "relative": 0.5},
+            "d": {"min_us": 5, "relative": 1.0},
+        }
+        statuses = {
+            row["case"]: row["status"]
+            for row in compare(results, baseline, threshold=0.25)
+        }
+        self.assertEqual(
+            statuses, {"a": "ok", "b": "REGRESSED", "c": "improved", "d": "new"}
+        )
+
+    def test_median_run_and_noise_floor(self):
+        """
+        One slow run does not move a case; noisy cases get a wider tolerance, up
+        to twice the threshold
+        """
+        samples = [
+            {"median_us": us, "min_us": us, "loops": 8, "relative": us / 10}
+            for us in (10.0, 11.0, 30.0)
+        ]
+        combined = combine_runs(samples)
+        self.assertEqual(combined["relative"], 1.1)
+        self.assertAlmostEqual(combined["noise"], 0.1 / 1.1)
+
+        baseline = {
+            "quiet": {"min_us": 5, "relative": 1.0, "noise": 0.02},
+            "noisy": {"min_us": 5, "relative": 1.0, "noise": 0.12},
+            "erratic": {"min_us": 5, "relative": 1.0, "noise": 0.5},
+        }
+        results = {name: {"min_us": 5, "relative": 1.35} for name in baseline}
+        rows = {row["case"]: row for row in compare(results, baseline, threshold=0.25)}
+        self.assertEqual(rows["quiet"]["status"], "REGRESSED")
+        self.assertEqual(rows["noisy"]["status"], "ok")
+        self.assertAlmostEqual(rows["noisy"]["tolerance"], 0.36)
+        results["erratic"]["relative"] = 1.6
+        erratic = compare(results, baseline, threshold=0.25)[2]
+        self.assertEqual((erratic["tolerance"], erratic["status"]), (0.5, "REGRESSED"))
+
+    def test_app_invoke_keeps_no_session_state(self):
+        """Each timed invoke starts a fresh session and ends it"""
+        workload = Workload(SuiteConfig(catalog=20, orders=10, order_items=3))
+        run = CASES["app_invoke"](workload)
+        for _ in range(3):
+            run()
+        self.assertEqual(len(workload.runtime.order_service._orders), 0)
+
+    def test_baseline_round_trip_and_config_mismatch(self):
+        """
+        Baselines store their workload config and refuse comparisons across configs
+        """
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "baseline.json")
+            config = SuiteConfig(catalog=20, orders=10, order_items=3)
+            save_baseline(path, config, {"routers": {"min_us": 1.0, "relative": 0.01}})
+            self.assertEqual(load_baseline(path)["config"], vars(config))
+            exit_code = main(
+                [
+                    "--only",
+                    "routers",
+                    "--catalog",
+                    "30",
+                    "--min-time",
+                    "0.001",
+                    "--repeat",
+                    "1",
+                    "--baseline",
+                    path,
+                ]
+            )
+            self.assertEqual(exit_code, 2)
+
+if __name__ == "__main__":
+    unittest.main()
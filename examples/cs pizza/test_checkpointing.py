@@ -0,0 +1,194 @@
+"""
+Test suite for disk-backed session checkpointing.
+"""
+
+import contextlib
+import io
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+from langgraph.types import Command
+from state import StateManager, ContextUpdate, ConversationStatus, OrderStatus
+from runtime import PizzaRuntime
+from checkpointing import PizzaCheckpointer, PizzaStateSerializer, session_config
+from graph import create_workflow
+
+def build_app(checkpointer: PizzaCheckpointer):
+    return create_workflow().compile(checkpointer=checkpointer)
+
+class TestCheckpointing(unittest.TestCase):
+    """Test serialization, resume and pruning of pizza sessions"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "sessions.db")
+        self.runtime = PizzaRuntime.create()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def run_turns(self, app, session_id: str, *inputs: str):
+        config = session_config(session_id)
+        with contextlib.redirect_stdout(io.StringIO()):
+            app.invoke(
+                StateManager.create_initial_state(inputs[0], session_id),
+                config,
+                context=self.runtime,
+            )
+            for user_input in inputs[1:]:
+                app.invoke(Command(resume=user_input), config, context=self.runtime)
+        return app.get_state(config).values
+
+    def test_serializer_round_trip(self):
+        """Orders, pizzas, context and enums survive the compact encoding"""
+        app = build_app(PizzaCheckpointer.open(self.path))
+        state = self.run_turns(
+            app, "s1", "I want a pepperoni pizza", "yes another margherita pizza"
+        )
+        update = ContextUpdate(
+            turns=(("hi", "user"),), status=ConversationStatus.EXITED
+        )
+
+        serde = PizzaStateSerializer()
+        typed = serde.dumps_typed({"state": state, "update": update})
+        self.assertEqual(typed[0], PizzaStateSerializer.TYPE)
+        restored = serde.loads_typed(typed)
+
+        self.assertEqual(restored["update"], update)
+        order = restored["state"]["current_order"]
+        self.assertEqual(
+            [item.pizza.name for item in order.items], ["pepperoni", "margherita"]
+        )
+        self.assertEqual(order.status, OrderStatus.PENDING)
+        self.assertAlmostEqual(order.total_amount, state["current_order"].total_amount)
+        self.assertEqual(
+            order.items[0].timestamp, state["current_order"].items[0].timestamp
+        )
+        self.assertEqual(
+            restored["state"]["conversation_context"], state["conversation_context"]
+        )
+
+    def test_unknown_types_fall_back(self):
+        """Values the compact format cannot encode use the default serializer"""
+        serde = PizzaStateSerializer()
+        value = {"when": {1, 2, 3}}
+        typed = serde.dumps_typed(value)
+        self.assertNotEqual(typed[0], PizzaStateSerializer.TYPE)
+        self.assertEqual(serde.loads_typed(typed), value)
+
+    def test_resume_after_restart(self):
+        """A new process resumes a session from its last checkpoint"""
+        first = build_app(PizzaCheckpointer.open(self.path))
+        before = self.run_turns(first, "s1", "I want a pepperoni pizza")
+
+        restarted = build_app(PizzaCheckpointer.open(self.path))
+        resumed = restarted.get_state(session_config("s1")).values
+        self.assertEqual(resumed["current_order"].items, before["current_order"].items)
+        self.assertEqual(
+            resumed["conversation_context"], before["conversation_context"]
+        )
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            restarted.invoke(
+                Command(resume="add a hawaiian pizza"),
+                session_config("s1"),
+                context=PizzaRuntime.create(),
+            )
+        after = restarted.get_state(session_config("s1")).values
+        self.assertEqual(
+            [item.pizza.name for item in after["current_order"].items],
+            ["pepperoni", "hawaiian"],
+        )
+
+    def test_reply_resumes_at_waiting_node(self):
+        """A reply resumes the paused run at await_user without re-running triage"""
+        app = build_app(PizzaCheckpointer.open(self.path))
+        self.run_turns(app, "s1", "I want a pepperoni pizza")
+        config = session_config("s1")
+        self.assertEqual(app.get_state(config).next, ("await_user",))
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            nodes = [
+                node
+                for chunk in app.stream(
+                    Command(resume="another margherita pizza"),
+                    config,
+                    context=self.runtime,
+                )
+                for node in chunk
+            ]
+        self.assertEqual(
+            nodes, ["await_user", "pizza_agent", "continuation_agent", "__interrupt__"]
+        )
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            app.invoke(Command(resume="done, thanks"), config, context=self.runtime)
+        snapshot = app.get_state(config)
+        self.assertEqual(snapshot.next, ())
+        self.assertEqual(
+            snapshot.values["conversation_context"].status, ConversationStatus.EXITED
+        )
+        self.assertEqual(len(snapshot.values["current_order"].items), 2)
+
+    def test_pruning_bounds_storage(self):
+        """Only the newest checkpoints and their writes are kept per session"""
+        checkpointer = PizzaCheckpointer.open(self.path, keep_last=2)
+        app = build_app(checkpointer)
+        self.run_turns(
+            app,
+            "s1",
+            "I want a pepperoni pizza",
+            "add a hawaiian pizza",
+            "also a veggie pizza",
+        )
+        self.run_turns(app, "s2", "I want a pepperoni pizza")
+
+        stats = checkpointer.storage_stats()
+        self.assertEqual(stats["threads"], 2)
+        self.assertEqual(stats["checkpoints"], 4)
+        with checkpointer.cursor(transaction=False) as cur:
+            orphans = cur.execute("""SELECT COUNT(*) FROM writes w WHERE NOT EXISTS (
+                SELECT 1 FROM checkpoints c WHERE c.thread_id = w.thread_id
+                AND c.checkpoint_id = w.checkpoint_id)""").fetchone()[0]
+        self.assertEqual(orphans, 0)
+        self.assertEqual(
+            len(app.get_state(session_config("s1")).values["current_order"].items), 3
+        )
+
+    def test_pruning_keeps_writes_of_unsaved_checkpoint(self):
+        """
+        Pending writes stored before their (background-saved) checkpoint survive pruning
+        """
+        checkpointer = PizzaCheckpointer.open(self.path, keep_last=3)
+        app = build_app(checkpointer)
+        self.run_turns(app, "s1", "I want a pepperoni pizza")
+        latest = checkpointer.get_tuple(session_config("s1")).config
+        ahead = dict(latest["configurable"], checkpoint_id="~future")
+        checkpointer.put_writes(
+            {"configurable": ahead}, [("__interrupt__", "pending")], "task-1"
+        )
+
+        self.assertGreater(checkpointer.prune("s1", keep_last=1), 0)
+        with checkpointer.cursor(transaction=False) as cur:
+            kept = cur.execute(
+                "SELECT COUNT(*) FROM writes WHERE checkpoint_id = '~future'"
+            ).fetchone()[0]
+        self.assertEqual(kept, 1)
+
+    def test_import_opens_no_database(self):
+        """Importing main creates no database, in the working directory or elsewhere"""
+        here = os.path.dirname(os.path.abspath(__file__))
+        env = dict(os.environ, PYTHONPATH=here, PIZZA_CHECKPOINT_DB=self.path)
+        subprocess.run(
+            [sys.executable, "-c", "import main"],
+            cwd=self.tmp.name,
+            env=env,
+            check=True,
+            capture_output=True,
+        )
+        self.assertEqual(os.listdir(self.tmp.name), [])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,65 @@
+"""
+Test suite for on-demand, hash-cached Mermaid diagrams.
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+
+from graph import create_workflow
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from common.diagrams import graph_fingerprint, cached_fingerprint, write_mermaid
+
+class TestDiagrams(unittest.TestCase):
+    """Test structural hashing and cached diagram writes"""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "workflow_graph.mmd")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_fingerprint_tracks_structure(self):
+        """Same structure, same hash; compiled and uncompiled graphs agree"""
+        workflow = create_workflow()
+        self.assertEqual(
+            graph_fingerprint(workflow), graph_fingerprint(create_workflow())
+        )
+        self.assertEqual(
+            graph_fingerprint(workflow), graph_fingerprint(workflow.compile())
+        )
+        self.assertNotEqual(
+            graph_fingerprint(workflow),
+            graph_fingerprint(create_workflow(wait_for_user=False)),
+        )
+
+    def test_unchanged_graph_is_not_redrawn(self):
+        self.assertTrue(write_mermaid(create_workflow(), self.path))
+        with open(self.path) as f:
+            drawn = f.read()
+        self.assertIn("await_user", drawn)
+        self.assertEqual(
+            cached_fingerprint(self.path), graph_fingerprint(create_workflow())
+        )
+
+        self.assertFalse(write_mermaid(create_workflow(), self.path))
+        self.assertTrue(write_mermaid(create_workflow(), self.path, force=True))
+        # A structural change redraws
+        self.assertTrue(write_mermaid(create_workflow(wait_for_user=False), self.path))
+        with open(self.path) as f:
+            self.assertNotIn("await_user", f.read())
+
+    def test_committed_diagram_is_current(self):
+        """
+        workflow_graph.mmd matches graph.py (regenerate with ../common/diagrams.py)
+        """
+        path = os.path.join(
+            os.path.dirname(os.path.abspath(__file__)), "workflow_graph.mmd"
+        )
+        self.assertEqual(cached_fingerprint(path), graph_fingerprint(create_workflow()))
+
+if __name__ == '__main__':
+    unittest.main()
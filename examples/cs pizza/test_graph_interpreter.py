@@ -0,0 +1,140 @@
+"""
+Test suite for the in-process graph interpreter and the scenario fuzzer.
+"""
+
+import operator
+import os
+import sqlite3
+import sys
+import unittest
+from typing import Annotated, List, TypedDict
+
+from langgraph.errors import GraphRecursionError
+from langgraph.graph import StateGraph, END
+from langgraph.types import Command
+
+from runtime import PizzaRuntime
+from checkpointing import PizzaCheckpointer
+from graph import create_workflow
+from benchmarks.batch_sessions import load_corpus, DEFAULT_CORPUS
+from benchmarks.fuzz_scenarios import fuzz, run_compiled, run_interpreted, shrink
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from common.graph_interpreter import GraphInterpreter, UnsupportedGraphError
+
+class CounterState(TypedDict):
+    count: int
+    visited: Annotated[List[str], operator.add]
+
+def increment(state: CounterState) -> CounterState:
+    return {"count": state["count"] + 1, "visited": ["increment"]}
+
+class TestGraphInterpreter(unittest.TestCase):
+    """Test the interpreter against the compiled LangGraph app"""
+
+    def test_same_paths_and_orders_as_compiled_app(self):
+        """Every turn of the scripted corpus takes the same node path"""
+        workflow = create_workflow()
+        app = workflow.compile(
+            checkpointer=PizzaCheckpointer(
+                sqlite3.connect(":memory:", check_same_thread=False)
+            )
+        )
+        interpreter = GraphInterpreter(workflow, context=PizzaRuntime.create())
+        runtime = PizzaRuntime.create()
+
+        for index, conversation in enumerate(load_corpus(DEFAULT_CORPUS)):
+            with self.subTest(conversation=conversation["name"]):
+                compiled = run_compiled(
+                    app, runtime, conversation["turns"], f"corpus-{index}"
+                )
+                interpreted = run_interpreted(interpreter, conversation["turns"])
+                self.assertEqual(interpreted.paths, compiled.paths)
+                self.assertEqual(interpreted.paused, compiled.paused)
+                for key in (
+                    "exit_reason",
+                    "wants_pizza",
+                    "requires_user_input",
+                    "validation_errors",
+                ):
+                    self.assertEqual(
+                        interpreted.state.get(key), compiled.state.get(key), key
+                    )
+                order, expected = interpreted.state.get(
+                    "current_order"
+                ), compiled.state.get("current_order")
+                self.assertEqual(
+                    [item.pizza.name for item in order.items] if order else None,
+                    [item.pizza.name for item in expected.items] if expected else None,
+                )
+                self.assertEqual(
+                    interpreted.state["conversation_context"].conversation_history,
+                    compiled.state["conversation_context"].conversation_history,
+                )
+
+    def test_fuzzed_scenarios(self):
+        """Random conversations satisfy the properties and match the compiled app"""
+        result = fuzz(1000, seed=11, compare=100)
+        self.assertEqual(result["failures"], [])
+        self.assertEqual(result["mismatches"], [])
+
+    def test_reducers_and_recursion_limit(self):
+        workflow = StateGraph(CounterState)
+        workflow.add_node("increment", increment)
+        workflow.set_entry_point("increment")
+        workflow.add_conditional_edges(
+            "increment", lambda s: END if s["count"] >= 3 else "increment"
+        )
+
+        run = GraphInterpreter(workflow).run({"count": 0})
+        self.assertEqual(run.path, ["increment"] * 3)
+        self.assertEqual(run.state, {"count": 3, "visited": ["increment"] * 3})
+        self.assertEqual(run.state, workflow.compile().invoke({"count": 0}))
+
+        with self.assertRaises(GraphRecursionError):
+            GraphInterpreter(workflow, recursion_limit=2).run({"count": 0})
+
+    def test_command_goto(self):
+        workflow = StateGraph(CounterState)
+        workflow.add_node(
+            "jump", lambda s: Command(update={"count": 10}, goto="increment")
+        )
+        workflow.add_node("increment", increment)
+        workflow.set_entry_point("jump")
+        workflow.add_edge("increment", END)
+
+        run = GraphInterpreter(workflow).run({"count": 0})
+        self.assertEqual(run.path, ["jump", "increment"])
+        self.assertEqual(run.state["count"], 11)
+
+    def test_fan_out_is_rejected(self):
+        workflow = StateGraph(CounterState)
+        workflow.add_node("a", increment)
+        workflow.add_node("b", increment)
+        workflow.add_node("c", increment)
+        workflow.set_entry_point("a")
+        workflow.add_edge("a", "b")
+        workflow.add_edge("a", "c")
+        with self.assertRaises(UnsupportedGraphError):
+            GraphInterpreter(workflow)
+
+        # Fan-out decided by a router shows only at run time: same error
+        workflow = StateGraph(CounterState)
+        for name in ("a", "b", "c"):
+            workflow.add_node(name, increment)
+        workflow.set_entry_point("a")
+        workflow.add_conditional_edges("a", lambda state: ["b", "c"], ["b", "c"])
+        interpreter = GraphInterpreter(workflow)
+        with self.assertRaises(UnsupportedGraphError):
+            interpreter.run({"count": 0})
+
+    def test_shrink(self):
+        """Failing conversations are reduced to the turns and words that matter"""
+        turns = ["i want a pizza", "another pepperoni please", "done thanks"]
+        self.assertEqual(
+            shrink(turns, lambda candidate: any("pepperoni" in t for t in candidate)),
+            ["pepperoni"],
+        )
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,138 @@
+"""
+Test suite for the static graph optimizer.
+"""
+
+import contextlib
+import io
+import os
+import sqlite3
+import sys
+import unittest
+from typing import Literal, TypedDict
+
+from langgraph.graph import StateGraph, END
+
+from runtime import PizzaRuntime
+from checkpointing import PizzaCheckpointer
+from graph import create_workflow
+from benchmarks.batch_sessions import load_corpus, DEFAULT_CORPUS
+from benchmarks.fuzz_scenarios import run_compiled
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from common.graph_optimizer import analyze, main, optimize_graph
+
+class LoopState(TypedDict):
+    count: int
+
+def step(state: LoopState) -> LoopState:
+    return {"count": state["count"] + 1}
+
+def always_b(state: LoopState) -> Literal["b"]:
+    return "b"
+
+def anywhere(state: LoopState) -> str:
+    return END
+
+class TestGraphOptimizer(unittest.TestCase):
+    """Test the analysis report and the constant-router rewrite"""
+
+    def test_pizza_constant_router_becomes_edge(self):
+        """
+        route_after_pizza is compiled as a plain edge; the source graph is untouched
+        """
+        workflow = create_workflow()
+        report = analyze(workflow)
+        self.assertEqual(
+            report.constant_routers,
+            {("pizza_agent", "route_after_pizza"): "continuation_agent"},
+        )
+        self.assertEqual(
+            [finding.kind for finding in report.findings], ["constant-router"]
+        )
+
+        optimized = optimize_graph(workflow)
+        self.assertIn(("pizza_agent", "continuation_agent"), optimized.edges)
+        self.assertNotIn("pizza_agent", optimized.branches)
+        self.assertIn("pizza_agent", workflow.branches)
+        self.assertNotIn(("pizza_agent", "continuation_agent"), workflow.edges)
+        self.assertEqual(analyze(optimized).findings, [])
+        self.assertIs(optimize_graph(optimized), optimized)
+
+    def test_optimized_app_takes_same_paths(self):
+        """
+        Every corpus conversation takes the same node path with and without the rewrite
+        """
+        workflow = create_workflow()
+        runtime = PizzaRuntime.create()
+        apps = [
+            graph.compile(
+                checkpointer=PizzaCheckpointer(
+                    sqlite3.connect(":memory:", check_same_thread=False)
+                )
+            )
+            for graph in (workflow, optimize_graph(workflow))
+        ]
+        for index, conversation in enumerate(load_corpus(DEFAULT_CORPUS)):
+            with self.subTest(conversation=conversation["name"]):
+                original, optimized = (
+                    run_compiled(
+                        app, runtime, conversation["turns"], f"optimizer-{index}"
+                    )
+                    for app in apps
+                )
+                self.assertEqual(optimized.paths, original.paths)
+                self.assertEqual(
+                    optimized.state.get("exit_reason"),
+                    original.state.get("exit_reason"),
+                )
+
+    def test_literal_annotation_and_open_routers(self):
+        """
+        A single-valued Literal is constant; a router without path map or Literal is not
+        """
+        workflow = StateGraph(LoopState)
+        for name in ("a", "b", "c"):
+            workflow.add_node(name, step)
+        workflow.set_entry_point("a")
+        workflow.add_conditional_edges("a", always_b)
+        workflow.add_conditional_edges("b", anywhere)
+        workflow.add_edge("c", END)
+        report = analyze(workflow)
+        self.assertEqual(report.constant_routers, {("a", "always_b"): "b"})
+        # "anywhere" may route to c, so every node counts as reachable
+        self.assertEqual(report.of_kind("unreachable-node"), [])
+        self.assertEqual(
+            optimize_graph(workflow)
+            .compile()
+            .invoke({"count": 0}, {"recursion_limit": 5})["count"],
+            2,
+        )
+
+    def test_unreachable_nodes_and_cycles_without_exit(self):
+        workflow = StateGraph(LoopState)
+        for name in ("start", "ping", "pong", "orphan"):
+            workflow.add_node(name, step)
+        workflow.set_entry_point("start")
+        workflow.add_edge("start", "ping")
+        workflow.add_edge("ping", "pong")
+        workflow.add_edge("pong", "ping")
+        workflow.add_edge("orphan", END)
+        report = analyze(workflow)
+        self.assertEqual(
+            [finding.nodes for finding in report.of_kind("unreachable-node")],
+            [("orphan",)],
+        )
+        cycles = report.of_kind("cycle-without-exit")
+        self.assertEqual([finding.nodes for finding in cycles], [("ping", "pong")])
+        self.assertIn("ping -> pong -> ping", str(report))
+
+        # A conditional exit out of the cycle clears the finding
+        workflow.add_conditional_edges("pong", anywhere, {"ping": "ping", "done": END})
+        self.assertEqual(analyze(workflow).of_kind("cycle-without-exit"), [])
+
+    def test_cli_when_imported(self):
+        """The CLI loads its target through `common`, not only when run as a script"""
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            self.assertEqual(main(["graph:create_workflow"]), 0)
+        self.assertIn("constant-router: route_after_pizza", output.getvalue())
@@ -0,0 +1,114 @@
+"""
+Test suite for per-node and per-router graph instrumentation.
+"""
+
+import json
+import os
+import sqlite3
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+from langgraph.types import Command
+
+from state import StateManager
+from runtime import PizzaRuntime
+from checkpointing import PizzaCheckpointer, session_config
+from graph import create_workflow
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from common.graph_profiler import (
+    GraphProfiler,
+    LatencyHistogram,
+    instrument_from_env,
+    is_instrumented,
+)
+
+class TestGraphProfiler(unittest.TestCase):
+    """Test instrumentation of the compiled pizza graph"""
+
+    def setUp(self):
+        checkpointer = PizzaCheckpointer(
+            sqlite3.connect(":memory:", check_same_thread=False)
+        )
+        self.app = create_workflow().compile(checkpointer=checkpointer)
+        self.runtime = PizzaRuntime.create()
+        self.profiler = GraphProfiler()
+
+    def order_two_pizzas(self, app):
+        config = session_config("session_1")
+        app.invoke(
+            StateManager.create_initial_state("I want a pepperoni pizza", "session_1"),
+            config,
+            context=self.runtime,
+        )
+        app.invoke(
+            Command(resume="another hawaiian pizza"), config, context=self.runtime
+        )
+        return app.invoke(Command(resume="done"), config, context=self.runtime)
+
+    def test_records_nodes_and_routers(self):
+        """Every node and conditional edge gets its own histogram"""
+        result = self.order_two_pizzas(self.profiler.instrument(self.app))
+        self.assertEqual(len(result['current_order'].items), 2)
+
+        stats = self.profiler.stats()
+        self.assertEqual(stats["nodes"]["pizza_agent"]["calls"], 2)
+        self.assertEqual(stats["nodes"]["triage"]["calls"], 1)
+        self.assertEqual(
+            stats["routers"]["continuation_agent:route_after_continuation"]["calls"], 2
+        )
+        self.assertEqual(
+            stats["routers"]["await_user:route_after_await_user"]["calls"], 2
+        )
+        # Each reply resumes await_user after it paused the run
+        self.assertEqual(stats["nodes"]["await_user"]["interrupts"], 2)
+        wall = stats["nodes"]["pizza_agent"]["wall"]
+        self.assertEqual(sum(wall["buckets_us"].values()), 2)
+        self.assertGreater(wall["max_us"], 0)
+
+    def test_graph_shape_and_settings_are_kept(self):
+        """The instrumented app draws the same graph and keeps its checkpointer"""
+        instrumented = self.profiler.instrument(self.app)
+        self.assertIs(instrumented.checkpointer, self.app.checkpointer)
+        self.assertEqual(
+            instrumented.get_graph().draw_mermaid(), self.app.get_graph().draw_mermaid()
+        )
+        self.assertTrue(is_instrumented(instrumented))
+        self.assertFalse(is_instrumented(self.app))
+
+    def test_disabled_profiler_records_nothing(self):
+        self.profiler.enabled = False
+        self.order_two_pizzas(self.profiler.instrument(self.app))
+        self.assertEqual(self.profiler.stats(), {"nodes": {}, "routers": {}})
+
+    def test_environment_flag(self):
+        """Without GRAPH_PROFILE the app is returned unchanged"""
+        with mock.patch.dict(os.environ, {"GRAPH_PROFILE": ""}):
+            self.assertIs(instrument_from_env(self.app, self.profiler), self.app)
+        with mock.patch.dict(os.environ, {"GRAPH_PROFILE": "1"}):
+            self.assertTrue(
+                is_instrumented(instrument_from_env(self.app, self.profiler))
+            )
+
+    def test_export_json(self):
+        self.order_two_pizzas(self.profiler.instrument(self.app))
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "profile.json")
+            self.profiler.export_json(path)
+            with open(path) as f:
+                exported = json.load(f)
+        self.assertEqual(exported, json.loads(json.dumps(self.profiler.stats())))
+
+    def test_histogram_percentiles(self):
+        histogram = LatencyHistogram()
+        for us in [1, 2, 3, 5, 9, 17, 33, 65, 129, 1000]:
+            histogram.add(us * 1000)
+        self.assertEqual(histogram.count, 10)
+        self.assertEqual(histogram.percentile(50), 16.0)
+        self.assertEqual(histogram.percentile(100), 1000.0)
+        self.assertEqual(histogram.to_dict()["min_us"], 1.0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -79,7 +79,9 @@ class TestStateManagement(unittest.TestCase):
         self.assertEqual(state["retry_count"], 0)
         
         # Test pizza search transition
-        state = StateManager.transition_to_pizza_search(state, "pepperoni pizza")
+        update = StateManager.transition_to_pizza_search(state, "pepperoni pizza")
+        self.assertNotIn("user_input", update)  # Only changed fields are returned
+        state = StateManager.apply(state, update)
         
         self.assertTrue(state["wants_pizza"])
         self.assertEqual(state["pizza_request"], "pepperoni pizza")
@@ -87,25 +89,53 @@ class TestStateManagement(unittest.TestCase):
         self.assertEqual(state["next_action"], "pizza_search")
         
         # Test exit transition
-        state = StateManager.transition_to_exit(state, "User declined")
+        state = StateManager.apply(
+            state, StateManager.transition_to_exit(state, "User declined")
+        )
         
         self.assertFalse(state["wants_pizza"])
         self.assertEqual(state["exit_reason"], "User declined")
         self.assertEqual(state["conversation_context"].status, ConversationStatus.EXITED)
         
         # Test error handling
-        state = StateManager.add_error(state, "Test error")
+        state = StateManager.apply(state, StateManager.add_error(state, "Test error"))
         
         self.assertEqual(state["last_error"], "Test error")
         self.assertIn("Test error", state["validation_errors"])
         self.assertEqual(state["retry_count"], 1)
         
+        # Errors accumulate through the reducer
+        state = StateManager.apply(state, StateManager.add_error(state, "Second error"))
+        self.assertEqual(state["validation_errors"], ["Test error", "Second error"])
+        self.assertEqual(state["retry_count"], 2)
+        
         # Test error clearing
-        state = StateManager.clear_errors(state)
+        state = StateManager.apply(state, StateManager.clear_errors(state))
         
         self.assertIsNone(state["last_error"])
         self.assertIsNone(state["validation_errors"])
         self.assertEqual(state["retry_count"], 0)
+    
+    def test_conversation_context_reducer(self):
+        """Test that context updates append turns without mutating earlier states"""
+        state = StateManager.create_initial_state("I want pizza", "session_123")
+        original_context = state["conversation_context"]
+        
+        update = StateManager.merge(
+            StateManager.add_turn("I want pizza", "triage"),
+            StateManager.transition_to_pizza_search(state, "I want pizza")
+        )
+        new_state = StateManager.apply(state, update)
+        
+        context = new_state["conversation_context"]
+        self.assertEqual(context.turn_count, 1)
+        self.assertEqual(context.last_agent, "triage")
+        self.assertEqual(context.status, ConversationStatus.PROCESSING_ORDER)
+        self.assertEqual(len(context.conversation_history), 1)
+        
+        # The previous state is left untouched
+        self.assertEqual(original_context.turn_count, 0)
+        self.assertEqual(original_context.conversation_history, [])
 
 class TestPizzaService(unittest.TestCase):
     """Test pizza catalog and recommendation services"""
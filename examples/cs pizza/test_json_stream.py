@@ -0,0 +1,124 @@
+"""
+Test suite for incremental JSON parsing and early-stopped decisions.
+"""
+
+import os
+import sys
+import time
+import unittest
+from unittest import mock
+
+import agents
+from agents import TriageAgentLLM
+from state import StateManager
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from common.json_stream import IncrementalJSONParser, JSONStreamError, parse_json_stream
+from common.llm_clients import ClientRegistry
+from common.ollama_stub import OllamaStub
+
+TRIAGE_SCHEMA = {"wants_pizza": bool, "reason": str}
+
+def pieces(text, size):
+    return [text[index:index + size] for index in range(0, len(text), size)]
+
+class TestIncrementalJSONParser(unittest.TestCase):
+    """Values are parsed as they complete, whatever the token boundaries"""
+
+    def test_any_split(self):
+        text = (
+            'Sure!\n```json\n{"a": "x \\"y\\" }", '
+            '"b": {"c": [1, {"d": null}]}, "e": -1.5e2, "f": false}\n```'
+        )
+        for size in (1, 2, 3, 7, len(text)):
+            result = parse_json_stream(pieces(text, size))
+            self.assertEqual(
+                result.values,
+                {"a": 'x "y" }', "b": {"c": [1, {"d": None}]}, "e": -150.0, "f": False},
+            )
+            self.assertFalse(result.stopped_early)
+
+    def test_stops_when_required_keys_complete(self):
+        chunks = iter(
+            pieces('{"wants_pizza": true, "reason": "The user says pizza"}', 3)
+        )
+        result = parse_json_stream(
+            chunks, required=("wants_pizza",), schema=TRIAGE_SCHEMA
+        )
+        self.assertEqual(result.values, {"wants_pizza": True})
+        self.assertTrue(result.stopped_early)
+        self.assertNotIn("reason", result.text)
+        # The rest of the stream was not read
+        self.assertIn("reason", "".join(chunks))
+
+    def test_literal_needs_no_delimiter_but_number_does(self):
+        parser = IncrementalJSONParser(required=("n",))
+        self.assertFalse(parser.feed('{"n": 12'))
+        self.assertTrue(parser.feed("3,"))
+        self.assertEqual(parser.values, {"n": 123})
+        parser = IncrementalJSONParser(required=("ok",))
+        self.assertTrue(parser.feed('{"ok": true'))
+
+    def test_schema_violations(self):
+        with self.assertRaises(JSONStreamError):
+            parse_json_stream(
+                ['{"wants_pizza": "yes"}'],
+                required=("wants_pizza",),
+                schema=TRIAGE_SCHEMA,
+            )
+        with self.assertRaises(JSONStreamError):
+            parse_json_stream(['{"count": true}'], schema={"count": int})
+        with self.assertRaises(JSONStreamError):
+            parse_json_stream(
+                ['{"reason": "none"}'], required=("wants_pizza",), schema=TRIAGE_SCHEMA
+            )
+        with self.assertRaises(JSONStreamError):
+            parse_json_stream(['{"wants_pizza": tru'])
+        with self.assertRaises(JSONStreamError):
+            parse_json_stream(['{wants_pizza: true}'])
+
+    def test_closes_the_stream(self):
+        closed = []
+
+        def stream():
+            try:
+                yield '{"wants_pizza": false, '
+                yield '"reason": "bye"}'
+            finally:
+                closed.append(True)
+
+        parse_json_stream(stream(), required=("wants_pizza",))
+        self.assertEqual(closed, [True])
+
+class TestEarlyStoppedTriage(unittest.TestCase):
+    """TriageAgentLLM routes on wants_pizza without waiting for the reason"""
+
+    def test_generation_cancelled_after_decision(self):
+        reason = " ".join(["The user clearly mentions pizza and seems hungry."] * 6)
+        reply = f'{{"wants_pizza": true, "reason": "{reason}"}}'
+        registry = ClientRegistry()
+        self.addCleanup(registry.close)
+        with OllamaStub(default_reply=reply, tokens_per_sec=100) as stub:
+            llm = registry.chat_model("mistral:latest", stub.base_url, temperature=0.1)
+            agent = TriageAgentLLM(
+                StateManager.create_initial_state("a pizza please", "s1")
+            )
+            with mock.patch.object(
+                agents.default_registry, "chat_model", lambda **kwargs: llm
+            ):
+                start = time.perf_counter()
+                agent.execute(on_token=lambda text: None)
+                elapsed = time.perf_counter() - start
+            deadline = time.monotonic() + 5
+            while stub.metrics()["cancelled"] == 0 and time.monotonic() < deadline:
+                time.sleep(0.01)
+            metrics = stub.metrics()
+        self.assertEqual(agent.result, {"wants_pizza": True})
+        total_tokens = reply.count(" ") + 1
+        # The full reply would take about total_tokens / 100 s
+        self.assertLess(elapsed, total_tokens / 100 / 2)
+        self.assertEqual(metrics["cancelled"], 1)
+        self.assertLess(metrics["tokens"], total_tokens / 2)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,118 @@
+"""
+Test suite for the exact-match LLM response cache.
+"""
+
+import os
+import sys
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+from langchain_core.language_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration
+
+import agents
+from agents import TriageAgentLLM
+from state import StateManager
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from common.llm_cache import ResponseCache
+
+def fake_llm(*replies: str, **kwargs) -> GenericFakeChatModel:
+    return GenericFakeChatModel(
+        messages=iter([AIMessage(content=reply) for reply in replies]), **kwargs
+    )
+
+def generations(text: str):
+    return [ChatGeneration(message=AIMessage(content=text))]
+
+class TestResponseCache(unittest.TestCase):
+    """Test both cache tiers, expiry and metrics"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "llm_cache.db")
+        self.now = 1000.0
+        self.cache = ResponseCache(self.path, ttl=60, clock=lambda: self.now)
+
+    def tearDown(self):
+        self.cache.close()
+        self.tmp.cleanup()
+
+    def test_repeated_prompt_skips_model(self):
+        """Same prompt and parameters: the second call never reaches the model"""
+        llm = fake_llm("Status", "Jira", cache=self.cache)
+        self.assertEqual(llm.invoke("status?").content, "Status")
+        self.assertEqual(llm.invoke("status?").content, "Status")
+        self.assertEqual(llm.invoke("Produkt 3").content, "Jira")
+        metrics = self.cache.metrics()
+        self.assertEqual((metrics["hits"], metrics["misses"]), (1, 2))
+        self.assertEqual(metrics["hit_ratio"], 0.333)
+
+    def test_parameters_are_part_of_the_key(self):
+        self.cache.update("status?", "model=a temperature=0.1", generations("Status"))
+        self.assertIsNone(self.cache.lookup("status?", "model=a temperature=0.7"))
+        self.assertEqual(
+            self.cache.lookup("status?", "model=a temperature=0.1")[0].text, "Status"
+        )
+
+    def test_disk_tier_survives_restart(self):
+        self.cache.update("status?", "llm", generations("Status"))
+        restarted = ResponseCache(self.path, ttl=60, clock=lambda: self.now)
+        try:
+            self.assertEqual(
+                restarted.lookup("status?", "llm")[0].message.content, "Status"
+            )
+            self.assertEqual(
+                restarted.lookup("status?", "llm")[0].message.content, "Status"
+            )
+            metrics = restarted.metrics()
+            self.assertEqual((metrics["disk_hits"], metrics["memory_hits"]), (1, 1))
+        finally:
+            restarted.close()
+
+    def test_entries_expire_after_ttl(self):
+        self.cache.update("status?", "llm", generations("Status"))
+        self.now += 61
+        self.assertIsNone(self.cache.lookup("status?", "llm"))
+        self.assertEqual(self.cache.metrics()["disk_entries"], 0)
+
+    def test_memory_tier_is_lru(self):
+        cache = ResponseCache(max_entries=2)
+        for prompt in ("a", "b"):
+            cache.update(prompt, "llm", generations(prompt))
+        cache.lookup("a", "llm")
+        cache.update("c", "llm", generations("c"))
+        self.assertIsNone(cache.lookup("b", "llm"))
+        self.assertIsNotNone(cache.lookup("a", "llm"))
+        self.assertEqual(cache.metrics()["disk_entries"], None)
+
+    def test_latency_saved(self):
+        """Hits count the model time the filling miss took"""
+        self.assertIsNone(self.cache.lookup("status?", "llm"))
+        time.sleep(0.02)
+        self.cache.update("status?", "llm", generations("Status"))
+        self.cache.lookup("status?", "llm")
+        self.assertGreaterEqual(self.cache.metrics()["latency_saved_s"], 0.02)
+
+    def test_triage_agent_opts_in(self):
+        """TriageAgentLLM answers a repeated input from the cache"""
+        llm = fake_llm('{"wants_pizza": true}', cache=self.cache)
+        state = StateManager.create_initial_state("status?", "s1")
+        with mock.patch.object(
+            agents, "default_response_cache", lambda: self.cache
+        ), mock.patch.object(
+            agents.default_registry,
+            "chat_model",
+            lambda **kwargs: llm if "cache" in kwargs else None,
+        ):
+            replies = []
+            for _ in range(3):
+                TriageAgentLLM(state).execute(on_token=replies.append)
+        self.assertEqual(replies, ['{"wants_pizza": true}'] * 3)
+        self.assertEqual(self.cache.metrics()["hits"], 2)
+
+if __name__ == "__main__":
+    unittest.main()
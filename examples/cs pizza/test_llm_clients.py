@@ -0,0 +1,86 @@
+"""
+Test suite for the shared ChatOllama client registry.
+"""
+
+import os
+import sys
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from common.llm_clients import ClientRegistry
+from common.ollama_stub import OllamaStub
+
+class TestClientRegistry(unittest.TestCase):
+    """Test client reuse, connection pooling and metrics"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = OllamaStub(default_reply="Hallo").start()
+        cls.base_url = cls.server.base_url
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.stop()
+
+    def setUp(self):
+        self.registry = ClientRegistry(max_connections=2, max_keepalive_connections=2)
+
+    def tearDown(self):
+        self.registry.close()
+
+    def test_same_configuration_same_client(self):
+        first = self.registry.chat_model(
+            "mistral:latest",
+            self.base_url,
+            timeout=5,
+            temperature=0.1,
+            tags=["nostream"],
+        )
+        again = self.registry.chat_model(
+            "mistral:latest",
+            self.base_url,
+            timeout=5,
+            temperature=0.1,
+            tags=["nostream"],
+        )
+        other = self.registry.chat_model(
+            "mistral:latest", self.base_url, timeout=5, temperature=0.7
+        )
+        self.assertIs(first, again)
+        self.assertIsNot(first, other)
+        self.assertEqual(self.registry.metrics()["clients"], 2)
+        # The timeout reaches the HTTP client (ChatOllama ignores its own timeout
+        # argument)
+        self.assertEqual(first._client._client.timeout.read, 5)
+
+    def test_requests_reuse_one_connection(self):
+        """Clients of one base URL share a keep-alive pool"""
+        for temperature in (0.1, 0.1, 0.5, 0.1):
+            llm = self.registry.chat_model(
+                "mistral:latest", self.base_url, temperature=temperature
+            )
+            self.assertEqual(llm.invoke("hi").content, "Hallo")
+        pool = self.registry.metrics()["pools"][self.base_url]
+        self.assertEqual(pool["requests"], 4)
+        self.assertEqual(pool["connections_opened"], 1)
+        self.assertEqual(pool["reuse_ratio"], 0.75)
+
+    def test_connection_limit_across_threads(self):
+        llm = self.registry.chat_model("mistral:latest", self.base_url)
+        with ThreadPoolExecutor(max_workers=6) as pool:
+            replies = list(pool.map(lambda _: llm.invoke("hi").content, range(24)))
+        self.assertEqual(replies, ["Hallo"] * 24)
+        metrics = self.registry.metrics()["pools"][self.base_url]
+        self.assertEqual(metrics["requests"], 24)
+        self.assertLessEqual(metrics["connections_opened"], 2)
+
+    def test_close_resets(self):
+        self.registry.chat_model("mistral:latest", self.base_url).invoke("hi")
+        self.registry.close()
+        self.assertEqual(
+            self.registry.metrics(), {"clients": 0, "pools": {}, "warm_up": {}}
+        )
+
+if __name__ == "__main__":
+    unittest.main()
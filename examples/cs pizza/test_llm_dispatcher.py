@@ -0,0 +1,122 @@
+"""
+Test suite for the micro-batching LLM dispatcher.
+"""
+
+import os
+import sys
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from common.llm_dispatcher import LLMDispatcher, request_key
+
+class SlowCall:
+    """Callable that records concurrency and blocks until released"""
+
+    def __init__(self, result="ok", error=None):
+        self.result = result
+        self.error = error
+        self.release = threading.Event()
+        self.lock = threading.Lock()
+        self.running = 0
+        self.peak = 0
+        self.calls = 0
+
+    def __call__(self):
+        with self.lock:
+            self.calls += 1
+            self.running += 1
+            self.peak = max(self.peak, self.running)
+        self.release.wait(5)
+        with self.lock:
+            self.running -= 1
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+class TestLLMDispatcher(unittest.TestCase):
+    """Test singleflight, bounded concurrency, error fan-out and windowing"""
+
+    def setUp(self):
+        self.dispatcher = LLMDispatcher(window=0.01, max_concurrency=2)
+
+    def tearDown(self):
+        self.dispatcher.close()
+
+    def test_identical_requests_share_one_call(self):
+        call = SlowCall("Hallo")
+        futures = [self.dispatcher.submit("same", call) for _ in range(20)]
+        call.release.set()
+        self.assertEqual([future.result(5) for future in futures], ["Hallo"] * 20)
+        self.assertEqual(call.calls, 1)
+        metrics = self.dispatcher.metrics()
+        self.assertEqual(
+            (metrics["submitted"], metrics["coalesced"], metrics["calls"]), (20, 19, 1)
+        )
+        self.assertEqual(metrics["in_flight"], 0)
+
+    def test_request_joins_call_in_flight(self):
+        call = SlowCall()
+        first = self.dispatcher.submit("same", call)
+        while call.calls == 0:
+            time.sleep(0.001)
+        # The call has left the window but not finished: a new request waits for it
+        self.assertIs(self.dispatcher.submit("same", call), first)
+        call.release.set()
+        first.result(5)
+        # Finished calls are not remembered; that is the response cache's job
+        self.assertIsNot(self.dispatcher.submit("same", call), first)
+
+    def test_concurrency_is_bounded(self):
+        call = SlowCall()
+        futures = [self.dispatcher.submit(index, call) for index in range(8)]
+        time.sleep(0.05)
+        call.release.set()
+        for future in futures:
+            future.result(5)
+        self.assertEqual(call.calls, 8)
+        self.assertEqual(call.peak, 2)
+
+    def test_errors_reach_every_waiter_and_are_not_kept(self):
+        call = SlowCall(error=ConnectionError("ollama down"))
+        futures = [self.dispatcher.submit("same", call) for _ in range(3)]
+        call.release.set()
+        for future in futures:
+            self.assertIsInstance(future.exception(5), ConnectionError)
+        self.assertEqual(self.dispatcher.metrics()["errors"], 1)
+        retry = SlowCall("ok")
+        retry.release.set()
+        self.assertEqual(self.dispatcher.submit("same", retry).result(5), "ok")
+
+    def test_window_collects_a_burst_into_one_batch(self):
+        dispatcher = LLMDispatcher(window=0.5, max_concurrency=2)
+        self.addCleanup(dispatcher.close)
+        call = SlowCall()
+        call.release.set()
+        with ThreadPoolExecutor(max_workers=6) as pool:
+            list(
+                pool.map(
+                    lambda index: dispatcher.submit(index % 3, call).result(5), range(6)
+                )
+            )
+        metrics = dispatcher.metrics()
+        self.assertEqual(metrics["calls"], 3)
+        self.assertEqual(metrics["batches"], 1)
+        self.assertEqual(metrics["max_batch"], 3)
+
+    def test_invoke_keys_on_model_and_prompt(self):
+        llm = FakeListChatModel(responses=["product", "status"])
+        other = FakeListChatModel(responses=["jira"])
+        self.assertEqual(request_key(llm, "hi"), request_key(llm, "hi"))
+        self.assertNotEqual(request_key(llm, "hi"), request_key(llm, "ho"))
+        self.assertNotEqual(request_key(llm, "hi"), request_key(other, "hi"))
+        self.assertEqual(
+            self.dispatcher.invoke(llm, "hi", timeout=5).content, "product"
+        )
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,120 @@
+"""
+Test suite for the pizza logging setup.
+"""
+
+import io
+import json
+import logging
+import unittest
+from unittest import mock
+from state import StateManager
+from nodes import TriageAgent, PizzaAgent, ContinuationAgent
+from edges import route_after_triage
+from runtime import PizzaRuntime
+from pizza_logging import (
+    configure_logging,
+    flush_logging,
+    shutdown_logging,
+    get_logger,
+    SamplingFilter,
+)
+
+class Exploding:
+    """Log argument that fails the test if it is ever formatted"""
+
+    def __str__(self):
+        raise AssertionError("formatted while logging was disabled")
+
+class TestPizzaLogging(unittest.TestCase):
+    """Test leveled, buffered output from nodes and routers"""
+
+    def setUp(self):
+        self.stream = io.StringIO()
+        self.runtime = PizzaRuntime.create()
+
+    def tearDown(self):
+        shutdown_logging()
+        logging.getLogger("pizza").setLevel(logging.NOTSET)
+
+    def run_turn(self, user_input: str):
+        state = StateManager.create_initial_state(user_input, "session_1")
+        state = StateManager.apply(state, TriageAgent(state, self.runtime))
+        route_after_triage(state)
+        return StateManager.apply(state, PizzaAgent(state, self.runtime))
+
+    def test_info_level_keeps_routing_quiet(self):
+        """INFO shows the agents' decisions; routing lines need DEBUG"""
+        configure_logging("INFO", stream=self.stream)
+        self.run_turn("I want a pepperoni pizza")
+        flush_logging()
+
+        output = self.stream.getvalue()
+        self.assertIn("Triage: User wants pizza", output)
+        self.assertIn("PizzaAgent: Added pepperoni to order", output)
+        self.assertNotIn("Routing:", output)
+
+    def test_disabled_level_does_no_formatting(self):
+        """Arguments are not formatted below the configured level"""
+        configure_logging("WARNING", stream=self.stream)
+        get_logger("nodes").info("Order: %s", Exploding())
+        flush_logging()
+        self.assertEqual(self.stream.getvalue(), "")
+
+    def test_json_format_includes_extra_fields(self):
+        """JSON lines carry the level, logger and `extra` fields"""
+        configure_logging("DEBUG", fmt="json", stream=self.stream)
+        get_logger("nodes").info(
+            "Added %s", "pepperoni", extra={"session_id": "session_1"}
+        )
+        flush_logging()
+
+        entry = json.loads(self.stream.getvalue())
+        self.assertEqual(entry["message"], "Added pepperoni")
+        self.assertEqual(entry["logger"], "pizza.nodes")
+        self.assertEqual(entry["level"], "INFO")
+        self.assertEqual(entry["session_id"], "session_1")
+
+    def test_mutable_arguments_are_rendered_when_logged(self):
+        """Buffered records show arguments as they were at the log call"""
+        configure_logging("INFO", stream=self.stream)
+        items = ["pepperoni"]
+        get_logger("nodes").info("Items: %s", items)
+        items.append("hawaiian")
+        flush_logging()
+        self.assertEqual(self.stream.getvalue().strip(), "Items: ['pepperoni']")
+
+    def test_sampling_filter(self):
+        """DEBUG records are sampled per message; higher levels always pass"""
+        sampler = SamplingFilter(every=10)
+        make = lambda level, msg: logging.LogRecord(
+            "pizza.edges", level, "", 0, msg, None, None
+        )
+
+        routed = sum(
+            sampler.filter(make(logging.DEBUG, "Routing: a")) for _ in range(100)
+        )
+        other = sum(sampler.filter(make(logging.DEBUG, "Routing: b")) for _ in range(5))
+        warnings = sum(
+            sampler.filter(make(logging.WARNING, "Routing: a")) for _ in range(5)
+        )
+
+        self.assertEqual(routed, 10)
+        self.assertEqual(other, 1)
+        self.assertEqual(warnings, 5)
+
+    def test_state_does_not_depend_on_log_level(self):
+        """A failing order summary is recorded in the state at every level"""
+        state = self.run_turn("I want a pepperoni pizza")
+        errors = []
+        for level in ("WARNING", "INFO"):
+            configure_logging(level, stream=self.stream)
+            with mock.patch.object(self.runtime.order_service, "get_order_summary",
+                                   side_effect=RuntimeError("summary failed")):
+                update = ContinuationAgent(state, self.runtime)
+            errors.append(StateManager.apply(state, update)["validation_errors"])
+            shutdown_logging()
+        self.assertEqual(errors[0], errors[1])
+        self.assertTrue(any("summary failed" in error for error in errors[0]))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,144 @@
+"""
+Test suite for tiered model routing with latency SLOs.
+"""
+
+import json
+import os
+import sys
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+from langchain_core.language_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage
+
+import agents
+from agents import PizzaAgentLLM, TriageAgentLLM
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from common.model_router import ModelRouter, TaskProfile, load_pools
+
+ROUTING = TaskProfile("routing", slo=0.5)
+POOLS = {"routing": ["small", "large"]}
+
+class TestModelRouter(unittest.TestCase):
+    """
+    Models are chosen by preference, avoided while over their SLO and retried after the
+    cool-down
+    """
+
+    def setUp(self):
+        self.router = ModelRouter(
+            POOLS, default_model="default", cooldown=0.05, min_samples=2
+        )
+
+    def test_pools(self):
+        self.assertEqual(self.router.select(ROUTING), "small")
+        self.assertEqual(self.router.select(TaskProfile("answer", slo=5.0)), "default")
+        self.assertEqual(self.router.models(), ["default", "small", "large"])
+        self.assertEqual(load_pools('{"routing": "small"}'), {"routing": ["small"]})
+        with tempfile.NamedTemporaryFile("w", suffix=".json", delete=False) as f:
+            json.dump(POOLS, f)
+        self.addCleanup(os.remove, f.name)
+        self.assertEqual(load_pools(f.name), POOLS)
+        self.assertEqual(load_pools(""), {})
+
+    def test_slow_model_demoted_until_probe(self):
+        # One slow call is not enough to leave the pool's first choice
+        self.router.record("small", ROUTING, 2.0)
+        self.assertEqual(self.router.select(ROUTING), "small")
+        self.router.record("small", ROUTING, 2.0)
+        self.assertEqual(self.router.select(ROUTING), "large")
+        time.sleep(0.06)
+        # The probe after the cool-down is fast: the model is used again
+        with self.router.track(ROUTING) as model:
+            self.assertEqual(model, "small")
+            # One probe at a time; other callers keep using the next model
+            self.assertEqual(self.router.select(ROUTING), "large")
+        self.assertEqual(self.router.select(ROUTING), "small")
+        stats = self.router.metrics()["models"]["small"]["routing"]
+        self.assertEqual(
+            (stats["calls"], stats["demotions"], stats["demoted"]), (3, 1, False)
+        )
+        self.assertLess(stats["mean_ms"], 100.0)
+
+    def test_slow_probe_demotes_again(self):
+        self.router.record("small", ROUTING, 2.0, error=True)
+        time.sleep(0.06)
+        model, probe = self.router._select(ROUTING)
+        self.assertEqual((model, probe), ("small", True))
+        self.router.record(model, ROUTING, 2.0, probe=True)
+        self.assertEqual(self.router.select(ROUTING), "large")
+        self.assertEqual(
+            self.router.metrics()["models"]["small"]["routing"]["demotions"], 2
+        )
+
+    def test_all_slow_uses_fastest(self):
+        for model, seconds in (("small", 3.0), ("large", 1.0)):
+            self.router.record(model, ROUTING, seconds)
+            self.router.record(model, ROUTING, seconds)
+        self.assertEqual(self.router.candidates(ROUTING), ["large", "small"])
+
+    def test_call_falls_back_on_error(self):
+        def run(model: str) -> str:
+            if model == "small":
+                raise TimeoutError("timed out")
+            return model
+
+        self.assertEqual(self.router.call(ROUTING, run), "large")
+        # The failed model is skipped during its cool-down
+        self.assertEqual(self.router.call(ROUTING, run), "large")
+        metrics = self.router.metrics()
+        self.assertEqual(metrics["fallbacks"], 1)
+        self.assertEqual(metrics["selections"]["routing"], {"small": 1, "large": 2})
+        self.assertEqual(metrics["models"]["small"]["routing"]["errors"], 1)
+        with self.assertRaises(TimeoutError):
+            ModelRouter({"routing": ["small"]}).call(ROUTING, run)
+
+    def test_content_errors_do_not_demote(self):
+        def run(model: str) -> str:
+            raise ValueError("not JSON")
+
+        for _ in range(3):
+            with self.assertRaises(ValueError):
+                self.router.call(ROUTING, run)
+        with self.assertRaises(ValueError), self.router.track(ROUTING):
+            raise ValueError("not JSON")
+        metrics = self.router.metrics()
+        # No fallback and no latency recorded; the model stays first choice
+        self.assertEqual((metrics["fallbacks"], metrics["models"]), (0, {}))
+        self.assertEqual(self.router.select(ROUTING), "small")
+
+class TestAgentModels(unittest.TestCase):
+    """Agents take the model of their task class from the pool"""
+
+    def setUp(self):
+        self.models = []
+
+    def chat_model(self, model, **kwargs):
+        self.models.append(model)
+        if model == "small":
+            raise ConnectionError("model not pulled")
+        reply = '{"wants_pizza": true}' if kwargs.get("cache") else "Margherita"
+        return GenericFakeChatModel(messages=iter([AIMessage(content=reply)]))
+
+    def test_routing_and_answer_pools(self):
+        router = ModelRouter(POOLS, default_model="default")
+        state = {"user_input": "a pizza please", "pizza_request": "cheese"}
+        replies = []
+        with mock.patch.object(agents, "default_router", router), mock.patch.object(
+            agents.default_registry, "chat_model", self.chat_model
+        ):
+            triage = TriageAgentLLM(state)
+            triage.execute(on_token=replies.append)
+            PizzaAgentLLM(state).execute(on_token=replies.append)
+        # The triage fell back from the failing small model; the answer uses the default
+        # pool
+        self.assertEqual(self.models, ["small", "large", "default"])
+        self.assertTrue(triage.result["wants_pizza"])
+        self.assertEqual(replies[-1], "Margherita")
+        self.assertEqual(router.metrics()["fallbacks"], 1)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,143 @@
+"""
+Test suite for the Ollama-compatible stub server.
+"""
+
+import os
+import sys
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from common.llm_clients import ClientRegistry
+from common.ollama_stub import DEFAULT_RULES, OllamaStub, tokenize
+
+class TestOllamaStub(unittest.TestCase):
+    """Test the stub through the same Ollama clients the agents use"""
+
+    def setUp(self):
+        self.registry = ClientRegistry()
+
+    def tearDown(self):
+        self.registry.close()
+
+    def chat_model(self, stub, **params):
+        return self.registry.chat_model(
+            "mistral:latest", stub.base_url, timeout=5, **params
+        )
+
+    def test_tokenize_round_trips(self):
+        for text in ("Hallo Welt", "  leading", "Final Answer: ja\n", "", "x"):
+            self.assertEqual("".join(tokenize(text)), text)
+        self.assertEqual(tokenize("eins zwei drei"), ["eins", " zwei", " drei"])
+
+    def test_script_then_rules_then_default(self):
+        rules = [(r"produkt (\d+)", r"Product \1"), (r"status", "Status")]
+        with OllamaStub(
+            script=["first", "second"], rules=rules, default_reply="end"
+        ) as stub:
+            llm = self.chat_model(stub)
+            replies = [
+                llm.invoke(text).content
+                for text in ("status", "status", "Produkt 7", "status", "hallo")
+            ]
+        self.assertEqual(replies, ["first", "second", "Product 7", "Status", "end"])
+
+    def test_chat_stream_timing(self):
+        with OllamaStub(
+            default_reply="eins zwei drei vier", ttft=0.1, tokens_per_sec=50
+        ) as stub:
+            llm = self.chat_model(stub)
+            start = time.perf_counter()
+            arrivals = []
+            chunks = []
+            for chunk in llm.stream("hi"):
+                if chunk.content:
+                    arrivals.append(time.perf_counter() - start)
+                    chunks.append(chunk.content)
+            metrics = stub.metrics()
+        self.assertEqual(chunks, ["eins", " zwei", " drei", " vier"])
+        self.assertGreaterEqual(arrivals[0], 0.1)
+        # Tokens arrive spread out, not in one burst at the end
+        self.assertGreaterEqual(arrivals[-1] - arrivals[0], 3 / 50 * 0.9)
+        self.assertEqual((metrics["requests"], metrics["tokens"]), (1, 4))
+        self.assertGreaterEqual(metrics["model_time_s"], 0.15)
+
+    def test_generate_endpoint(self):
+        from langchain_ollama import OllamaLLM
+        with OllamaStub(rules=[(r"step by step", "Ich bin ein Sprachmodell.")]) as stub:
+            llm = OllamaLLM(model="mistral", base_url=stub.base_url)
+            reply = llm.invoke(
+                "Question: Tell me about you\nAnswer: Let's think step by step."
+            )
+            by_path = stub.metrics()["by_path"]
+        self.assertEqual(reply, "Ich bin ein Sprachmodell.")
+        self.assertEqual(by_path, {"/api/generate": 1})
+
+    def test_injected_errors(self):
+        from ollama import ResponseError
+        with OllamaStub(error_rate=1.0) as stub:
+            with self.assertRaises(ResponseError) as raised:
+                self.chat_model(stub).invoke("hi")
+            self.assertEqual(raised.exception.status_code, 500)
+            self.assertEqual(stub.metrics()["errors"], 1)
+        with OllamaStub(error_rate=0.3, seed=1) as stub:
+            llm = self.chat_model(stub)
+            failures = 0
+            for _ in range(40):
+                try:
+                    llm.invoke("hi")
+                except ResponseError:
+                    failures += 1
+        self.assertTrue(4 <= failures <= 20, failures)
+
+    def test_parallel_slots(self):
+        with OllamaStub(ttft=0.1, parallel=2) as stub:
+            llm = self.chat_model(stub)
+            start = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=4) as pool:
+                list(pool.map(lambda _: llm.invoke("hi"), range(4)))
+            elapsed = time.perf_counter() - start
+        # Four requests through two slots take two rounds
+        self.assertGreaterEqual(elapsed, 0.2)
+
+    def test_default_rules_cover_the_examples(self):
+        with OllamaStub(rules=DEFAULT_RULES) as stub:
+            llm = self.chat_model(stub)
+            triage = ("system", "You are a triage agent for a pizza ordering system.")
+            self.assertIn(
+                '"wants_pizza": true',
+                llm.invoke([triage, ("human", 'User input: "a pizza please"')]).content,
+            )
+            self.assertIn(
+                '"wants_pizza": false',
+                llm.invoke([triage, ("human", 'User input: "no thanks, bye"')]).content,
+            )
+            routing = (
+                "system",
+                "Du bist ein Routing-Agent. Mögliche Kategorien: Product, Jira",
+            )
+            self.assertEqual(
+                llm.invoke(
+                    [routing, ("human", "Nutzeranfrage: Was kostet Produkt 3?")]
+                ).content,
+                "Product",
+            )
+            self.assertEqual(
+                llm.invoke([routing, ("human", "Nutzeranfrage: Guten Morgen")]).content,
+                "end",
+            )
+
+    def test_runs_standalone_on_a_thread(self):
+        stub = OllamaStub().start()
+        try:
+            self.assertEqual(self.chat_model(stub).invoke("hi").content, "OK")
+        finally:
+            stub.stop()
+        self.assertFalse(
+            any(thread.name == "ollama-stub" for thread in threading.enumerate())
+        )
+
+if __name__ == "__main__":
+    unittest.main()
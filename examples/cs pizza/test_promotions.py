@@ -0,0 +1,201 @@
+"""
+Test suite for the promotion rule engine.
+"""
+
+import unittest
+from datetime import datetime
+from state import Pizza, Order, OrderItem
+from services.order_service import OrderService, OrderRecommendationService
+from services.pizza_service import PizzaCatalogService
+from services.promotion_service import (
+    PromotionEngine,
+    PromotionRule,
+    PromotionRuleError,
+    OrderFeatures,
+    DEFAULT_PROMOTIONS,
+)
+
+# Monday 12:30
+LUNCH_TIME = datetime(2024, 1, 1, 12, 30)
+
+class TestPromotionEngine(unittest.TestCase):
+    """Test promotion rule compilation and evaluation"""
+
+    def setUp(self):
+        self.catalog_service = PizzaCatalogService()
+        self.margherita = self.catalog_service.get_pizza_by_name("margherita")
+        self.pepperoni = self.catalog_service.get_pizza_by_name("pepperoni")
+        self.hawaiian = self.catalog_service.get_pizza_by_name("hawaiian")
+
+    def make_order(self, *pizzas: Pizza, created_at: datetime = LUNCH_TIME) -> Order:
+        return Order(
+            [OrderItem(pizza, timestamp=created_at) for pizza in pizzas],
+            created_at=created_at,
+        )
+
+    def test_default_rules_match_legacy_behavior(self):
+        """Built-in promotions reproduce the previous hard-coded savings rules"""
+        service = OrderRecommendationService(OrderService())
+
+        single = service.calculate_savings_opportunities(
+            self.make_order(self.margherita)
+        )
+        self.assertEqual(single, {"potential_savings": 0.0, "suggestions": []})
+
+        order = self.make_order(self.pepperoni, self.hawaiian)
+        opportunities = service.calculate_savings_opportunities(order)
+        self.assertEqual(opportunities["suggestions"], [
+            "2+ pizzas qualify for 10% discount",
+            "Orders over $30 get free delivery"
+        ])
+        self.assertAlmostEqual(
+            opportunities["potential_savings"], order.total_amount * 0.1
+        )
+
+    def test_combo_and_ingredient_rules(self):
+        """
+        Combo rules require all listed pizzas; ingredient rules all listed ingredients
+        """
+        engine = PromotionEngine.from_definitions(
+            [
+                {
+                    "id": "combo",
+                    "message": "Combo deal",
+                    "when": {"pizzas": ["pepperoni", "margherita"]},
+                    "reward": {"amount_off": 5},
+                },
+                {
+                    "id": "pineapple",
+                    "message": "Pineapple lovers",
+                    "when": {"ingredients": ["pineapple", "ham"]},
+                    "reward": {"percent_off": 5},
+                },
+            ]
+        )
+
+        self.assertEqual(
+            engine.evaluate(self.make_order(self.pepperoni)).suggestions, []
+        )
+        combo = engine.evaluate(self.make_order(self.pepperoni, self.margherita))
+        self.assertEqual(combo.suggestions, ["Combo deal"])
+        self.assertAlmostEqual(combo.potential_savings, 5.0)
+        self.assertEqual(
+            engine.evaluate(self.make_order(self.hawaiian)).suggestions,
+            ["Pineapple lovers"],
+        )
+
+    def test_time_window_rules(self):
+        """Hour windows (including ones wrapping midnight) and weekdays are respected"""
+        engine = PromotionEngine.from_definitions([
+            {"id": "lunch", "message": "Lunch special", "when": {"hours": [11, 14]},
+             "reward": {"amount_off": 2}},
+            {"id": "late", "message": "Late night", "when": {"hours": [22, 2]},
+             "reward": {"amount_off": 3}},
+            {"id": "weekend", "message": "Weekend deal", "when": {"weekdays": [5, 6]},
+             "reward": {"amount_off": 4}}
+        ])
+
+        self.assertEqual(
+            engine.evaluate(self.make_order(self.margherita)).suggestions,
+            ["Lunch special"],
+        )
+        late = self.make_order(self.margherita, created_at=datetime(2024, 1, 6, 1, 0))
+        self.assertEqual(
+            engine.evaluate(late).suggestions, ["Late night", "Weekend deal"]
+        )
+
+    def test_savings_combination(self):
+        """Exclusive rewards take the best one; stackable rewards add up"""
+        engine = PromotionEngine.from_definitions(
+            [
+                {
+                    "id": "small",
+                    "message": "Small",
+                    "when": {"min_items": 1},
+                    "reward": {"amount_off": 1},
+                },
+                {
+                    "id": "big",
+                    "message": "Big",
+                    "when": {"min_items": 1},
+                    "reward": {"amount_off": 3},
+                },
+                {
+                    "id": "extra",
+                    "message": "Extra",
+                    "when": {"min_items": 1},
+                    "reward": {"amount_off": 2, "stackable": True},
+                    "priority": 5,
+                },
+            ]
+        )
+
+        result = engine.evaluate(self.make_order(self.margherita))
+        self.assertEqual(result.suggestions, ["Extra", "Small", "Big"])
+        self.assertAlmostEqual(result.potential_savings, 5.0)
+
+    def test_only_triggered_rules_are_evaluated(self):
+        """Rules whose trigger features are absent are never evaluated"""
+        definitions = [
+            {
+                "id": f"combo_{i}",
+                "message": f"Combo {i}",
+                "when": {"pizzas": ["hawaiian", f"special {i}"]},
+                "reward": {"amount_off": 1},
+            }
+            for i in range(100)
+        ]
+        engine = PromotionEngine.from_definitions(definitions)
+
+        features = OrderFeatures.from_order(
+            self.make_order(self.margherita, self.hawaiian)
+        )
+        self.assertEqual(engine.candidate_rules(features), [])
+        engine.evaluate_features(features)
+        self.assertEqual(engine.evaluated_rules, 0)
+
+    def test_bulk_matches_individual_evaluation(self):
+        """Bulk scoring returns the same results as scoring orders one by one"""
+        engine = PromotionEngine.from_definitions(
+            DEFAULT_PROMOTIONS
+            + [
+                {
+                    "id": "combo",
+                    "message": "Combo deal",
+                    "when": {"pizzas": ["pepperoni", "margherita"]},
+                    "reward": {"amount_off": 5},
+                }
+            ]
+        )
+        orders = [
+            self.make_order(self.margherita),
+            self.make_order(self.pepperoni, self.margherita),
+            self.make_order(self.hawaiian, self.hawaiian, self.pepperoni),
+        ]
+
+        bulk = engine.evaluate_many(orders)
+        individual = [engine.evaluate(order) for order in orders]
+        self.assertEqual([r.to_dict() for r in bulk], [r.to_dict() for r in individual])
+
+        summary = engine.simulate_campaign(orders)
+        self.assertEqual(summary["orders"], 3)
+        self.assertEqual(summary["promoted_orders"], 2)
+        self.assertEqual(summary["rule_hits"]["combo"], 1)
+
+    def test_invalid_rules(self):
+        """Invalid rule definitions are rejected at compile time"""
+        with self.assertRaises(PromotionRuleError):
+            PromotionRule.from_dict(
+                {"id": "x", "message": "X", "when": {"colour": "red"}}
+            )
+        with self.assertRaises(PromotionRuleError):
+            PromotionRule.from_dict(
+                {"id": "x", "message": "X", "when": {"hours": [10, 30]}}
+            )
+        with self.assertRaises(PromotionRuleError):
+            PromotionEngine.from_definitions(
+                DEFAULT_PROMOTIONS + DEFAULT_PROMOTIONS[:1]
+            )
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,132 @@
+"""
+Test suite for stable prompt prefixes, keep_alive and the model warm-up.
+"""
+
+import os
+import sys
+import time
+import unittest
+from unittest import mock
+
+from agents import PizzaAgentLLM, TriageAgentLLM, warm_up_prompts
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from common import llm_clients
+from common.llm_clients import ClientRegistry, keep_alive_value, start_warm_up
+from common.ollama_stub import OllamaStub, keep_alive_seconds
+
+class TestPromptPrefix(unittest.TestCase):
+    """
+    Prompts start with a fixed system message, so only the user message is evaluated
+    """
+
+    def setUp(self):
+        self.registry = ClientRegistry()
+        self.addCleanup(self.registry.close)
+
+    def test_agent_prompts_share_the_system_message(self):
+        for agent in (TriageAgentLLM, PizzaAgentLLM):
+            with self.subTest(agent=agent.__name__):
+                first, second = (
+                    agent({})
+                    .prompt()
+                    .invoke({"user_input": text, "pizza_request": text})
+                    .to_messages()
+                    for text in ("a veggie pizza", "no thanks")
+                )
+                self.assertEqual((first[0].type, first[1].type), ("system", "human"))
+                self.assertEqual(first[0], second[0])
+                self.assertNotIn("veggie", first[0].content)
+        self.assertEqual(len(warm_up_prompts()), 2)
+
+    def test_prefix_evaluated_once(self):
+        with OllamaStub(default_reply="Margherita", prompt_tokens_per_sec=2000) as stub:
+            llm = self.registry.chat_model("mistral:latest", stub.base_url, timeout=5)
+            chain = PizzaAgentLLM({}).chain(llm)
+            chain.invoke({"pizza_request": "something with mushrooms"})
+            first = stub.metrics()
+            chain.invoke({"pizza_request": "a spicy one"})
+            second = stub.metrics()
+        evaluated = second["prompt_tokens"] - first["prompt_tokens"]
+        # The request text and its label; the system message comes from the cache
+        self.assertLessEqual(evaluated, 8)
+        self.assertGreater(second["prompt_tokens_cached"], first["prompt_tokens"] - 8)
+
+class TestKeepAliveAndWarmUp(unittest.TestCase):
+    """Models stay loaded between requests and are loaded before the first one"""
+
+    def setUp(self):
+        self.registry = ClientRegistry()
+        self.addCleanup(self.registry.close)
+
+    def test_keep_alive_values(self):
+        self.assertEqual(
+            (keep_alive_value("30m"), keep_alive_value("-1"), keep_alive_value("")),
+            ("30m", -1, None),
+        )
+        self.assertEqual(
+            (keep_alive_seconds("5m"), keep_alive_seconds(0), keep_alive_seconds(-1)),
+            (300, 0, float("inf")),
+        )
+
+    def test_keep_alive_sent_with_requests(self):
+        with OllamaStub(load_time=0.05) as stub:
+            with mock.patch.object(llm_clients, "DEFAULT_KEEP_ALIVE", "0"):
+                self.registry.chat_model("mistral:latest", stub.base_url).invoke("hi")
+            # keep_alive 0 unloads the model right after the request
+            self.assertEqual(stub.loaded_models(), [])
+            llm = self.registry.chat_model("mistral:latest", stub.base_url)
+            self.assertEqual(
+                llm.keep_alive,
+                llm_clients.keep_alive_value(llm_clients.DEFAULT_KEEP_ALIVE),
+            )
+            llm.invoke("hi")
+            llm.invoke("hi")
+            self.assertEqual(stub.loaded_models(), ["mistral:latest"])
+            self.assertEqual(stub.metrics()["loads"], 2)
+
+    def test_warm_up_moves_load_and_prefix_out_of_the_first_request(self):
+        system_prompt = TriageAgentLLM({}).prompt().messages[0].format().content
+
+        def first_token(stub) -> float:
+            llm = self.registry.chat_model("mistral:latest", stub.base_url, timeout=5)
+            prompt = (
+                TriageAgentLLM({}).prompt().invoke({"user_input": "a pizza please"})
+            )
+            start = time.perf_counter()
+            next(iter(llm.stream(prompt)))
+            return time.perf_counter() - start
+
+        stub_options = {
+            "default_reply": "ok",
+            "load_time": 0.2,
+            "prompt_tokens_per_sec": 500,
+        }
+        with OllamaStub(**stub_options) as stub:
+            cold = first_token(stub)
+        with OllamaStub(**stub_options) as stub:
+            thread = start_warm_up(
+                {"mistral:latest": [system_prompt]}, self.registry, stub.base_url
+            )
+            thread.join(timeout=5)
+            warm = first_token(stub)
+            metrics = stub.metrics()
+        self.assertIn("seconds", self.registry.metrics()["warm_up"]["mistral:latest"])
+        self.assertEqual(metrics["loads"], 1)
+        # Load (200 ms) and the system message (~100 tokens at 500/s) happen in the
+        # warm-up
+        self.assertGreater(cold - warm, 0.2)
+
+    def test_warm_up_failure_is_recorded(self):
+        registry = ClientRegistry()
+        self.addCleanup(registry.close)
+        thread = start_warm_up(
+            {"mistral:latest": ["x"]}, registry, "http://127.0.0.1:9"
+        )
+        thread.join(timeout=10)
+        self.assertIn("error", registry.metrics()["warm_up"]["mistral:latest"])
+        with mock.patch.object(llm_clients, "WARM_UP_ENABLED", False):
+            self.assertIsNone(start_warm_up({"mistral:latest": ["x"]}, registry))
+
+if __name__ == "__main__":
+    unittest.main()
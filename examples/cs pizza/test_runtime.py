@@ -0,0 +1,72 @@
+"""
+Test suite for the shared pizza runtime context.
+"""
+
+import contextlib
+import io
+import unittest
+from state import StateManager
+from nodes import TriageAgent, PizzaAgent
+from runtime import PizzaRuntime, LRUCache
+from services.order_service import OrderService
+
+class TestPizzaRuntime(unittest.TestCase):
+    """Test services shared across node calls"""
+
+    def setUp(self):
+        self.runtime = PizzaRuntime.create()
+
+    def run_turn(self, user_input: str, session_id: str):
+        state = StateManager.create_initial_state(user_input, session_id)
+        with contextlib.redirect_stdout(io.StringIO()):
+            state = StateManager.apply(state, TriageAgent(state, self.runtime))
+            return StateManager.apply(state, PizzaAgent(state, self.runtime))
+
+    def test_orders_survive_across_calls(self):
+        """An order created in one call is known to the next call for the session"""
+        first = self.run_turn("I want a pepperoni pizza", "session_1")
+        second = self.run_turn("Give me a margherita pizza", "session_1")
+
+        self.assertIs(second['current_order'], first['current_order'])
+        self.assertEqual(len(second['current_order'].items), 2)
+        self.assertIs(
+            self.runtime.order_service.get_order_for_session("session_1"),
+            first['current_order'],
+        )
+
+    def test_session_orders_dropped_and_bounded(self):
+        """Orders are forgotten when a session ends and beyond the bound"""
+        self.run_turn("I want a pepperoni pizza", "session_1")
+        self.runtime.end_session("session_1")
+        self.assertIsNone(self.runtime.order_service.get_order_for_session("session_1"))
+
+        order_service = OrderService(max_sessions=2)
+        for session_id in ("a", "b", "c"):
+            order_service.create_order(session_id)
+        self.assertIsNone(order_service.get_order_for_session("a"))
+        self.assertIsNotNone(order_service.get_order_for_session("c"))
+        self.assertEqual(len(order_service._orders), 2)
+
+    def test_search_cache_returns_copies(self):
+        """Cached search results cannot be corrupted by callers"""
+        result = self.runtime.search_pizzas("pepperoni pizza")
+        result.matches.clear()
+
+        cached = self.runtime.search_pizzas("pepperoni pizza")
+        self.assertEqual(cached.matches[0].name, "pepperoni")
+        self.assertEqual(self.runtime.search_cache.hits, 1)
+
+    def test_lru_cache_eviction(self):
+        """The least recently used entry is evicted first"""
+        cache = LRUCache(max_size=2)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        cache.get("a")
+        cache.put("c", 3)
+
+        self.assertEqual(cache.get("a"), 1)
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(len(cache), 2)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,74 @@
+"""
+Cold-start budget for the example entry points.
+Each entry point is imported in a fresh interpreter. Heavy LLM/agent modules
+must not be loaded, and the import must stay within a budget expressed as a
+multiple of importing LangGraph alone (the floor every example pays), so the
+check holds on slower machines. Set STARTUP_BUDGET_SCALE to loosen it further.
+"""
+
+import os
+import sys
+import unittest
+
+EXAMPLES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.append(EXAMPLES_DIR)
+from common.import_report import cold_start, import_times
+
+# Loaded only when an LLM-backed node runs
+HEAVY_MODULES = ("langchain_ollama", "ollama", "langchain.agents")
+
+# (example directory, module, budget as a multiple of the LangGraph import)
+ENTRY_POINTS = [
+    ("cs pizza", "main", 1.6),
+    ("cs network", "chat", 1.4),
+    ("cs airline", "main", 1.3),
+    ("02 - langGraph", "main", 1.3),
+    ("04 - StateGraph", "main", 1.3),
+]
+
+class TestStartupBudget(unittest.TestCase):
+    """Test cold-start cost of each example entry point"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.scale = float(os.environ.get("STARTUP_BUDGET_SCALE", "1.0"))
+        cls.floor = cold_start("langgraph.graph", EXAMPLES_DIR)
+
+    def test_heavy_modules_are_not_imported(self):
+        for directory, module, _ in ENTRY_POINTS:
+            with self.subTest(entry_point=f"{directory}/{module}"):
+                loaded = {
+                    entry.module
+                    for entry in import_times(
+                        module, os.path.join(EXAMPLES_DIR, directory)
+                    )
+                }
+                heavy = loaded.intersection(HEAVY_MODULES)
+                self.assertFalse(heavy, f"{directory}/{module} imports {sorted(heavy)}")
+
+    def test_cold_start_within_budget(self):
+        for directory, module, budget in ENTRY_POINTS:
+            with self.subTest(entry_point=f"{directory}/{module}"):
+                limit = self.floor * budget * self.scale
+                elapsed = cold_start(
+                    module, os.path.join(EXAMPLES_DIR, directory), runs=2
+                )
+                if elapsed > limit:
+                    # Re-measure before failing; one slow run is usually noise
+                    elapsed = min(
+                        elapsed,
+                        cold_start(
+                            module, os.path.join(EXAMPLES_DIR, directory), runs=3
+                        ),
+                    )
+                self.assertLessEqual(
+                    elapsed,
+                    limit,
+                    f"{directory}/{module}: {elapsed * 1e3:.0f} ms "
+                    f"> budget {limit * 1e3:.0f} ms "
+                    f"(LangGraph alone: {self.floor * 1e3:.0f} ms); "
+                    "see ../common/import_report.py",
+                )
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,155 @@
+"""
+Test suite for token streaming from LLM-backed nodes.
+"""
+
+import io
+import os
+import sys
+import threading
+import unittest
+from typing import Any, List, TypedDict
+from unittest import mock
+
+from langchain_core.language_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage
+from langgraph.graph import StateGraph, END
+
+from agents import TriageAgentLLM
+from state import StateManager
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from common.llm_clients import default_registry
+from common.token_stream import FinalAnswerFilter, TokenPrinter, stream_turn
+
+class ChatState(TypedDict):
+    messages: list
+
+def fake_llm(*replies: str, **kwargs) -> GenericFakeChatModel:
+    return GenericFakeChatModel(
+        messages=iter([AIMessage(content=reply) for reply in replies]), **kwargs
+    )
+
+class GatedFakeChatModel(GenericFakeChatModel):
+    """Waits after its first token until the client has received it"""
+    gate: Any = None
+    client_saw_first_token: bool = False
+
+    def _stream(self, *args, **kwargs):
+        for index, chunk in enumerate(super()._stream(*args, **kwargs)):
+            yield chunk
+            if index == 0:
+                self.client_saw_first_token = self.gate.wait(timeout=5)
+
+class TestTokenStream(unittest.TestCase):
+    """Test that tokens reach clients while nodes are still generating"""
+
+    def build_app(self, events: List[str], gate: threading.Event = None):
+        def classify(state: ChatState) -> ChatState:
+            fake_llm("product", tags=["nostream"]).invoke("classify")
+            return {}
+
+        def answer(state: ChatState) -> ChatState:
+            llm = GatedFakeChatModel(
+                messages=iter([AIMessage(content="Die Pizza kommt gleich")]),
+                gate=gate or threading.Event(),
+            )
+            reply = llm.invoke("answer")
+            events.append(
+                f"answer returned, client saw first token: {llm.client_saw_first_token}"
+            )
+            return {"messages": state["messages"] + [reply]}
+
+        def react(state: ChatState) -> ChatState:
+            llm = fake_llm(
+                "Thought: look it up\nAction: find",
+                "Thought: done\nFinal Answer: Produkt 3 ist da",
+            )
+            llm.invoke("step 1")
+            return {"messages": state["messages"] + [llm.invoke("step 2")]}
+
+        workflow = StateGraph(ChatState)
+        workflow.add_node("classify", classify)
+        workflow.add_node("answer", answer)
+        workflow.add_node("react", react)
+        workflow.set_entry_point("classify")
+        workflow.add_edge("classify", "answer")
+        workflow.add_edge("answer", "react")
+        workflow.add_edge("react", END)
+        return workflow.compile()
+
+    def test_tokens_arrive_before_node_returns(self):
+        events, gate = [], threading.Event()
+
+        def on_token(text: str, node: str):
+            events.append(f"{node}: {text}")
+            gate.set()
+
+        state, stats = stream_turn(
+            self.build_app(events, gate),
+            {"messages": []},
+            nodes=("answer",),
+            on_token=on_token,
+        )
+        self.assertEqual(events[0], "answer: Die")
+        self.assertIn("answer returned, client saw first token: True", events)
+        tokens = [
+            event[len("answer: ") :] for event in events if event.startswith("answer: ")
+        ]
+        self.assertEqual("".join(tokens), "Die Pizza kommt gleich")
+        self.assertEqual(stats.tokens, len(tokens))
+        self.assertLessEqual(stats.first_token_s, stats.total_s)
+        self.assertEqual(state["messages"][0].content, "Die Pizza kommt gleich")
+
+    def test_nostream_tag_and_react_final_answer(self):
+        """Classifier tokens are hidden; ReAct nodes stream only the final answer"""
+        tokens = []
+        gate = threading.Event()
+        gate.set()
+        _, stats = stream_turn(
+            self.build_app([], gate),
+            {"messages": []},
+            react_nodes=("react",),
+            on_token=lambda text, node: tokens.append((node, text)),
+        )
+        self.assertNotIn("classify", {node for node, _ in tokens})
+        self.assertEqual(
+            "".join(text for node, text in tokens if node == "react"),
+            "Produkt 3 ist da",
+        )
+
+    def test_turn_without_tokens(self):
+        gate = threading.Event()
+        gate.set()
+        _, stats = stream_turn(self.build_app([], gate), {"messages": []}, nodes=())
+        self.assertIsNone(stats.first_token_s)
+        self.assertIn("no tokens streamed", str(stats))
+
+    def test_final_answer_filter_split_marker(self):
+        """The marker may be split across tokens; each generation starts over"""
+        final_answer = FinalAnswerFilter()
+        shown = [
+            final_answer.feed(text, "g1")
+            for text in ["Thought: ok\nFinal An", "swer:", " ", "Hallo", " Welt"]
+        ]
+        self.assertEqual("".join(shown), "Hallo Welt")
+        self.assertEqual(final_answer.feed("Thought: again", "g2"), "")
+
+    def test_agent_execute_streams_tokens(self):
+        """AgentBase.execute hands tokens to on_token while generating"""
+        state = StateManager.create_initial_state("I want pizza", "s1")
+        printer_output = io.StringIO()
+        printer = TokenPrinter(prefix="> ", stream=printer_output)
+        with mock.patch.object(
+            default_registry,
+            "chat_model",
+            lambda **kwargs: fake_llm('{"wants_pizza": true}'),
+        ):
+            TriageAgentLLM(state).execute(
+                on_token=lambda token: printer(token, "triage")
+            )
+        self.assertTrue(printer.end_turn())
+        self.assertEqual(printer_output.getvalue(), '> {"wants_pizza": true}\n')
+        self.assertFalse(printer.end_turn())
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,12 +1,20 @@
 #!/usr/bin/env python3
 """
 Simple test of the pizza workflow without external dependencies.
-This simulates the workflow execution to demonstrate the continuation logic.
+This runs the graph definition with the in-process interpreter to demonstrate
+the continuation logic step by step.
 """
 
-from state import PizzaState
-from nodes import TriageAgent, PizzaAgent, ContinuationAgent
-from edges import route_after_triage, route_after_pizza, route_after_continuation
+import os
+import sys
+
+from state import StateManager
+from runtime import PizzaRuntime
+from graph import create_workflow
+from pizza_logging import configure_logging
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from common.graph_interpreter import GraphInterpreter
 
 def simulate_workflow(initial_input: str):
     """Simulate the workflow execution step by step."""
@@ -14,49 +22,31 @@ def simulate_workflow(initial_input: str):
     print(f"STARTING WORKFLOW WITH INPUT: '{initial_input}'")
     print(f"{'='*50}")
     
-    # Initialize state
-    state = PizzaState(
-        user_input=initial_input,
-        wants_pizza=False,
-        pizza_request="",
-        found_pizza=None,
-        exit_reason=None,
-        continue_ordering=None,
-    )
-    
-    current_node = "triage"
-    step = 1
+    steps = []
     
-    while current_node != "__end__":
-        print(f"\n--- Step {step}: {current_node} ---")
-        
-        if current_node == "triage":
-            state = TriageAgent(state)
-            next_node = route_after_triage(state)
-            
-        elif current_node == "pizza_agent":
-            state = PizzaAgent(state)
-            next_node = route_after_pizza(state)
-            
-        elif current_node == "continuation_agent":
-            state = ContinuationAgent(state)
-            next_node = route_after_continuation(state)
-        
+    def show_step(node, state, next_node):
+        steps.append(node)
+        print(f"\n--- Step {len(steps)}: {node} ---")
         print(f"Current state: {dict(state)}")
         print(f"Next node: {next_node}")
-        
-        current_node = next_node
-        step += 1
-        
-        # Safety check to avoid infinite loops
-        if step > 10:
-            print("Too many steps, ending simulation")
-            break
+    
+    # Run the graph definition in-process, without the Pregel runtime
+    interpreter = GraphInterpreter(
+        create_workflow(), context=PizzaRuntime.create(), on_step=show_step
+    )
+    run = interpreter.run(StateManager.create_initial_state(initial_input))
+    
+    if run.paused_at:
+        # The compiled graph pauses here until the user replies
+        print(f"\n--- Step {len(run.path)}: {run.paused_at} ---")
+        print("Waiting for user reply")
     
     print(f"\n--- WORKFLOW ENDED ---")
-    print(f"Final state: {dict(state)}")
+    print(f"Final state: {dict(run.state)}")
 
 if __name__ == "__main__":
+    configure_logging("DEBUG", buffered=False)
+    
     # Test scenarios
     test_cases = [
         "I want a pepperoni pizza",